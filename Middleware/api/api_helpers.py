@@ -8,7 +8,7 @@ from typing import Dict, Any, List, Optional, Tuple
 from flask import request as flask_request
 
 from Middleware.common import instance_global_variables
-from Middleware.services.response_builder_service import ResponseBuilderService
+from Middleware.services.response_builder_service import ResponseBuilderService, StreamChunkEncoder
 from Middleware.utilities.config_utils import get_current_username, workflow_exists_in_shared_folder, \
     get_config_property_if_exists, get_user_config_for, get_root_config_directory, _is_safe_flat_config_name
 
@@ -22,6 +22,7 @@ def build_response_json(
         additional_fields: Optional[Dict[str, Any]] = None,
         request_id: Optional[str] = None,
         tool_calls: Optional[List[Dict[str, Any]]] = None,
+        encoder: Optional[StreamChunkEncoder] = None,
 ) -> str:
     """
     Constructs a response JSON payload based on the API type using the ResponseBuilderService.
@@ -32,10 +33,16 @@ def build_response_json(
         additional_fields (Optional[Dict[str, Any]]): Extra fields to merge into the final JSON response.
         request_id (Optional[str]): The unique identifier for the request.
         tool_calls (Optional[List[Dict[str, Any]]]): Tool call objects to include in the response.
+        encoder (Optional[StreamChunkEncoder]): The stream's encoder from
+            create_stream_chunk_encoder(). When given, it serializes the chunk
+            with its own fixed API type, request id, model name and chunk id.
 
     Returns:
         str: A JSON string representing the formatted response payload.
     """
+    if encoder is not None:
+        return encoder.encode(token, finish_reason, additional_fields=additional_fields, tool_calls=tool_calls)
+
     api_type = instance_global_variables.get_api_type()
     response = {}
 
@@ -56,6 +63,22 @@ def build_response_json(
     return json.dumps(response, ensure_ascii=False)
 
 
+def create_stream_chunk_encoder(request_id: Optional[str] = None) -> StreamChunkEncoder:
+    """
+    Creates the chunk encoder for one streamed response in the current API format.
+
+    Args:
+        request_id (Optional[str]): The unique identifier for the request.
+
+    Returns:
+        StreamChunkEncoder: An encoder to pass to build_response_json for every chunk of the stream.
+
+    Raises:
+        ValueError: If the current API type does not stream.
+    """
+    return StreamChunkEncoder(instance_global_variables.get_api_type(), request_id, model_name=get_model_name())
+
+
 def get_model_name():
     """
     Retrieves the current model name based on the username and active workflow.
@@ -1,7 +1,9 @@
 import json
 import logging
+import time
 
 from Middleware.common import instance_global_variables
+from Middleware.services.metrics_service import metrics_service
 
 logger = logging.getLogger(__name__)
 
@@ -84,8 +86,12 @@ class ConcurrencyLimitMiddleware:
         if instance_global_variables.CONCURRENCY_LEVEL == "endpoint":
             return self._app(environ, start_response)
 
+        wait_started = time.perf_counter()
         acquired = self._semaphore.acquire(timeout=self._acquire_timeout)
+        metrics_service.observe("wilmer_concurrency_wait_seconds", time.perf_counter() - wait_started,
+                                {"level": "wilmer"})
         if not acquired:
+            metrics_service.increment("wilmer_concurrency_rejections_total", {"level": "wilmer"})
             logger.warning(
                 "Request rejected: concurrency limit reached "
                 "(timed out after %ss)", self._acquire_timeout
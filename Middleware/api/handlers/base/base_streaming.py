@@ -7,8 +7,9 @@
 # ApiServer's handler discovery walk.
 
 import logging
+import time
 from dataclasses import dataclass
-from typing import Callable, Dict, List
+from typing import Callable, Dict, List, Optional, Tuple
 
 try:
     import eventlet
@@ -23,12 +24,13 @@ except ImportError:
 
     EventletQueueEmpty = queue.Empty
 
-from flask import Response, stream_with_context
+from flask import Response, request, stream_with_context
 from werkzeug.exceptions import ClientDisconnected
 
 from Middleware.api import api_helpers
 from Middleware.common import instance_global_variables
 from Middleware.exceptions.early_termination_exception import EarlyTerminationException
+from Middleware.utilities import config_utils
 from Middleware.utilities.sensitive_logging_utils import set_encryption_context, is_encryption_active
 
 logger = logging.getLogger(__name__)
@@ -90,6 +92,77 @@ def _restore_request_context(snapshot: tuple) -> None:
     set_encryption_context(encryption_active)
 
 
+def _get_coalescing_settings() -> Optional[Tuple[int, float]]:
+    """Reads the current user's stream coalescing limits on the request thread.
+
+    Returns:
+        Optional[Tuple[int, float]]: (max_bytes, max_delay_seconds), or None when
+        coalescing is off or the user config cannot be read.
+    """
+    try:
+        return config_utils.get_stream_coalescing_settings()
+    except Exception as e:
+        logger.debug(f"Could not read streamCoalescing; streaming chunks individually: {e}")
+        return None
+
+
+def _encode_chunk(chunk) -> bytes:
+    """Encodes a backend chunk for the WSGI server.
+
+    Args:
+        chunk: A str or bytes chunk from the backend.
+
+    Returns:
+        bytes: The UTF-8 encoded chunk.
+    """
+    return chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+def _coalesce_queued_chunks(event_queue, stop_signal, first: bytes, chunk_signals_done: Callable[[bytes], bool],
+                            max_bytes: int, max_delay: float) -> Tuple[bytes, bool, Optional[BaseException]]:
+    """Merges chunks waiting behind an already-dequeued chunk into one write.
+
+    Chunks are taken until the write holds max_bytes, until max_delay has passed
+    since the first chunk was dequeued, or until the backend has finished and the
+    queue is empty. The terminator predicate is applied to each chunk on its own,
+    never to the merged bytes, so the exact-match SSE check keeps working and
+    nothing queued after the terminator is merged in.
+
+    Args:
+        event_queue: The reader greenlet's queue of ("data" | "error", value) items.
+        stop_signal: The reader greenlet's completion event.
+        first (bytes): The encoded chunk that starts the write. It must not be a terminator.
+        chunk_signals_done (Callable[[bytes], bool]): The API's stream-terminator predicate.
+        max_bytes (int): The size at which the write is sent without waiting for more.
+        max_delay (float): The longest, in seconds, the first chunk may be held back.
+
+    Returns:
+        Tuple[bytes, bool, Optional[BaseException]]: The merged bytes, whether they
+        end with the stream terminator, and a backend error that was dequeued
+        behind them (to be raised once the merged bytes are sent).
+    """
+    parts = [first]
+    size = len(first)
+    deadline = time.monotonic() + max_delay
+    while size < max_bytes:
+        try:
+            remaining = deadline - time.monotonic()
+            if remaining > 0 and not stop_signal.ready():
+                msg_type, data = event_queue.get(timeout=remaining)
+            else:
+                msg_type, data = event_queue.get_nowait()
+        except EventletQueueEmpty:
+            break
+        if msg_type == "error":
+            return b''.join(parts), False, data
+        encoded = _encode_chunk(data)
+        parts.append(encoded)
+        size += len(encoded)
+        if chunk_signals_done(encoded):
+            return b''.join(parts), True, None
+    return b''.join(parts), False, None
+
+
 def _build_streaming_response(body, mimetype: str) -> Response:
     """Wraps an iterable of encoded chunks in a streaming Response with shared headers.
 
@@ -110,7 +183,10 @@ def _build_streaming_response(body, mimetype: str) -> Response:
     )
     # Force connection teardown after streaming completes. Some front-ends (notably Node.js-based apps)
     # can have their HTTP connection pool corrupted by keep-alive connections that outlive a streaming response.
-    response.headers['Connection'] = 'close'
+    # Waitress follows PEP 3333 strictly and rejects a hop-by-hop header from the application, failing the
+    # whole response, so under Waitress the connection lifetime is left to the server.
+    if not request.environ.get('SERVER_SOFTWARE', '').startswith('waitress'):
+        response.headers['Connection'] = 'close'
     return response
 
 
@@ -122,6 +198,8 @@ def stream_with_eventlet_optimized(config: StreamingApiConfig, backend: Callable
 
     Uses a queue-based approach where a background greenlet reads from the backend
     and the main generator uses timeouts to detect when heartbeats are needed.
+    When the user enables ``streamCoalescing``, chunks that queue up while the
+    client socket is being written are sent together in one write.
 
     Args:
         config (StreamingApiConfig): The API-specific streaming values.
@@ -142,6 +220,7 @@ def stream_with_eventlet_optimized(config: StreamingApiConfig, backend: Callable
     from Middleware.services.idempotency_service import idempotency_service
 
     request_context = _capture_request_context()
+    coalescing = _get_coalescing_settings()
 
     event_queue = EventletQueue()
     stop_signal = eventlet.event.Event()
@@ -220,18 +299,24 @@ def stream_with_eventlet_optimized(config: StreamingApiConfig, backend: Callable
                         raise data
                     elif msg_type == "data":
                         backend_produced_data = True
-                        if isinstance(data, str):
-                            encoded = data.encode('utf-8')
-                        else:
-                            encoded = data
+                        encoded = _encode_chunk(data)
+                        signals_done = config.chunk_signals_done(encoded)
+                        pending_error = None
+                        if coalescing is not None and not signals_done:
+                            encoded, signals_done, pending_error = _coalesce_queued_chunks(
+                                event_queue, stop_signal, encoded, config.chunk_signals_done, *coalescing)
                         yield encoded
                         first_output_sent = True
 
                         # If this chunk carries the stream terminator, return
                         # immediately. The backend_reader greenlet continues running
                         # so that post-returnToUser workflow nodes can finish.
-                        if config.chunk_signals_done(encoded):
+                        if signals_done:
                             return
+                        # A backend error queued behind the coalesced chunks is
+                        # raised only after the chunks before it were sent.
+                        if pending_error is not None:
+                            raise pending_error
 
                         # Force immediate socket write
                         eventlet.sleep(0)
@@ -0,0 +1,42 @@
+# Middleware/api/handlers/impl/metrics_api_handler.py
+
+from flask import Response
+from flask.views import MethodView
+
+from Middleware.api.app import app
+from Middleware.api.handlers.base.base_api_handler import BaseApiHandler
+from Middleware.services.metrics_service import metrics_service
+
+# The content type Prometheus scrapers expect for the text exposition format.
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsAPI(MethodView):
+    @staticmethod
+    def get() -> Response:
+        """
+        Handles GET requests for the /metrics endpoint.
+
+        Returns node, backend, concurrency, cancellation and cache metrics in the
+        Prometheus text exposition format. As a GET it is never held behind the
+        concurrency limit, so it stays responsive while every slot is busy.
+
+        Returns:
+            Response: The exposition text.
+        """
+        return Response(metrics_service.render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+class MetricsApiHandler(BaseApiHandler):
+    """
+    Registers the Prometheus metrics endpoint.
+    """
+
+    def register_routes(self, app_instance: app) -> None:
+        """
+        Registers the /metrics route with the Flask app.
+
+        Args:
+            app_instance (app): The Flask application instance.
+        """
+        app_instance.add_url_rule('/metrics', view_func=MetricsAPI.as_view('metrics'), methods=['GET'])
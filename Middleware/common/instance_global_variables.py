@@ -22,6 +22,7 @@ CONCURRENCY_TIMEOUT = 900
 CONCURRENCY_LEVEL = "wilmer"
 PORT = None  # None = resolve from user config (single-user) or default (multi-user)
 LISTEN_ADDRESS = "127.0.0.1"  # Bind address; use --listen to expose on network (0.0.0.0)
+PRECOMPILE_WORKFLOWS = False  # --precompile-workflows: compile every workflow file at startup
 _request_semaphore = None
 
 
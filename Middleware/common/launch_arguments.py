@@ -95,6 +95,9 @@ def parse_and_apply_launch_arguments(description):
                              "outbound LLM API calls, allowing reentrant requests (e.g. a Wilmer "
                              "workflow that calls another service which calls back into Wilmer) "
                              "to make progress without deadlocking.")
+    parser.add_argument("--precompile-workflows", action='store_true', default=None,
+                        help="Compile every workflow under Configs/Workflows at startup so the first "
+                             "request for each one does not pay to load it. Off by default.")
     parser.add_argument("positional", nargs="*", help="Positional arguments for ConfigDirectory and User")
     args = parser.parse_args()
 
@@ -142,6 +145,9 @@ def parse_and_apply_launch_arguments(description):
     if args.listen is not None:
         instance_global_variables.LISTEN_ADDRESS = args.listen.strip()
 
+    if args.precompile_workflows is not None:
+        instance_global_variables.PRECOMPILE_WORKFLOWS = args.precompile_workflows
+
     instance_global_variables.CONCURRENCY_LIMIT = args.concurrency
     instance_global_variables.CONCURRENCY_TIMEOUT = args.concurrency_timeout
     instance_global_variables.CONCURRENCY_LEVEL = args.concurrency_level
@@ -12,6 +12,8 @@ from logging.handlers import RotatingFileHandler
 from Middleware.common import instance_global_variables
 from Middleware.utilities import config_utils
 
+logger = logging.getLogger(__name__)
+
 
 class UserInjectionFilter(logging.Filter):
     """Injects the current request-scoped username into every log record.
@@ -147,3 +149,66 @@ def resolve_file_logging():
             return False
     # Multi-user without --file-logging flag: default off
     return False
+
+
+def precompile_workflows():
+    """Compile every workflow file up front when ``--precompile-workflows`` is set.
+
+    Walks ``{ConfigDirectory}/Workflows`` (every user folder and the shared
+    folders) through the process-wide workflow compiler, so the first request
+    for each workflow finds its plan already built. Failures are logged and
+    never block startup.
+
+    Returns:
+        int: The number of workflows compiled (0 when disabled).
+    """
+    if not instance_global_variables.PRECOMPILE_WORKFLOWS:
+        return 0
+
+    # Imported here so importing server_startup stays cheap for the helpers above.
+    from Middleware.workflows.managers.workflow_compiler import workflow_compiler
+
+    try:
+        workflows_directory = os.path.join(str(config_utils.get_root_config_directory()), 'Workflows')
+        compiled = workflow_compiler.precompile_directory(workflows_directory)
+    except Exception as e:
+        logger.warning(f"Workflow precompilation failed: {e}")
+        return 0
+    logger.info(f"Precompiled {compiled} workflows from {workflows_directory}")
+    return compiled
+
+
+def recover_memory_jobs(users):
+    """Re-queue background memory jobs that were persisted before a restart.
+
+    For each configured user (or the single default user), looks for that
+    user's ``memory_jobs.db`` queue file and hands any jobs in it back to the
+    background memory queue, so they run without waiting for another
+    ``runInBackground`` QualityMemory request. Users without a queue file are
+    skipped, and failures are logged and never block startup.
+
+    Args:
+        users (Optional[List[str]]): The configured users; empty or None for a
+            single-user install.
+
+    Returns:
+        int: The number of jobs re-queued.
+    """
+    # Imported here so importing server_startup stays cheap for the helpers above.
+    from Middleware.services.memory_job_service import memory_job_service
+
+    recovered = 0
+    for user in users or [None]:
+        if user:
+            instance_global_variables.set_request_user(user)
+        try:
+            workers, _, db_path = config_utils.get_memory_job_queue_settings()
+            if os.path.exists(db_path):
+                recovered += memory_job_service.recover(db_path, workers)
+        except Exception as e:
+            logger.warning(f"Could not recover background memory jobs for user {user or 'default'}: {e}")
+        finally:
+            instance_global_variables.clear_request_user()
+    if recovered:
+        logger.info(f"Re-queued {recovered} background memory job(s) from before the restart")
+    return recovered
@@ -4,10 +4,9 @@ import logging
 from typing import Any, Dict, Optional
 
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3 import Retry
 
 from Middleware.services.cancellation_service import cancellation_service
+from Middleware.services.http_session_pool_service import http_session_pool_service
 from Middleware.utilities.config_utils import get_connect_timeout
 
 logger = logging.getLogger(__name__)
@@ -35,7 +34,13 @@ class _AbortHandle:
 
     def abort(self) -> None:
         """Aggressively closes the HTTP session (and any attached response) to
-        interrupt the stream or prefill phase."""
+        interrupt the stream or prefill phase.
+
+        The session is one borrowed from HttpSessionPoolService and owns a single
+        connection, so this tears down only the in-flight socket; other requests
+        against the same backend keep their pooled connections. The cleared
+        adapters mark the session as dead so the pool discards it on release.
+        """
         logger.info(f"Abort callback triggered ({self._mode_label}) for request_id: "
                     f"{self._request_id}. Starting session close procedure.")
 
@@ -65,12 +70,17 @@ class BaseApiTransport:
 
     Holds no generation-specific state. LlmApiHandler layers streaming and
     payload/prompt concerns on top of this; EmbeddingApiHandler uses it as-is.
+
+    The session is borrowed lazily from the process-wide HttpSessionPoolService
+    on first use and handed back by close(), so consecutive calls against the
+    same backend reuse a warm keep-alive connection. Using the transport again
+    after close() simply borrows another session.
     """
 
     def __init__(self, base_url: str, api_key: str, headers: Dict[str, str],
                  suppress_retries: bool = False, read_timeout: int = 14400):
         """
-        Initializes the transport state and a persistent requests session.
+        Initializes the transport state. The HTTP session is borrowed on first use.
 
         Args:
             base_url (str): The base URL of the target API.
@@ -90,15 +100,29 @@ class BaseApiTransport:
         self.headers = headers
         self.suppress_retries = suppress_retries
         self.read_timeout = read_timeout
-        self.session = requests.Session()
-        if suppress_retries:
-            retries = Retry(total=0)
-        else:
-            retries = Retry(total=5, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-        self.session.mount("http://", HTTPAdapter(max_retries=retries))
-        self.session.mount("https://", HTTPAdapter(max_retries=retries))
+        self._session: Optional[requests.Session] = None
         self.connect_timeout = get_connect_timeout()
 
+    @property
+    def session(self) -> requests.Session:
+        """
+        The HTTP session for this transport, borrowed from the shared pool on first access.
+
+        Returns:
+            requests.Session: A session keyed by this transport's base URL and retry policy.
+        """
+        if self._session is None:
+            self._session = http_session_pool_service.acquire(self.base_url, self.suppress_retries)
+        return self._session
+
+    @session.setter
+    def session(self, value: Optional[requests.Session]) -> None:
+        self._session = value
+
+    @session.deleter
+    def session(self) -> None:
+        self._session = None
+
     def execute_non_streaming_post(self, url: str, payload: Dict[str, Any],
                                    request_id: Optional[str] = None) -> Optional[Dict]:
         """
@@ -126,10 +150,7 @@ class BaseApiTransport:
         """
         if request_id and cancellation_service.is_cancelled(request_id):
             logger.info(f"Request {request_id} was already cancelled before starting API request.")
-            try:
-                self.session.close()
-            except Exception:
-                pass
+            self.close()
             return None
 
         retries = 1 if self.suppress_retries else 3
@@ -187,8 +208,13 @@ class BaseApiTransport:
         return None
 
     def close(self):
-        """Closes the HTTP session to release keep-alive connections."""
+        """Returns the borrowed HTTP session to the shared pool.
+
+        Sessions the pool did not lend (or that an abort has torn down) are
+        closed instead. A no-op when no session has been borrowed.
+        """
+        session, self._session = self._session, None
         try:
-            self.session.close()
+            http_session_pool_service.release(session)
         except Exception:
             pass
@@ -2,7 +2,7 @@
 
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Generator, List, Optional, Union
+from typing import Any, Dict, Generator, List, NamedTuple, Optional, Union
 
 import requests
 
@@ -16,13 +16,27 @@ except ImportError:
 from Middleware.llmapis.handlers.base.base_api_transport import BaseApiTransport, _AbortHandle
 from Middleware.llmapis.sampler_translation import normalize_gen_input
 from Middleware.services.cancellation_service import cancellation_service
-from Middleware.utilities.config_utils import get_config_property_if_exists
-from Middleware.utilities.sensitive_logging_utils import sensitive_log, log_prompt_content
+from Middleware.services.llm_response_cache_service import llm_response_cache_service
+from Middleware.utilities.config_utils import get_config_property_if_exists, get_current_username, \
+    get_llm_response_cache_settings
+from Middleware.utilities.sensitive_logging_utils import is_encryption_active, sensitive_log, log_prompt_content
 from Middleware.utilities.structured_output_utils import get_structured_output_config
 
 logger = logging.getLogger(__name__)
 
 
+class ResponseCacheLookup(NamedTuple):
+    """A non-streaming request prepared for, and looked up in, the LLM response cache."""
+
+    url: str
+    payload: Dict[str, Any]
+    username: str
+    key: str
+    max_entries: int
+    db_path: Optional[str]
+    response: Optional[Union[str, Dict[str, Any]]]
+
+
 class LlmApiHandler(BaseApiTransport, ABC):
     """
     Defines the abstract interface and shared generation logic for all LLM API handlers.
@@ -38,7 +52,7 @@ class LlmApiHandler(BaseApiTransport, ABC):
                  stream: bool, api_type_config, endpoint_config, max_tokens, dont_include_model: bool = False,
                  suppress_retries: bool = False):
         """
-        Initializes the API handler and a persistent requests session.
+        Initializes the API handler. The HTTP session is borrowed from the shared pool on first use.
 
         Args:
             base_url (str): The base URL of the LLM API.
@@ -239,10 +253,7 @@ class LlmApiHandler(BaseApiTransport, ABC):
         # Check if already cancelled
         if request_id and cancellation_service.is_cancelled(request_id):
             logger.info(f"Request {request_id} was already cancelled before starting LLM request.")
-            try:
-                self.session.close()
-            except Exception:
-                pass
+            self.close()
             return
 
         # Check if Eventlet is active for logging purposes
@@ -349,7 +360,8 @@ class LlmApiHandler(BaseApiTransport, ABC):
                              request_id: Optional[str] = None,
                              tools: Optional[List[Dict]] = None,
                              tool_choice: Optional[Any] = None,
-                             structured_output_schema: Optional[Dict] = None) -> Union[str, Dict[str, Any]]:
+                             structured_output_schema: Optional[Dict] = None,
+                             cache_lookup: Optional[ResponseCacheLookup] = None) -> Union[str, Dict[str, Any]]:
         """
         Manages a non-streaming request to the LLM API to get a complete response.
 
@@ -358,6 +370,10 @@ class LlmApiHandler(BaseApiTransport, ABC):
         contributes the generation-specific payload preparation and response
         parsing around it.
 
+        With a cache_lookup from lookup_cached_response that missed, its
+        prepared URL and payload are sent, and a non-empty response is stored in
+        the LLM response cache under its key.
+
         Args:
             conversation (Optional[List[Dict[str, str]]]): The history of the conversation.
             system_prompt (Optional[str]): A system-level instruction for the LLM.
@@ -365,6 +381,10 @@ class LlmApiHandler(BaseApiTransport, ABC):
             request_id (Optional[str]): The request ID for cancellation tracking.
             tools (Optional[List[Dict]]): Tool definitions in OpenAI format.
             tool_choice (Optional[Any]): Tool selection policy.
+            structured_output_schema (Optional[Dict]): JSON schema to constrain
+                the response with, when the API type supports it.
+            cache_lookup (Optional[ResponseCacheLookup]): The missed cache lookup
+                for this same call, or None to bypass the LLM response cache.
 
         Returns:
             Union[str, Dict[str, Any]]: The complete, raw text generated by the LLM,
@@ -376,15 +396,15 @@ class LlmApiHandler(BaseApiTransport, ABC):
         # for a request that will never be sent.
         if request_id and cancellation_service.is_cancelled(request_id):
             logger.info(f"Request {request_id} was already cancelled before starting LLM request.")
-            try:
-                self.session.close()
-            except Exception:
-                pass
+            self.close()
             return ""
 
-        payload = self._prepare_payload(conversation, system_prompt, prompt, tools=tools, tool_choice=tool_choice,
-                                        structured_output_schema=structured_output_schema)
-        url = self._get_api_endpoint_url()
+        if cache_lookup is not None:
+            url, payload = cache_lookup.url, cache_lookup.payload
+        else:
+            payload = self._prepare_payload(conversation, system_prompt, prompt, tools=tools, tool_choice=tool_choice,
+                                            structured_output_schema=structured_output_schema)
+            url = self._get_api_endpoint_url()
 
         response_json = self.execute_non_streaming_post(url, payload, request_id=request_id)
         if response_json is None:
@@ -397,12 +417,65 @@ class LlmApiHandler(BaseApiTransport, ABC):
             logger.error(f"Unexpected error in {self.__class__.__name__}: {e}", exc_info=True)
             raise
 
+        # Empty results are not cached: they are usually a transient backend
+        # problem, and the next attempt should reach the backend again.
+        if cache_lookup is not None and result:
+            llm_response_cache_service.put(cache_lookup.username, cache_lookup.key, result, cache_lookup.max_entries,
+                                           cache_lookup.db_path)
+
         if isinstance(result, dict):
             log_prompt_content(logger, "Raw output from the LLM", result.get('content', ''))
             return result
         log_prompt_content(logger, "Raw output from the LLM", result)
         return result or ""
 
+    def lookup_cached_response(self, conversation: Optional[List[Dict[str, str]]] = None,
+                               system_prompt: Optional[str] = None, prompt: Optional[str] = None,
+                               tools: Optional[List[Dict]] = None,
+                               tool_choice: Optional[Any] = None,
+                               structured_output_schema: Optional[Dict] = None,
+                               api_key_hash: Optional[str] = None) -> Optional[ResponseCacheLookup]:
+        """
+        Prepares a non-streaming request and looks it up in the LLM response cache.
+
+        Nothing is sent to the backend, so a caller can answer a hit before it
+        waits for an endpoint concurrency slot. On a miss, pass the lookup to
+        handle_non_streaming, which sends the already prepared payload and
+        stores the response. Entries are keyed by the final URL and payload and
+        scoped to the user and api_key_hash, and are never written to the
+        persistent tier while encryption is active.
+
+        Args:
+            conversation (Optional[List[Dict[str, str]]]): The history of the conversation.
+            system_prompt (Optional[str]): A system-level instruction for the LLM.
+            prompt (Optional[str]): The latest user prompt to be processed.
+            tools (Optional[List[Dict]]): Tool definitions in OpenAI format.
+            tool_choice (Optional[Any]): Tool selection policy.
+            structured_output_schema (Optional[Dict]): JSON schema to constrain
+                the response with, when the API type supports it.
+            api_key_hash (Optional[str]): The request's API key hash, which
+                scopes cached responses.
+
+        Returns:
+            Optional[ResponseCacheLookup]: The lookup, whose ``response`` is the
+            cached response on a hit and None on a miss; None when the
+            ``llmResponseCache`` user setting turns the cache off.
+        """
+        cache_settings = get_llm_response_cache_settings()
+        if not cache_settings:
+            return None
+        ttl_seconds, max_entries, db_path = cache_settings
+        if is_encryption_active():
+            # The disk tier is plaintext; encrypted users' responses stay in memory.
+            db_path = None
+        payload = self._prepare_payload(conversation, system_prompt, prompt, tools=tools, tool_choice=tool_choice,
+                                        structured_output_schema=structured_output_schema)
+        url = self._get_api_endpoint_url()
+        username = get_current_username()
+        key = llm_response_cache_service.build_key(username, api_key_hash, url, payload)
+        return ResponseCacheLookup(url, payload, username, key, max_entries, db_path,
+                                   llm_response_cache_service.get(username, key, ttl_seconds, db_path))
+
     def set_gen_input(self):
         """
         Injects the structurally-managed generation fields, then normalizes.
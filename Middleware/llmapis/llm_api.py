@@ -1,10 +1,10 @@
 # /Middleware/llmapis/llm_api.py
 
 import ipaddress
-import json
 import logging
 import os
 import socket
+import time
 import traceback
 from copy import deepcopy
 from typing import Any, Dict, Generator, List, Optional, Set, Union
@@ -12,7 +12,7 @@ from urllib.parse import urlsplit
 
 from Middleware.common import instance_global_variables
 from Middleware.common.constants import EMBEDDING_API_TYPES
-from Middleware.llmapis.handlers.base.base_llm_api_handler import LlmApiHandler
+from Middleware.llmapis.handlers.base.base_llm_api_handler import LlmApiHandler, ResponseCacheLookup
 from Middleware.llmapis.handlers.impl.claude_api_handler import ClaudeApiHandler
 from Middleware.llmapis.handlers.impl.koboldcpp_api_handler import KoboldCppApiHandler
 from Middleware.llmapis.handlers.impl.ollama_chat_api_handler import OllamaChatHandler
@@ -20,11 +20,13 @@ from Middleware.llmapis.handlers.impl.ollama_generate_api_handler import OllamaG
 from Middleware.llmapis.handlers.impl.openai_api_handler import OpenAiApiHandler
 from Middleware.llmapis.handlers.impl.openai_completions_api_handler import OpenAiCompletionsApiHandler
 from Middleware.llmapis.sampler_translation import deep_merge, translate
+from Middleware.services.metrics_service import metrics_service
 from Middleware.utilities.config_utils import (
     get_openai_preset_path,
     get_endpoint_config,
     try_get_endpoint_config,
     get_api_type_config,
+    load_config,
 )
 from Middleware.utilities.sensitive_logging_utils import sensitive_log
 
@@ -47,7 +49,12 @@ def _acquire_endpoint_gate() -> bool:
     if sem is None:
         return False
     timeout = instance_global_variables.CONCURRENCY_TIMEOUT
-    if not sem.acquire(timeout=timeout):
+    wait_started = time.perf_counter()
+    acquired = sem.acquire(timeout=timeout)
+    metrics_service.observe("wilmer_concurrency_wait_seconds", time.perf_counter() - wait_started,
+                            {"level": "endpoint"})
+    if not acquired:
+        metrics_service.increment("wilmer_concurrency_rejections_total", {"level": "endpoint"})
         raise TimeoutError(
             f"Timed out after {timeout}s waiting for an LLM call slot "
             f"(concurrency-level=endpoint, limit={instance_global_variables.CONCURRENCY_LIMIT})"
@@ -155,6 +162,7 @@ class LlmApiService:
     """
 
     def __init__(self, endpoint: str, presetname: str, max_tokens: int, stream: bool = False,
+                 cache_responses: bool = False, cache_api_key_hash: Optional[str] = None,
                  _visited_endpoints: Optional[Set[str]] = None):
         """
         Initializes the LlmApiService instance.
@@ -167,6 +175,10 @@ class LlmApiService:
             presetname (str): The name of the generation preset to apply.
             max_tokens (int): The maximum number of tokens to generate.
             stream (bool): A flag indicating whether to use streaming responses.
+            cache_responses (bool): If True, non-streaming calls consult the LLM
+                response cache. Set for nodes with "cacheResponses": true.
+            cache_api_key_hash (Optional[str]): The request's API key hash, which
+                scopes the cached entries.
             _visited_endpoints (Optional[Set[str]]): Internal failover chain tracker.
                 Callers should leave this as None; it is populated automatically
                 when a backup service is instantiated during failover.
@@ -210,6 +222,10 @@ class LlmApiService:
         # _build_backup_service); set this when the backup's API type has no preset
         # of that name in its own Presets/<type>/ directory.
         self._backup_preset_name: Optional[str] = self.endpoint_file.get("backupPresetName") or None
+        # Only non-streaming calls consult the LLM response cache, whose entries
+        # are scoped to the request's API key hash.
+        self.cache_responses: bool = cache_responses
+        self.cache_api_key_hash: Optional[str] = cache_api_key_hash
 
         self._api_handler = self.create_api_handler()
 
@@ -240,8 +256,7 @@ class LlmApiService:
             logger.debug(f"Fallback preset path: {preset_file}")
             if not os.path.exists(preset_file):
                 raise FileNotFoundError(f"The preset file {preset_file} does not exist.")
-        with open(preset_file, encoding="utf-8") as file:
-            return json.load(file)
+        return load_config(preset_file)
 
     def _resolve_gen_input(self, presetname: str, preset_type: str) -> Dict[str, Any]:
         """
@@ -271,7 +286,9 @@ class LlmApiService:
         donor = try_get_endpoint_config(presetname)
         if donor and donor.get("presetSamplers"):
             logger.info("Resolving preset '%s' from an endpoint-embedded presetSamplers block.", presetname)
-            gen_input = translate(donor["presetSamplers"], self.api_type_config)
+            # deepcopy: the donor is a shared, read-only cached config, and the
+            # translated values end up in a gen_input the handler mutates.
+            gen_input = translate(deepcopy(donor["presetSamplers"]), self.api_type_config)
         else:
             gen_input = self._load_preset_file(presetname, preset_type)
 
@@ -377,13 +394,16 @@ class LlmApiService:
                 self._backup_endpoint_name, backup_url,
             )
 
-        return LlmApiService(
+        backup_service = LlmApiService(
             endpoint=self._backup_endpoint_name,
             presetname=self._backup_preset_name or self._presetname,
             max_tokens=self.max_tokens,
             stream=self.stream,
+            cache_responses=self.cache_responses,
+            cache_api_key_hash=self.cache_api_key_hash,
             _visited_endpoints=self._visited_endpoints,
         )
+        return backup_service
 
     def get_response_from_llm(
             self,
@@ -405,6 +425,13 @@ class LlmApiService:
         been yielded to the caller; once any token has been emitted, the original
         exception is re-raised.
 
+        When `cache_responses` is set, a non-streaming call is answered from the
+        LLM response cache if an identical payload was sent to the same endpoint
+        URL recently (see LlmResponseCacheService). The lookup happens before
+        the endpoint concurrency slot is taken, so a hit never waits for a
+        backend and is not recorded as backend latency. Streaming calls are
+        never cached.
+
         Args:
             conversation (Optional[List[Dict[str, str]]]): The conversation history.
             system_prompt (Optional[str]): The system prompt.
@@ -480,13 +507,25 @@ class LlmApiService:
                 def stream_wrapper() -> Generator[Dict[str, Any], None, None]:
                     first_token_yielded = False
                     gate_held = False
+                    tokens_streamed = 0
+                    metric_labels = {"endpoint": self._endpoint_name}
                     try:
                         gate_held = _acquire_endpoint_gate()
+                        call_started = time.perf_counter()
                         try:
                             for chunk in self._api_handler.handle_streaming(**call_kwargs):
+                                if not first_token_yielded:
+                                    metrics_service.observe("wilmer_backend_ttft_seconds",
+                                                            time.perf_counter() - call_started, metric_labels)
                                 first_token_yielded = True
+                                if isinstance(chunk, dict) and chunk.get("token"):
+                                    tokens_streamed += 1
                                 yield chunk
+                            metrics_service.observe("wilmer_backend_latency_seconds",
+                                                    time.perf_counter() - call_started,
+                                                    {**metric_labels, "stream": "true"})
                         except Exception as e:
+                            metrics_service.increment("wilmer_backend_errors_total", metric_labels)
                             if not first_token_yielded and self._has_backup:
                                 # Release before delegating so the backup's own
                                 # acquire doesn't deadlock against us at limit=1.
@@ -508,6 +547,11 @@ class LlmApiService:
                                 )
                             raise
                     finally:
+                        # Counted once here rather than per chunk so the hot loop
+                        # above never takes the metrics lock.
+                        if tokens_streamed:
+                            metrics_service.increment("wilmer_tokens_streamed_total", metric_labels,
+                                                      tokens_streamed)
                         if gate_held:
                             _release_endpoint_gate(True)
                         self.is_busy_flag = False
@@ -517,11 +561,23 @@ class LlmApiService:
             else:
                 gate_held = False
                 try:
+                    if self.cache_responses:
+                        cache_lookup = self._lookup_cached_response(call_kwargs)
+                        if cache_lookup is not None:
+                            if cache_lookup.response is not None:
+                                logger.info("Returning a cached response for '%s'; the backend was not called.",
+                                            self._endpoint_name)
+                                return cache_lookup.response
+                            call_kwargs["cache_lookup"] = cache_lookup
                     gate_held = _acquire_endpoint_gate()
+                    call_started = time.perf_counter()
                     try:
                         response = self._api_handler.handle_non_streaming(**call_kwargs)
+                        metrics_service.observe("wilmer_backend_latency_seconds", time.perf_counter() - call_started,
+                                                {"endpoint": self._endpoint_name, "stream": "false"})
                         return response
                     except Exception as e:
+                        metrics_service.increment("wilmer_backend_errors_total", {"endpoint": self._endpoint_name})
                         if self._has_backup:
                             # Release before delegating so the backup's own
                             # acquire doesn't deadlock against us at limit=1.
@@ -554,8 +610,29 @@ class LlmApiService:
             traceback.print_exc()
             raise
 
+    def _lookup_cached_response(self, call_kwargs: Dict[str, Any]) -> Optional[ResponseCacheLookup]:
+        """
+        Looks a non-streaming call up in the LLM response cache.
+
+        A lookup that fails is logged and treated as disabled, so the call goes
+        to the backend (and, on error, its backup) exactly as without a cache.
+
+        Args:
+            call_kwargs (Dict[str, Any]): The arguments for handle_non_streaming.
+
+        Returns:
+            Optional[ResponseCacheLookup]: The handler's lookup, or None.
+        """
+        lookup_kwargs = {k: v for k, v in call_kwargs.items() if k != "request_id"}
+        try:
+            return self._api_handler.lookup_cached_response(**lookup_kwargs, api_key_hash=self.cache_api_key_hash)
+        except Exception as e:
+            logger.warning("LLM response cache lookup for '%s' failed; calling the backend: %s",
+                           self._endpoint_name, e)
+            return None
+
     def close(self):
-        """Closes the underlying API handler's HTTP session."""
+        """Returns the underlying API handler's HTTP session to the shared pool."""
         if self._api_handler:
             self._api_handler.close()
 
@@ -5,6 +5,8 @@ import threading
 import time
 from typing import Set, Dict, Callable, List
 
+from Middleware.services.metrics_service import metrics_service
+
 logger = logging.getLogger(__name__)
 
 # Entries older than this are pruned lazily on the next cancellation request.
@@ -95,6 +97,7 @@ class CancellationService:
                 return
 
             self._cancelled_requests[request_id] = time.monotonic()
+            metrics_service.increment("wilmer_cancellations_total")
             logger.info(f"Cancellation registered for request_id: {request_id}")
 
             # Get callbacks to invoke (copy the list to avoid holding the lock during callback execution)
@@ -0,0 +1,160 @@
+# Middleware/services/categorization_cache_service.py
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on remembered categorizations. Each entry is a digest and a
+# category name, so the cap is about memory hygiene over long uptimes rather
+# than size; the least recently used entry is dropped first.
+MAX_CACHED_CATEGORIZATIONS = 1024
+
+
+class CategorizationCacheService:
+    """
+    A thread-safe singleton that remembers recent prompt categorizations.
+
+    A regenerate or client retry sends the same conversation again, and without
+    this cache the categorization workflow (possibly several attempts of it)
+    re-runs only to pick the same route. Entries are keyed by a digest of the
+    user, the API key hash, the categorization workflow, the routing categories
+    and the messages the categorizer sees, so a change to any of them is a miss.
+    Only matched categories are stored; an UNKNOWN result is always retried.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of CategorizationCacheService exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(CategorizationCacheService, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the entry map and counters.
+        """
+        if self._initialized:
+            return
+
+        # key -> (category, monotonic time stored)
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._stats: Dict[str, int] = self._empty_stats()
+        self._cache_lock = threading.Lock()
+        self._initialized = True
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {"hits": 0, "misses": 0, "stores": 0, "opt_outs": 0, "expirations": 0}
+
+    @staticmethod
+    def build_key(username: str, api_key_hash: Optional[str], workflow_name: str,
+                  categories: Dict[str, Any], messages: List[Dict[str, Any]]) -> str:
+        """
+        Builds the cache key for one categorization.
+
+        Args:
+            username (str): The current WilmerAI user.
+            api_key_hash (Optional[str]): The request's API key hash, so clients
+                with different keys never share entries.
+            workflow_name (str): The categorization workflow.
+            categories (Dict[str, Any]): The loaded routing categories; editing
+                the routing config changes the key.
+            messages (List[Dict[str, Any]]): The messages the categorizer sees.
+
+        Returns:
+            str: A SHA-256 hex digest.
+        """
+        # Whole messages, not just content: a routing decision can hinge on a
+        # tool call or tool result as much as on the text.
+        material = json.dumps([username, api_key_hash, workflow_name, categories, messages],
+                              sort_keys=True, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, ttl_seconds: float) -> Optional[str]:
+        """
+        Returns the cached category for a key if it is younger than ttl_seconds.
+
+        Args:
+            key (str): The key from build_key.
+            ttl_seconds (float): The maximum age of a usable entry.
+
+        Returns:
+            Optional[str]: The category, or None on a miss.
+        """
+        with self._cache_lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] > ttl_seconds:
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[0]
+
+    def put(self, key: str, category: str) -> None:
+        """
+        Stores a categorization result.
+
+        Args:
+            key (str): The key from build_key.
+            category (str): The matched category.
+        """
+        with self._cache_lock:
+            self._entries[key] = (category, time.monotonic())
+            self._entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > MAX_CACHED_CATEGORIZATIONS:
+                self._entries.popitem(last=False)
+
+    def record_opt_out(self) -> None:
+        """
+        Counts a result that was not stored because its category opted out of caching.
+        """
+        with self._cache_lock:
+            self._stats["opt_outs"] += 1
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Returns cache counters.
+
+        Returns:
+            Dict[str, float]: ``hits``, ``misses``, ``stores``, ``opt_outs``
+            (results of categories with ``cacheCategorization: false``),
+            ``expirations``, current ``entries``, and ``hit_rate`` (hits over
+            lookups, 0.0 before the first lookup).
+        """
+        with self._cache_lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        """
+        Drops every cached categorization and resets the counters. Intended for test isolation.
+        """
+        with self._cache_lock:
+            self._entries.clear()
+            self._stats = self._empty_stats()
+
+
+# Global singleton instance
+categorization_cache_service = CategorizationCacheService()
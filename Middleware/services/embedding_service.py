@@ -6,6 +6,7 @@ from typing import List, Optional
 from Middleware.common.constants import EMBEDDING_API_TYPES
 from Middleware.llmapis.handlers.impl.embedding_api_handler import EmbeddingApiHandler
 from Middleware.utilities.config_utils import get_api_type_config, get_endpoint_config
+from Middleware.utilities.embedding_cache import embedding_cache
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +42,11 @@ class EmbeddingService:
         api_key = endpoint_file.get("apiKey", "")
         self.endpoint_name = endpoint_name
         self.model_name = endpoint_file.get("modelNameToSendToAPI", "")
+        # Endpoint names are resolved per user, so two users' same-named
+        # endpoints may reach different servers; the base URL, not the config
+        # name, says whose vectors these are. An empty model name
+        # (dontIncludeModel endpoints) leaves the choice to that server.
+        self._cache_namespace = f"{endpoint_file['endpoint'].rstrip('/')}|{self.model_name}"
         self._handler = EmbeddingApiHandler(
             base_url=endpoint_file["endpoint"],
             api_key=api_key,
@@ -55,7 +61,11 @@ class EmbeddingService:
 
     def get_embeddings(self, texts: List[str], request_id: Optional[str] = None) -> Optional[List[List[float]]]:
         """
-        Embeds a batch of texts via the configured endpoint.
+        Embeds a batch of texts, consulting the embedding cache first.
+
+        Texts already embedded by this server and model are answered from the cache; only
+        the remaining distinct texts are sent to the endpoint, in one request,
+        and their vectors are cached for next time.
 
         Args:
             texts (List[str]): The texts to embed.
@@ -63,10 +73,32 @@ class EmbeddingService:
 
         Returns:
             Optional[List[List[float]]]: One vector per text in input order, an
-            empty list for empty input, or None if the request was cancelled.
+            empty list for empty input, or None if the request was cancelled or
+            the endpoint did not return one vector per text.
         """
-        return self._handler.get_embeddings(texts, request_id=request_id)
+        if not texts:
+            return self._handler.get_embeddings(texts, request_id=request_id)
+
+        cache_model = self._cache_namespace
+        cached = embedding_cache.get_many(cache_model, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        if not missing:
+            embedding_cache.record_saved_call()
+            logger.debug("Served %d embedding(s) for model '%s' entirely from cache.", len(texts), cache_model)
+            return cached
+
+        vectors = self._handler.get_embeddings(missing, request_id=request_id)
+        if vectors is None:
+            return None
+        if len(vectors) != len(missing):
+            # Without one vector per text there is no safe way to pair them up.
+            logger.error("Embeddings endpoint '%s' returned %d vector(s) for %d text(s); discarding the batch.",
+                         self.endpoint_name, len(vectors), len(missing))
+            return None
+        embedding_cache.put_many(cache_model, missing, vectors)
+        fetched = dict(zip(missing, vectors))
+        return [vector if vector is not None else fetched[text] for text, vector in zip(texts, cached)]
 
     def close(self):
-        """Closes the underlying HTTP session to release keep-alive connections."""
+        """Returns the underlying HTTP session to the shared pool."""
         self._handler.close()
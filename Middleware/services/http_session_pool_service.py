@@ -0,0 +1,449 @@
+# Middleware/services/http_session_pool_service.py
+
+import logging
+import threading
+import time
+import weakref
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import Retry
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on how many idle keep-alive sessions are retained per pool key.
+# Concurrent borrowers beyond this are still served (a fresh session is built),
+# but on release the surplus is closed instead of being parked, so a burst
+# cannot leave an unbounded number of sockets open against one backend.
+MAX_IDLE_SESSIONS_PER_KEY = 4
+
+# Idle sessions older than this are closed lazily on the next acquire/release.
+# Kept short because local backends (llama.cpp's HTTP server in particular)
+# drop keep-alive connections after a few seconds of inactivity; parking a
+# session far beyond that only hands the next borrower a socket the server has
+# already closed, which urllib3 must detect and reconnect anyway.
+IDLE_SESSION_TTL_SECONDS = 30
+
+# Upper bound on idle sessions kept for WebFetch nodes. Each WebFetch session
+# holds its own urllib3 pool with keep-alive connections to the hosts it has
+# fetched from, so a handful covers several nodes fetching concurrently.
+MAX_IDLE_WEB_FETCH_SESSIONS = 4
+
+PoolKey = Tuple[str, bool]
+
+
+def _origin_of(base_url: str) -> str:
+    """
+    Reduces a configured base URL to its scheme://host:port origin.
+
+    Connections are per origin, so two endpoint configs that point at the same
+    server (e.g. different models on one Ollama instance) share a pool even if
+    their base URLs carry different paths.
+
+    Args:
+        base_url (str): The endpoint base URL; a scheme is assumed if missing.
+
+    Returns:
+        str: The lower-cased origin, or the raw URL if it cannot be parsed.
+    """
+    try:
+        split = urlsplit(base_url if "//" in base_url else "http://" + base_url)
+    except ValueError:
+        return base_url
+    if not split.netloc:
+        return base_url
+    return f"{(split.scheme or 'http').lower()}://{split.netloc.lower()}"
+
+
+class HttpSessionPoolService:
+    """
+    A thread-safe singleton registry of reusable HTTP sessions for API backends.
+
+    Each LLM or embeddings call used to build its own ``requests.Session`` and
+    close it afterwards, so every node paid a fresh TCP (and often TLS)
+    handshake against the same backend. This registry instead lends out
+    sessions keyed by ``(origin, suppress_retries)`` and takes them back when
+    the caller is finished, keeping the underlying keep-alive connection warm
+    for the next borrower.
+
+    Every lent session is mounted with a single-connection adapter, so one
+    borrower owns exactly one connection. That keeps cancellation simple: an
+    abort closes the borrowed session (and with it only the in-flight socket)
+    without affecting any other request sharing the same backend. A session
+    whose adapters were torn down by an abort is recognised on release and
+    discarded rather than parked.
+
+    Idle sessions are bounded per key (MAX_IDLE_SESSIONS_PER_KEY) and closed
+    after IDLE_SESSION_TTL_SECONDS. Per-key counters are available through
+    get_stats().
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of HttpSessionPoolService exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(HttpSessionPoolService, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the idle-session registry, lease tracking, and counters.
+        """
+        if self._initialized:
+            return
+
+        # key -> list of (session, monotonic_time_parked), oldest first.
+        self._idle: Dict[PoolKey, List[Tuple[requests.Session, float]]] = {}
+        # Lent-out session -> its key. Weak so a borrower that never releases
+        # (e.g. an abandoned handler) cannot pin the session in memory.
+        self._leased: "weakref.WeakKeyDictionary[requests.Session, PoolKey]" = weakref.WeakKeyDictionary()
+        self._stats: Dict[PoolKey, Dict[str, int]] = {}
+        self._pool_lock = threading.Lock()
+        self._initialized = True
+        logger.info("HttpSessionPoolService initialized")
+
+    @staticmethod
+    def _build_session(suppress_retries: bool) -> requests.Session:
+        """
+        Builds a session with the transport retry policy, a one-connection adapter,
+        and a jar that stores no cookies.
+
+        Sessions are keyed only by origin and lent to whichever user calls that
+        backend next, so a cookie one borrower received (from an auth gateway or a
+        sticky load balancer, say) must never be sent on another's request.
+
+        Args:
+            suppress_retries (bool): If True, urllib3 5xx retries are disabled so
+                failover to a backup endpoint happens on first failure.
+
+        Returns:
+            requests.Session: The new session.
+        """
+        if suppress_retries:
+            retries = Retry(total=0)
+        else:
+            retries = Retry(total=5, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
+        session = requests.Session()
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        for prefix in ("http://", "https://"):
+            session.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=retries))
+        return session
+
+    def _stats_for_locked(self, key: PoolKey) -> Dict[str, int]:
+        """
+        Returns the mutable counter dict for a key, creating it on first use.
+
+        Must be called while holding self._pool_lock.
+        """
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = {"created": 0, "reused": 0, "released": 0, "discarded": 0, "evicted": 0}
+            self._stats[key] = stats
+        return stats
+
+    def _prune_idle_locked(self) -> List[requests.Session]:
+        """
+        Removes idle sessions older than IDLE_SESSION_TTL_SECONDS.
+
+        Must be called while holding self._pool_lock. The sessions are returned
+        rather than closed here so socket teardown happens outside the lock.
+
+        Returns:
+            List[requests.Session]: The evicted sessions, for the caller to close.
+        """
+        cutoff = time.monotonic() - IDLE_SESSION_TTL_SECONDS
+        evicted = []
+        for key, parked in self._idle.items():
+            stale = [session for session, parked_at in parked if parked_at < cutoff]
+            if stale:
+                parked[:] = [(session, parked_at) for session, parked_at in parked if parked_at >= cutoff]
+                self._stats_for_locked(key)["evicted"] += len(stale)
+                evicted.extend(stale)
+        return evicted
+
+    @staticmethod
+    def _close_quietly(sessions: List[requests.Session]) -> None:
+        """
+        Closes sessions, ignoring errors from already-dead sockets.
+
+        Args:
+            sessions (List[requests.Session]): The sessions to close.
+        """
+        for session in sessions:
+            try:
+                session.close()
+            except Exception:
+                pass
+
+    def acquire(self, base_url: str, suppress_retries: bool = False) -> requests.Session:
+        """
+        Lends a session for the given backend, reusing a warm one when available.
+
+        The most recently parked session is handed out first, since it is the
+        one least likely to have been dropped by the server.
+
+        Args:
+            base_url (str): The backend base URL; only its origin is used as the key.
+            suppress_retries (bool): The retry policy the session must carry.
+
+        Returns:
+            requests.Session: A session the caller owns until it calls release().
+        """
+        key = (_origin_of(base_url), bool(suppress_retries))
+        with self._pool_lock:
+            evicted = self._prune_idle_locked()
+            stats = self._stats_for_locked(key)
+            parked = self._idle.get(key)
+            session = parked.pop()[0] if parked else None
+            if session is not None:
+                stats["reused"] += 1
+            else:
+                stats["created"] += 1
+        self._close_quietly(evicted)
+
+        if session is None:
+            session = self._build_session(key[1])
+        with self._pool_lock:
+            self._leased[session] = key
+        return session
+
+    def release(self, session: requests.Session) -> None:
+        """
+        Returns a borrowed session to its pool, or closes it if it cannot be reused.
+
+        A session is closed instead of parked when this registry did not lend
+        it, when an abort has already torn down its adapters, or when its key
+        already holds MAX_IDLE_SESSIONS_PER_KEY idle sessions. Safe to call
+        with any session; never raises.
+
+        Args:
+            session (requests.Session): The session previously returned by acquire().
+        """
+        if session is None:
+            return
+
+        to_close = []
+        with self._pool_lock:
+            key = self._leased.pop(session, None)
+            if key is None:
+                to_close.append(session)
+            else:
+                stats = self._stats_for_locked(key)
+                parked = self._idle.setdefault(key, [])
+                if not session.adapters:
+                    stats["discarded"] += 1
+                    to_close.append(session)
+                elif len(parked) >= MAX_IDLE_SESSIONS_PER_KEY:
+                    stats["evicted"] += 1
+                    to_close.append(session)
+                else:
+                    stats["released"] += 1
+                    parked.append((session, time.monotonic()))
+            to_close.extend(self._prune_idle_locked())
+        self._close_quietly(to_close)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns a snapshot of per-key pool counters.
+
+        Keys are rendered as ``"<origin>"`` or ``"<origin> (no-retry)"``. Each
+        entry carries the cumulative created/reused/released/discarded/evicted
+        counters plus the current ``idle`` and ``in_use`` session counts.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: The counters, keyed by rendered pool key.
+        """
+        with self._pool_lock:
+            in_use: Dict[PoolKey, int] = {}
+            for key in self._leased.values():
+                in_use[key] = in_use.get(key, 0) + 1
+            snapshot = {}
+            for key, stats in self._stats.items():
+                label = key[0] + (" (no-retry)" if key[1] else "")
+                snapshot[label] = dict(stats, idle=len(self._idle.get(key, [])), in_use=in_use.get(key, 0))
+            return snapshot
+
+    def clear(self) -> None:
+        """
+        Closes every idle session and resets all counters. Intended for shutdown
+        and test isolation; sessions currently lent out are unaffected and will
+        be closed when released.
+        """
+        with self._pool_lock:
+            to_close = [session for parked in self._idle.values() for session, _ in parked]
+            self._idle.clear()
+            self._leased.clear()
+            self._stats.clear()
+        self._close_quietly(to_close)
+
+
+# Global singleton instance
+http_session_pool_service = HttpSessionPoolService()
+
+
+class WebFetchSessionPool:
+    """
+    A thread-safe singleton pool of reusable HTTP sessions for WebFetch nodes.
+
+    WebFetch used to send every request (and every manually followed redirect
+    hop) through ``requests.request``, which builds and tears down a session,
+    and with it the connection, each time. The sessions lent out here keep
+    their default adapters, so one session keeps warm keep-alive connections to
+    every host it has fetched from, whatever the URL of the next node.
+
+    Unlike the backend sessions above, these sessions never persist cookies:
+    their jar refuses to store any, so a cookie one fetch receives is never sent
+    by a later, unrelated fetch. Cookies set during a single fetch's redirect
+    chain are still carried across that chain by requests itself.
+
+    Idle sessions are bounded by MAX_IDLE_WEB_FETCH_SESSIONS and closed after
+    IDLE_SESSION_TTL_SECONDS.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of WebFetchSessionPool exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(WebFetchSessionPool, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the idle-session list, lease tracking, and counters.
+        """
+        if self._initialized:
+            return
+
+        # (session, monotonic_time_parked), oldest first.
+        self._idle: List[Tuple[requests.Session, float]] = []
+        self._leased: "weakref.WeakSet[requests.Session]" = weakref.WeakSet()
+        self._stats: Dict[str, int] = self._empty_stats()
+        self._pool_lock = threading.Lock()
+        self._initialized = True
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {"created": 0, "reused": 0, "released": 0, "discarded": 0, "evicted": 0}
+
+    @staticmethod
+    def _build_session() -> requests.Session:
+        """
+        Builds a session with requests' default adapters and a jar that stores no cookies.
+
+        Returns:
+            requests.Session: The new session.
+        """
+        session = requests.Session()
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return session
+
+    def _prune_idle_locked(self) -> List[requests.Session]:
+        """
+        Removes idle sessions older than IDLE_SESSION_TTL_SECONDS.
+
+        Must be called while holding self._pool_lock.
+
+        Returns:
+            List[requests.Session]: The evicted sessions, for the caller to close.
+        """
+        cutoff = time.monotonic() - IDLE_SESSION_TTL_SECONDS
+        stale = [session for session, parked_at in self._idle if parked_at < cutoff]
+        if stale:
+            self._idle[:] = [(session, parked_at) for session, parked_at in self._idle if parked_at >= cutoff]
+            self._stats["evicted"] += len(stale)
+        return stale
+
+    def acquire(self) -> requests.Session:
+        """
+        Lends a session, reusing the most recently parked one when available.
+
+        Returns:
+            requests.Session: A session the caller owns until it calls release().
+        """
+        with self._pool_lock:
+            evicted = self._prune_idle_locked()
+            session = self._idle.pop()[0] if self._idle else None
+            self._stats["reused" if session is not None else "created"] += 1
+        HttpSessionPoolService._close_quietly(evicted)
+
+        if session is None:
+            session = self._build_session()
+        with self._pool_lock:
+            self._leased.add(session)
+        return session
+
+    def release(self, session: requests.Session) -> None:
+        """
+        Returns a borrowed session to the pool, or closes it if it cannot be reused.
+
+        Responses read from the session may still be open; their connections go
+        back to the session's urllib3 pool once they are read or closed. Safe to
+        call with any session; never raises.
+
+        Args:
+            session (requests.Session): The session previously returned by acquire().
+        """
+        if session is None:
+            return
+
+        to_close = []
+        with self._pool_lock:
+            if session not in self._leased:
+                to_close.append(session)
+            else:
+                self._leased.discard(session)
+                if not session.adapters:
+                    self._stats["discarded"] += 1
+                    to_close.append(session)
+                elif len(self._idle) >= MAX_IDLE_WEB_FETCH_SESSIONS:
+                    self._stats["evicted"] += 1
+                    to_close.append(session)
+                else:
+                    self._stats["released"] += 1
+                    self._idle.append((session, time.monotonic()))
+            to_close.extend(self._prune_idle_locked())
+        HttpSessionPoolService._close_quietly(to_close)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns pool counters.
+
+        Returns:
+            Dict[str, int]: The cumulative created/reused/released/discarded/evicted
+            counters plus the current ``idle`` and ``in_use`` session counts.
+        """
+        with self._pool_lock:
+            return dict(self._stats, idle=len(self._idle), in_use=len(self._leased))
+
+    def clear(self) -> None:
+        """
+        Closes every idle session and resets the counters. Intended for shutdown
+        and test isolation; sessions currently lent out are closed when released.
+        """
+        with self._pool_lock:
+            to_close = [session for session, _ in self._idle]
+            self._idle.clear()
+            self._leased.clear()
+            self._stats = self._empty_stats()
+        HttpSessionPoolService._close_quietly(to_close)
+
+
+# Global singleton instance
+web_fetch_session_pool = WebFetchSessionPool()
@@ -4,6 +4,7 @@ import json
 import logging
 from typing import Any, List, Optional, Tuple
 
+from Middleware.services.token_count_service import token_count_service
 from Middleware.utilities.prompt_extraction_utils import (
     extract_last_n_turns,
     extract_last_turns_by_estimated_token_limit,
@@ -234,7 +235,7 @@ class LLMDispatchService:
         collection.insert(insert_pos, dict(last_user_msg))
 
     @staticmethod
-    def _estimate_tokens_for_tools(tools) -> int:
+    def _estimate_tokens_for_tools(tools, count_tokens=None) -> int:
         """Estimate the token cost of forwarded tool definitions.
 
         Tool schemas are sent to the backend and count against the context
@@ -244,6 +245,8 @@ class LLMDispatchService:
 
         Args:
             tools: The tool definition list (OpenAI format), or None.
+            count_tokens (Optional[Callable[[str], int]]): The endpoint's exact
+                token counter, or None for the conservative estimate.
 
         Returns:
             int: Estimated token count, or 0 when there are no tools.
@@ -254,10 +257,10 @@ class LLMDispatchService:
             serialized = json.dumps(tools)
         except (TypeError, ValueError):
             return 0
-        return rough_estimate_token_length(serialized)
+        return (count_tokens or rough_estimate_token_length)(serialized)
 
     @staticmethod
-    def _estimate_collection_tokens(messages) -> int:
+    def _estimate_collection_tokens(messages, count_tokens=None) -> int:
         """Sum the estimated content tokens across a message list.
 
         Used only to report the before/after size when the clamp reduces a
@@ -265,11 +268,32 @@ class LLMDispatchService:
 
         Args:
             messages (list): The message list to measure.
+            count_tokens (Optional[Callable[[str], int]]): The endpoint's exact
+                token counter, or None for the conservative estimate.
 
         Returns:
             int: The summed estimated token count of the message contents.
         """
-        return sum(rough_estimate_token_length(m.get("content") or "") for m in messages)
+        count = count_tokens or rough_estimate_token_length
+        return sum(count(m.get("content") or "") for m in messages)
+
+    @staticmethod
+    def _resolve_token_counter(llm_handler):
+        """Return the exact token counter for the node's endpoint, if it has one.
+
+        An endpoint that names a local ``tokenizerFile`` is counted with that
+        tokenizer (see ``TokenCountService``); its clamp budget is then in real
+        tokens, so the estimation level is not applied to it.
+
+        Args:
+            llm_handler: The node's LLM handler.
+
+        Returns:
+            Optional[Callable[[str], int]]: The counter, or None to use the
+            conservative estimate.
+        """
+        endpoint_config = getattr(getattr(llm_handler, "llm", None), "endpoint_file", None)
+        return token_count_service.get_counter(endpoint_config)
 
     @staticmethod
     def _context_clamp_enabled(context) -> bool:
@@ -326,7 +350,8 @@ class LLMDispatchService:
         )
 
     @staticmethod
-    def _compute_conversation_token_budget(llm_handler, system_prompt, tools) -> Optional[int]:
+    def _compute_conversation_token_budget(llm_handler, system_prompt, tools,
+                                           count_tokens=None) -> Optional[int]:
         """Compute the tokens available for conversation content before THIS node's
         endpoint window would be exceeded.
 
@@ -346,6 +371,9 @@ class LLMDispatchService:
                 resolved endpoint config and ``max_tokens``).
             system_prompt (str): The node's fully-substituted system prompt.
             tools: The tool definitions being forwarded (or None).
+            count_tokens (Optional[Callable[[str], int]]): The endpoint's exact
+                token counter, or None for the conservative estimate. With a
+                counter the budget is in real tokens and the level is not applied.
 
         Returns:
             Optional[int]: The conversation token budget, or None when the
@@ -358,15 +386,17 @@ class LLMDispatchService:
         llm = getattr(llm_handler, "llm", None)
         endpoint_config = getattr(llm, "endpoint_file", None)
         base_budget = compute_endpoint_window_budget(
-            endpoint_config, getattr(llm, "max_tokens", 0), _CLAMP_HEADROOM_TOKENS)
+            endpoint_config, getattr(llm, "max_tokens", 0), _CLAMP_HEADROOM_TOKENS,
+            estimation_multiplier=1.0 if count_tokens is not None else None)
         if base_budget is None:
             return None
 
         # Refine the shared window basis with what only dispatch knows at send time:
         # the system prompt and forwarded tool schemas (both already in conservative
         # estimate space, so subtracted after the level has scaled the base).
-        system_tokens = rough_estimate_token_length(system_prompt) if system_prompt else 0
-        tool_tokens = LLMDispatchService._estimate_tokens_for_tools(tools)
+        count = count_tokens or rough_estimate_token_length
+        system_tokens = count(system_prompt) if system_prompt else 0
+        tool_tokens = LLMDispatchService._estimate_tokens_for_tools(tools, count_tokens)
         budget = base_budget - system_tokens - tool_tokens
 
         if budget <= 0:
@@ -382,7 +412,7 @@ class LLMDispatchService:
         return budget
 
     @staticmethod
-    def _trim_messages_to_token_budget(messages, budget):
+    def _trim_messages_to_token_budget(messages, budget, count_tokens=None):
         """Return the most-recent messages that fit within ``budget`` estimated tokens.
 
         Drops whole messages oldest-first, always keeping at least the single most
@@ -401,6 +431,8 @@ class LLMDispatchService:
         Args:
             messages (list): Conversation messages in chronological order.
             budget (Optional[int]): The estimated token budget, or None to disable.
+            count_tokens (Optional[Callable[[str], int]]): The endpoint's exact
+                token counter, or None for the conservative estimate.
 
         Returns:
             list: The retained messages in chronological order. A new list when a
@@ -409,11 +441,12 @@ class LLMDispatchService:
         if budget is None or not messages:
             return messages
 
+        count = count_tokens or rough_estimate_token_length
         overhead = _CLAMP_PER_MESSAGE_OVERHEAD_TOKENS
         selected = []
         used = 0
         for message in reversed(messages):
-            cost = rough_estimate_token_length(message.get("content") or "") + overhead
+            cost = count(message.get("content") or "") + overhead
             if not selected or used + cost <= budget:
                 selected.append(message)
                 used += cost
@@ -430,7 +463,7 @@ class LLMDispatchService:
             # Bounding the embedded conversation variable is the supported defense.
             # (budget <= 0 is the misconfig case already warned about when the
             # budget was computed, so it is not re-warned here.)
-            single_tokens = rough_estimate_token_length(selected[0].get("content") or "")
+            single_tokens = count(selected[0].get("content") or "")
             logger.warning(
                 "Pre-send clamp: the single most-recent conversation message is ~%d "
                 "estimated tokens, which alone exceeds the conversation budget of ~%d. "
@@ -446,7 +479,7 @@ class LLMDispatchService:
         return selected
 
     @staticmethod
-    def _clamp_chat_collection_to_budget(collection, budget) -> None:
+    def _clamp_chat_collection_to_budget(collection, budget, count_tokens=None) -> None:
         """Trim a chat ``collection`` in place so it fits ``budget`` tokens.
 
         Leading system message(s) are preserved (their tokens were already
@@ -457,6 +490,8 @@ class LLMDispatchService:
         Args:
             collection (list): The message collection to modify in place.
             budget (Optional[int]): The conversation token budget, or None.
+            count_tokens (Optional[Callable[[str], int]]): The endpoint's exact
+                token counter, or None for the conservative estimate.
         """
         if budget is None or not collection:
             return
@@ -466,11 +501,12 @@ class LLMDispatchService:
         body = collection[lead:]
         if not body:
             return
-        trimmed = LLMDispatchService._trim_messages_to_token_budget(body, budget)
+        trimmed = LLMDispatchService._trim_messages_to_token_budget(body, budget, count_tokens)
         collection[:] = collection[:lead] + trimmed
 
     @staticmethod
-    def _warn_if_authored_prompt_overflows(prompt, budget, config, llm_handler) -> None:
+    def _warn_if_authored_prompt_overflows(prompt, budget, config, llm_handler,
+                                           count_tokens=None) -> None:
         """Warn, without modifying, when an operator-authored prompt overflows the budget.
 
         The node's ``prompt`` field is authored content (instructions, safety
@@ -489,10 +525,12 @@ class LLMDispatchService:
                 clamp is disabled or the endpoint window is unknown.
             config (dict): The node config (for the node title).
             llm_handler: The node's LLM handler (for window context).
+            count_tokens (Optional[Callable[[str], int]]): The endpoint's exact
+                token counter, or None for the conservative estimate.
         """
         if budget is None or not prompt:
             return
-        prompt_tokens = rough_estimate_token_length(prompt)
+        prompt_tokens = (count_tokens or rough_estimate_token_length)(prompt)
         if prompt_tokens <= budget:
             return
         title = config.get("title") or config.get("agentName") or "unknown"
@@ -845,9 +883,11 @@ class LLMDispatchService:
         # subsuming) the opt-in per-node lastMessagesToSendInsteadOfPromptMaxTokenSize
         # cap. None disables the clamp (every clamp helper below no-ops), which also
         # happens when the endpoint window is unknown.
+        # Endpoints with a local tokenizer are clamped on exact counts instead.
+        token_counter = LLMDispatchService._resolve_token_counter(llm_handler) if clamp_enabled else None
         conversation_token_budget = (
             LLMDispatchService._compute_conversation_token_budget(
-                llm_handler, system_prompt, tools_to_send)
+                llm_handler, system_prompt, tools_to_send, token_counter)
             if clamp_enabled else None)
 
         # 2. Prepare inputs and call LLM based on API type
@@ -868,13 +908,13 @@ class LLMDispatchService:
                 # Final safety clamp on the message slice before it is formatted to a
                 # string, so the rendered prompt fits the node's endpoint window.
                 if conversation_token_budget is not None:
-                    before_tokens = LLMDispatchService._estimate_collection_tokens(source_messages)
+                    before_tokens = LLMDispatchService._estimate_collection_tokens(source_messages, token_counter)
                     before_count = len(source_messages)
                     source_messages = LLMDispatchService._trim_messages_to_token_budget(
-                        source_messages, conversation_token_budget)
+                        source_messages, conversation_token_budget, token_counter)
                     LLMDispatchService._log_context_window_clamp(
                         config, llm_handler, before_tokens,
-                        LLMDispatchService._estimate_collection_tokens(source_messages),
+                        LLMDispatchService._estimate_collection_tokens(source_messages, token_counter),
                         before_count - len(source_messages))
                 prompt = get_formatted_last_n_turns_as_string(
                     source_messages, last_messages_to_send + 1,
@@ -891,7 +931,7 @@ class LLMDispatchService:
                 # The correct defense against conversation-driven overflow is to bound
                 # the embedded conversation variable when it is built, not here.
                 LLMDispatchService._warn_if_authored_prompt_overflows(
-                    prompt, conversation_token_budget, config, llm_handler)
+                    prompt, conversation_token_budget, config, llm_handler, token_counter)
             if config.get("addUserTurnTemplate"):
                 prompt = format_user_turn_with_template(prompt, llm_handler.prompt_template_file_name, False)
             if config.get("addOpenEndedAssistantTurnTemplate"):
@@ -968,7 +1008,7 @@ class LLMDispatchService:
                 # This user message IS the operator's authored prompt; never truncate
                 # it. Warn if it overflows and send as-is (see the completions branch).
                 LLMDispatchService._warn_if_authored_prompt_overflows(
-                    prompt, conversation_token_budget, config, llm_handler)
+                    prompt, conversation_token_budget, config, llm_handler, token_counter)
 
             # Final pre-send safety clamp: trim the CONVERSATION body (oldest-first) to
             # fit the node's endpoint window. Conversation-only: it runs solely on the
@@ -978,12 +1018,13 @@ class LLMDispatchService:
             # preserved. Placed BEFORE the user-message safety net so a user message
             # dropped by the clamp can still be recovered from the full conversation.
             if use_last_n_messages and conversation_token_budget is not None:
-                before_tokens = LLMDispatchService._estimate_collection_tokens(collection)
+                before_tokens = LLMDispatchService._estimate_collection_tokens(collection, token_counter)
                 before_count = len(collection)
-                LLMDispatchService._clamp_chat_collection_to_budget(collection, conversation_token_budget)
+                LLMDispatchService._clamp_chat_collection_to_budget(
+                    collection, conversation_token_budget, token_counter)
                 LLMDispatchService._log_context_window_clamp(
                     config, llm_handler, before_tokens,
-                    LLMDispatchService._estimate_collection_tokens(collection),
+                    LLMDispatchService._estimate_collection_tokens(collection, token_counter),
                     before_count - len(collection))
 
             if use_last_n_messages:
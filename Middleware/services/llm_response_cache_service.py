@@ -0,0 +1,279 @@
+# Middleware/services/llm_response_cache_service.py
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from copy import deepcopy
+from typing import Any, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+_CREATE_TABLE_SQL = (
+    "CREATE TABLE IF NOT EXISTS llm_responses ("
+    "cache_key TEXT PRIMARY KEY, username TEXT NOT NULL DEFAULT '', response TEXT NOT NULL, stored_at REAL NOT NULL)"
+)
+_CREATE_INDEX_SQL = "CREATE INDEX IF NOT EXISTS llm_responses_by_user ON llm_responses (username, stored_at)"
+
+LlmResponse = Union[str, Dict[str, Any]]
+
+
+class LlmResponseCacheService:
+    """
+    A thread-safe singleton that caches complete LLM responses by request payload.
+
+    Internal nodes such as keyword extraction, JSON extraction or a temperature 0
+    summarizer are often re-run with a byte-identical payload when the user
+    regenerates or a client retries. A node that sets ``cacheResponses`` lets
+    LlmApiHandler answer such a call from here instead of the backend. Entries
+    are keyed by a digest of the user, the API key hash, the endpoint URL and the
+    final payload, so any change to the prompt, samplers, model or tools is a miss.
+
+    Responses are stored in plaintext, so callers must not pass a db_path for
+    requests with encryption active; the handler keeps those in memory only.
+
+    The in-memory LRU is always used. When persistence is enabled the entries are
+    also written to a small SQLite file so they survive restarts; the memory tier
+    is checked first and refilled from disk on a memory miss. ``maxEntries`` comes
+    from each user's own config, so both tiers are partitioned by user and every
+    user's limit only ever evicts that user's entries.
+
+    Ages are measured with wall-clock time rather than time.monotonic() because
+    persisted entries must stay comparable across restarts.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of LlmResponseCacheService exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(LlmResponseCacheService, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the entry map, counters and locks.
+        """
+        if self._initialized:
+            return
+
+        # username -> key -> (response, wall-clock time stored), least recently used first
+        self._entries: Dict[str, "OrderedDict[str, Tuple[LlmResponse, float]]"] = {}
+        self._stats: Dict[str, int] = self._empty_stats()
+        self._cache_lock = threading.Lock()
+        # SQLite serializes writers itself; this lock only keeps our own threads
+        # from tripping over "database is locked" on the small cache file.
+        self._db_lock = threading.Lock()
+        self._initialized_db_paths = set()
+        self._initialized = True
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expirations": 0}
+
+    @staticmethod
+    def build_key(username: str, api_key_hash: Optional[str], url: str, payload: Dict[str, Any]) -> str:
+        """
+        Builds the cache key for one backend call.
+
+        Args:
+            username (str): The current WilmerAI user, so users never share entries.
+            api_key_hash (Optional[str]): The request's API key hash, so clients
+                with different keys never share entries.
+            url (str): The full backend URL the payload is posted to.
+            payload (Dict[str, Any]): The final request payload.
+
+        Returns:
+            str: A SHA-256 hex digest.
+        """
+        # sort_keys makes the digest independent of the order gen_input and the
+        # handler happened to assemble the payload in.
+        material = json.dumps([username, api_key_hash, url, payload], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, username: str, key: str, ttl_seconds: float,
+            db_path: Optional[str] = None) -> Optional[LlmResponse]:
+        """
+        Returns a cached response younger than ttl_seconds, or None.
+
+        Args:
+            username (str): The user whose entries are searched.
+            key (str): The key from build_key.
+            ttl_seconds (float): The maximum age of a usable entry.
+            db_path (Optional[str]): The persistent cache file to fall back to on a
+                memory miss, or None when persistence is disabled.
+
+        Returns:
+            Optional[LlmResponse]: A copy of the cached response, or None on a miss.
+        """
+        now = time.time()
+        with self._cache_lock:
+            user_entries = self._entries.get(username, {})
+            entry = user_entries.get(key)
+            if entry is not None and now - entry[1] > ttl_seconds:
+                del user_entries[key]
+                self._stats["expirations"] += 1
+                entry = None
+            if entry is not None:
+                user_entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return deepcopy(entry[0])
+
+        entry = self._read_from_disk(db_path, key, now - ttl_seconds) if db_path else None
+        with self._cache_lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            user_entries = self._entries.setdefault(username, OrderedDict())
+            user_entries[key] = entry
+            user_entries.move_to_end(key)
+        return deepcopy(entry[0])
+
+    def put(self, username: str, key: str, response: LlmResponse, max_entries: int,
+            db_path: Optional[str] = None) -> None:
+        """
+        Stores a response, evicting the user's least recently used entries beyond max_entries.
+
+        Args:
+            username (str): The user the entry belongs to.
+            key (str): The key from build_key.
+            response (LlmResponse): The response text, or the tool-call dictionary.
+            max_entries (int): The user's entry limit, applied to both tiers.
+            db_path (Optional[str]): The persistent cache file, or None when
+                persistence is disabled.
+        """
+        stored_at = time.time()
+        with self._cache_lock:
+            user_entries = self._entries.setdefault(username, OrderedDict())
+            user_entries[key] = (deepcopy(response), stored_at)
+            user_entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(user_entries) > max_entries:
+                user_entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        if db_path:
+            self._write_to_disk(db_path, username, key, response, stored_at, max_entries)
+
+    def _connect(self, db_path: str) -> sqlite3.Connection:
+        """
+        Opens the persistent cache file, creating it and its table on first use.
+
+        Args:
+            db_path (str): The cache file path.
+
+        Returns:
+            sqlite3.Connection: An open connection; the caller closes it.
+        """
+        if db_path not in self._initialized_db_paths:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(db_path, timeout=5)
+        if db_path not in self._initialized_db_paths:
+            conn.execute(_CREATE_TABLE_SQL)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(llm_responses)")}
+            if "username" not in columns:
+                # Files written before entries were partitioned by user.
+                conn.execute("ALTER TABLE llm_responses ADD COLUMN username TEXT NOT NULL DEFAULT ''")
+            conn.execute(_CREATE_INDEX_SQL)
+            conn.commit()
+            self._initialized_db_paths.add(db_path)
+        return conn
+
+    def _read_from_disk(self, db_path: str, key: str, oldest_allowed: float) -> Optional[Tuple[LlmResponse, float]]:
+        """
+        Reads one unexpired entry from the persistent cache.
+
+        Args:
+            db_path (str): The cache file path.
+            key (str): The key from build_key.
+            oldest_allowed (float): Entries stored before this wall-clock time are expired.
+
+        Returns:
+            Optional[Tuple[LlmResponse, float]]: The response and its store time, or None.
+        """
+        try:
+            with self._db_lock, closing(self._connect(db_path)) as conn:
+                row = conn.execute("SELECT response, stored_at FROM llm_responses WHERE cache_key = ?",
+                                   (key,)).fetchone()
+                if row is None:
+                    return None
+                if row[1] < oldest_allowed:
+                    conn.execute("DELETE FROM llm_responses WHERE cache_key = ?", (key,))
+                    conn.commit()
+                    return None
+            return json.loads(row[0]), row[1]
+        except (sqlite3.Error, OSError, ValueError) as e:
+            # The disk tier is an optimization; a broken file must not fail the call.
+            logger.warning(f"Could not read the LLM response cache at {db_path}: {e}")
+            return None
+
+    def _write_to_disk(self, db_path: str, username: str, key: str, response: LlmResponse, stored_at: float,
+                       max_entries: int) -> None:
+        """
+        Writes one entry to the persistent cache and trims the user's entries to max_entries.
+
+        Args:
+            db_path (str): The cache file path.
+            username (str): The user the entry belongs to.
+            key (str): The key from build_key.
+            response (LlmResponse): The response to store.
+            stored_at (float): The wall-clock store time.
+            max_entries (int): The user's entry limit.
+        """
+        try:
+            with self._db_lock, closing(self._connect(db_path)) as conn:
+                conn.execute("INSERT OR REPLACE INTO llm_responses (cache_key, username, response, stored_at) "
+                             "VALUES (?, ?, ?, ?)",
+                             (key, username, json.dumps(response), stored_at))
+                conn.execute("DELETE FROM llm_responses WHERE username = ? AND cache_key NOT IN "
+                             "(SELECT cache_key FROM llm_responses WHERE username = ? "
+                             "ORDER BY stored_at DESC LIMIT ?)",
+                             (username, username, max_entries))
+                conn.commit()
+        except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not write the LLM response cache at {db_path}: {e}")
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Returns cache counters.
+
+        Returns:
+            Dict[str, float]: ``hits`` (memory), ``disk_hits``, ``misses``,
+            ``stores``, ``evictions``, ``expirations``, current in-memory
+            ``entries``, and ``hit_rate`` (both kinds of hit over lookups, 0.0
+            before the first lookup).
+        """
+        with self._cache_lock:
+            hits = self._stats["hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": sum(len(user_entries) for user_entries in self._entries.values()),
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        """
+        Drops every in-memory entry and resets the counters. Intended for test isolation.
+
+        Persisted files are left alone; delete the file to empty the disk tier.
+        """
+        with self._cache_lock:
+            self._entries.clear()
+            self._stats = self._empty_stats()
+        self._initialized_db_paths.clear()
+
+
+# Global singleton instance
+llm_response_cache_service = LlmResponseCacheService()
@@ -28,7 +28,7 @@ class LlmHandlerService:
         pass
 
     def initialize_llm_handler(self, config_data, preset, endpoint, stream, truncate_length, max_tokens,
-                               addGenerationPrompt=None):
+                               addGenerationPrompt=None, cache_responses=False, cache_api_key_hash=None):
         """
         Initializes an `LlmHandler` instance with the provided configuration.
 
@@ -48,6 +48,10 @@ class LlmHandlerService:
             addGenerationPrompt (bool, optional): Flag to add a generation prompt.
                                                   If None, it defaults to the value
                                                   in the config data.
+            cache_responses (bool, optional): Flag to answer non-streaming calls
+                                              from the LLM response cache.
+            cache_api_key_hash (str, optional): The API key hash that scopes the
+                                                cached responses.
 
         Returns:
             LlmHandler: The newly created and initialized `LlmHandler` instance.
@@ -67,7 +71,9 @@ class LlmHandlerService:
         logger.info(f'Attempting to load {llm_type} endpoint: %s', endpoint)
         llm = LlmApiService(endpoint=endpoint, presetname=preset,
                             stream=stream,
-                            max_tokens=max_tokens)
+                            max_tokens=max_tokens,
+                            cache_responses=cache_responses,
+                            cache_api_key_hash=cache_api_key_hash)
 
         prompt_template = config_data["promptTemplate"]
         if prompt_template is not None:
@@ -81,7 +87,7 @@ class LlmHandlerService:
         return llm_handler
 
     def load_model_from_config(self, config_name, preset, stream=False, truncate_length=4096, max_tokens=400,
-                               addGenerationPrompt=None):
+                               addGenerationPrompt=None, cache_responses=False, cache_api_key_hash=None):
         """
         Loads and initializes an LLM handler from an endpoint config file.
 
@@ -100,6 +106,11 @@ class LlmHandlerService:
                                         Defaults to 400.
             addGenerationPrompt (bool, optional): Flag to add a generation prompt.
                                                   Defaults to None.
+            cache_responses (bool, optional): Flag to answer non-streaming calls
+                                              from the LLM response cache.
+                                              Defaults to False.
+            cache_api_key_hash (str, optional): The API key hash that scopes the
+                                                cached responses. Defaults to None.
 
         Returns:
             LlmHandler: The initialized `LlmHandler` instance.
@@ -111,7 +122,7 @@ class LlmHandlerService:
             logger.info("Loading model from: %s", config_name)
             config_file = get_endpoint_config(config_name)
             return self.initialize_llm_handler(config_file, preset, config_name, stream, truncate_length, max_tokens,
-                                               addGenerationPrompt)
+                                               addGenerationPrompt, cache_responses, cache_api_key_hash)
         except Exception:
             logger.error("Error loading model from config.")
             raise
\ No newline at end of file
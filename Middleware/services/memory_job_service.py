@@ -0,0 +1,433 @@
+# Middleware/services/memory_job_service.py
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import closing
+from copy import deepcopy
+from typing import Any, Dict, Optional
+
+from Middleware.common import instance_global_variables
+from Middleware.utilities.sensitive_logging_utils import is_encryption_active, set_encryption_context
+from Middleware.workflows.models.execution_context import ExecutionContext
+
+logger = logging.getLogger(__name__)
+
+_CREATE_TABLE_SQL = (
+    "CREATE TABLE IF NOT EXISTS memory_jobs ("
+    "job_key TEXT PRIMARY KEY, job_id TEXT NOT NULL, payload TEXT NOT NULL, enqueued_at REAL NOT NULL)"
+)
+
+# How often a worker re-checks the request semaphore while it is deferring a job
+# to live traffic. Short enough that a job starts soon after the last request
+# finishes, long enough that an idle probe loop costs nothing measurable.
+IDLE_POLL_SECONDS = 0.5
+
+# Fields that only ever live in memory. The raw API key and the derived
+# encryption key must never reach the disk, so a job carrying them is not
+# persisted at all (see enqueue_quality_memory).
+_TRANSIENT_FIELDS = ("api_key", "encryption_key")
+
+
+class MemoryJobService:
+    """
+    A thread-safe singleton that runs QualityMemory generation off the request path.
+
+    A QualityMemory node that sets ``runInBackground`` hands its work to this
+    queue and returns immediately, so the interactive request no longer holds
+    the request semaphore while memories are written. Jobs are keyed by user,
+    API key hash and discussion id: enqueueing a discussion that already has a
+    pending job replaces that job's conversation with the newer one instead of
+    adding a second job, because one catch-up over the latest messages covers
+    everything the older job would have done. A discussion never has two jobs
+    running at once.
+
+    Workers yield to live traffic: before a job starts they wait until a slot of
+    the request semaphore is free, up to ``maxDeferSeconds``, and then run anyway
+    so a busy server cannot starve memory upkeep indefinitely.
+
+    Jobs are also written to a small SQLite file so that work queued before a
+    restart is picked up again: server startup calls ``recover`` for each
+    user's queue file. Jobs for requests that carried an API key are held in
+    memory only; they are lost on restart and simply re-queued by the
+    discussion's next request.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of MemoryJobService exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(MemoryJobService, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the job map, counters and worker bookkeeping.
+        """
+        if self._initialized:
+            return
+
+        # job_key -> job. Insertion order is queue order; coalescing replaces a
+        # job in place so a busy discussion does not lose its turn.
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._running = set()
+        self._workers = []
+        self._stats: Dict[str, int] = self._empty_stats()
+        self._condition = threading.Condition()
+        # SQLite serializes writers itself; this lock only keeps our own threads
+        # from tripping over "database is locked" on the small queue file.
+        self._db_lock = threading.Lock()
+        self._recovered_db_paths = set()
+        self._initialized = True
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {"enqueued": 0, "coalesced": 0, "recovered": 0, "completed": 0, "failed": 0,
+                "deferred": 0, "defer_timeouts": 0}
+
+    @staticmethod
+    def build_key(username: Optional[str], api_key_hash: Optional[str], discussion_id: str) -> str:
+        """
+        Builds the coalescing key for one discussion.
+
+        Args:
+            username (Optional[str]): The current WilmerAI user.
+            api_key_hash (Optional[str]): The hash of the request's API key, if any.
+            discussion_id (str): The discussion the memories belong to.
+
+        Returns:
+            str: The job key.
+        """
+        return repr((username, api_key_hash, discussion_id))
+
+    def enqueue_quality_memory(self, context: ExecutionContext, workers: int, max_defer_seconds: float,
+                               db_path: Optional[str] = None) -> bool:
+        """
+        Queues a QualityMemory catch-up for the context's discussion.
+
+        Args:
+            context (ExecutionContext): The QualityMemory node's execution context.
+            workers (int): The size of the worker pool; the pool only ever grows.
+            max_defer_seconds (float): How long a job may wait for live traffic to drain.
+            db_path (Optional[str]): The queue file, or None to keep jobs in memory only.
+
+        Returns:
+            bool: True if the job was merged into one already pending for the discussion.
+        """
+        username = instance_global_variables.get_request_user()
+        workflow_manager = context.workflow_manager
+        job = {
+            "job_key": self.build_key(username, context.api_key_hash, context.discussion_id),
+            "job_id": uuid.uuid4().hex,
+            "username": username,
+            "workflow_override": instance_global_variables.get_workflow_override(),
+            "api_type": instance_global_variables.get_api_type(),
+            "encryption_active": is_encryption_active(),
+            "workflow_id": context.workflow_id,
+            "workflow_name": getattr(workflow_manager, "workflowConfigName", None),
+            "workflow_user_folder_override": getattr(workflow_manager, "workflow_user_folder_override", None),
+            "discussion_id": context.discussion_id,
+            "config": context.config,
+            "workflow_config": context.workflow_config,
+            "messages": deepcopy(context.messages),
+            "api_key_hash": context.api_key_hash,
+            "api_key": context.api_key,
+            "encryption_key": context.encryption_key,
+            "max_defer_seconds": max_defer_seconds,
+            "enqueued_at": time.time(),
+        }
+        if context.api_key:
+            db_path = None
+        job["db_path"] = db_path
+
+        if db_path:
+            # Startup normally recovers the file already; this covers a queue
+            # file first configured while the server was running.
+            self.recover(db_path, workers)
+            self._write_to_disk(db_path, job)
+
+        with self._condition:
+            coalesced = job["job_key"] in self._pending
+            self._pending[job["job_key"]] = job
+            self._stats["coalesced" if coalesced else "enqueued"] += 1
+            self._ensure_workers_locked(workers)
+            self._condition.notify()
+
+        logger.info("Queued background memory generation for discussion %s%s.", context.discussion_id,
+                    " (merged with the pending job)" if coalesced else "")
+        return coalesced
+
+    def _ensure_workers_locked(self, workers: int) -> None:
+        """
+        Grows the worker pool to the given size. Must be called while holding self._condition.
+
+        Args:
+            workers (int): The number of worker threads to have running.
+        """
+        while len(self._workers) < workers:
+            thread = threading.Thread(target=self._worker_loop, name=f"wilmer-memory-job-{len(self._workers)}",
+                                      daemon=True)
+            thread.start()
+            self._workers.append(thread)
+
+    def _next_job_locked(self) -> Optional[Dict[str, Any]]:
+        """
+        Pops the oldest pending job whose discussion is not already running.
+
+        Must be called while holding self._condition.
+
+        Returns:
+            Optional[Dict[str, Any]]: The job, or None if nothing is runnable.
+        """
+        for job_key in self._pending:
+            if job_key not in self._running:
+                self._running.add(job_key)
+                return self._pending.pop(job_key)
+        return None
+
+    def _worker_loop(self) -> None:
+        """
+        Runs pending jobs until the process exits.
+        """
+        while True:
+            with self._condition:
+                job = self._next_job_locked()
+                while job is None:
+                    self._condition.wait()
+                    job = self._next_job_locked()
+
+            succeeded = False
+            try:
+                self._wait_for_live_traffic(job["max_defer_seconds"])
+                self._run_job(job)
+                succeeded = True
+            except Exception as e:
+                # A job that fails is dropped rather than retried; retrying a job
+                # that fails deterministically would loop forever, and the
+                # discussion's next request queues a fresh catch-up anyway.
+                logger.error("Background memory generation for discussion %s failed: %s",
+                             job["discussion_id"], e, exc_info=True)
+            finally:
+                if job["db_path"]:
+                    self._delete_from_disk(job["db_path"], job)
+                with self._condition:
+                    self._running.discard(job["job_key"])
+                    self._stats["completed" if succeeded else "failed"] += 1
+                    self._condition.notify_all()
+
+    def _wait_for_live_traffic(self, max_defer_seconds: float) -> None:
+        """
+        Blocks until a request semaphore slot is free, or max_defer_seconds pass.
+
+        The slot is probed and released straight away; background jobs never hold
+        the semaphore, so an arriving request is not made to wait for one.
+
+        Args:
+            max_defer_seconds (float): The longest time to wait before running anyway.
+        """
+        semaphore = instance_global_variables.get_request_semaphore()
+        if semaphore is None:
+            return
+        deadline = time.monotonic() + max_defer_seconds
+        deferred = False
+        while not semaphore.acquire(blocking=False):
+            if not deferred:
+                deferred = True
+                with self._condition:
+                    self._stats["deferred"] += 1
+            if time.monotonic() >= deadline:
+                logger.info("Live traffic did not drain within %ss; running the memory job anyway.",
+                            max_defer_seconds)
+                with self._condition:
+                    self._stats["defer_timeouts"] += 1
+                return
+            time.sleep(IDLE_POLL_SECONDS)
+        semaphore.release()
+
+    @staticmethod
+    def _run_job(job: Dict[str, Any]) -> None:
+        """
+        Re-applies the original request's context and runs the memory catch-up.
+
+        Args:
+            job (Dict[str, Any]): The job to run.
+        """
+        # Imported here because the workflow manager imports the memory node
+        # handler, which enqueues through this module.
+        from Middleware.workflows.managers.workflow_manager import WorkflowManager
+        from Middleware.workflows.tools.slow_but_quality_rag_tool import SlowButQualityRAGTool
+
+        instance_global_variables.set_request_user(job["username"])
+        instance_global_variables.set_workflow_override(job["workflow_override"])
+        instance_global_variables.set_api_type(job["api_type"])
+        set_encryption_context(job["encryption_active"])
+        try:
+            workflow_manager = WorkflowManager(
+                workflow_config_name=job.get("workflow_name"),
+                workflow_user_folder_override=job.get("workflow_user_folder_override"),
+            )
+            context = ExecutionContext(
+                request_id=f"memory-job-{job['job_id']}",
+                workflow_id=job["workflow_id"],
+                discussion_id=job["discussion_id"],
+                config=job["config"],
+                messages=job["messages"],
+                stream=False,
+                workflow_config=job["workflow_config"],
+                workflow_variable_service=workflow_manager.workflow_variable_service,
+                workflow_manager=workflow_manager,
+                api_key=job["api_key"],
+                encryption_key=job["encryption_key"],
+                api_key_hash=job["api_key_hash"],
+            )
+            SlowButQualityRAGTool().handle_discussion_id_flow(context)
+        finally:
+            instance_global_variables.clear_request_user()
+            instance_global_variables.clear_workflow_override()
+            instance_global_variables.clear_api_type()
+            set_encryption_context(False)
+
+    def _connect(self, db_path: str) -> sqlite3.Connection:
+        """
+        Opens the queue file, creating it and its table if needed.
+
+        Args:
+            db_path (str): The queue file path.
+
+        Returns:
+            sqlite3.Connection: An open connection; the caller closes it.
+        """
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(db_path, timeout=5)
+        conn.execute(_CREATE_TABLE_SQL)
+        return conn
+
+    def recover(self, db_path: str, workers: int = 1) -> int:
+        """
+        Re-queues jobs left in a queue file by a previous run, once per file.
+
+        Args:
+            db_path (str): The queue file path.
+            workers (int): The size of the worker pool to start if jobs were found.
+
+        Returns:
+            int: The number of jobs re-queued.
+        """
+        with self._condition:
+            if db_path in self._recovered_db_paths:
+                return 0
+            self._recovered_db_paths.add(db_path)
+
+        try:
+            with self._db_lock, closing(self._connect(db_path)) as conn:
+                rows = conn.execute("SELECT payload FROM memory_jobs ORDER BY enqueued_at").fetchall()
+            jobs = [json.loads(row[0]) for row in rows]
+        except (sqlite3.Error, OSError, ValueError) as e:
+            logger.warning(f"Could not read the memory job queue at {db_path}: {e}")
+            return 0
+
+        recovered = 0
+        with self._condition:
+            for job in jobs:
+                job.update({field: None for field in _TRANSIENT_FIELDS}, db_path=db_path)
+                if job["job_key"] not in self._pending:
+                    self._pending[job["job_key"]] = job
+                    self._stats["recovered"] += 1
+                    recovered += 1
+            if recovered:
+                logger.info(f"Recovered {recovered} background memory job(s) from {db_path}")
+                self._ensure_workers_locked(workers)
+                self._condition.notify_all()
+        return recovered
+
+    def _write_to_disk(self, db_path: str, job: Dict[str, Any]) -> None:
+        """
+        Persists a job, replacing any pending job for the same discussion.
+
+        Args:
+            db_path (str): The queue file path.
+            job (Dict[str, Any]): The job; it must not carry transient fields.
+        """
+        payload = {k: v for k, v in job.items() if k not in _TRANSIENT_FIELDS and k != "db_path"}
+        try:
+            with self._db_lock, closing(self._connect(db_path)) as conn:
+                conn.execute("INSERT OR REPLACE INTO memory_jobs (job_key, job_id, payload, enqueued_at) "
+                             "VALUES (?, ?, ?, ?)",
+                             (job["job_key"], job["job_id"], json.dumps(payload), job["enqueued_at"]))
+                conn.commit()
+        except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+            # The job still runs from memory; it just will not survive a restart.
+            logger.warning(f"Could not persist a memory job to {db_path}: {e}")
+
+    def _delete_from_disk(self, db_path: str, job: Dict[str, Any]) -> None:
+        """
+        Removes a finished job from the queue file.
+
+        The row is matched on job_id as well as job_key, so a newer job that was
+        coalesced in while this one ran is left in place.
+
+        Args:
+            db_path (str): The queue file path.
+            job (Dict[str, Any]): The finished job.
+        """
+        try:
+            with self._db_lock, closing(self._connect(db_path)) as conn:
+                conn.execute("DELETE FROM memory_jobs WHERE job_key = ? AND job_id = ?",
+                             (job["job_key"], job["job_id"]))
+                conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Could not remove a finished memory job from {db_path}: {e}")
+
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until no job is pending or running.
+
+        Args:
+            timeout (Optional[float]): The longest time to wait, or None to wait indefinitely.
+
+        Returns:
+            bool: True if the queue drained, False if the timeout elapsed first.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._running, timeout)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns queue counters.
+
+        Returns:
+            Dict[str, int]: ``enqueued``, ``coalesced`` (merged into a pending job),
+            ``recovered`` (re-queued from disk), ``completed``, ``failed``,
+            ``deferred`` (jobs that waited for live traffic), ``defer_timeouts``,
+            and the current ``pending`` and ``running`` job counts.
+        """
+        with self._condition:
+            return {**self._stats, "pending": len(self._pending), "running": len(self._running)}
+
+    def clear(self) -> None:
+        """
+        Drops every pending job and resets the counters. Intended for test isolation.
+
+        Running jobs finish normally and queue files are left alone; worker threads
+        stay alive for the next job.
+        """
+        with self._condition:
+            self._pending.clear()
+            self._stats = self._empty_stats()
+            self._recovered_db_paths.clear()
+
+
+# Global singleton instance
+memory_job_service = MemoryJobService()
@@ -4,9 +4,10 @@ import logging
 from typing import Dict, List, Tuple, Optional
 
 from Middleware.services.embedding_service import EmbeddingService
-from Middleware.utilities import text_utils, vector_db_utils, vector_math_utils
+from Middleware.utilities import text_utils, vector_db_utils, vector_index_utils, vector_math_utils
 from Middleware.utilities.config_utils import get_discussion_memory_file_path, get_discussion_chat_summary_file_path, \
     get_discussion_state_document_file_path
+from Middleware.utilities.embedding_matrix_cache import NUMPY_AVAILABLE, embedding_matrix_cache
 from Middleware.utilities.file_utils import read_chunks_with_hashes, read_plain_text_file
 from Middleware.utilities.hashing_utils import extract_text_blocks_from_hashed_chunks
 from Middleware.utilities.sensitive_logging_utils import sensitive_log
@@ -32,6 +33,8 @@ class MemoryService:
                                 semantic_query: Optional[str] = None,
                                 embedding_endpoint_name: Optional[str] = None,
                                 use_entity_expansion: bool = False,
+                                vector_index: str = "exact",
+                                vector_index_probes: Optional[int] = None,
                                 request_id: Optional[str] = None) -> str:
         """
         Searches for memories in the vector database.
@@ -76,6 +79,13 @@ class MemoryService:
             use_entity_expansion (bool): If True, runs the entity-expansion
                 second pass described above. Expansion-only hits are appended
                 after the base results. Defaults to False (no behavior change).
+            vector_index (str): "exact" scores every stored embedding; "ivf"
+                scores only the candidates from the discussion's approximate
+                nearest-neighbour index (see vector_index_utils), falling back
+                to exact search when no up-to-date index exists.
+            vector_index_probes (Optional[int]): Clusters searched in "ivf"
+                mode; higher trades latency for recall. Defaults to
+                vector_index_utils.DEFAULT_IVF_PROBES.
             request_id (Optional[str]): The request ID, forwarded to the
                 embedding call so client cancellation can abort an in-flight
                 semantic query instead of waiting out its read timeout.
@@ -110,7 +120,7 @@ class MemoryService:
             query_text = (semantic_query or keywords.replace(';', ' ')).strip()
             found_ids = self._search_semantic_memory_ids(
                 discussion_id, query_text, limit, embedding_endpoint_name, api_key_hash,
-                request_id=request_id)
+                request_id=request_id, vector_index=vector_index, vector_index_probes=vector_index_probes)
             if found_ids is None:
                 logger.error("Semantic search failed; falling back to keyword-only results.")
             else:
@@ -239,7 +249,9 @@ class MemoryService:
     def _search_semantic_memory_ids(discussion_id: str, query_text: str, limit: int,
                                     embedding_endpoint_name: str,
                                     api_key_hash: Optional[str],
-                                    request_id: Optional[str] = None) -> Optional[List[int]]:
+                                    request_id: Optional[str] = None,
+                                    vector_index: str = "exact",
+                                    vector_index_probes: Optional[int] = None) -> Optional[List[int]]:
         """
         Ranks stored memory embeddings against an embedded query text.
 
@@ -250,6 +262,8 @@ class MemoryService:
             embedding_endpoint_name (str): The embeddings endpoint config name.
             api_key_hash (Optional[str]): Pre-computed hash for directory isolation.
             request_id (Optional[str]): The request ID for cancellation tracking.
+            vector_index (str): "exact" or "ivf"; see search_vector_memories.
+            vector_index_probes (Optional[int]): Clusters searched in "ivf" mode.
 
         Returns:
             Optional[List[int]]: Ranked memory ids (best first); an empty list
@@ -265,13 +279,36 @@ class MemoryService:
             vectors = service.get_embeddings([query_text], request_id=request_id)
             if not vectors:
                 return None
+            model = service.model_name
+            if (vector_index or "exact").lower() == "ivf":
+                probes = vector_index_probes or vector_index_utils.DEFAULT_IVF_PROBES
+                candidates = vector_db_utils.get_ann_candidate_ids(
+                    discussion_id, model, vectors[0], probes, api_key_hash=api_key_hash)
+                if candidates is not None:
+                    # Rescore the candidates exactly; the index only narrows the field.
+                    stored = vector_db_utils.get_embeddings_by_ids(
+                        discussion_id, model, candidates, api_key_hash=api_key_hash)
+                    ranked = vector_math_utils.rank_by_cosine(vectors[0], stored, limit)
+                    return [memory_id for memory_id, _ in ranked]
+            if NUMPY_AVAILABLE:
+                # Read the signature before the rows, so a write landing in
+                # between can only make the cached matrix look stale.
+                cache_key = (discussion_id, api_key_hash, model)
+                signature = vector_db_utils.get_embedding_signature(
+                    discussion_id, model, api_key_hash=api_key_hash)
+                ranked = embedding_matrix_cache.search(cache_key, signature, vectors[0], limit)
+                if ranked is not None:
+                    return [memory_id for memory_id, _ in ranked]
             stored = vector_db_utils.get_all_embeddings(
-                discussion_id, service.model_name, api_key_hash=api_key_hash)
+                discussion_id, model, api_key_hash=api_key_hash)
             if not stored:
                 logger.info("No stored embeddings for model '%s' in discussion '%s' yet.",
-                            service.model_name, discussion_id)
+                            model, discussion_id)
                 return []
-            ranked = vector_math_utils.rank_by_cosine(vectors[0], stored, limit)
+            if NUMPY_AVAILABLE:
+                ranked = embedding_matrix_cache.load(cache_key, signature, stored, vectors[0], limit)
+            else:
+                ranked = vector_math_utils.rank_by_cosine(vectors[0], stored, limit)
             return [memory_id for memory_id, _ in ranked]
         except Exception as e:
             logger.error("Semantic memory search failed for discussion '%s': %s",
@@ -0,0 +1,271 @@
+# Middleware/services/metrics_service.py
+
+import bisect
+import importlib
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds. They run from a few milliseconds
+# (a cached node, an uncontended semaphore) to five minutes (a long reasoning
+# generation), which covers every latency recorded here without per-metric
+# tuning; the implicit +Inf bucket catches anything longer.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+# name -> (type, help). Every metric recorded through the service is declared
+# here so the exposition always carries its HELP and TYPE lines, and a typo in
+# a metric name at a call site fails loudly in tests instead of silently
+# creating a new series.
+METRICS: Dict[str, Tuple[str, str]] = {
+    "wilmer_node_execution_seconds": (
+        "histogram", "Workflow node execution time, by node type and workflow."),
+    "wilmer_backend_ttft_seconds": (
+        "histogram", "Time from sending a streaming LLM request to its first chunk, by endpoint."),
+    "wilmer_backend_latency_seconds": (
+        "histogram", "Total LLM call time, by endpoint and whether the call streamed."),
+    "wilmer_tokens_streamed_total": (
+        "counter", "Non-empty token chunks streamed back from LLM backends, by endpoint."),
+    "wilmer_backend_errors_total": (
+        "counter", "LLM calls that raised an error, by endpoint (failovers included)."),
+    "wilmer_concurrency_wait_seconds": (
+        "histogram", "Time spent waiting for a concurrency slot, by concurrency level."),
+    "wilmer_concurrency_rejections_total": (
+        "counter", "Requests or LLM calls that timed out waiting for a concurrency slot, by level."),
+    "wilmer_cancellations_total": (
+        "counter", "Requests marked for cancellation."),
+}
+
+# Caches whose hit ratio is exported, as
+# cache label -> (module, instance attribute, hit counter keys, miss counter keys).
+# Each cache keeps its own counters behind get_stats(), so the exporter reads
+# them at scrape time rather than having every lookup report twice. Modules are
+# imported lazily; a cache whose module fails to import is skipped.
+CACHE_STATS_SOURCES: Dict[str, Tuple[str, str, Tuple[str, ...], Tuple[str, ...]]] = {
+    "config": ("Middleware.utilities.config_cache", "config_cache", ("hits",), ("misses",)),
+    "workflow_plan": ("Middleware.workflows.managers.workflow_compiler", "workflow_compiler",
+                      ("hits",), ("compiles",)),
+    "categorization": ("Middleware.services.categorization_cache_service", "categorization_cache_service",
+                       ("hits",), ("misses",)),
+    "llm_response": ("Middleware.services.llm_response_cache_service", "llm_response_cache_service",
+                     ("hits", "disk_hits"), ("misses",)),
+    "embedding": ("Middleware.utilities.embedding_cache", "embedding_cache",
+                  ("memory_hits", "disk_hits"), ("misses",)),
+    "embedding_matrix": ("Middleware.utilities.embedding_matrix_cache", "embedding_matrix_cache",
+                         ("hits",), ("loads",)),
+    "token_count": ("Middleware.services.token_count_service", "token_count_service",
+                    ("count_hits",), ("count_misses",)),
+    "word_count": ("Middleware.utilities.text_utils", "word_count_memo", ("hits",), ("misses",)),
+    "keyword_index": ("Middleware.utilities.keyword_index", "keyword_index_cache", ("hits",), ("misses",)),
+    "mcp_session": ("Middleware.workflows.tools.mcp_client_tool", "mcp_session_pool", ("reused",), ("opened",)),
+    "mcp_tools": ("Middleware.workflows.tools.mcp_client_tool", "mcp_session_pool",
+                  ("tools_cache_hits",), ("tools_cache_misses",)),
+    "web_fetch": ("Middleware.services.web_fetch_cache_service", "web_fetch_cache_service",
+                  ("hits", "disk_hits"), ("misses",)),
+    "web_fetch_session": ("Middleware.services.http_session_pool_service", "web_fetch_session_pool",
+                          ("reused",), ("created",)),
+    "html_text": ("Middleware.services.web_fetch_cache_service", "html_text_memo", ("hits",), ("misses",)),
+    "fernet_key": ("Middleware.utilities.encryption_utils", "fernet_key_cache",
+                   ("derivations_saved",), ("derivations",)),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> LabelKey:
+    return tuple(sorted((str(k), str(v)) for k, v in (labels or {}).items()))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(label_key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = label_key + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsService:
+    """
+    A thread-safe singleton registry of Prometheus-style counters and histograms.
+
+    Call sites record with observe() and increment(); render_prometheus()
+    produces the text exposition format (version 0.0.4) served at /metrics.
+    Values live in process memory only and start from zero on every restart,
+    which is what a Prometheus scraper expects of counters.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of MetricsService exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(MetricsService, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the empty series maps.
+        """
+        if self._initialized:
+            return
+
+        # name -> label key -> value
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        # name -> label key -> [per-bucket counts (non-cumulative, +Inf last), sum, count]
+        self._histograms: Dict[str, Dict[LabelKey, list]] = {}
+        self._metrics_lock = threading.Lock()
+        self._initialized = True
+
+    @staticmethod
+    def _check_metric(name: str, expected_type: str) -> None:
+        declared = METRICS.get(name)
+        if declared is None or declared[0] != expected_type:
+            raise ValueError(f"'{name}' is not a declared {expected_type} metric")
+
+    def increment(self, name: str, labels: Optional[Dict[str, str]] = None, amount: float = 1) -> None:
+        """
+        Adds to a counter.
+
+        Args:
+            name (str): A counter declared in METRICS.
+            labels (Optional[Dict[str, str]]): The series labels.
+            amount (float): The non-negative amount to add.
+        """
+        self._check_metric(name, "counter")
+        key = _label_key(labels)
+        with self._metrics_lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        """
+        Records one observation in a histogram.
+
+        Args:
+            name (str): A histogram declared in METRICS.
+            value (float): The observed value, in seconds for the latency histograms.
+            labels (Optional[Dict[str, str]]): The series labels.
+        """
+        self._check_metric(name, "histogram")
+        key = _label_key(labels)
+        index = bisect.bisect_left(DEFAULT_BUCKETS, value)
+        with self._metrics_lock:
+            series = self._histograms.setdefault(name, {})
+            entry = series.get(key)
+            if entry is None:
+                entry = series[key] = [[0] * (len(DEFAULT_BUCKETS) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @staticmethod
+    def collect_cache_stats() -> Dict[str, Dict[str, float]]:
+        """
+        Reads hit and miss totals from every cache in CACHE_STATS_SOURCES.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Cache label -> ``hits``, ``misses`` and
+            ``hit_ratio`` (0.0 before the first lookup).
+        """
+        collected = {}
+        for cache, (module_name, attribute, hit_keys, miss_keys) in CACHE_STATS_SOURCES.items():
+            try:
+                stats = getattr(importlib.import_module(module_name), attribute).get_stats()
+            except Exception as e:
+                logger.debug("Skipping cache metrics for '%s': %s", cache, e)
+                continue
+            hits = sum(stats.get(k, 0) for k in hit_keys)
+            misses = sum(stats.get(k, 0) for k in miss_keys)
+            lookups = hits + misses
+            collected[cache] = {"hits": hits, "misses": misses,
+                                "hit_ratio": hits / lookups if lookups else 0.0}
+        return collected
+
+    def render_prometheus(self) -> str:
+        """
+        Renders every recorded series, plus the cache gauges, in the Prometheus
+        text exposition format.
+
+        Returns:
+            str: The exposition text, ending in a newline.
+        """
+        with self._metrics_lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {key: (list(entry[0]), entry[1], entry[2]) for key, entry in series.items()}
+                          for name, series in self._histograms.items()}
+
+        lines: List[str] = []
+        for name, (metric_type, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            if metric_type == "counter":
+                for key, value in sorted(counters.get(name, {}).items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+                continue
+            for key, (buckets, total, count) in sorted(histograms.get(name, {}).items()):
+                cumulative = 0
+                for bound, bucket_count in zip(DEFAULT_BUCKETS + (float("inf"),), buckets):
+                    cumulative += bucket_count
+                    le = (("le", _format_value(bound)),)
+                    lines.append(f"{name}_bucket{_format_labels(key, le)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(key)} {count}")
+
+        cache_stats = self.collect_cache_stats()
+        for suffix, metric_type, help_text in (
+                ("hits", "gauge", "Cumulative hits of an in-process cache since startup."),
+                ("misses", "gauge", "Cumulative misses of an in-process cache since startup."),
+                ("hit_ratio", "gauge", "Hits over lookups of an in-process cache since startup."),
+        ):
+            name = f"wilmer_cache_{suffix}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for cache, stats in cache_stats.items():
+                lines.append(f"{name}{_format_labels((('cache', cache),))} {_format_value(stats[suffix])}")
+        return "\n".join(lines) + "\n"
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns registry counters.
+
+        Returns:
+            Dict[str, int]: The number of ``counter_series`` and ``histogram_series``
+            recorded so far.
+        """
+        with self._metrics_lock:
+            return {
+                "counter_series": sum(len(series) for series in self._counters.values()),
+                "histogram_series": sum(len(series) for series in self._histograms.values()),
+            }
+
+    def clear(self) -> None:
+        """
+        Drops every recorded series. Intended for test isolation.
+        """
+        with self._metrics_lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+# Global singleton instance
+metrics_service = MetricsService()
@@ -3,10 +3,12 @@
 import json
 import logging
 import string
-from typing import List, Dict, Union, Generator
+from typing import List, Dict, Optional, Tuple, Union, Generator
 
+from Middleware.services.categorization_cache_service import categorization_cache_service
 from Middleware.utilities.config_utils import get_active_categorization_workflow_name, get_categories_config, \
-    get_max_categorization_attempts
+    get_max_categorization_attempts, get_categorization_cache_settings, get_current_username
+from Middleware.utilities.encryption_utils import get_api_key_hash_if_available
 from Middleware.utilities.sensitive_logging_utils import log_prompt_content
 from Middleware.workflows.managers.workflow_manager import WorkflowManager
 
@@ -71,6 +73,8 @@ class PromptCategorizationService:
         """
         self.routes = {}
         self.categories = {}
+        # Categories whose routing entry sets "cacheCategorization": false.
+        self.uncached_categories = set()
         self.initialize()
 
     def initialize(self):
@@ -83,6 +87,8 @@ class PromptCategorizationService:
                 workflow_name = info['workflow']
                 description = info['description']
                 self._add_category(category, workflow_name, description)
+                if info.get('cacheCategorization', True) is False:
+                    self.uncached_categories.add(category)
         except FileNotFoundError:
             logger.warning("Routing configuration file not found.")
             raise
@@ -109,7 +115,7 @@ class PromptCategorizationService:
         Returns:
             Union[Generator[str, None, None], str, None]: The result of the routed workflow execution.
         """
-        category = self._categorize_request(messages, request_id)
+        category = self._categorize_request(messages, request_id, api_key=api_key)
         logger.info("Category: %s", category)
 
         if category in self.categories:
@@ -164,21 +170,54 @@ class PromptCategorizationService:
                     return key
         return None
 
-    def _categorize_request(self, messages: List[Dict[str, str]], request_id: str) -> str:
+    def _get_cache_lookup(self, messages: List[Dict[str, str]], api_key: str = None) -> \
+            Optional[Tuple[str, float]]:
+        """
+        Returns the categorization cache key and TTL for a request, if the cache is enabled.
+
+        Args:
+            messages (List[Dict[str, str]]): The conversation history to be categorized.
+            api_key (str): The API key from the request, if present.
+
+        Returns:
+            Optional[Tuple[str, float]]: (cache key, TTL in seconds), or None when
+            ``categorizationCacheTtlSeconds`` is not set.
+        """
+        settings = get_categorization_cache_settings()
+        if settings is None:
+            return None
+        ttl_seconds, message_count = settings
+        keyed_messages = messages[-message_count:] if message_count else messages
+        key = categorization_cache_service.build_key(
+            get_current_username(), get_api_key_hash_if_available(api_key),
+            get_active_categorization_workflow_name(), self.categories, keyed_messages)
+        return key, ttl_seconds
+
+    def _categorize_request(self, messages: List[Dict[str, str]], request_id: str, api_key: str = None) -> str:
         """
         Determines the request category by executing the categorization workflow.
 
         This method runs the categorization workflow, processes the LLM's output,
         and attempts to match it to a known category. The number of attempts is
         controlled by the `maxCategorizationAttempts` user config setting (default: 1).
+        When `categorizationCacheTtlSeconds` is set, a category matched for the
+        same conversation within the TTL is reused without running the workflow.
 
         Args:
             messages (List[Dict[str, str]]): The conversation history to be categorized.
             request_id (str): The unique identifier for the request.
+            api_key (str): The API key from the request, if present; it scopes cached results.
 
         Returns:
             str: The matched category name, or 'UNKNOWN' if no match is found after all attempts.
         """
+        cache_lookup = self._get_cache_lookup(messages, api_key)
+        if cache_lookup is not None:
+            cached_category = categorization_cache_service.get(*cache_lookup)
+            if cached_category in self.categories:
+                logger.info("Reusing cached categorization for an identical conversation.")
+                return cached_category
+
         logger.info("Categorizing request")
         category_data = self._initialize_categories()
         workflow_manager = self._configure_workflow_manager(category_data)
@@ -205,6 +244,11 @@ class PromptCategorizationService:
             matched_category = self._match_category(category)
 
             if matched_category is not None:
+                if cache_lookup is not None:
+                    if matched_category in self.uncached_categories:
+                        categorization_cache_service.record_opt_out()
+                    else:
+                        categorization_cache_service.put(cache_lookup[0], matched_category)
                 return matched_category
 
         return "UNKNOWN"
@@ -6,13 +6,30 @@ import logging
 import time
 import uuid
 from datetime import datetime, timezone
+from json.encoder import encode_basestring
 from typing import Dict, Any, Optional, List
 
 from Middleware.common import instance_global_variables
 from Middleware.utilities import config_utils
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Streaming API types StreamChunkEncoder can build envelopes for.
+STREAMING_API_TYPES = ("ollamagenerate", "ollamaapichat", "openaicompletion", "openaichatcompletion")
+
+# Placeholder values serialized into a chunk once per stream and then cut out
+# of the JSON text, leaving the literal envelope around them. The NUL bytes
+# keep them from colliding with anything a real chunk could contain.
+_TOKEN_SLOT = "\x00wilmer-token\x00"
+_CREATED_AT_SLOT = "\x00wilmer-created-at\x00"
+
 
 def _utc_now_iso() -> str:
     """Returns the current UTC time in Ollama's ISO format with a Z suffix.
@@ -532,3 +549,174 @@ class ResponseBuilderService:
         if request_id:
             response["request_id"] = request_id
         return response
+
+
+def _json_string(text: str) -> str:
+    """Serializes a string as a JSON string literal, exactly as ``json.dumps(text, ensure_ascii=False)`` would.
+
+    Uses orjson when it is installed; its escaping of valid strings matches the
+    standard library's. Strings orjson rejects (lone surrogates) fall back to
+    the standard library.
+
+    Args:
+        text (str): The string to serialize.
+
+    Returns:
+        str: The quoted, escaped JSON string.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(text).decode("utf-8")
+        except TypeError:
+            pass
+    return encode_basestring(text)
+
+
+class _FixedModelResponseBuilder(ResponseBuilderService):
+    """A ResponseBuilderService whose model name is fixed for the life of one stream."""
+
+    def __init__(self, model_name: str):
+        self._model_name = model_name
+
+    def _get_model_name(self) -> str:
+        return self._model_name
+
+
+class StreamChunkEncoder:
+    """
+    Serializes the streaming chunks of one response.
+
+    Building a chunk through ResponseBuilderService resolves the model name
+    (which can read the current-user file), generates an id, builds nested
+    dicts and runs ``json.dumps`` for every token. An encoder is created once
+    per streamed response instead: the model name, chunk id and creation time
+    are fixed up front, and each chunk type's JSON is serialized once with
+    placeholder values and split into literal envelope pieces. A plain content
+    chunk is then just the envelope joined with the JSON-escaped token (and,
+    for Ollama, the current timestamp). Chunks carrying a finish reason, tool
+    calls or extra fields are rare and go through the builder as before.
+
+    A stable id and creation time across a stream's chunks match what
+    OpenAI's own API sends. The output is byte-for-byte what ``json.dumps``
+    of the equivalent builder dict gives.
+
+    Attributes:
+        api_type (str): The streaming API type the chunks are shaped for.
+        request_id (Optional[str]): The request id Ollama chunks carry.
+        model_name (str): The model name every chunk reports.
+        chunk_id (Optional[str]): The id every OpenAI chunk carries.
+        created (int): The creation time every OpenAI chunk carries.
+    """
+
+    def __init__(self, api_type: str, request_id: Optional[str] = None, model_name: Optional[str] = None):
+        """
+        Fixes the per-stream fields and pre-serializes the content chunk envelope.
+
+        Args:
+            api_type (str): One of STREAMING_API_TYPES.
+            request_id (Optional[str]): The request id Ollama chunks carry.
+            model_name (Optional[str]): The model name to report; resolved from
+                the current user and workflow when omitted.
+
+        Raises:
+            ValueError: If api_type is not a streaming API type.
+        """
+        if api_type not in STREAMING_API_TYPES:
+            raise ValueError(f"Unsupported API type for streaming: {api_type}")
+        self.api_type = api_type
+        self.request_id = request_id
+        self.model_name = model_name if model_name is not None else ResponseBuilderService()._get_model_name()
+        self.chunk_id = {
+            "openaichatcompletion": f"chatcmpl-{uuid.uuid4()}",
+            "openaicompletion": f"cmpl-{uuid.uuid4()}",
+        }.get(api_type)
+        self.created = int(time.time())
+        self._builder = _FixedModelResponseBuilder(self.model_name)
+        self._envelope = self._build_envelope()
+
+    def encode(self, token: str, finish_reason: Optional[str] = None,
+               additional_fields: Optional[Dict[str, Any]] = None,
+               tool_calls: Optional[List[Dict[str, Any]]] = None) -> str:
+        """
+        Serializes one streaming chunk.
+
+        Args:
+            token (str): The text content (token) to include in the chunk.
+            finish_reason (Optional[str]): The reason the stream ended, if applicable.
+            additional_fields (Optional[Dict[str, Any]]): Extra fields to merge into the chunk.
+            tool_calls (Optional[List[Dict[str, Any]]]): Tool call objects to include in the chunk.
+
+        Returns:
+            str: The chunk as a JSON string.
+        """
+        if token and finish_reason is None and tool_calls is None and not additional_fields:
+            pieces, slots = self._envelope
+            values = {
+                _TOKEN_SLOT: _json_string(token),
+                _CREATED_AT_SLOT: _json_string(_utc_now_iso()) if _CREATED_AT_SLOT in slots else None,
+            }
+            parts = [pieces[0]]
+            for slot, piece in zip(slots, pieces[1:]):
+                parts.append(values[slot])
+                parts.append(piece)
+            return "".join(parts)
+
+        response = self._build_chunk(token, finish_reason, tool_calls)
+        if additional_fields:
+            response.update(additional_fields)
+        return json.dumps(response, ensure_ascii=False)
+
+    def _build_chunk(self, token: str, finish_reason: Optional[str],
+                     tool_calls: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Builds a chunk dict through the response builder, with this stream's fixed fields.
+
+        Args:
+            token (str): The text content.
+            finish_reason (Optional[str]): The finish reason, if any.
+            tool_calls (Optional[List[Dict[str, Any]]]): Tool call objects, if any.
+
+        Returns:
+            Dict[str, Any]: The chunk.
+        """
+        if self.api_type == "ollamagenerate":
+            return self._builder.build_ollama_generate_chunk(token, finish_reason, self.request_id)
+        if self.api_type == "ollamaapichat":
+            return self._builder.build_ollama_chat_chunk(token, finish_reason, self.request_id,
+                                                         tool_calls=tool_calls)
+        if self.api_type == "openaicompletion":
+            response = self._builder.build_openai_completion_chunk(token, finish_reason)
+        else:
+            response = self._builder.build_openai_chat_completion_chunk(token, finish_reason,
+                                                                        tool_calls=tool_calls)
+        response["id"] = self.chunk_id
+        response["created"] = self.created
+        return response
+
+    def _build_envelope(self):
+        """
+        Serializes a content chunk with placeholder values and splits it around them.
+
+        Returns:
+            Tuple[List[str], List[str]]: The literal pieces and, between each
+            consecutive pair, the slot whose value goes there.
+        """
+        chunk = self._build_chunk(_TOKEN_SLOT, None, None)
+        if "created_at" in chunk:
+            chunk["created_at"] = _CREATED_AT_SLOT
+        text = json.dumps(chunk, ensure_ascii=False)
+
+        positions = []
+        for slot in (_TOKEN_SLOT, _CREATED_AT_SLOT):
+            serialized = json.dumps(slot, ensure_ascii=False)
+            if serialized in text:
+                positions.append((text.index(serialized), serialized, slot))
+        positions.sort()
+
+        pieces, slots, cursor = [], [], 0
+        for index, serialized, slot in positions:
+            pieces.append(text[cursor:index])
+            slots.append(slot)
+            cursor = index + len(serialized)
+        pieces.append(text[cursor:])
+        return pieces, slots
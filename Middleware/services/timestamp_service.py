@@ -12,7 +12,7 @@ from Middleware.utilities.datetime_utils import (
     add_seconds_to_timestamp,
     parse_timestamp_string
 )
-from Middleware.utilities.file_utils import load_timestamp_file, save_timestamp_file
+from Middleware.utilities.file_utils import load_timestamp_file, update_timestamp_file
 from Middleware.utilities.hashing_utils import hash_single_message
 from Middleware.utilities.sensitive_logging_utils import sensitive_log
 
@@ -81,11 +81,9 @@ class TimestampService:
         with _get_timestamp_lock(discussion_id):
             timestamp_to_save = current_timestamp()
             timestamp_file = get_discussion_timestamp_file_path(discussion_id, api_key_hash=api_key_hash)
-            timestamps = load_timestamp_file(timestamp_file, encryption_key=encryption_key)
 
             logger.debug("Saving placeholder timestamp for discussion_id: %s", discussion_id)
-            timestamps[PLACEHOLDER_HASH] = timestamp_to_save
-            save_timestamp_file(timestamp_file, timestamps, encryption_key=encryption_key)
+            update_timestamp_file(timestamp_file, {PLACEHOLDER_HASH: timestamp_to_save}, encryption_key=encryption_key)
 
     def commit_assistant_response(self, discussion_id: str, content: str,
                                    encryption_key: Optional[bytes] = None,
@@ -108,19 +106,21 @@ class TimestampService:
             timestamps = load_timestamp_file(timestamp_file, encryption_key=encryption_key)
 
             if PLACEHOLDER_HASH in timestamps:
-                placeholder_time = timestamps.pop(PLACEHOLDER_HASH)
+                placeholder_time = timestamps[PLACEHOLDER_HASH]
+                updates = {}
                 if content:
                     message_hash = hash_single_message({'role': 'assistant', 'content': content})
                     logger.debug("Committing placeholder timestamp for hash: %s", message_hash)
-                    timestamps[message_hash] = placeholder_time
+                    updates[message_hash] = placeholder_time
                 else:
                     logger.debug("Cleared placeholder for empty assistant response.")
-                save_timestamp_file(timestamp_file, timestamps, encryption_key=encryption_key)
+                update_timestamp_file(timestamp_file, updates, removed=[PLACEHOLDER_HASH],
+                                      encryption_key=encryption_key)
             elif content:
                 logger.warning("Attempted to commit assistant response without a placeholder. Saving with current time.")
                 message_hash = hash_single_message({'role': 'assistant', 'content': content})
-                timestamps[message_hash] = current_timestamp()
-                save_timestamp_file(timestamp_file, timestamps, encryption_key=encryption_key)
+                update_timestamp_file(timestamp_file, {message_hash: current_timestamp()},
+                                      encryption_key=encryption_key)
 
     def save_specific_timestamp(self, discussion_id: str, content: str, timestamp: str,
                                 encryption_key: Optional[bytes] = None,
@@ -146,7 +146,6 @@ class TimestampService:
 
             timestamp_file = get_discussion_timestamp_file_path(discussion_id, api_key_hash=api_key_hash)
             timestamps = load_timestamp_file(timestamp_file, encryption_key=encryption_key)
-            timestamps_updated = False
 
             if message_hash not in timestamps or timestamps[message_hash] != timestamp:
                 if message_hash in timestamps:
@@ -154,14 +153,10 @@ class TimestampService:
                                  message_hash, timestamps[message_hash], timestamp)
                 else:
                     logger.debug("Timestamp saved for hash: %s", message_hash)
-                timestamps[message_hash] = timestamp
-                timestamps_updated = True
+                update_timestamp_file(timestamp_file, {message_hash: timestamp}, encryption_key=encryption_key)
             else:
                 logger.debug("Timestamp already exists and matches for hash: %s.", message_hash)
 
-            if timestamps_updated:
-                save_timestamp_file(timestamp_file, timestamps, encryption_key=encryption_key)
-
     def resolve_and_track_history(self, messages: List[Dict[str, str]], discussion_id: str,
                                    encryption_key: Optional[bytes] = None,
                                    api_key_hash: Optional[str] = None):
@@ -190,7 +185,10 @@ class TimestampService:
         """Inner implementation of resolve_and_track_history, called while holding the per-discussion lock."""
         timestamp_file = get_discussion_timestamp_file_path(discussion_id, api_key_hash=api_key_hash)
         timestamps = load_timestamp_file(timestamp_file, encryption_key=encryption_key)
-        timestamps_updated = False
+        # Only the changes are written back; `timestamps` is kept current so the
+        # anchor lookups below see them too.
+        updates = {}
+        removed = []
 
         # --- Phase 0: Resolve placeholder from a previous turn ---
         if PLACEHOLDER_HASH in timestamps:
@@ -211,6 +209,7 @@ class TimestampService:
                     if msg_hash not in timestamps:
                         logger.info("Applying pending placeholder to last assistant message (hash: %s)", msg_hash)
                         timestamps[msg_hash] = placeholder_time
+                        updates[msg_hash] = placeholder_time
                     else:
                         logger.debug("Last valid assistant message already tracked.")
 
@@ -222,7 +221,7 @@ class TimestampService:
                     "Could not find a suitable assistant message to resolve pending placeholder (e.g., chat started with assistant, or only system messages present).")
 
             del timestamps[PLACEHOLDER_HASH]
-            timestamps_updated = True
+            removed.append(PLACEHOLDER_HASH)
 
         # --- Phase 1: Chronological Resolution (Backward Iteration) ---
         # We iterate newest-to-oldest so that each known timestamp becomes the
@@ -250,8 +249,8 @@ class TimestampService:
             if msg_hash in timestamps:
                 time_anchor = timestamps[msg_hash]
             else:
-                timestamps_updated = True
                 timestamps[msg_hash] = time_anchor
+                updates[msg_hash] = time_anchor
                 logger.debug(f"Assigning timestamp {time_anchor} to new message (Index: {i}, Role: {role})")
 
             new_anchor = add_seconds_to_timestamp(time_anchor, -1)
@@ -261,8 +260,8 @@ class TimestampService:
             else:
                 time_anchor = new_anchor
 
-        if timestamps_updated:
-            save_timestamp_file(timestamp_file, timestamps, encryption_key=encryption_key)
+        if updates or removed:
+            update_timestamp_file(timestamp_file, updates, removed=removed, encryption_key=encryption_key)
             logger.debug("Timestamps file updated for discussion_id: %s", discussion_id)
 
     def format_messages_with_timestamps(self, messages: List[Dict[str, str]], discussion_id: str,
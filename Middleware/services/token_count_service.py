@@ -0,0 +1,260 @@
+# Middleware/services/token_count_service.py
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from Middleware.utilities.config_utils import get_root_config_directory
+from Middleware.utilities.text_utils import rough_estimate_token_length
+
+try:
+    from tokenizers import Tokenizer
+    TOKENIZERS_AVAILABLE = True
+except ImportError:
+    Tokenizer = None
+    TOKENIZERS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Endpoint config key naming a local Hugging Face ``tokenizer.json`` for the
+# endpoint's model. Relative paths resolve against the Public/Configs directory.
+TOKENIZER_FILE_KEY = "tokenizerFile"
+
+# Upper bound on memoized exact token counts across all tokenizers.
+MAX_CACHED_TOKEN_COUNTS = 8192
+
+# Upper bound on the total characters of texts behind memoized counts. Each
+# entry's key holds a reference to its text, so this caps the memory pinned.
+MAX_CACHED_TOKEN_COUNT_CHARS = 64 * 1024 * 1024
+
+# Texts longer than this are counted without being memoized, so one large
+# document cannot push out every other entry.
+MAX_CACHED_TOKEN_COUNT_TEXT_CHARS = 1024 * 1024
+
+# Upper bound on loaded tokenizers. A tokenizer.json for a 150k-vocab model
+# takes tens of MB once loaded, and few setups use more than a handful.
+MAX_LOADED_TOKENIZERS = 8
+
+TokenCounter = Callable[[str], int]
+
+
+def resolve_tokenizer_path(endpoint_config: Any) -> Optional[str]:
+    """
+    Returns the absolute tokenizer file path an endpoint config names, if any.
+
+    Args:
+        endpoint_config (Any): The resolved endpoint configuration.
+
+    Returns:
+        Optional[str]: The path, or None when ``tokenizerFile`` is absent or not a non-empty string.
+    """
+    if not isinstance(endpoint_config, dict):
+        return None
+    path = endpoint_config.get(TOKENIZER_FILE_KEY)
+    if not isinstance(path, str) or not path.strip():
+        return None
+    path = os.path.expanduser(path.strip())
+    if not os.path.isabs(path):
+        path = os.path.join(get_root_config_directory(), path)
+    return os.path.abspath(path)
+
+
+class TokenCountService:
+    """
+    A thread-safe singleton that counts tokens for an endpoint.
+
+    By default counts come from ``rough_estimate_token_length``, the
+    deliberately conservative heuristic. An endpoint that sets ``tokenizerFile``
+    to a local ``tokenizer.json`` gets exact counts from that tokenizer instead,
+    when the optional ``tokenizers`` package is installed. Loaded tokenizers are
+    kept (and reloaded when the file changes), and exact counts are memoized by
+    text, so re-counting an unchanged conversation costs a lookup. A tokenizer
+    that cannot be loaded is logged once per file version and the endpoint falls
+    back to the heuristic.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of TokenCountService exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(TokenCountService, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the tokenizer and count maps and the counters.
+        """
+        if self._initialized:
+            return
+
+        # path -> (file signature, tokenizer or None when loading failed)
+        self._tokenizers: "OrderedDict[str, Tuple[Tuple, Any]]" = OrderedDict()
+        # (path, file signature, text) -> exact count
+        self._counts: "OrderedDict[Tuple[str, Tuple, str], int]" = OrderedDict()
+        self._count_chars = 0
+        self._stats: Dict[str, int] = self._empty_stats()
+        self._service_lock = threading.Lock()
+        self._initialized = True
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {"tokenizer_loads": 0, "load_failures": 0, "count_hits": 0, "count_misses": 0}
+
+    def get_counter(self, endpoint_config: Any) -> Optional[TokenCounter]:
+        """
+        Returns an exact token counter for an endpoint, if it has a usable tokenizer.
+
+        Args:
+            endpoint_config (Any): The resolved endpoint configuration.
+
+        Returns:
+            Optional[TokenCounter]: A function mapping text to its exact token
+            count, or None when the endpoint has no usable tokenizer (the caller
+            should keep using the heuristic).
+        """
+        path = resolve_tokenizer_path(endpoint_config)
+        if path is None:
+            return None
+        loaded = self._load_tokenizer(path)
+        if loaded is None:
+            return None
+        signature, tokenizer = loaded
+        return lambda text: self._count_exact(path, signature, tokenizer, text)
+
+    def count(self, text: str, endpoint_config: Any = None) -> int:
+        """
+        Counts the tokens of text for an endpoint.
+
+        Args:
+            text (str): The text to count.
+            endpoint_config (Any): The resolved endpoint configuration, or None
+                for the heuristic estimate.
+
+        Returns:
+            int: The exact count when the endpoint has a usable tokenizer,
+            otherwise the conservative estimate.
+        """
+        counter = self.get_counter(endpoint_config)
+        if counter is None:
+            return rough_estimate_token_length(text)
+        return counter(text)
+
+    def _load_tokenizer(self, path: str) -> Optional[Tuple[Tuple, Any]]:
+        """
+        Returns the loaded tokenizer for a file, loading or reloading it as needed.
+
+        Args:
+            path (str): The absolute tokenizer file path.
+
+        Returns:
+            Optional[Tuple[Tuple, Any]]: (file signature, tokenizer), or None when
+            the file or the ``tokenizers`` package is unavailable.
+        """
+        try:
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except OSError:
+            signature = None
+
+        with self._service_lock:
+            cached = self._tokenizers.get(path)
+            if cached is not None and cached[0] == signature:
+                self._tokenizers.move_to_end(path)
+                return cached if cached[1] is not None else None
+
+        tokenizer = None
+        if signature is None:
+            logger.warning(f"Tokenizer file '{path}' was not found. Using estimated token counts.")
+        elif not TOKENIZERS_AVAILABLE:
+            logger.warning(f"Tokenizer file '{path}' is configured but the 'tokenizers' package is not "
+                           f"installed. Using estimated token counts.")
+        else:
+            try:
+                tokenizer = Tokenizer.from_file(path)
+            except Exception as e:
+                logger.warning(f"Could not load tokenizer file '{path}': {e}. Using estimated token counts.")
+
+        with self._service_lock:
+            self._stats["tokenizer_loads" if tokenizer is not None else "load_failures"] += 1
+            # Failures are remembered too, so a broken file is reported once per
+            # version rather than on every count.
+            self._tokenizers[path] = (signature, tokenizer)
+            self._tokenizers.move_to_end(path)
+            while len(self._tokenizers) > MAX_LOADED_TOKENIZERS:
+                self._tokenizers.popitem(last=False)
+        return (signature, tokenizer) if tokenizer is not None else None
+
+    def _count_exact(self, path: str, signature: Tuple, tokenizer: Any, text: str) -> int:
+        """
+        Counts text with a loaded tokenizer, memoizing the result.
+
+        Args:
+            path (str): The tokenizer file path.
+            signature (Tuple): The file signature the tokenizer was loaded from.
+            tokenizer (Any): The loaded ``tokenizers.Tokenizer``.
+            text (str): The text to count.
+
+        Returns:
+            int: The number of tokens, excluding special tokens.
+        """
+        key = (path, signature, text)
+        with self._service_lock:
+            cached = self._counts.get(key)
+            if cached is not None:
+                self._counts.move_to_end(key)
+                self._stats["count_hits"] += 1
+                return cached
+            self._stats["count_misses"] += 1
+
+        count = len(tokenizer.encode(text, add_special_tokens=False).ids)
+        if len(text) > MAX_CACHED_TOKEN_COUNT_TEXT_CHARS:
+            return count
+
+        with self._service_lock:
+            if key not in self._counts:
+                self._counts[key] = count
+                self._count_chars += len(text)
+                while len(self._counts) > MAX_CACHED_TOKEN_COUNTS or self._count_chars > MAX_CACHED_TOKEN_COUNT_CHARS:
+                    (_, _, evicted), _ = self._counts.popitem(last=False)
+                    self._count_chars -= len(evicted)
+        return count
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns service counters.
+
+        Returns:
+            Dict[str, int]: ``tokenizer_loads``, ``load_failures``, ``count_hits``
+            and ``count_misses`` (exact counts served from / added to the memo),
+            and current ``tokenizers``, ``cached_counts`` and ``cached_chars``.
+        """
+        with self._service_lock:
+            return {
+                **self._stats,
+                "tokenizers": sum(1 for _, tokenizer in self._tokenizers.values() if tokenizer is not None),
+                "cached_counts": len(self._counts),
+                "cached_chars": self._count_chars,
+            }
+
+    def clear(self) -> None:
+        """
+        Drops every loaded tokenizer and memoized count and resets the counters. Intended for test isolation.
+        """
+        with self._service_lock:
+            self._tokenizers.clear()
+            self._counts.clear()
+            self._count_chars = 0
+            self._stats = self._empty_stats()
+
+
+# Global singleton instance
+token_count_service = TokenCountService()
@@ -0,0 +1,608 @@
+# Middleware/services/web_fetch_cache_service.py
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+_CREATE_TABLE_SQL = (
+    "CREATE TABLE IF NOT EXISTS web_fetch_responses ("
+    "cache_key TEXT PRIMARY KEY, username TEXT NOT NULL DEFAULT '', metadata TEXT NOT NULL, "
+    "body BLOB NOT NULL, size INTEGER NOT NULL, stored_at REAL NOT NULL)"
+)
+_CREATE_INDEX_SQL = ("CREATE INDEX IF NOT EXISTS web_fetch_responses_by_user "
+                     "ON web_fetch_responses (username, stored_at)")
+
+# Headers a 304 Not Modified must not overwrite on the stored response: they
+# describe the transfer of the (absent) 304 body, not the stored representation.
+_NOT_UPDATED_BY_304 = frozenset({"content-length", "content-encoding", "transfer-encoding"})
+
+# Rough per-entry overhead, in bytes, counted on top of the body and headers so
+# that many tiny responses cannot slip past the size bound.
+_ENTRY_OVERHEAD_BYTES = 512
+
+# Upper bound on memoized stripped-HTML texts, and on the characters they hold.
+MAX_MEMOIZED_HTML_TEXTS = 256
+MAX_MEMOIZED_HTML_TEXT_CHARS = 16 * 1024 * 1024
+
+
+def _parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    """
+    Parses a Cache-Control header into lowercased directives.
+
+    Args:
+        value (str): The header value, e.g. ``'public, max-age="60"'``.
+
+    Returns:
+        Dict[str, Optional[str]]: Directive -> argument (None for a bare directive).
+    """
+    directives: Dict[str, Optional[str]] = {}
+    for part in value.split(","):
+        name, sep, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip().strip('"') if sep else None
+    return directives
+
+
+def _parse_seconds(value: Optional[str]) -> Optional[int]:
+    """
+    Parses a delta-seconds value (max-age, Age), returning None if it is not one.
+    """
+    if value is None or not value.strip().isdigit():
+        return None
+    return int(value.strip())
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    """
+    Parses an HTTP date header into a Unix timestamp, returning None if it is not one.
+    """
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def freshness_lifetime(headers: Mapping[str, str], ttl_seconds: float, now: float) -> Optional[float]:
+    """
+    Computes how long a response may be served from the cache without revalidation.
+
+    Follows RFC 7234 for a private cache, capped by the node's ``cacheTtlSeconds``:
+    ``no-store`` and ``Vary: *`` responses are not stored, ``no-cache`` is stored
+    but revalidated on every use, ``max-age`` wins over ``Expires``, and a
+    response carrying neither is fresh for ``ttl_seconds``. The ``Age`` the
+    response already had upstream is subtracted.
+
+    Args:
+        headers (Mapping[str, str]): The response headers (case-insensitive mapping).
+        ttl_seconds (float): The node's cacheTtlSeconds, the longest allowed lifetime.
+        now (float): The current wall-clock time.
+
+    Returns:
+        Optional[float]: The remaining lifetime in seconds (0 means stale on
+        arrival), or None when the response must not be stored.
+    """
+    directives = _parse_cache_control(headers.get("Cache-Control", ""))
+    if "no-store" in directives or headers.get("Vary", "").strip() == "*":
+        return None
+    if "no-cache" in directives:
+        return 0.0
+
+    max_age = _parse_seconds(directives.get("max-age"))
+    if max_age is not None:
+        lifetime = float(max_age)
+    elif "Expires" in headers:
+        # An invalid Expires (such as "0") means already expired (RFC 7234 5.3).
+        expires = _parse_http_date(headers.get("Expires"))
+        date = _parse_http_date(headers.get("Date")) or now
+        lifetime = expires - date if expires is not None else 0.0
+    else:
+        lifetime = float(ttl_seconds)
+
+    age = _parse_seconds(headers.get("Age")) or 0
+    return max(0.0, min(lifetime, float(ttl_seconds)) - age)
+
+
+def _entry_size(entry: Dict[str, Any]) -> int:
+    """
+    Returns the number of bytes an entry is counted as against the size bound.
+    """
+    header_bytes = sum(len(k) + len(v) for k, v in entry["headers"].items())
+    return len(entry["body"]) + header_bytes + len(entry["url"]) + _ENTRY_OVERHEAD_BYTES
+
+
+class WebFetchCacheService:
+    """
+    A thread-safe singleton HTTP cache for WebFetch nodes.
+
+    A workflow that fetches the same documentation page or API resource on
+    every turn used to download it every time. A WebFetch node that sets
+    ``cacheTtlSeconds`` stores its successful GET responses here and behaves
+    like an RFC 7234 private cache: a fresh entry is answered locally, and a
+    stale entry that carries an ``ETag`` or ``Last-Modified`` validator is
+    revalidated with a conditional request, so an unchanged page costs a
+    304 Not Modified instead of a full download.
+
+    Entries are keyed by a digest of the user, the URL, the request headers and
+    the proxy and TLS settings, so nothing is shared across users and a request
+    whose headers could select a different representation never matches.
+
+    The in-memory LRU is always used and bounded by size in bytes. When
+    persistence is enabled the entries are also written to a small SQLite file,
+    trimmed to the same bound, so they survive restarts; the memory tier is
+    checked first and refilled from disk on a memory miss. ``maxBytes`` comes from
+    each user's own config, so both tiers are partitioned by user and every
+    user's bound only ever evicts that user's entries. Wall-clock time is
+    used for freshness because persisted entries must stay comparable across
+    restarts.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of WebFetchCacheService exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(WebFetchCacheService, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the entry map, counters and locks.
+        """
+        if self._initialized:
+            return
+
+        # username -> key -> entry, least recently used first
+        self._entries: Dict[str, "OrderedDict[str, Dict[str, Any]]"] = {}
+        # username -> counted size of that user's in-memory entries
+        self._bytes: Dict[str, int] = {}
+        self._stats: Dict[str, int] = self._empty_stats()
+        self._cache_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._initialized_db_paths = set()
+        self._initialized = True
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {"hits": 0, "disk_hits": 0, "misses": 0, "revalidated": 0, "stores": 0, "evictions": 0}
+
+    @staticmethod
+    def build_key(username: str, url: str, headers: Mapping[str, str], proxies: Optional[Mapping[str, str]],
+                  verify: Any, allow_redirects: bool) -> str:
+        """
+        Builds the cache key for one WebFetch request.
+
+        Args:
+            username (str): The current WilmerAI user, so users never share entries.
+            url (str): The fully resolved request URL.
+            headers (Mapping[str, str]): The resolved request headers.
+            proxies (Optional[Mapping[str, str]]): The proxy mapping, or None.
+            verify (Any): The TLS-verification setting.
+            allow_redirects (bool): Whether redirects are followed, since a node that
+                does not follow them must never get another node's redirected 200.
+
+        Returns:
+            str: A SHA-256 hex digest.
+        """
+        normalized_headers = sorted((str(k).lower(), str(v)) for k, v in (headers or {}).items())
+        material = json.dumps([username, url, normalized_headers, proxies, verify, allow_redirects],
+                              sort_keys=True, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def lookup(self, username: str, key: str, max_bytes: int,
+               db_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Returns the stored response for a key, fresh or stale, or None.
+
+        A fresh entry counts as a hit; a stale entry (which the caller may
+        revalidate) or no entry counts as a miss.
+
+        Args:
+            username (str): The user whose entries are searched.
+            key (str): The key from build_key.
+            max_bytes (int): The size bound the user's memory tier is kept to when a
+                disk read refills it.
+            db_path (Optional[str]): The persistent cache file to fall back to on a
+                memory miss, or None when persistence is disabled.
+
+        Returns:
+            Optional[Dict[str, Any]]: A copy of the entry, with ``fresh`` set, or None.
+            The entry holds ``url``, ``status_code``, ``reason``, ``headers``,
+            ``encoding``, ``body`` (bytes), ``stored_at`` and ``fresh_until``.
+        """
+        now = time.time()
+        with self._cache_lock:
+            user_entries = self._entries.get(username, {})
+            entry = user_entries.get(key)
+            if entry is not None:
+                user_entries.move_to_end(key)
+                fresh = now < entry["fresh_until"]
+                self._stats["hits" if fresh else "misses"] += 1
+                return dict(entry, headers=dict(entry["headers"]), fresh=fresh)
+
+        entry = self._read_from_disk(db_path, key) if db_path else None
+        with self._cache_lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            fresh = now < entry["fresh_until"]
+            self._stats["disk_hits" if fresh else "misses"] += 1
+            self._remember_locked(username, key, entry, max_bytes)
+        return dict(entry, headers=dict(entry["headers"]), fresh=fresh)
+
+    def store(self, username: str, key: str, *, url: str, status_code: int, reason: Optional[str], headers: Mapping[str, str],
+              encoding: Optional[str], body: bytes, ttl_seconds: float, max_bytes: int,
+              db_path: Optional[str] = None) -> bool:
+        """
+        Stores a response if its headers allow it.
+
+        A response is not stored when it forbids storage, when it would be stale
+        on arrival and carries no validator to revalidate it with, or when it is
+        larger than the user's whole cache.
+
+        Args:
+            username (str): The user the entry belongs to.
+            key (str): The key from build_key.
+            url (str): The final URL the response came from.
+            status_code (int): The response status code.
+            reason (Optional[str]): The response reason phrase.
+            headers (Mapping[str, str]): The response headers.
+            encoding (Optional[str]): The response text encoding, if known.
+            body (bytes): The response body.
+            ttl_seconds (float): The node's cacheTtlSeconds.
+            max_bytes (int): The user's size bound, applied to both tiers.
+            db_path (Optional[str]): The persistent cache file, or None when
+                persistence is disabled.
+
+        Returns:
+            bool: True if the response was stored.
+        """
+        now = time.time()
+        headers = CaseInsensitiveDict(headers)
+        lifetime = freshness_lifetime(headers, ttl_seconds, now)
+        has_validator = "ETag" in headers or "Last-Modified" in headers
+        if lifetime is None or (lifetime <= 0 and not has_validator):
+            self.discard(username, key, db_path)
+            return False
+        entry = {"url": url, "status_code": status_code, "reason": reason, "headers": dict(headers),
+                 "encoding": encoding, "body": bytes(body), "stored_at": now, "fresh_until": now + lifetime}
+        return self._put(username, key, entry, max_bytes, db_path)
+
+    def revalidated(self, username: str, key: str, entry: Dict[str, Any], not_modified_headers: Mapping[str, str],
+                    ttl_seconds: float, max_bytes: int, db_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Refreshes a stale entry after the server answered 304 Not Modified.
+
+        The 304's headers replace the stored ones (RFC 7234 4.3.4) and the
+        freshness lifetime is computed again from the merged headers.
+
+        Args:
+            username (str): The user the entry belongs to.
+            key (str): The key from build_key.
+            entry (Dict[str, Any]): The stale entry returned by lookup().
+            not_modified_headers (Mapping[str, str]): The headers of the 304 response.
+            ttl_seconds (float): The node's cacheTtlSeconds.
+            max_bytes (int): The user's size bound, applied to both tiers.
+            db_path (Optional[str]): The persistent cache file, or None.
+
+        Returns:
+            Dict[str, Any]: The refreshed entry, to be served in place of the 304.
+        """
+        headers = dict(entry["headers"])
+        lowered = {k.lower(): k for k in headers}
+        for name, value in not_modified_headers.items():
+            if name.lower() in _NOT_UPDATED_BY_304:
+                continue
+            headers.pop(lowered.get(name.lower(), name), None)
+            headers[name] = value
+        with self._cache_lock:
+            self._stats["revalidated"] += 1
+        refreshed = {k: v for k, v in entry.items() if k != "fresh"}
+        refreshed["headers"] = headers
+        self.store(username, key, url=refreshed["url"], status_code=refreshed["status_code"], reason=refreshed["reason"],
+                   headers=headers, encoding=refreshed["encoding"], body=refreshed["body"],
+                   ttl_seconds=ttl_seconds, max_bytes=max_bytes, db_path=db_path)
+        return refreshed
+
+    def discard(self, username: str, key: str, db_path: Optional[str] = None) -> None:
+        """
+        Removes an entry from both tiers, if present.
+
+        Args:
+            username (str): The user the entry belongs to.
+            key (str): The key from build_key.
+            db_path (Optional[str]): The persistent cache file, or None.
+        """
+        with self._cache_lock:
+            entry = self._entries.get(username, {}).pop(key, None)
+            if entry is not None:
+                self._bytes[username] -= _entry_size(entry)
+        if db_path:
+            try:
+                with self._db_lock, closing(self._connect(db_path)) as conn:
+                    conn.execute("DELETE FROM web_fetch_responses WHERE cache_key = ?", (key,))
+                    conn.commit()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Could not update the WebFetch cache at {db_path}: {e}")
+
+    def _put(self, username: str, key: str, entry: Dict[str, Any], max_bytes: int, db_path: Optional[str]) -> bool:
+        """
+        Writes an entry to both tiers, unless it is larger than the user's whole cache.
+        """
+        size = _entry_size(entry)
+        if size > max_bytes:
+            self.discard(username, key, db_path)
+            return False
+        with self._cache_lock:
+            self._stats["stores"] += 1
+            self._remember_locked(username, key, entry, max_bytes)
+        if db_path:
+            self._write_to_disk(db_path, username, key, entry, size, max_bytes)
+        return True
+
+    def _remember_locked(self, username: str, key: str, entry: Dict[str, Any], max_bytes: int) -> None:
+        """
+        Puts an entry in the user's memory tier and evicts the user's entries down to max_bytes.
+
+        Must be called while holding self._cache_lock.
+        """
+        user_entries = self._entries.setdefault(username, OrderedDict())
+        user_bytes = self._bytes.get(username, 0)
+        previous = user_entries.pop(key, None)
+        if previous is not None:
+            user_bytes -= _entry_size(previous)
+        user_entries[key] = entry
+        user_bytes += _entry_size(entry)
+        while user_bytes > max_bytes and len(user_entries) > 1:
+            _, evicted = user_entries.popitem(last=False)
+            user_bytes -= _entry_size(evicted)
+            self._stats["evictions"] += 1
+        self._bytes[username] = user_bytes
+
+    def _connect(self, db_path: str) -> sqlite3.Connection:
+        """
+        Opens the persistent cache file, creating it and its table on first use.
+
+        Args:
+            db_path (str): The cache file path.
+
+        Returns:
+            sqlite3.Connection: An open connection; the caller closes it.
+        """
+        if db_path not in self._initialized_db_paths:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(db_path, timeout=5)
+        if db_path not in self._initialized_db_paths:
+            conn.execute(_CREATE_TABLE_SQL)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(web_fetch_responses)")}
+            if "username" not in columns:
+                # Files written before entries were partitioned by user.
+                conn.execute("ALTER TABLE web_fetch_responses ADD COLUMN username TEXT NOT NULL DEFAULT ''")
+            conn.execute(_CREATE_INDEX_SQL)
+            conn.commit()
+            self._initialized_db_paths.add(db_path)
+        return conn
+
+    def _read_from_disk(self, db_path: str, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Reads one entry from the persistent cache.
+
+        Args:
+            db_path (str): The cache file path.
+            key (str): The key from build_key.
+
+        Returns:
+            Optional[Dict[str, Any]]: The entry, or None.
+        """
+        try:
+            with self._db_lock, closing(self._connect(db_path)) as conn:
+                row = conn.execute("SELECT metadata, body FROM web_fetch_responses WHERE cache_key = ?",
+                                   (key,)).fetchone()
+            if row is None:
+                return None
+            entry = json.loads(row[0])
+            entry["body"] = bytes(row[1])
+            return entry
+        except (sqlite3.Error, OSError, ValueError) as e:
+            # The disk tier is an optimization; a broken file must not fail the fetch.
+            logger.warning(f"Could not read the WebFetch cache at {db_path}: {e}")
+            return None
+
+    def _write_to_disk(self, db_path: str, username: str, key: str, entry: Dict[str, Any], size: int,
+                       max_bytes: int) -> None:
+        """
+        Writes one entry to the persistent cache and trims the user's entries to max_bytes, oldest first.
+
+        Args:
+            db_path (str): The cache file path.
+            username (str): The user the entry belongs to.
+            key (str): The key from build_key.
+            entry (Dict[str, Any]): The entry to store.
+            size (int): The entry's counted size.
+            max_bytes (int): The user's size bound.
+        """
+        metadata = {k: v for k, v in entry.items() if k != "body"}
+        try:
+            with self._db_lock, closing(self._connect(db_path)) as conn:
+                conn.execute("INSERT OR REPLACE INTO web_fetch_responses "
+                             "(cache_key, username, metadata, body, size, stored_at) VALUES (?, ?, ?, ?, ?, ?)",
+                             (key, username, json.dumps(metadata), sqlite3.Binary(entry["body"]), size,
+                              entry["stored_at"]))
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM web_fetch_responses WHERE username = ?",
+                                     (username,)).fetchone()[0]
+                if total > max_bytes:
+                    kept, stale_keys = 0, []
+                    for cache_key, entry_size in conn.execute(
+                            "SELECT cache_key, size FROM web_fetch_responses WHERE username = ? "
+                            "ORDER BY stored_at DESC", (username,)):
+                        kept += entry_size
+                        if kept > max_bytes:
+                            stale_keys.append((cache_key,))
+                    conn.executemany("DELETE FROM web_fetch_responses WHERE cache_key = ?", stale_keys)
+                conn.commit()
+        except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not write the WebFetch cache at {db_path}: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns cache counters.
+
+        Returns:
+            Dict[str, int]: ``hits`` (fresh in memory), ``disk_hits`` (fresh on
+            disk), ``misses`` (absent or stale), ``revalidated`` (stale entries a
+            304 confirmed), ``stores``, ``evictions``, and the current in-memory
+            ``entries`` and ``bytes``.
+        """
+        with self._cache_lock:
+            return {**self._stats, "entries": sum(len(user_entries) for user_entries in self._entries.values()),
+                    "bytes": sum(self._bytes.values())}
+
+    def clear(self) -> None:
+        """
+        Drops every in-memory entry and resets the counters. Intended for test isolation.
+
+        Persisted files are left alone; delete the file to empty the disk tier.
+        """
+        with self._cache_lock:
+            self._entries.clear()
+            self._bytes.clear()
+            self._stats = self._empty_stats()
+        self._initialized_db_paths.clear()
+
+
+# Global singleton instance
+web_fetch_cache_service = WebFetchCacheService()
+
+
+class HtmlTextMemo:
+    """
+    A thread-safe, process-wide LRU memo of stripped HTML text by body digest.
+
+    ``outputFormat: "html-stripped"`` runs the whole page through an HTML
+    parser, which costs far more than hashing it. A page fetched again (from
+    the WebFetch cache, a 304, or simply an unchanged page) has the same body,
+    so its text is looked up by the SHA-256 of the body instead of parsed again.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of HtmlTextMemo exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(HtmlTextMemo, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the text map and counters.
+        """
+        if self._initialized:
+            return
+
+        self._texts: "OrderedDict[str, str]" = OrderedDict()
+        self._chars = 0
+        self._hits = 0
+        self._misses = 0
+        self._memo_lock = threading.Lock()
+        self._initialized = True
+
+    @staticmethod
+    def digest(html: str) -> str:
+        """
+        Returns the SHA-256 hex digest of an HTML body, the key its text is memoized under.
+
+        Args:
+            html (str): The HTML body.
+
+        Returns:
+            str: The 64-character hex digest.
+        """
+        return hashlib.sha256(html.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def get(self, digest: str) -> Optional[str]:
+        """
+        Returns the memoized text for a body digest, or None.
+
+        Args:
+            digest (str): The digest from digest().
+
+        Returns:
+            Optional[str]: The stripped text, or None on a miss.
+        """
+        with self._memo_lock:
+            text = self._texts.get(digest)
+            if text is None:
+                self._misses += 1
+                return None
+            self._texts.move_to_end(digest)
+            self._hits += 1
+            return text
+
+    def put(self, digest: str, text: str) -> None:
+        """
+        Memoizes the text for a body digest, evicting the least recently used texts.
+
+        Args:
+            digest (str): The digest from digest().
+            text (str): The stripped text.
+        """
+        if len(text) > MAX_MEMOIZED_HTML_TEXT_CHARS:
+            return
+        with self._memo_lock:
+            previous = self._texts.pop(digest, None)
+            if previous is not None:
+                self._chars -= len(previous)
+            self._texts[digest] = text
+            self._chars += len(text)
+            while len(self._texts) > MAX_MEMOIZED_HTML_TEXTS or self._chars > MAX_MEMOIZED_HTML_TEXT_CHARS:
+                _, evicted = self._texts.popitem(last=False)
+                self._chars -= len(evicted)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns memo counters.
+
+        Returns:
+            Dict[str, int]: ``hits``, ``misses``, current ``entries``, and ``chars`` held.
+        """
+        with self._memo_lock:
+            return {"hits": self._hits, "misses": self._misses, "entries": len(self._texts), "chars": self._chars}
+
+    def clear(self) -> None:
+        """
+        Drops every memoized text and resets the counters. Intended for test isolation.
+        """
+        with self._memo_lock:
+            self._texts.clear()
+            self._chars = 0
+            self._hits = 0
+            self._misses = 0
+
+
+# Global singleton instance
+html_text_memo = HtmlTextMemo()
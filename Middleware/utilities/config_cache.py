@@ -0,0 +1,260 @@
+# /Middleware/utilities/config_cache.py
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on how many parsed files are retained. Wilmer's config tree is
+# normally a few dozen files; the cap only guards against a pathological number
+# of distinct paths (e.g. per-discussion files routed through load_config).
+# The least recently used entry is dropped first.
+MAX_CACHED_FILES = 512
+
+_READ_ONLY_MESSAGE = "Cached configuration is read-only; copy it (dict(...) / copy.deepcopy) before modifying."
+
+
+class ReadOnlyDict(dict):
+    """
+    A dict whose mutating methods raise TypeError.
+
+    Returned for cached configuration so a caller cannot corrupt the copy every
+    other request shares. It is still a real ``dict`` (``isinstance`` checks,
+    ``json.dumps``, ``dict(...)`` and ``{**...}`` all behave normally), and
+    ``copy.deepcopy`` yields a fully mutable plain-dict copy.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(_READ_ONLY_MESSAGE)
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return dict, (thaw(self),)
+
+
+class ReadOnlyList(list):
+    """
+    A list whose mutating methods raise TypeError.
+
+    The list counterpart of ReadOnlyDict, used for arrays nested in cached
+    configuration.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(_READ_ONLY_MESSAGE)
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return list, (thaw(self),)
+
+
+def freeze(value: Any) -> Any:
+    """
+    Recursively converts parsed JSON into its read-only equivalent.
+
+    Args:
+        value (Any): A value produced by ``json.load``.
+
+    Returns:
+        Any: The same structure with every dict/list replaced by ReadOnlyDict/ReadOnlyList.
+    """
+    if isinstance(value, dict):
+        return ReadOnlyDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return ReadOnlyList(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """
+    Recursively copies a (possibly read-only) JSON structure into plain dicts and lists.
+
+    Args:
+        value (Any): A value previously returned by freeze(), or any JSON-shaped value.
+
+    Returns:
+        Any: An independent, fully mutable copy.
+    """
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    return value
+
+
+def _read_json(path: str) -> Any:
+    """
+    Opens and parses a JSON file.
+
+    Args:
+        path (str): The file to read.
+
+    Returns:
+        Any: The parsed JSON document.
+    """
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ConfigCache:
+    """
+    A thread-safe, process-wide cache of parsed JSON configuration files.
+
+    Each file is parsed once and kept (frozen) alongside the ``os.stat``
+    signature it was read with: modification time, size, and inode. Every
+    lookup re-stats the file and re-parses it only when that signature has
+    changed, so edits to a config file on disk (including atomic
+    replace-by-rename) are picked up on the very next request without a
+    restart. A stat is far cheaper than the open/read/parse it replaces, which
+    matters because the user config alone is consulted several times per node.
+
+    Files that cannot be stat'ed are read directly and not cached; a missing
+    file therefore surfaces the same FileNotFoundError as a plain ``open``.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of ConfigCache exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(ConfigCache, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the entry map and hit/miss counters.
+        """
+        if self._initialized:
+            return
+
+        # path -> ((mtime_ns, size, inode), frozen parsed value)
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int, int], Any]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._uncached = 0
+        self._cache_lock = threading.Lock()
+        self._initialized = True
+
+    def get(self, path: str) -> Any:
+        """
+        Returns the parsed, read-only contents of a JSON file.
+
+        Args:
+            path (str): The file to load.
+
+        Returns:
+            Any: The parsed document; dicts and lists are ReadOnlyDict/ReadOnlyList.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            json.JSONDecodeError: If the file is not valid JSON.
+        """
+        try:
+            st = os.stat(path)
+        except (OSError, TypeError, ValueError):
+            # Not stat-able: read directly so the caller sees open()'s own error.
+            with self._cache_lock:
+                self._uncached += 1
+            return freeze(_read_json(path))
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+        with self._cache_lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(path)
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+
+        value = freeze(_read_json(path))
+        with self._cache_lock:
+            self._entries[path] = (signature, value)
+            self._entries.move_to_end(path)
+            while len(self._entries) > MAX_CACHED_FILES:
+                self._entries.popitem(last=False)
+        return value
+
+    def load(self, path: str) -> Any:
+        """
+        Returns a private, mutable copy of a JSON file's contents.
+
+        For callers that modify what they load (presets, workflows). The file is
+        still parsed at most once per change; only the copy is made per call.
+
+        Args:
+            path (str): The file to load.
+
+        Returns:
+            Any: An independent copy the caller may freely mutate.
+        """
+        return thaw(self.get(path))
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """
+        Drops one cached file, or every cached file when no path is given.
+
+        Args:
+            path (Optional[str]): The file to forget, or None to clear everything.
+        """
+        with self._cache_lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns cache counters.
+
+        Returns:
+            Dict[str, int]: ``hits`` (served without reading the file), ``misses``
+            (first reads and re-reads after a change), ``uncached`` (direct reads
+            of files that could not be stat'ed), and current ``entries``.
+        """
+        with self._cache_lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "uncached": self._uncached,
+                "entries": len(self._entries),
+            }
+
+    def clear(self) -> None:
+        """
+        Drops every cached file and resets the counters. Intended for test isolation.
+        """
+        with self._cache_lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._uncached = 0
+
+
+# Global singleton instance
+config_cache = ConfigCache()
@@ -1,11 +1,11 @@
 # /Middleware/utilities/config_utils.py
 
-import json
 import logging
 import os
 from typing import Optional
 
 from Middleware.common import instance_global_variables
+from Middleware.utilities.config_cache import config_cache
 
 logger = logging.getLogger(__name__)
 
@@ -53,7 +53,9 @@ def load_config(config_file):
     """
     Loads a configuration file.
 
-    This function opens and reads a JSON configuration file from the specified path.
+    The file is parsed through the shared config cache, so repeated loads of an
+    unchanged file skip the disk read and JSON parse. The result is a private
+    copy the caller may modify.
 
     Args:
         config_file (str): The absolute path to the configuration file.
@@ -61,9 +63,25 @@ def load_config(config_file):
     Returns:
         dict: The loaded configuration data as a dictionary.
     """
-    with open(config_file) as f:
-        config_data = json.load(f)
-    return config_data
+    return config_cache.load(config_file)
+
+
+def load_config_view(config_file):
+    """
+    Loads a configuration file as a shared, read-only view.
+
+    Like load_config, but returns the cached object itself instead of a copy,
+    so it costs only a stat when the file is unchanged. Dicts and lists in the
+    result raise TypeError on mutation; callers that need to modify the data
+    should use load_config instead.
+
+    Args:
+        config_file (str): The absolute path to the configuration file.
+
+    Returns:
+        dict: The loaded configuration data as a read-only dictionary.
+    """
+    return config_cache.get(config_file)
 
 
 def get_config_property_if_exists(config_property, config_data):
@@ -113,8 +131,7 @@ def get_current_username():
         )
     config_dir = get_root_config_directory()
     config_file = os.path.join(config_dir, 'Users', '_current-user.json')
-    with open(config_file) as file:
-        data = json.load(file)
+    data = load_config_view(config_file)
     return data['currentUser']
 
 
@@ -126,13 +143,11 @@ def get_user_config_for(username):
         username (str): The username whose config to load.
 
     Returns:
-        dict: The specified user's configuration data.
+        dict: The specified user's configuration data (a read-only view).
     """
     config_dir = get_root_config_directory()
     config_path = os.path.join(config_dir, 'Users', f'{username.lower()}.json')
-    with open(config_path) as file:
-        config_data = json.load(file)
-    return config_data
+    return load_config_view(config_path)
 
 
 def get_user_config():
@@ -199,6 +214,48 @@ def get_liveness_tool_call():
     return value
 
 
+def get_stream_coalescing_settings():
+    """
+    Retrieves the user's stream coalescing limits, if coalescing is enabled.
+
+    By default the Eventlet streamer writes every backend chunk to the client
+    socket on its own. The ``streamCoalescing`` user setting lets it merge
+    chunks that are already waiting into a single write, bounded by a byte
+    budget and by how long the first chunk of a write may be held back.
+
+    Accepted values in the user config::
+
+        "streamCoalescing": true
+        "streamCoalescing": {"maxBytes": 16384, "maxDelayMs": 16}
+
+    ``true`` (or an object that omits a field) uses the defaults of 16384
+    bytes and 16 ms. A ``maxDelayMs`` of 0 merges only chunks already queued,
+    never waiting for more.
+
+    Returns:
+        tuple or None: ``(max_bytes, max_delay_seconds)``, or None if unset,
+        false, or malformed (a malformed value is logged and treated as
+        disabled, because coalescing is a throughput tweak that must never
+        break the response path).
+    """
+    value = get_config_value('streamCoalescing')
+    if value is None or value is False:
+        return None
+    if value is True:
+        value = {}
+    if not isinstance(value, dict):
+        logger.warning("streamCoalescing config must be true/false or an object; ignoring it")
+        return None
+    max_bytes = value.get('maxBytes', 16384)
+    max_delay_ms = value.get('maxDelayMs', 16)
+    if (isinstance(max_bytes, bool) or not isinstance(max_bytes, int) or max_bytes < 1
+            or isinstance(max_delay_ms, bool) or not isinstance(max_delay_ms, (int, float)) or max_delay_ms < 0):
+        logger.warning("streamCoalescing config is malformed (need an integer maxBytes >= 1 and a "
+                       "maxDelayMs >= 0); ignoring it")
+        return None
+    return max_bytes, max_delay_ms / 1000.0
+
+
 def get_root_public_directory():
     """
     Gets the root directory of the ``Public`` folder.
@@ -756,7 +813,7 @@ def get_categories_config():
     """
     routing_config = get_config_value('routingConfig')
     config_path = get_config_path('Routing', routing_config)
-    return load_config(config_path)
+    return load_config_view(config_path)
 
 
 def get_openai_preset_path(config_name, preset_type="OpenAiCompatibleApis", use_subdirectory=False):
@@ -796,7 +853,7 @@ def get_endpoint_config(endpoint):
     """
     sub_directory = get_endpoint_subdirectory()
     config = get_endpoint_config_path(sub_directory, endpoint)
-    return load_config(config)
+    return load_config_view(config)
 
 
 def try_get_endpoint_config(endpoint: str) -> Optional[dict]:
@@ -823,7 +880,7 @@ def try_get_endpoint_config(endpoint: str) -> Optional[dict]:
     config_path = get_endpoint_config_path(sub_directory, endpoint)
     if not os.path.exists(config_path):
         return None
-    return load_config(config_path)
+    return load_config_view(config_path)
 
 
 # Per-endpoint estimation level (wilmerContextEstimationLevel). Wilmer's token
@@ -965,7 +1022,8 @@ def is_context_clamp_enabled(node_config, endpoint_config) -> bool:
 CONTEXT_WINDOW_BUDGET_HEADROOM_TOKENS = 512
 
 
-def compute_endpoint_window_budget(endpoint_config, n_predict, headroom_tokens) -> Optional[int]:
+def compute_endpoint_window_budget(endpoint_config, n_predict, headroom_tokens,
+                                   estimation_multiplier=None) -> Optional[int]:
     """Compute the base conversation token budget for an endpoint window.
 
     ``budget = (maxContextTokenSize - n_predict) * estimation_level - headroom``
@@ -983,6 +1041,9 @@ def compute_endpoint_window_budget(endpoint_config, n_predict, headroom_tokens)
         n_predict (int): The node's response budget (``maxResponseSizeInTokens`` ->
             ``llm.max_tokens``). Non-numeric or negative values are treated as 0.
         headroom_tokens (int): Tokens to reserve for framing/estimation slack.
+        estimation_multiplier (Optional[float]): Overrides the endpoint's estimation
+            level. Dispatch passes 1.0 when it counts with the endpoint's real
+            tokenizer, since exact counts carry no overestimate to reclaim.
 
     Returns:
         Optional[int]: The base budget, or None when the endpoint window is unknown
@@ -997,7 +1058,8 @@ def compute_endpoint_window_budget(endpoint_config, n_predict, headroom_tokens)
         return None
     if not isinstance(n_predict, (int, float)) or isinstance(n_predict, bool) or n_predict < 0:
         n_predict = 0
-    multiplier = get_estimation_level_multiplier(endpoint_config)
+    multiplier = (get_estimation_level_multiplier(endpoint_config)
+                  if estimation_multiplier is None else estimation_multiplier)
     return int((int(window) - int(n_predict)) * multiplier) - int(headroom_tokens)
 
 
@@ -1015,7 +1077,7 @@ def get_api_type_config(api_type):
         dict: The loaded API type configuration data.
     """
     api_type_file = get_config_path('ApiTypes', api_type)
-    return load_config(api_type_file)
+    return load_config_view(api_type_file)
 
 
 def load_mcp_server_config(server_name):
@@ -1092,7 +1154,7 @@ def load_template_from_json(template_file_name):
         dict: The loaded prompt template data.
     """
     config_path = get_template_config_path(template_file_name)
-    return load_config(config_path)
+    return load_config_view(config_path)
 
 
 def get_workflow_path(workflow_name, user_folder_override=None):
@@ -1389,6 +1451,155 @@ def get_max_categorization_attempts() -> int:
     return 1 if value is None else max(1, int(value))
 
 
+def get_categorization_cache_settings():
+    """
+    Retrieves the categorization result cache settings.
+
+    ``categorizationCacheTtlSeconds`` enables the cache: a regenerate or retry
+    of the same conversation within that many seconds reuses the earlier
+    category instead of re-running the categorization workflow.
+    ``categorizationCacheMessageCount`` limits the cache key to the last N
+    messages, for categorization workflows that only read the end of the
+    conversation; 0 or absent keys on every message.
+
+    Returns:
+        tuple or None: ``(ttl_seconds, message_count)``, or None when the cache
+        is disabled (unset, 0, or malformed; a malformed value is logged).
+    """
+    ttl = get_config_value('categorizationCacheTtlSeconds')
+    if not ttl:
+        return None
+    message_count = get_config_value('categorizationCacheMessageCount') or 0
+    if (isinstance(ttl, bool) or not isinstance(ttl, (int, float)) or ttl < 0
+            or isinstance(message_count, bool) or not isinstance(message_count, int) or message_count < 0):
+        logger.warning("categorizationCacheTtlSeconds / categorizationCacheMessageCount are malformed (need "
+                       "non-negative numbers); categorization results will not be cached")
+        return None
+    return ttl, message_count
+
+
+def get_llm_response_cache_settings():
+    """
+    Retrieves the limits of the LLM response cache used by ``cacheResponses`` nodes.
+
+    Nodes opt in individually with ``"cacheResponses": true``; the
+    ``llmResponseCache`` user setting only tunes the shared cache, or turns it
+    off for every node with ``false``.
+
+    Accepted values in the user config::
+
+        "llmResponseCache": false
+        "llmResponseCache": {"ttlSeconds": 3600, "maxEntries": 512, "persist": true}
+
+    An absent setting (or an object that omits a field) uses a one hour TTL,
+    512 entries and no persistence. With ``persist`` the entries are also
+    written to ``llm_response_cache.db`` in the SQLite directory, so they
+    survive restarts.
+
+    Returns:
+        tuple or None: ``(ttl_seconds, max_entries, db_path)`` where ``db_path``
+        is None unless persistence is enabled, or None when the cache is
+        disabled (``false`` or malformed; a malformed value is logged).
+    """
+    value = get_config_value('llmResponseCache')
+    if value is False:
+        return None
+    if value is None or value is True:
+        value = {}
+    if not isinstance(value, dict):
+        logger.warning("llmResponseCache config must be true/false or an object; responses will not be cached")
+        return None
+    ttl = value.get('ttlSeconds', 3600)
+    max_entries = value.get('maxEntries', 512)
+    persist = value.get('persist', False)
+    if (isinstance(ttl, bool) or not isinstance(ttl, (int, float)) or ttl <= 0
+            or isinstance(max_entries, bool) or not isinstance(max_entries, int) or max_entries < 1
+            or not isinstance(persist, bool)):
+        logger.warning("llmResponseCache config is malformed (need a ttlSeconds > 0, an integer maxEntries >= 1 "
+                       "and a boolean persist); responses will not be cached")
+        return None
+    db_path = os.path.join(get_custom_dblite_filepath(), 'llm_response_cache.db') if persist else None
+    return ttl, max_entries, db_path
+
+
+def get_web_fetch_cache_settings():
+    """
+    Retrieves the limits of the HTTP cache used by WebFetch nodes with ``cacheTtlSeconds``.
+
+    Nodes opt in individually by setting ``cacheTtlSeconds``; the
+    ``webFetchCache`` user setting only tunes the shared cache, or turns it off
+    for every node with ``false``.
+
+    Accepted values in the user config::
+
+        "webFetchCache": false
+        "webFetchCache": {"maxBytes": 67108864, "persist": true}
+
+    An absent setting (or an object that omits a field) uses a 64 MiB bound
+    and no persistence. With ``persist`` the responses are also written to
+    ``web_fetch_cache.db`` in the SQLite directory, trimmed to the same bound,
+    so they survive restarts.
+
+    Returns:
+        tuple or None: ``(max_bytes, db_path)`` where ``db_path`` is None
+        unless persistence is enabled, or None when the cache is disabled
+        (``false`` or malformed; a malformed value is logged).
+    """
+    value = get_config_value('webFetchCache')
+    if value is False:
+        return None
+    if value is None or value is True:
+        value = {}
+    if not isinstance(value, dict):
+        logger.warning("webFetchCache config must be true/false or an object; WebFetch responses will not be cached")
+        return None
+    max_bytes = value.get('maxBytes', 64 * 1024 * 1024)
+    persist = value.get('persist', False)
+    if (isinstance(max_bytes, bool) or not isinstance(max_bytes, int) or max_bytes < 1
+            or not isinstance(persist, bool)):
+        logger.warning("webFetchCache config is malformed (need an integer maxBytes >= 1 and a boolean persist); "
+                       "WebFetch responses will not be cached")
+        return None
+    db_path = os.path.join(get_custom_dblite_filepath(), 'web_fetch_cache.db') if persist else None
+    return max_bytes, db_path
+
+
+def get_memory_job_queue_settings():
+    """
+    Retrieves the worker settings of the background memory job queue.
+
+    The queue is used by QualityMemory nodes that set ``"runInBackground": true``.
+    Accepted value in the user config::
+
+        "memoryJobQueue": {"workers": 1, "maxDeferSeconds": 300}
+
+    ``workers`` is the number of background threads writing memories, and
+    ``maxDeferSeconds`` is how long a job waits for live requests to finish
+    before it runs anyway. Queued jobs are kept in ``memory_jobs.db`` in the
+    SQLite directory so they survive restarts.
+
+    Returns:
+        tuple: ``(workers, max_defer_seconds, db_path)``. An absent setting, an
+        omitted field or a malformed value (which is logged) uses one worker
+        and a 300 second deferral.
+    """
+    db_path = os.path.join(get_custom_dblite_filepath(), 'memory_jobs.db')
+    value = get_config_value('memoryJobQueue')
+    if value is None:
+        value = {}
+    if not isinstance(value, dict):
+        logger.warning("memoryJobQueue config must be an object; using the default worker settings")
+        return 1, 300, db_path
+    workers = value.get('workers', 1)
+    max_defer = value.get('maxDeferSeconds', 300)
+    if (isinstance(workers, bool) or not isinstance(workers, int) or workers < 1
+            or isinstance(max_defer, bool) or not isinstance(max_defer, (int, float)) or max_defer < 0):
+        logger.warning("memoryJobQueue config is malformed (need an integer workers >= 1 and a "
+                       "maxDeferSeconds >= 0); using the default worker settings")
+        return 1, 300, db_path
+    return workers, max_defer, db_path
+
+
 def get_encrypt_using_api_key() -> bool:
     """
     Retrieves the ``encryptUsingApiKey`` configuration setting.
@@ -0,0 +1,299 @@
+# /Middleware/utilities/embedding_cache.py
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from Middleware.utilities import config_utils
+from Middleware.utilities.sensitive_logging_utils import is_encryption_active
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on vectors kept in memory. Vectors are held as packed doubles, so
+# 4,096 vectors at 1,024 dimensions take about 32 MB. The least recently used
+# vector is dropped first.
+MAX_CACHED_EMBEDDINGS = 4096
+
+# Upper bound on rows kept in the on-disk tier; the oldest rows are pruned
+# first once it is exceeded.
+MAX_DISK_CACHED_EMBEDDINGS = 200_000
+
+_DISK_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS embedding_cache (
+        model TEXT NOT NULL,
+        text_hash TEXT NOT NULL,
+        vector BLOB NOT NULL,
+        PRIMARY KEY (model, text_hash)
+    )
+'''
+
+
+def text_digest(text: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a text, the content address used as its cache key.
+
+    Args:
+        text (str): The text that was (or will be) embedded.
+
+    Returns:
+        str: The 64-character hex digest.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    A thread-safe, process-wide, content-addressed cache of embedding vectors.
+
+    Vectors are keyed by (model, SHA-256 of the text), so the same text embedded
+    by the same model is only ever sent to the backend once: a repeated semantic
+    query, or a memory the lazy backfill retries after a failed write, is
+    answered locally. Vectors are stored as packed doubles, so a cached vector
+    is bit-for-bit the one the backend returned.
+
+    The in-memory tier is always on. The optional on-disk tier, enabled with the
+    ``embeddingCacheOnDisk`` user setting, keeps vectors across restarts in
+    ``EmbeddingCache.<username>.sqlite`` in the user's SQLite directory. It is
+    bypassed for encrypted users' requests, whose text-derived vectors are never
+    written to an unencrypted side file.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of EmbeddingCache exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(EmbeddingCache, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the entry map and counters.
+        """
+        if self._initialized:
+            return
+
+        self._entries: "OrderedDict[Tuple[str, str], array]" = OrderedDict()
+        self._stats: Dict[str, int] = self._empty_stats()
+        self._cache_lock = threading.Lock()
+        self._initialized = True
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {"memory_hits": 0, "disk_hits": 0, "misses": 0, "saved_calls": 0, "disk_errors": 0}
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Looks up a batch of texts, memory tier first, then the disk tier.
+
+        Args:
+            model (str): The embedding model name.
+            texts (Sequence[str]): The texts to look up.
+
+        Returns:
+            List[Optional[List[float]]]: One entry per text: a fresh copy of the
+            cached vector, or None on a miss.
+        """
+        digests = [text_digest(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        with self._cache_lock:
+            for i, digest in enumerate(digests):
+                vector = self._entries.get((model, digest))
+                if vector is not None:
+                    self._entries.move_to_end((model, digest))
+                    results[i] = vector.tolist()
+                    self._stats["memory_hits"] += 1
+
+        pending = {digests[i] for i, result in enumerate(results) if result is None}
+        found = self._disk_get(model, pending) if pending else {}
+        with self._cache_lock:
+            for i, digest in enumerate(digests):
+                if results[i] is not None:
+                    continue
+                vector = found.get(digest)
+                if vector is None:
+                    self._stats["misses"] += 1
+                    continue
+                results[i] = vector.tolist()
+                self._stats["disk_hits"] += 1
+                self._remember_locked(model, digest, vector)
+        return results
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """
+        Stores freshly computed vectors in both tiers.
+
+        Args:
+            model (str): The embedding model name.
+            texts (Sequence[str]): The embedded texts.
+            vectors (Sequence[Sequence[float]]): One vector per text, in the same order.
+        """
+        packed = {text_digest(text): array('d', vector) for text, vector in zip(texts, vectors)}
+        with self._cache_lock:
+            for digest, vector in packed.items():
+                self._remember_locked(model, digest, vector)
+        self._disk_put(model, packed)
+
+    def record_saved_call(self) -> None:
+        """
+        Counts a backend call that was avoided because every text was cached.
+        """
+        with self._cache_lock:
+            self._stats["saved_calls"] += 1
+
+    def _remember_locked(self, model: str, digest: str, vector: array) -> None:
+        """
+        Inserts into the memory tier and enforces the LRU bound. Caller must hold _cache_lock.
+
+        Args:
+            model (str): The embedding model name.
+            digest (str): The text's SHA-256 digest.
+            vector (array): The packed vector.
+        """
+        self._entries[(model, digest)] = vector
+        self._entries.move_to_end((model, digest))
+        while len(self._entries) > MAX_CACHED_EMBEDDINGS:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _disk_path() -> Optional[str]:
+        """
+        Returns the on-disk tier's file for the current user, or None when the tier is off.
+
+        Returns:
+            Optional[str]: The SQLite file path, or None.
+        """
+        if is_encryption_active() or config_utils.get_config_value('embeddingCacheOnDisk') is not True:
+            return None
+        directory = config_utils.get_custom_dblite_filepath()
+        return os.path.join(directory, f'EmbeddingCache.{config_utils.get_current_username()}.sqlite')
+
+    def _open_disk(self) -> Optional[sqlite3.Connection]:
+        """
+        Opens the on-disk tier, creating it if needed.
+
+        Returns:
+            Optional[sqlite3.Connection]: A connection, or None when the tier is off or unavailable.
+        """
+        try:
+            path = self._disk_path()
+            if path is None:
+                return None
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute(_DISK_SCHEMA)
+            return conn
+        except Exception as e:
+            self._count_disk_error(e)
+            return None
+
+    def _disk_get(self, model: str, digests: set) -> Dict[str, array]:
+        """
+        Reads vectors from the on-disk tier.
+
+        Args:
+            model (str): The embedding model name.
+            digests (set): The digests to look up.
+
+        Returns:
+            Dict[str, array]: The vectors found, by digest.
+        """
+        conn = self._open_disk()
+        if conn is None:
+            return {}
+        try:
+            found = {}
+            ordered = list(digests)
+            for start in range(0, len(ordered), 500):
+                chunk = ordered[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f'SELECT text_hash, vector FROM embedding_cache WHERE model = ? AND text_hash IN ({placeholders})',
+                    [model, *chunk]).fetchall()
+                for digest, blob in rows:
+                    vector = array('d')
+                    vector.frombytes(blob)
+                    found[digest] = vector
+            return found
+        except sqlite3.Error as e:
+            self._count_disk_error(e)
+            return {}
+        finally:
+            conn.close()
+
+    def _disk_put(self, model: str, packed: Dict[str, array]) -> None:
+        """
+        Writes vectors to the on-disk tier and prunes it to MAX_DISK_CACHED_EMBEDDINGS.
+
+        Args:
+            model (str): The embedding model name.
+            packed (Dict[str, array]): The vectors to store, by digest.
+        """
+        if not packed:
+            return
+        conn = self._open_disk()
+        if conn is None:
+            return
+        try:
+            conn.executemany(
+                'INSERT OR REPLACE INTO embedding_cache (model, text_hash, vector) VALUES (?, ?, ?)',
+                [(model, digest, vector.tobytes()) for digest, vector in packed.items()])
+            total = conn.execute('SELECT COUNT(*) FROM embedding_cache').fetchone()[0]
+            if total > MAX_DISK_CACHED_EMBEDDINGS:
+                conn.execute(
+                    'DELETE FROM embedding_cache WHERE rowid IN '
+                    '(SELECT rowid FROM embedding_cache ORDER BY rowid LIMIT ?)',
+                    (total - MAX_DISK_CACHED_EMBEDDINGS,))
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            self._count_disk_error(e)
+        finally:
+            conn.close()
+
+    def _count_disk_error(self, error: Exception) -> None:
+        """
+        Logs and counts an on-disk tier failure; the cache keeps working from memory.
+
+        Args:
+            error (Exception): The failure.
+        """
+        logger.warning(f"Embedding cache disk tier unavailable: {error}")
+        with self._cache_lock:
+            self._stats["disk_errors"] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns cache counters.
+
+        Returns:
+            Dict[str, int]: ``memory_hits`` and ``disk_hits`` (texts served without
+            the backend), ``misses`` (texts sent to the backend), ``saved_calls``
+            (backend requests avoided entirely), ``disk_errors``, and current
+            in-memory ``entries``.
+        """
+        with self._cache_lock:
+            return {**self._stats, "entries": len(self._entries)}
+
+    def clear(self) -> None:
+        """
+        Drops every in-memory vector and resets the counters. Intended for test isolation.
+        """
+        with self._cache_lock:
+            self._entries.clear()
+            self._stats = self._empty_stats()
+
+
+# Global singleton instance
+embedding_cache = EmbeddingCache()
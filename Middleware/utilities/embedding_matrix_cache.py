@@ -0,0 +1,345 @@
+# /Middleware/utilities/embedding_matrix_cache.py
+"""
+Optional NumPy-backed semantic search over a discussion's stored embeddings.
+
+The stdlib path in vector_math_utils decodes and scores every stored blob on
+every search. When NumPy is installed, each (discussion, model) pair's vectors
+are instead kept here as one contiguous, pre-normalized float32 matrix, so a
+search is a single matrix-vector product followed by an ``argpartition`` top-k.
+Matrices are built on first use, extended in place when new embeddings are
+written, and revalidated against a cheap signature of the embedding table so a
+write from another process (e.g. Scripts/backfill_embeddings.py) is never
+missed. Without NumPy, NUMPY_AVAILABLE is False and callers keep using the
+stdlib path.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Upper bound, in bytes, on the matrices kept across all discussions. 10,000
+# memories embedded at 1,024 dimensions take about 40 MB. The least recently
+# searched matrix is dropped first; the matrix just used is always kept.
+MAX_CACHED_MATRIX_BYTES = 256 * 1024 * 1024
+
+
+class EmbeddingMatrix:
+    """
+    The pre-normalized float32 vectors of one model in one discussion.
+
+    Rows live in a buffer with spare capacity so appends are amortized O(1)
+    instead of copying the whole matrix on every write.
+
+    Attributes:
+        dim (int): The vector dimension every row has.
+        signature (Hashable): The embedding-table signature the rows correspond to.
+    """
+
+    def __init__(self, dim: int, signature: Hashable):
+        """
+        Creates an empty matrix.
+
+        Args:
+            dim (int): The vector dimension.
+            signature (Hashable): The embedding-table signature for the rows about to be added.
+        """
+        self.dim = dim
+        self.signature = signature
+        self._ids: List[int] = []
+        self._row_of: Dict[int, int] = {}
+        self._buffer = np.empty((0, dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def nbytes(self) -> int:
+        """The memory held by the row buffer."""
+        return self._buffer.nbytes
+
+    def upsert(self, id_blob_pairs: Iterable[Tuple[int, bytes]]) -> int:
+        """
+        Adds or replaces rows, normalizing each vector to unit length.
+
+        Args:
+            id_blob_pairs (Iterable[Tuple[int, bytes]]): (memory_id, float32 blob) pairs.
+
+        Returns:
+            int: The number of pairs skipped because their dimension differs from ``dim``.
+        """
+        new_ids = []
+        new_vectors = []
+        skipped = 0
+        for memory_id, blob in id_blob_pairs:
+            vector = np.frombuffer(blob, dtype=np.float32)
+            if vector.shape[0] != self.dim:
+                skipped += 1
+                continue
+            row = self._row_of.get(memory_id)
+            if row is not None and row >= len(self._ids):
+                # Repeated within this batch: the later vector wins.
+                new_vectors[row - len(self._ids)] = vector
+            elif row is not None:
+                self._buffer[row] = _normalize(vector)
+            else:
+                self._row_of[memory_id] = len(self._ids) + len(new_ids)
+                new_ids.append(memory_id)
+                new_vectors.append(vector)
+
+        if new_vectors:
+            needed = len(self._ids) + len(new_ids)
+            if needed > self._buffer.shape[0]:
+                grown = np.empty((max(needed, 2 * self._buffer.shape[0]), self.dim), dtype=np.float32)
+                grown[:len(self._ids)] = self._buffer[:len(self._ids)]
+                self._buffer = grown
+            block = np.vstack(new_vectors)
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            norms[norms == 0.0] = 1.0
+            self._buffer[len(self._ids):needed] = block / norms
+            self._ids.extend(new_ids)
+        return skipped
+
+    def top_k(self, query_vector: Sequence[float], top_n: int) -> List[Tuple[int, float]]:
+        """
+        Ranks every row by cosine similarity to a query vector.
+
+        Args:
+            query_vector (Sequence[float]): The query embedding; must have ``dim`` values.
+            top_n (int): The maximum number of results to return.
+
+        Returns:
+            List[Tuple[int, float]]: (memory_id, similarity) pairs, best first.
+        """
+        size = len(self._ids)
+        k = min(top_n, size)
+        if k <= 0:
+            return []
+        query = _normalize(np.asarray(query_vector, dtype=np.float32))
+        scores = self._buffer[:size] @ query
+        if k < size:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(size)
+        # A stable sort keeps insertion order among equal scores, as the stdlib path does.
+        best = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self._ids[i], float(scores[i])) for i in best]
+
+
+def _normalize(vector):
+    """
+    Scales a vector to unit length, leaving an all-zero vector unchanged.
+
+    Args:
+        vector (np.ndarray): The vector to normalize.
+
+    Returns:
+        np.ndarray: A float32 unit vector (or the zero vector).
+    """
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector.astype(np.float32, copy=True)
+
+
+class EmbeddingMatrixCache:
+    """
+    A thread-safe, process-wide LRU cache of EmbeddingMatrix objects.
+
+    Entries are keyed by (discussion_id, api_key_hash, model) and carry the
+    embedding-table signature they were built from. ``search`` only uses an
+    entry whose signature matches the caller's freshly read one, so a stale
+    matrix is never searched.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of EmbeddingMatrixCache exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(EmbeddingMatrixCache, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the entry map and counters.
+        """
+        if self._initialized:
+            return
+
+        self._entries: "OrderedDict[Tuple, EmbeddingMatrix]" = OrderedDict()
+        self._stats: Dict[str, int] = {"hits": 0, "loads": 0, "appends": 0, "evictions": 0}
+        # One lock for the map and the matrices: searches are short, and an
+        # append must never interleave with a search reading the same buffer.
+        self._cache_lock = threading.Lock()
+        self._initialized = True
+
+    def search(self, key: Tuple, signature: Optional[Hashable],
+               query_vector: Sequence[float], top_n: int) -> Optional[List[Tuple[int, float]]]:
+        """
+        Searches the cached matrix for key if it is current.
+
+        Args:
+            key (Tuple): (discussion_id, api_key_hash, model).
+            signature (Optional[Hashable]): The embedding table's current signature,
+                or None if it could not be read (never a hit).
+            query_vector (Sequence[float]): The query embedding.
+            top_n (int): The maximum number of results to return.
+
+        Returns:
+            Optional[List[Tuple[int, float]]]: (memory_id, similarity) pairs, best
+            first, or None on a miss (the caller should ``load``).
+        """
+        if signature is None:
+            return None
+        with self._cache_lock:
+            matrix = self._entries.get(key)
+            if matrix is None or matrix.signature != signature:
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return self._rank_locked(matrix, query_vector, top_n)
+
+    def load(self, key: Tuple, signature: Optional[Hashable], id_blob_pairs: List[Tuple[int, bytes]],
+             query_vector: Sequence[float], top_n: int) -> List[Tuple[int, float]]:
+        """
+        Builds the matrix for key from freshly read rows, caches it, and searches it.
+
+        Args:
+            key (Tuple): (discussion_id, api_key_hash, model).
+            signature (Optional[Hashable]): The signature read *before* the rows
+                were fetched, so a concurrent write can only make the entry look
+                stale, never current. None builds the matrix without caching it.
+            id_blob_pairs (List[Tuple[int, bytes]]): Every stored (memory_id, blob) for the model.
+            query_vector (Sequence[float]): The query embedding.
+            top_n (int): The maximum number of results to return.
+
+        Returns:
+            List[Tuple[int, float]]: (memory_id, similarity) pairs, best first.
+        """
+        if not id_blob_pairs:
+            return []
+        matrix = EmbeddingMatrix(len(id_blob_pairs[0][1]) // 4, signature)
+        skipped = matrix.upsert(id_blob_pairs)
+        if skipped:
+            logger.warning("Skipped %d stored embedding(s) whose dimension differs from %d for model '%s'.",
+                           skipped, matrix.dim, key[-1])
+
+        with self._cache_lock:
+            self._stats["loads"] += 1
+            if signature is not None:
+                self._entries[key] = matrix
+                self._entries.move_to_end(key)
+                self._evict_locked()
+            return self._rank_locked(matrix, query_vector, top_n)
+
+    def apply_write(self, key: Tuple, signature_before: Hashable, signature_after: Hashable,
+                    id_blob_pairs: List[Tuple[int, bytes]]) -> None:
+        """
+        Folds newly written embeddings into a cached matrix instead of reloading it.
+
+        Only applied when the cached matrix matches the table as it was right
+        before the write; otherwise the entry is dropped and rebuilt on the next
+        search.
+
+        Args:
+            key (Tuple): (discussion_id, api_key_hash, model).
+            signature_before (Hashable): The table signature read inside the write
+                transaction, before the rows were written.
+            signature_after (Hashable): The signature read inside the same
+                transaction after the write.
+            id_blob_pairs (List[Tuple[int, bytes]]): The (memory_id, blob) pairs written.
+        """
+        with self._cache_lock:
+            matrix = self._entries.get(key)
+            if matrix is None:
+                return
+            if matrix.signature != signature_before or matrix.upsert(id_blob_pairs):
+                del self._entries[key]
+                return
+            matrix.signature = signature_after
+            self._stats["appends"] += 1
+            self._evict_locked()
+
+    def contains(self, key: Tuple) -> bool:
+        """
+        Returns True if a matrix (current or not) is cached for key.
+
+        Args:
+            key (Tuple): (discussion_id, api_key_hash, model).
+
+        Returns:
+            bool: Whether an entry exists.
+        """
+        with self._cache_lock:
+            return key in self._entries
+
+    def _rank_locked(self, matrix: EmbeddingMatrix, query_vector: Sequence[float],
+                     top_n: int) -> List[Tuple[int, float]]:
+        """
+        Searches a matrix, guarding against a query of the wrong dimension.
+
+        Args:
+            matrix (EmbeddingMatrix): The matrix to search.
+            query_vector (Sequence[float]): The query embedding.
+            top_n (int): The maximum number of results.
+
+        Returns:
+            List[Tuple[int, float]]: (memory_id, similarity) pairs, best first.
+        """
+        if len(query_vector) != matrix.dim:
+            logger.warning("Query embedding dimension %d does not match stored dimension %d. "
+                           "Returning no semantic results.", len(query_vector), matrix.dim)
+            return []
+        return matrix.top_k(query_vector, top_n)
+
+    def _evict_locked(self) -> None:
+        """
+        Drops least recently used matrices beyond MAX_CACHED_MATRIX_BYTES. Caller must hold _cache_lock.
+        """
+        total = sum(matrix.nbytes for matrix in self._entries.values())
+        while total > MAX_CACHED_MATRIX_BYTES and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            total -= evicted.nbytes
+            self._stats["evictions"] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns cache counters.
+
+        Returns:
+            Dict[str, int]: ``hits``, ``loads`` (matrices built from the database),
+            ``appends`` (writes folded into a cached matrix), ``evictions``,
+            current ``entries``, and ``bytes`` held.
+        """
+        with self._cache_lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": sum(matrix.nbytes for matrix in self._entries.values()),
+            }
+
+    def clear(self) -> None:
+        """
+        Drops every cached matrix and resets the counters. Intended for test isolation.
+        """
+        with self._cache_lock:
+            self._entries.clear()
+            self._stats = {"hits": 0, "loads": 0, "appends": 0, "evictions": 0}
+
+
+# Global singleton instance
+embedding_matrix_cache = EmbeddingMatrixCache()
@@ -1,10 +1,22 @@
 import base64
 import hashlib
 import logging
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on derived keys kept in memory. One entry per (API key, username)
+# pair seen recently; the least recently used key is dropped first.
+MAX_CACHED_FERNET_KEYS = 256
+
+# A cached key is dropped after this long without being used, so a client that
+# has gone away does not leave its derived key in memory indefinitely. Every
+# use restarts the clock, so an active client session derives its key once.
+FERNET_KEY_IDLE_TTL_SECONDS = 1800
+
 _Fernet = None
 _PBKDF2HMAC = None
 _hashes = None
@@ -58,6 +70,131 @@ def derive_fernet_key(api_key: str, username: Optional[str] = None) -> bytes:
     return base64.urlsafe_b64encode(key_bytes)
 
 
+class FernetKeyCache:
+    """
+    A thread-safe singleton that remembers derived Fernet keys.
+
+    ``derive_fernet_key`` runs 100,000 PBKDF2 iterations, tens of milliseconds
+    of CPU, and a single request can construct many workflow processors (every
+    sub-workflow, chunk run and memory workflow) that each need the key. Entries
+    are keyed by a SHA-256 digest of the (API key, username) pair, so the raw API
+    key is never held, and are bounded in both count (LRU cap) and idle age (TTL).
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of FernetKeyCache exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(FernetKeyCache, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the key map and counters.
+        """
+        if self._initialized:
+            return
+
+        # digest -> (derived key, monotonic time of last use)
+        self._keys: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._stats: Dict[str, int] = self._empty_stats()
+        self._cache_lock = threading.Lock()
+        self._initialized = True
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {"derivations": 0, "derivations_saved": 0, "expirations": 0}
+
+    @staticmethod
+    def _cache_key(api_key: str, username: Optional[str]) -> str:
+        """
+        Returns the digest that identifies an (API key, username) pair.
+
+        Args:
+            api_key (str): The raw API key.
+            username (Optional[str]): The WilmerAI username, or None.
+
+        Returns:
+            str: A SHA-256 hex digest of the pair's repr, which cannot collide
+            across different pairs (and keeps a None username distinct).
+        """
+        return hashlib.sha256(repr((api_key, username)).encode("utf-8")).hexdigest()
+
+    def get_key(self, api_key: str, username: Optional[str] = None) -> bytes:
+        """
+        Returns the Fernet key for an API key and username, deriving it only on a miss.
+
+        Args:
+            api_key (str): The raw API key.
+            username (Optional[str]): The WilmerAI username used in the salt.
+
+        Returns:
+            bytes: The same key ``derive_fernet_key(api_key, username)`` returns.
+        """
+        digest = self._cache_key(api_key, username)
+        now = time.monotonic()
+        with self._cache_lock:
+            self._prune_expired_locked(now)
+            cached = self._keys.get(digest)
+            if cached is not None:
+                self._keys[digest] = (cached[0], now)
+                self._keys.move_to_end(digest)
+                self._stats["derivations_saved"] += 1
+                return cached[0]
+
+        key = derive_fernet_key(api_key, username=username)
+        with self._cache_lock:
+            self._stats["derivations"] += 1
+            self._keys[digest] = (key, time.monotonic())
+            self._keys.move_to_end(digest)
+            while len(self._keys) > MAX_CACHED_FERNET_KEYS:
+                self._keys.popitem(last=False)
+        return key
+
+    def _prune_expired_locked(self, now: float) -> None:
+        """
+        Drops keys unused for FERNET_KEY_IDLE_TTL_SECONDS. Caller must hold _cache_lock.
+
+        Args:
+            now (float): The current monotonic time.
+        """
+        cutoff = now - FERNET_KEY_IDLE_TTL_SECONDS
+        # Entries are kept in order of last use, so expired ones are at the front.
+        while self._keys:
+            digest, (_, last_used) = next(iter(self._keys.items()))
+            if last_used >= cutoff:
+                break
+            del self._keys[digest]
+            self._stats["expirations"] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns cache counters.
+
+        Returns:
+            Dict[str, int]: ``derivations`` (PBKDF2 runs), ``derivations_saved``
+            (keys served from the cache instead), ``expirations``, and current
+            ``entries``.
+        """
+        with self._cache_lock:
+            return {**self._stats, "entries": len(self._keys)}
+
+    def clear(self) -> None:
+        """
+        Drops every cached key and resets the counters. Intended for test isolation.
+        """
+        with self._cache_lock:
+            self._keys.clear()
+            self._stats = self._empty_stats()
+
+
 def hash_api_key(api_key: str) -> str:
     """
     Returns the first 16 hex characters of the SHA-256 hash of the API key.
@@ -110,7 +247,9 @@ def get_encryption_key_if_available(api_key: Optional[str]) -> Optional[bytes]:
     and the ``encryptUsingApiKey`` user config setting is enabled.
 
     The current WilmerAI username is automatically fetched and used as
-    the per-user salt for key derivation.
+    the per-user salt for key derivation. Derived keys come from
+    ``fernet_key_cache``, so PBKDF2 runs once per client session rather than
+    once per workflow processor.
 
     Directory isolation (via ``get_api_key_hash_if_available``) always
     applies when an API key is present. Encryption only applies when the
@@ -127,7 +266,7 @@ def get_encryption_key_if_available(api_key: Optional[str]) -> Optional[bytes]:
         from Middleware.utilities.config_utils import get_encrypt_using_api_key, get_current_username
         if get_encrypt_using_api_key():
             username = get_current_username()
-            return derive_fernet_key(api_key, username=username)
+            return fernet_key_cache.get_key(api_key, username=username)
     return None
 
 
@@ -144,3 +283,7 @@ def get_api_key_hash_if_available(api_key: Optional[str]) -> Optional[str]:
     if api_key:
         return hash_api_key(api_key)
     return None
+
+
+# Global singleton instance
+fernet_key_cache = FernetKeyCache()
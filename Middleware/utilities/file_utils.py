@@ -1,15 +1,64 @@
 # /Middleware/utilities/file_utils.py
 
+import hashlib
 import json
 import logging
 import os
 import shutil
 import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Tuple, Union, Optional
+from typing import Any, Dict, Iterable, List, Tuple, Union, Optional
 
 logger = logging.getLogger(__name__)
 
+# Memory and timestamp files grow by a few entries per turn. Rather than
+# rewriting the whole JSON document (and re-encrypting it) on every turn, new
+# entries are appended to a record log beside it, "<file>.json.records", and
+# folded back into the JSON file once the log is at least as large as the file
+# itself (and at least RECORD_LOG_MIN_COMPACT_BYTES). That keeps the amortized
+# write cost per turn proportional to the new entries, while readers never
+# read more than about twice the data.
+RECORD_LOG_SUFFIX = ".records"
+RECORD_LOG_MIN_COMPACT_BYTES = 64 * 1024
+
+# First line of every record log. It is followed by the size and SHA-256 of
+# the JSON file the records apply to, so a log left behind by a replaced or
+# hand-edited JSON file is recognised and never replayed onto the wrong base.
+# The fingerprint depends only on content, so copying, restoring or moving a
+# discussion folder (even across filesystems) keeps its pending records. A log
+# whose fingerprint does not match is set aside as "<log>.stale-<ns>" with a
+# warning rather than deleted.
+_RECORD_LOG_HEADER = "WILMER-RECORDS 2"
+
+# Upper bound on memoized JSON file digests. Each entry maps a path to the stat
+# signature (device, inode, size, mtime) its digest was taken at, so a file that
+# has not changed since is not re-hashed on every append or read.
+MAX_MEMOIZED_BASE_DIGESTS = 256
+_base_digests: "OrderedDict[str, Tuple[Tuple[int, int, int, int], str]]" = OrderedDict()
+_base_digests_guard = threading.Lock()
+
+# save_custom_file(mode="append") writes in place with O_APPEND rather than
+# rewriting the file, so an append costs the same however large the file has
+# grown. Before the bytes are written, the file's size before and after the
+# append is recorded in a small rollback journal, "<file>.append-journal", which
+# is removed once the appended bytes are fsynced. A journal that outlives its
+# append marks a write interrupted by a crash; the next access to the file
+# truncates it back to its size before that append.
+APPEND_JOURNAL_SUFFIX = ".append-journal"
+
+# Per-file locks serializing writes to custom files within this process.
+_custom_file_locks: Dict[str, threading.Lock] = {}
+_custom_file_locks_guard = threading.Lock()
+
+# Appends waiting for a group commit, keyed like _custom_file_locks. Each entry
+# is [data, committed, error]; whichever writer next takes the file's lock
+# commits every queued entry with one journal write and one fsync.
+_group_commit_queues: Dict[str, List[list]] = {}
+
 
 def resolve_file_path(path_str: str) -> str:
     """
@@ -162,6 +211,324 @@ def _write_json_file(file_path: Path, data, encryption_key: Optional[bytes] = No
     _atomic_write_bytes(file_path, json_bytes)
 
 
+def _record_log_path(file_path: Path) -> Path:
+    return file_path.with_name(file_path.name + RECORD_LOG_SUFFIX)
+
+
+def _stat_signature(file_path: Path) -> Tuple[int, int, int, int]:
+    stat = file_path.stat()
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _record_log_header(file_path: Path) -> bytes:
+    """
+    Builds the header line that ties a record log to the current JSON file's content.
+
+    The file is hashed only when its stat signature has changed since it was
+    last hashed in this process.
+
+    Args:
+        file_path (Path): The JSON file the records apply to. It must exist.
+
+    Returns:
+        bytes: The header line, newline included.
+    """
+    key = str(file_path)
+    signature = _stat_signature(file_path)
+    with _base_digests_guard:
+        cached = _base_digests.get(key)
+        if cached is not None and cached[0] == signature:
+            _base_digests.move_to_end(key)
+            digest = cached[1]
+        else:
+            digest = None
+    if digest is None:
+        content = file_path.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        if _stat_signature(file_path) == signature:
+            # Only remember a digest the file provably still has.
+            with _base_digests_guard:
+                _base_digests[key] = (signature, digest)
+                _base_digests.move_to_end(key)
+                while len(_base_digests) > MAX_MEMOIZED_BASE_DIGESTS:
+                    _base_digests.popitem(last=False)
+        size = len(content)
+    else:
+        size = signature[2]
+    return f"{_RECORD_LOG_HEADER} {size} {digest}\n".encode('ascii')
+
+
+def _set_aside_record_log(file_path: Path) -> None:
+    """
+    Renames a record log that does not match its JSON file out of the way.
+
+    Its records may be the only copy of recent entries, so they are kept
+    beside the file for manual recovery rather than deleted.
+
+    Args:
+        file_path (Path): The JSON file whose log is set aside.
+    """
+    log_path = _record_log_path(file_path)
+    aside = log_path.with_name(f"{log_path.name}.stale-{time.time_ns()}")
+    try:
+        os.replace(str(log_path), str(aside))
+    except FileNotFoundError:
+        return
+    logger.warning("Record log for %s does not match the file's current content; its records were not applied "
+                   "and it was kept as %s.", file_path, aside.name)
+
+
+def _encode_record(record: Dict[str, Any], encryption_key: Optional[bytes] = None) -> bytes:
+    """
+    Frames one record as a single line.
+
+    Plaintext records are written as ``<crc32 hex> <compact JSON>``; the
+    checksum lets a reader discard a line torn by a crash mid-append. Encrypted
+    records are written as one Fernet token, whose HMAC serves the same purpose.
+    JSON escapes newlines inside strings and Fernet tokens are base64, so
+    neither form can contain a line break.
+
+    Args:
+        record (Dict[str, Any]): The record to frame.
+        encryption_key (Optional[bytes]): Fernet key for encryption.
+
+    Returns:
+        bytes: The framed line, newline included.
+    """
+    payload = json.dumps(record, separators=(',', ':')).encode('utf-8')
+    if encryption_key:
+        from Middleware.utilities.encryption_utils import encrypt_bytes
+        return encrypt_bytes(payload, encryption_key) + b"\n"
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def _decode_record(line: bytes, encryption_key: Optional[bytes] = None) -> Optional[Dict[str, Any]]:
+    """
+    Parses one line written by :func:`_encode_record`.
+
+    Plaintext lines are accepted with or without a key, so a log started before
+    encryption was enabled stays readable (the same migration path as
+    ``_read_json_file``).
+
+    Args:
+        line (bytes): The line, without its newline.
+        encryption_key (Optional[bytes]): Fernet key for decryption.
+
+    Returns:
+        Optional[Dict[str, Any]]: The record, or None if the line is torn,
+            corrupt, or encrypted with a key that was not supplied.
+    """
+    checksum, _, payload = line.partition(b" ")
+    if len(checksum) == 8 and payload:
+        try:
+            if int(checksum, 16) == zlib.crc32(payload):
+                return json.loads(payload)
+        except ValueError:
+            pass
+        return None
+    if not encryption_key:
+        return None
+    try:
+        from cryptography.fernet import InvalidToken
+        from Middleware.utilities.encryption_utils import decrypt_bytes
+        return json.loads(decrypt_bytes(line, encryption_key))
+    except (InvalidToken, ValueError, UnicodeDecodeError):
+        return None
+
+
+def _read_records(file_path: Path, header: bytes, encryption_key: Optional[bytes] = None) -> List[Dict[str, Any]]:
+    """
+    Reads the records that apply to a JSON file.
+
+    Args:
+        file_path (Path): The JSON file.
+        header (bytes): The header the JSON file currently expects (from
+            :func:`_record_log_header`, taken before the file was read).
+        encryption_key (Optional[bytes]): Fernet key for decryption.
+
+    Returns:
+        List[Dict[str, Any]]: The readable records in write order; empty when
+            there is no log or it belongs to a different version of the file.
+    """
+    log_path = _record_log_path(file_path)
+    try:
+        raw = log_path.read_bytes()
+    except FileNotFoundError:
+        return []
+    if not raw.startswith(header):
+        logger.warning("Ignoring record log %s: it does not match the current content of %s.",
+                       log_path, file_path.name)
+        return []
+
+    lines = raw[len(header):].split(b"\n")
+    # The final element is empty when the log ends in a newline; otherwise it is
+    # a record torn by a crash mid-append and was never acknowledged.
+    lines.pop()
+    records = []
+    for line in lines:
+        if not line:
+            continue
+        record = _decode_record(line, encryption_key)
+        if record is None:
+            logger.warning("Skipping an unreadable record in %s.", log_path)
+            continue
+        records.append(record)
+    return records
+
+
+def _apply_records(data, records: List[Dict[str, Any]]):
+    """
+    Replays records onto the data loaded from a JSON file, in place.
+
+    A list file takes ``{"append": [...]}`` records. A dict file takes
+    ``{"remove": [...], "set": {...}}`` records; removals are applied first.
+
+    Args:
+        data: The list or dict loaded from the JSON file.
+        records (List[Dict[str, Any]]): The records from :func:`_read_records`.
+
+    Returns:
+        The updated data.
+    """
+    for record in records:
+        if isinstance(data, list):
+            data.extend(record.get("append", ()))
+        elif isinstance(data, dict):
+            for key in record.get("remove", ()):
+                data.pop(key, None)
+            data.update(record.get("set", {}))
+    return data
+
+
+def _read_json_file_with_records(file_path: Path, encryption_key: Optional[bytes] = None):
+    """
+    Reads a JSON file and replays its record log on top of it.
+
+    Args:
+        file_path (Path): The resolved path to the file.
+        encryption_key (Optional[bytes]): Fernet key for decryption.
+
+    Returns:
+        The parsed and updated JSON data.
+    """
+    if not _record_log_path(file_path).exists():
+        # Nothing to replay, so the file need not be fingerprinted.
+        return _read_json_file(file_path, encryption_key)
+    header = _record_log_header(file_path)
+    data = _read_json_file(file_path, encryption_key)
+    return _apply_records(data, _read_records(file_path, header, encryption_key))
+
+
+def _replace_json_file(file_path: Path, data, encryption_key: Optional[bytes] = None) -> None:
+    """
+    Rewrites a JSON file in full and drops its record log.
+
+    The JSON file is replaced first. A crash before the log is removed leaves a
+    log whose header no longer matches the new file, so it is ignored. A log
+    that did not match the file being replaced was never applied, so it is set
+    aside instead of removed. A log whose JSON file was deleted goes with it:
+    the header only fingerprints content, so a recreated file could otherwise
+    match the deleted one and bring its records back.
+
+    Args:
+        file_path (Path): The target file path.
+        data: The complete data to write.
+        encryption_key (Optional[bytes]): Fernet key for encryption.
+    """
+    log_path = _record_log_path(file_path)
+    orphaned = not file_path.exists()
+    log_matches = False
+    if log_path.exists() and not orphaned:
+        header = _record_log_header(file_path)
+        with log_path.open('rb') as f:
+            log_matches = f.read(len(header)) == header
+    _write_json_file(file_path, data, encryption_key)
+    if not log_path.exists():
+        return
+    if not log_matches and not orphaned:
+        _set_aside_record_log(file_path)
+        return
+    try:
+        os.unlink(str(log_path))
+    except FileNotFoundError:
+        pass
+
+
+def _append_record(file_path: Path, record: Dict[str, Any], encryption_key: Optional[bytes] = None) -> None:
+    """
+    Appends one record to a JSON file's record log, compacting when the log has grown.
+
+    The record is written with a single ``O_APPEND`` write and fsynced, so it is
+    either durable in full or, after a crash, ignored as a torn line. Callers
+    must serialize writers to the same file, as they already must for the
+    read-modify-write of the JSON file itself.
+
+    Args:
+        file_path (Path): The JSON file, which must already exist.
+        record (Dict[str, Any]): The record to append.
+        encryption_key (Optional[bytes]): Fernet key for encryption.
+    """
+    header = _record_log_header(file_path)
+    line = _encode_record(record, encryption_key)
+    log_path = str(_record_log_path(file_path))
+    flags = os.O_RDWR | os.O_CREAT | os.O_APPEND | getattr(os, 'O_BINARY', 0)
+    fd = os.open(log_path, flags, 0o600)
+    try:
+        log_size = os.fstat(fd).st_size
+        if log_size:
+            os.lseek(fd, 0, os.SEEK_SET)
+            if os.read(fd, len(header)) != header:
+                os.close(fd)
+                fd = None
+                _set_aside_record_log(file_path)
+                fd = os.open(log_path, flags, 0o600)
+                log_size = os.fstat(fd).st_size
+        if not log_size:
+            line = header + line
+        else:
+            os.lseek(fd, log_size - 1, os.SEEK_SET)
+            if os.read(fd, 1) != b"\n":
+                # Terminate a line torn by an earlier crash so this record starts cleanly.
+                line = b"\n" + line
+        os.write(fd, line)
+        os.fsync(fd)
+        log_size += len(line)
+    finally:
+        if fd is not None:
+            os.close(fd)
+
+    if log_size >= max(RECORD_LOG_MIN_COMPACT_BYTES, file_path.stat().st_size):
+        compact_record_log(str(file_path), encryption_key)
+
+
+def compact_record_log(filepath: str, encryption_key: Optional[bytes] = None) -> bool:
+    """
+    Folds a JSON file's record log back into the file.
+
+    Runs automatically once a log grows past its threshold; call it directly
+    before handling the JSON file by other means (e.g. re-keying it).
+
+    Args:
+        filepath (str): The path to the JSON file.
+        encryption_key (Optional[bytes]): Fernet key for decryption and encryption.
+
+    Returns:
+        bool: True if a log was folded in, False if the file had no log.
+    """
+    file_path = _resolve_case_insensitive_path(filepath) or _to_path(filepath)
+    log_path = _record_log_path(file_path)
+    if not log_path.exists():
+        return False
+    if not file_path.exists():
+        # The JSON file was deleted (e.g. to regenerate memories); its records go with it.
+        os.unlink(str(log_path))
+        return False
+    data = _read_json_file_with_records(file_path, encryption_key)
+    _replace_json_file(file_path, data, encryption_key)
+    logger.debug("Compacted record log into %s.", file_path)
+    return True
+
+
 def ensure_json_file_exists(
         filepath: str,
         initial_data: Union[List, None] = None,
@@ -170,9 +537,10 @@ def ensure_json_file_exists(
     """
     Ensures a JSON file exists, creates it if necessary, and returns its contents.
 
-    If the specified file exists (case-insensitively), its contents are
-    read and returned. If it does not exist, a new file is created with
-    the provided initial data or an empty list if no data is given.
+    If the specified file exists (case-insensitively), its contents, with any
+    pending record log replayed, are read and returned. If it does not exist,
+    a new file is created with the provided initial data or an empty list if
+    no data is given.
 
     Args:
         filepath (str): The path to the JSON file.
@@ -187,7 +555,7 @@ def ensure_json_file_exists(
     resolved_path = _resolve_case_insensitive_path(filepath)
 
     if resolved_path and resolved_path.exists():
-        data = _read_json_file(resolved_path, encryption_key)
+        data = _read_json_file_with_records(resolved_path, encryption_key)
         if not isinstance(data, list):
             raise TypeError(
                 f"Expected a JSON list in '{filepath}', got {type(data).__name__}. "
@@ -200,7 +568,7 @@ def ensure_json_file_exists(
 
     data_to_write = initial_data if initial_data is not None else []
 
-    _write_json_file(target_path, data_to_write, encryption_key)
+    _replace_json_file(target_path, data_to_write, encryption_key)
 
     return data_to_write
 
@@ -235,7 +603,8 @@ def write_chunks_with_hashes(
     Writes chunks of text with their hashes to a JSON file.
 
     This function either appends new data to an existing file or overwrites
-    the file completely based on the `overwrite` flag.
+    the file completely based on the `overwrite` flag. Appends go to the
+    file's record log, so their cost does not grow with the file.
 
     Args:
         chunks_with_hashes (List[Tuple[str, str]]): A list of tuples, each
@@ -248,11 +617,12 @@ def write_chunks_with_hashes(
     Returns:
         None
     """
-    existing_data = ensure_json_file_exists(filepath, encryption_key=encryption_key)
     new_data = [{'text_block': tb, 'hash': hc} for tb, hc in chunks_with_hashes]
-    combined_data = new_data if overwrite else existing_data + new_data
     target = _resolve_case_insensitive_path(filepath) or _to_path(filepath)
-    _write_json_file(target, combined_data, encryption_key)
+    if overwrite or not target.exists():
+        _replace_json_file(target, new_data, encryption_key)
+    elif new_data:
+        _append_record(target, {"append": new_data}, encryption_key)
 
 
 def update_chunks_with_hashes(
@@ -288,8 +658,9 @@ def load_timestamp_file(filepath: str, encryption_key: Optional[bytes] = None) -
     """
     Loads timestamp data from a JSON file into a dictionary.
 
-    If the file exists, its contents are loaded. If the file does not exist,
-    a warning is logged and an empty dictionary is returned.
+    If the file exists, its contents are loaded and any pending record log is
+    replayed on top. If the file does not exist, a warning is logged and an
+    empty dictionary is returned.
 
     Args:
         filepath (str): The path to the timestamp file.
@@ -303,7 +674,7 @@ def load_timestamp_file(filepath: str, encryption_key: Optional[bytes] = None) -
     if file_path and file_path.exists():
         logger.debug(f"File exists: {file_path}")
         logger.info(f"Opening file: {file_path}")
-        return _read_json_file(file_path, encryption_key)
+        return _read_json_file_with_records(file_path, encryption_key)
     else:
         logger.warning(f"File does not exist: {file_path or filepath}")
         return {}
@@ -315,10 +686,11 @@ def save_timestamp_file(
         encryption_key: Optional[bytes] = None
 ) -> None:
     """
-    Saves a dictionary of timestamps to a JSON file.
+    Saves a dictionary of timestamps to a JSON file, replacing its contents.
 
     The function creates the file and any necessary parent directories if
-    they do not already exist.
+    they do not already exist. Use `update_timestamp_file` to record a few
+    changes without rewriting the whole file.
 
     Args:
         filepath (str): The path to the target file.
@@ -330,7 +702,43 @@ def save_timestamp_file(
     """
     file_path = _resolve_case_insensitive_path(filepath) or _to_path(filepath)
     file_path.parent.mkdir(parents=True, exist_ok=True)
-    _write_json_file(file_path, timestamps, encryption_key)
+    _replace_json_file(file_path, timestamps, encryption_key)
+
+
+def update_timestamp_file(
+        filepath: str,
+        updates: Dict[str, str],
+        removed: Iterable[str] = (),
+        encryption_key: Optional[bytes] = None
+) -> None:
+    """
+    Records changes to a timestamp file by appending them to its record log.
+
+    The result is the same as loading the file, deleting the `removed` hashes,
+    applying `updates`, and saving it with `save_timestamp_file`, but only the
+    changes are written. A missing file is created.
+
+    Args:
+        filepath (str): The path to the target file.
+        updates (Dict[str, str]): Message hashes to set, with their timestamps.
+        removed (Iterable[str]): Message hashes to delete, applied before `updates`.
+        encryption_key (Optional[bytes]): Fernet key for transparent encryption.
+
+    Returns:
+        None
+    """
+    removed = list(removed)
+    if not updates and not removed:
+        return
+    file_path = _resolve_case_insensitive_path(filepath) or _to_path(filepath)
+    if not file_path.exists():
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        _replace_json_file(file_path, dict(updates), encryption_key)
+        return
+    record: Dict[str, Any] = {"set": dict(updates)}
+    if removed:
+        record["remove"] = removed
+    _append_record(file_path, record, encryption_key)
 
 
 def load_custom_file(
@@ -368,6 +776,10 @@ def load_custom_file(
             message if the file is missing or empty.
     """
     file_path = _resolve_case_insensitive_path(filepath)
+    if file_path and os.path.exists(str(_append_journal_path(file_path))):
+        # An append is in flight or was interrupted: wait for it, and roll it back if it was torn.
+        with _get_custom_file_lock(file_path):
+            _recover_interrupted_append(file_path)
     if file_path and file_path.exists():
         with file_path.open() as f:
             content = f.read()
@@ -471,22 +883,126 @@ def write_vision_responses(filepath: str, data: Dict, encryption_key: Optional[b
     _write_json_file(file_path, data, encryption_key)
 
 
+def _get_custom_file_lock(file_path: Path) -> threading.Lock:
+    """Returns the per-file write lock for a custom file, creating one if needed."""
+    key = os.path.abspath(str(file_path))
+    with _custom_file_locks_guard:
+        if key not in _custom_file_locks:
+            _custom_file_locks[key] = threading.Lock()
+        return _custom_file_locks[key]
+
+
+def _append_journal_path(file_path: Path) -> Path:
+    return file_path.with_name(file_path.name + APPEND_JOURNAL_SUFFIX)
+
+
+def _recover_interrupted_append(file_path: Path) -> None:
+    """
+    Rolls back an append that a crash interrupted, then removes its journal.
+
+    The file is only truncated when its size lies strictly between the sizes
+    recorded before and after the append, i.e. when part of the append landed.
+    A file of any other size was either never touched or has since been changed
+    by other means, and is left alone. The caller must hold the file's lock.
+
+    Args:
+        file_path (Path): The custom file.
+    """
+    journal_path = _append_journal_path(file_path)
+    try:
+        recorded = journal_path.read_text(encoding='ascii').split()
+    except FileNotFoundError:
+        return
+    try:
+        size_before, size_after = int(recorded[0]), int(recorded[1])
+        size = file_path.stat().st_size
+    except (IndexError, ValueError, FileNotFoundError):
+        size_before = size_after = size = None
+    if size is not None and size_before < size < size_after:
+        with file_path.open('r+b') as f:
+            f.truncate(size_before)
+            f.flush()
+            os.fsync(f.fileno())
+        logger.warning("Rolled back an append to %s that was interrupted (%d of %d bytes written).",
+                       file_path, size - size_before, size_after - size_before)
+    os.unlink(str(journal_path))
+
+
+def _journaled_append(file_path: Path, data: bytes) -> None:
+    """
+    Appends bytes to a file in place, journaling the append so a crash cannot
+    leave a partial write behind. The caller must hold the file's lock.
+
+    Args:
+        file_path (Path): The target file path. Its parent must already exist.
+        data (bytes): The bytes to append.
+    """
+    _recover_interrupted_append(file_path)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, 'O_BINARY', 0)
+    fd = os.open(str(file_path), flags, 0o600)
+    try:
+        size_before = os.fstat(fd).st_size
+        _atomic_write_bytes(_append_journal_path(file_path),
+                            f"{size_before} {size_before + len(data)}\n".encode('ascii'))
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.unlink(str(_append_journal_path(file_path)))
+
+
+def _group_commit_append(file_path: Path, data: bytes) -> None:
+    """
+    Appends bytes to a file as part of a group commit.
+
+    The append is queued, then the caller waits for the file's lock. Whoever
+    takes the lock first writes every queued append in arrival order with a
+    single journaled write and fsync; appends that arrive while that fsync is in
+    progress queue up and share the next one. A failed write is raised in every
+    caller whose append it carried.
+
+    Args:
+        file_path (Path): The target file path. Its parent must already exist.
+        data (bytes): The bytes to append.
+    """
+    key = os.path.abspath(str(file_path))
+    entry = [data, False, None]
+    with _custom_file_locks_guard:
+        _group_commit_queues.setdefault(key, []).append(entry)
+    with _get_custom_file_lock(file_path):
+        if not entry[1]:
+            with _custom_file_locks_guard:
+                batch = _group_commit_queues.pop(key, [])
+            try:
+                _journaled_append(file_path, b"".join(queued[0] for queued in batch))
+            except Exception as e:
+                for queued in batch:
+                    queued[2] = e
+            for queued in batch:
+                queued[1] = True
+    if entry[2] is not None:
+        raise entry[2]
+
+
 def save_custom_file(filepath: str, content: str, mode: str = "overwrite",
-                     find: Optional[str] = None) -> Optional[int]:
+                     find: Optional[str] = None, group_commit: bool = False) -> Optional[int]:
     """
-    Saves content to a text file using atomic write, creating parent directories
-    if they don't exist.
+    Saves content to a text file, creating parent directories if they don't exist.
 
-    Uses the same write-to-temp-then-replace pattern as ``_write_json_file``
-    to prevent data corruption if the process crashes mid-write.
+    Full rewrites use the same write-to-temp-then-replace pattern as
+    ``_write_json_file`` to prevent data corruption if the process crashes
+    mid-write. Appends write in place behind a rollback journal instead, so
+    their cost does not grow with the file (see APPEND_JOURNAL_SUFFIX).
 
     Args:
         filepath (str): The path where the file will be saved.
         content (str): The string content to write. Ignored when mode is "remove" or "trim".
         mode (str): One of:
             - "overwrite" (default): replace the whole file.
-            - "append": add content to the end of the existing file
-              (read-modify-write so the write stays atomic); a missing file is created.
+            - "append": add content to the end of the existing file without
+              rewriting it; a missing file is created.
             - "replace": swap every occurrence of ``find`` for ``content`` in an
               existing file, leaving all other text untouched. This is the surgical
               alternative to a full rewrite: a caller can update one entry without
@@ -497,6 +1013,9 @@ def save_custom_file(filepath: str, content: str, mode: str = "overwrite",
               a line-per-entry log that a model has salted with stray blank lines.
         find (Optional[str]): The target text for "replace"/"remove". Required for those two modes;
             not used by "trim".
+        group_commit (bool): For "append" only: share one fsync with any concurrent appends
+            to the same file instead of syncing each on its own. Each call still returns only
+            once its content is durable.
 
     Returns:
         Optional[int]: For "replace"/"remove"/"trim", the number of changes made
@@ -516,43 +1035,52 @@ def save_custom_file(filepath: str, content: str, mode: str = "overwrite",
         # whether it actually landed.
         if mode in ("replace", "remove") and not find:
             raise ValueError(f"save_custom_file: mode '{mode}' requires a non-empty 'find' value")
-        if not file_path.exists():
-            return 0
-        original = file_path.read_text(encoding='utf-8')
-        if mode == "replace":
-            change_count = original.count(find)
-            if change_count == 0:
+        with _get_custom_file_lock(file_path):
+            _recover_interrupted_append(file_path)
+            if not file_path.exists():
                 return 0
-            new_content = original.replace(find, content)
-        elif mode == "remove":  # drop whole lines containing the target text
-            lines = original.splitlines(keepends=True)
-            kept_lines = [line for line in lines if find not in line]
-            change_count = len(lines) - len(kept_lines)
-            if change_count == 0:
-                return 0
-            new_content = "".join(kept_lines)
-        else:  # "trim": drop blank / whitespace-only lines, leaving the real content intact
-            lines = original.splitlines(keepends=True)
-            kept_lines = [line for line in lines if line.strip()]
-            change_count = len(lines) - len(kept_lines)
-            if change_count == 0:
-                return 0
-            new_content = "".join(kept_lines)
-        try:
-            _atomic_write_bytes(file_path, new_content.encode('utf-8'))
-        except Exception as e:
-            raise IOError(f"Could not write to file at {filepath}") from e
+            original = file_path.read_text(encoding='utf-8')
+            if mode == "replace":
+                change_count = original.count(find)
+                if change_count == 0:
+                    return 0
+                new_content = original.replace(find, content)
+            elif mode == "remove":  # drop whole lines containing the target text
+                lines = original.splitlines(keepends=True)
+                kept_lines = [line for line in lines if find not in line]
+                change_count = len(lines) - len(kept_lines)
+                if change_count == 0:
+                    return 0
+                new_content = "".join(kept_lines)
+            else:  # "trim": drop blank / whitespace-only lines, leaving the real content intact
+                lines = original.splitlines(keepends=True)
+                kept_lines = [line for line in lines if line.strip()]
+                change_count = len(lines) - len(kept_lines)
+                if change_count == 0:
+                    return 0
+                new_content = "".join(kept_lines)
+            try:
+                _atomic_write_bytes(file_path, new_content.encode('utf-8'))
+            except Exception as e:
+                raise IOError(f"Could not write to file at {filepath}") from e
         return change_count
 
     file_path.parent.mkdir(parents=True, exist_ok=True)
-    if mode == "append" and file_path.exists():
-        # Read-modify-write so the atomic replace below is preserved. Let a read
-        # failure propagate rather than swallowing it: silently writing only the new
-        # content would overwrite (not append to) the existing file and lose its prior
-        # contents, the opposite of what "append" promises.
-        content = file_path.read_text(encoding='utf-8') + content
     try:
-        _atomic_write_bytes(file_path, content.encode('utf-8'))
+        if mode == "append":
+            if group_commit:
+                _group_commit_append(file_path, content.encode('utf-8'))
+            else:
+                with _get_custom_file_lock(file_path):
+                    _journaled_append(file_path, content.encode('utf-8'))
+        else:
+            with _get_custom_file_lock(file_path):
+                _atomic_write_bytes(file_path, content.encode('utf-8'))
+                # The whole file was replaced, so a leftover journal no longer describes it.
+                try:
+                    os.unlink(str(_append_journal_path(file_path)))
+                except FileNotFoundError:
+                    pass
     except Exception as e:
         raise IOError(f"Could not write to file at {filepath}") from e
     return None
@@ -0,0 +1,358 @@
+# /Middleware/utilities/keyword_index.py
+"""
+Incrementally maintained positional keyword indexes for the keyword search tools.
+
+``ConversationalKeywordSearchPerformerTool`` and ``MemoryKeywordSearchPerformerTool``
+used to rebuild an inverted index from scratch, and re-tokenize every matching
+chunk to score it, on every call. Each discussion now keeps a ``KeywordIndex``
+per search scope (conversation messages, memory file chunks) that maps every
+token to the documents containing it and the token's positions in each. A
+document is one message or one memory chunk, keyed by its text, so a request
+only tokenizes the texts the index has not seen before, and scoring and
+proximity are answered from the stored positions.
+
+The conversation search groups messages into chunks by token budget, and those
+chunk boundaries shift as the conversation grows. Indexing messages rather
+than chunks keeps the index valid across requests: a chunk's tokens are the
+concatenation of its messages' tokens (messages are joined with newlines,
+which never fall inside a token), so chunk-level scores and positions are
+assembled per request from the message-level postings. The results are
+identical to ``search_utils.advanced_search_in_chunks`` and
+``search_utils.search_in_chunks`` on the joined texts.
+"""
+
+import bisect
+import re
+import threading
+from collections import OrderedDict
+from itertools import combinations
+from typing import Dict, FrozenSet, Hashable, List, Optional, Sequence, Set, Tuple
+
+from Middleware.utilities.sensitive_logging_utils import is_encryption_active
+from Middleware.utilities.text_utils import tokenize
+
+# Upper bound, in characters of indexed text, on the indexes kept across all
+# discussions. Postings take a small multiple of the text they index. The least
+# recently searched index is dropped first; the index just used is always kept.
+MAX_INDEXED_CHARS = 64 * 1024 * 1024
+
+# Documents the current search no longer references (edited or deleted
+# messages, condensed memories) are pruned once the index holds more than
+# twice the referenced documents plus this slack, so pruning is amortized
+# across many searches.
+PRUNE_SLACK_DOCUMENTS = 256
+
+_SPEAKER_PATTERN = re.compile(r'(\b\w+):')
+
+
+class KeywordIndex:
+    """
+    A positional inverted index over a set of documents, keyed by document text.
+
+    Not thread-safe on its own; ``KeywordIndexCache`` serializes access to the
+    indexes it hands out.
+    """
+
+    def __init__(self):
+        """
+        Creates an empty index.
+        """
+        # token -> document text -> positions of the token in that document
+        self._postings: Dict[str, Dict[str, Tuple[int, ...]]] = {}
+        # document text -> (token count, speaker labels in the document)
+        self._documents: Dict[str, Tuple[int, FrozenSet[str]]] = {}
+        self.chars = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add_documents(self, texts: Sequence[str]) -> int:
+        """
+        Indexes every text not indexed yet.
+
+        Args:
+            texts (Sequence[str]): The document texts.
+
+        Returns:
+            int: The number of texts that had to be tokenized.
+        """
+        added = 0
+        for text in texts:
+            if text in self._documents:
+                continue
+            positions: Dict[str, List[int]] = {}
+            token_count = 0
+            for token_count, token in enumerate(tokenize(text), start=1):
+                positions.setdefault(token.lower(), []).append(token_count - 1)
+            speakers = frozenset(w.lower() for w in _SPEAKER_PATTERN.findall(text))
+            for token, token_positions in positions.items():
+                self._postings.setdefault(token, {})[text] = tuple(token_positions)
+            self._documents[text] = (token_count, speakers)
+            self.chars += len(text)
+            added += 1
+        return added
+
+    def prune(self, keep: Set[str]) -> int:
+        """
+        Drops every document not in ``keep``.
+
+        Args:
+            keep (Set[str]): The texts to keep.
+
+        Returns:
+            int: The number of documents dropped.
+        """
+        stale = [text for text in self._documents if text not in keep]
+        if not stale:
+            return 0
+        stale_set = set(stale)
+        for token in list(self._postings):
+            documents = self._postings[token]
+            for text in stale_set.intersection(documents):
+                del documents[text]
+            if not documents:
+                del self._postings[token]
+        for text in stale:
+            del self._documents[text]
+            self.chars -= len(text)
+        return len(stale)
+
+    def search_chunks(self, chunks: Sequence[Sequence[str]], query_tokens: Sequence[str],
+                      max_excerpts: int = 40, proximity_limit: int = 5) -> List[int]:
+        """
+        Ranks chunks of documents against a query, reading only stored postings.
+
+        Matches ``search_utils.advanced_search_in_chunks`` applied to each chunk's
+        documents joined with newlines: a chunk qualifies when it contains a query
+        token that is not a speaker label (``Name:``) in that chunk, scores the
+        total occurrences of the query tokens, and gains a point for every pair of
+        distinct query tokens within ``proximity_limit`` words of each other.
+
+        Args:
+            chunks (Sequence[Sequence[str]]): Each chunk's document texts, in order.
+                Every text must already be indexed.
+            query_tokens (Sequence[str]): The query tokens.
+            max_excerpts (int): The maximum number of chunks to return.
+            proximity_limit (int): The proximity window; 0 disables the proximity boost.
+
+        Returns:
+            List[int]: The indices of the best chunks, best first.
+        """
+        lower_query_tokens = [t.lower() for t in query_tokens]
+        distinct_query_tokens = list(dict.fromkeys(lower_query_tokens))
+
+        # text -> [(chunk index, token offset of the text within the chunk)]
+        layout: Dict[str, List[Tuple[int, int]]] = {}
+        for chunk_index, chunk in enumerate(chunks):
+            offset = 0
+            for text in chunk:
+                layout.setdefault(text, []).append((chunk_index, offset))
+                offset += self._documents[text][0]
+
+        # chunk index -> query token -> positions of the token in the chunk
+        chunk_positions: Dict[int, Dict[str, List[int]]] = {}
+        for token in distinct_query_tokens:
+            for text, positions in self._postings.get(token, {}).items():
+                for chunk_index, offset in layout.get(text, ()):
+                    chunk_positions.setdefault(chunk_index, {}).setdefault(token, []).extend(
+                        offset + position for position in positions)
+
+        speakers_of: Dict[int, Set[str]] = {}
+
+        def chunk_speakers(chunk_index: int) -> Set[str]:
+            if chunk_index not in speakers_of:
+                speakers_of[chunk_index] = set().union(*(self._documents[text][1] for text in chunks[chunk_index]))
+            return speakers_of[chunk_index]
+
+        # Collected token by token in ascending chunk order, as build_inverted_index
+        # lists them, so ties keep the same order as the unindexed search.
+        relevant_chunks = set()
+        for token in lower_query_tokens:
+            relevant_chunks.update(sorted(
+                chunk_index for chunk_index, positions in chunk_positions.items()
+                if token in positions and token not in chunk_speakers(chunk_index)))
+
+        chunk_scores: Dict[int, int] = {}
+        for chunk_index in relevant_chunks:
+            positions = chunk_positions[chunk_index]
+            chunk_scores[chunk_index] = sum(len(positions.get(token, ())) for token in lower_query_tokens)
+
+        if proximity_limit > 0 and len(distinct_query_tokens) >= 2:
+            for chunk_index in chunk_scores:
+                positions = chunk_positions[chunk_index]
+                proximity_score = 0
+                for token1, token2 in combinations(positions, 2):
+                    others = sorted(positions[token2])
+                    for position in positions[token1]:
+                        proximity_score += (bisect.bisect_right(others, position + proximity_limit)
+                                            - bisect.bisect_left(others, position - proximity_limit))
+                chunk_scores[chunk_index] += proximity_score
+
+        return sorted(chunk_scores, key=chunk_scores.get, reverse=True)[:max_excerpts]
+
+    def match_documents(self, documents: Sequence[str], query_tokens: Sequence[str], max_hits: int = 0) -> List[int]:
+        """
+        Finds the documents containing any query token.
+
+        Matches ``search_utils.search_in_chunks``.
+
+        Args:
+            documents (Sequence[str]): The document texts, in order. Every text must
+                already be indexed.
+            query_tokens (Sequence[str]): The query tokens.
+            max_hits (int): The maximum number of matches to return; 0 returns all.
+
+        Returns:
+            List[int]: The indices of the matching documents, in document order.
+        """
+        lower_query_tokens = {t.lower() for t in query_tokens}
+        matching_texts = set()
+        for token in lower_query_tokens:
+            matching_texts.update(self._postings.get(token, ()))
+        matches = [i for i, text in enumerate(documents) if text in matching_texts]
+        return matches[:max_hits] if max_hits > 0 else matches
+
+
+class KeywordIndexCache:
+    """
+    A thread-safe singleton holding one ``KeywordIndex`` per discussion and search scope.
+
+    Indexes live in process memory and are rebuilt on first use after a
+    restart, which costs one tokenization of the conversation or memory file,
+    the same as a single search before indexing. An index holds the text it
+    indexes, so requests with encryption active always search with a throwaway
+    index and never leave an encrypted user's conversation in memory.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of KeywordIndexCache exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(KeywordIndexCache, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the index map and counters.
+        """
+        if self._initialized:
+            return
+
+        self._indexes: "OrderedDict[Hashable, KeywordIndex]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._pruned = 0
+        self._cache_lock = threading.Lock()
+        self._initialized = True
+
+    def _prepare(self, key: Optional[Hashable], texts: List[str]) -> KeywordIndex:
+        """
+        Returns the index for a key with every text indexed. Must be called with the cache lock held.
+        """
+        if is_encryption_active():
+            key = None
+        index = self._indexes.get(key) if key is not None else None
+        if index is None:
+            index = KeywordIndex()
+            if key is not None:
+                self._indexes[key] = index
+        elif key is not None:
+            self._indexes.move_to_end(key)
+
+        added = index.add_documents(texts)
+        self._misses += added
+        self._hits += len(texts) - added
+
+        referenced = set(texts)
+        if len(index) > 2 * len(referenced) + PRUNE_SLACK_DOCUMENTS:
+            self._pruned += index.prune(referenced)
+
+        total_chars = sum(cached.chars for cached in self._indexes.values())
+        while total_chars > MAX_INDEXED_CHARS and len(self._indexes) > 1:
+            evicted_key, evicted = next(iter(self._indexes.items()))
+            if evicted is index:
+                break
+            del self._indexes[evicted_key]
+            total_chars -= evicted.chars
+        return index
+
+    def search_chunks(self, key: Optional[Hashable], chunks: Sequence[Sequence[str]], query: str,
+                      max_excerpts: int = 40, proximity_limit: int = 5) -> List[int]:
+        """
+        Ranks chunks of documents against a query using the index for ``key``.
+
+        Args:
+            key (Optional[Hashable]): Identifies the discussion and scope, e.g.
+                ``("conversation", api_key_hash, discussion_id)``. None searches
+                with a throwaway index.
+            chunks (Sequence[Sequence[str]]): Each chunk's document texts, in order.
+            query (str): The query string.
+            max_excerpts (int): The maximum number of chunks to return.
+            proximity_limit (int): The proximity window; 0 disables the proximity boost.
+
+        Returns:
+            List[int]: The indices of the best chunks, best first.
+        """
+        if not chunks or not query:
+            return []
+        with self._cache_lock:
+            index = self._prepare(key, [text for chunk in chunks for text in chunk])
+            return index.search_chunks(chunks, tokenize(query), max_excerpts, proximity_limit)
+
+    def match_documents(self, key: Optional[Hashable], documents: Sequence[str], query: str,
+                        max_hits: int = 0) -> List[int]:
+        """
+        Finds the documents containing any query token using the index for ``key``.
+
+        Args:
+            key (Optional[Hashable]): Identifies the discussion and scope. None
+                searches with a throwaway index.
+            documents (Sequence[str]): The document texts, in order.
+            query (str): The query string.
+            max_hits (int): The maximum number of matches to return; 0 returns all.
+
+        Returns:
+            List[int]: The indices of the matching documents, in document order.
+        """
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+        with self._cache_lock:
+            index = self._prepare(key, list(documents))
+            return index.match_documents(documents, query_tokens, max_hits)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns cache counters.
+
+        Returns:
+            Dict[str, int]: ``hits`` (documents already indexed when searched),
+            ``misses`` (documents tokenized), ``pruned`` (stale documents dropped),
+            and the current ``indexes``, ``documents`` and ``chars``.
+        """
+        with self._cache_lock:
+            return {"hits": self._hits, "misses": self._misses, "pruned": self._pruned,
+                    "indexes": len(self._indexes),
+                    "documents": sum(len(index) for index in self._indexes.values()),
+                    "chars": sum(index.chars for index in self._indexes.values())}
+
+    def clear(self) -> None:
+        """
+        Drops every index and resets the counters. Intended for test isolation.
+        """
+        with self._cache_lock:
+            self._indexes.clear()
+            self._hits = 0
+            self._misses = 0
+            self._pruned = 0
+
+
+# Global singleton instance
+keyword_index_cache = KeywordIndexCache()
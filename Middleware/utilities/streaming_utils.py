@@ -3,12 +3,18 @@
 import logging
 import re
 import time
-from typing import Any, Dict, Generator
+from typing import Any, Dict, Generator, List, Optional
 
 from Middleware.utilities.sensitive_logging_utils import sensitive_log
 
 logger = logging.getLogger(__name__)
 
+# Most characters of suppressed think-block text StreamingThinkRemover keeps
+# for the unterminated-block flush (about 64k tokens). A model that never
+# closes its think block usually ends by answering, so the tail is what
+# matters; anything earlier is dropped to keep memory flat on long reasoning.
+MAX_UNTERMINATED_FLUSH_CHARS = 256 * 1024
+
 
 def stream_static_content(content: str) -> Generator[Dict[str, Any], None, None]:
     """
@@ -49,6 +55,14 @@ def stream_static_content(content: str) -> Generator[Dict[str, Any], None, None]
 class StreamingThinkRemover:
     """
     A stateful class to remove "thinking" blocks from a streaming LLM response.
+
+    Work per delta is proportional to the delta, not to the text seen so far:
+    while suppressing a think block, the closing tag is searched for only in the
+    new delta plus the last ``len(endThinkTag) - 1`` characters before it (the
+    most a split tag can leave behind). Suppressed text is discarded except for
+    a tail of at most MAX_UNTERMINATED_FLUSH_CHARS characters, which is only
+    joined if the stream ends without a closing tag and has to be flushed, so
+    memory stays bounded however long the thinking phase runs.
     """
 
     def __init__(self, endpoint_config: Dict):
@@ -79,11 +93,19 @@ class StreamingThinkRemover:
                 self.open_tag_re = re.compile(re.escape(self.start_think_tag), re.IGNORECASE)
                 self.close_tag_re = re.compile(re.escape(self.end_think_tag), re.IGNORECASE)
 
+        # Text before a think block that is held while the opening tag may still appear.
         self._buffer = ""
         self._in_think_block = False
         self._opening_tag_check_complete = False
         self._thinking_handled = False
         self._consumed_open_tag = ""
+        # The tail of the text suppressed so far, kept only for the
+        # unterminated-block flush, and how many characters it holds.
+        self._suppressed: List[str] = []
+        self._suppressed_chars = 0
+        self._suppressed_truncated = False
+        # The end of the suppressed text that could be the start of a split closing tag.
+        self._close_tag_tail = ""
 
     def process_delta(self, delta: str) -> str:
         """
@@ -98,9 +120,6 @@ class StreamingThinkRemover:
         if not self.remove_thinking:
             return delta
 
-        self._buffer += delta
-        content_to_yield = ""
-
         # State machine with two modes:
         # - expectOnlyClosing: assumes the response begins inside a think block (no opening
         #   tag will appear); discard everything until the closing tag is found, then yield
@@ -116,70 +135,132 @@ class StreamingThinkRemover:
         #   non-streaming remove_thinking_from_text regardless of chunking.
         if self.expect_only_closing:
             if self._thinking_handled:
-                content_to_yield = self._buffer
+                return delta
+            remainder = self._scan_for_closing_tag(delta)
+            if remainder is None:
+                return ""
+            logger.debug("Closing tag found in 'expectOnlyClosing' mode. Discarding preceding content.")
+            self._thinking_handled = True
+            return remainder
+
+        if self._in_think_block:
+            return self._continue_think_block(delta)
+
+        if self._opening_tag_check_complete:
+            return delta
+
+        self._buffer += delta
+        match = self.open_tag_re.search(self._buffer)
+        if match:
+            if match.start() <= self.opening_tag_window:  # type: ignore
+                logger.debug("Opening think tag found within grace period. Entering think block.")
+                content_to_yield = self._buffer[:match.start()]  # type: ignore
+                after_tag = self._buffer[match.end():]  # type: ignore
+                self._in_think_block = True
+                self._consumed_open_tag = match.group(0)  # type: ignore
                 self._buffer = ""
-            else:
-                match = self.close_tag_re.search(self._buffer)
-                if match:
-                    logger.debug("Closing tag found in 'expectOnlyClosing' mode. Discarding preceding content.")
-                    self._thinking_handled = True
-                    content_to_yield = self._buffer[match.end():]  # type: ignore
-                    self._buffer = ""
+                return content_to_yield + self._continue_think_block(after_tag)
+
+            logger.debug("Opening tag found but it's outside the grace period. Disabling further checks.")
+        elif len(self._buffer) >= self.opening_tag_window + len(self.start_think_tag):
+            # A qualifying tag must start at index <= opening_tag_window, so it is
+            # fully contained once the buffer reaches window + len(tag) characters.
+            # Giving up any earlier would let chunk boundaries split a qualifying
+            # tag across the window edge and change the outcome.
+            logger.debug(f"Grace period of {self.opening_tag_window} chars exceeded without finding opening tag.")
         else:
-            while True:
-                original_buffer = self._buffer
-                if self._in_think_block:
-                    match = self.close_tag_re.search(self._buffer)
-                    if match:
-                        logger.debug("Closing think tag found. Resuming normal stream output.")
-                        self._in_think_block = False
-                        self._consumed_open_tag = ""
-                        # Only one think block is ever removed; disable further tag checks
-                        # so later tags pass through, matching remove_thinking_from_text.
-                        self._opening_tag_check_complete = True
-                        self._buffer = self._buffer[match.end():]  # type: ignore
-                    else:
-                        break
-                else:
-                    if self._opening_tag_check_complete:
-                        content_to_yield += self._buffer
-                        self._buffer = ""
-                        break
-
-                    match = self.open_tag_re.search(self._buffer)
-                    if match:
-                        if not self._opening_tag_check_complete and match.start() <= self.opening_tag_window:  # type: ignore
-                            logger.debug("Opening think tag found within grace period. Entering think block.")
-                            content_to_yield += self._buffer[:match.start()]  # type: ignore
-                            self._in_think_block = True
-                            self._consumed_open_tag = match.group(0)  # type: ignore
-                            self._buffer = self._buffer[match.end():]  # type: ignore
-                        else:
-                            logger.debug(
-                                "Opening tag found but it's outside the grace period. Disabling further checks.")
-                            self._opening_tag_check_complete = True
-                            content_to_yield += self._buffer
-                            self._buffer = ""
-                            break
-                    elif (len(self._buffer) >= self.opening_tag_window + len(self.start_think_tag)
-                          and not self._opening_tag_check_complete):
-                        # A qualifying tag must start at index <= opening_tag_window, so it is
-                        # fully contained once the buffer reaches window + len(tag) characters.
-                        # Giving up any earlier would let chunk boundaries split a qualifying
-                        # tag across the window edge and change the outcome.
-                        logger.debug(
-                            f"Grace period of {self.opening_tag_window} chars exceeded without finding opening tag.")
-                        self._opening_tag_check_complete = True
-                        content_to_yield += self._buffer
-                        self._buffer = ""
-                        break
-                    else:
-                        break
-
-                if self._buffer == original_buffer:
-                    break
+            return ""
+
+        self._opening_tag_check_complete = True
+        content_to_yield = self._buffer
+        self._buffer = ""
         return content_to_yield
 
+    def _continue_think_block(self, text: str) -> str:
+        """
+        Feeds text that arrived inside the think block, leaving the block at its closing tag.
+
+        Args:
+            text (str): The text received while inside the think block.
+
+        Returns:
+            str: The text after the closing tag, or an empty string while the block is still open.
+        """
+        remainder = self._scan_for_closing_tag(text)
+        if remainder is None:
+            return ""
+        logger.debug("Closing think tag found. Resuming normal stream output.")
+        self._in_think_block = False
+        self._consumed_open_tag = ""
+        # Only one think block is ever removed; disable further tag checks
+        # so later tags pass through, matching remove_thinking_from_text.
+        self._opening_tag_check_complete = True
+        return remainder
+
+    def _scan_for_closing_tag(self, text: str) -> Optional[str]:
+        """
+        Looks for the closing tag in newly suppressed text.
+
+        The search covers only the text plus the retained tail of earlier
+        suppressed text, which is enough to catch a tag split across deltas
+        because a case-insensitive match of an escaped tag is always exactly
+        ``len(endThinkTag)`` characters long.
+
+        Args:
+            text (str): The newly received text inside the think block.
+
+        Returns:
+            Optional[str]: The text after the closing tag, or None if it has not
+            appeared yet (the text is then recorded as suppressed).
+        """
+        window = self._close_tag_tail + text
+        match = self.close_tag_re.search(window)
+        if match is None:
+            if text:
+                self._keep_suppressed(text)
+            overlap = len(self.end_think_tag) - 1
+            self._close_tag_tail = window[-overlap:] if overlap else ""
+            return None
+        self._suppressed = []
+        self._suppressed_chars = 0
+        self._suppressed_truncated = False
+        self._close_tag_tail = ""
+        return window[match.end():]  # type: ignore
+
+    def _keep_suppressed(self, text: str) -> None:
+        """
+        Records suppressed text, dropping all but the last MAX_UNTERMINATED_FLUSH_CHARS.
+
+        The retained deltas are compacted only once they reach twice the limit,
+        so trimming costs amortized constant time per character.
+
+        Args:
+            text (str): The newly suppressed text.
+        """
+        self._suppressed.append(text)
+        self._suppressed_chars += len(text)
+        if self._suppressed_chars > 2 * MAX_UNTERMINATED_FLUSH_CHARS:
+            tail = "".join(self._suppressed)[-MAX_UNTERMINATED_FLUSH_CHARS:]
+            self._suppressed = [tail]
+            self._suppressed_chars = len(tail)
+            self._suppressed_truncated = True
+
+    def _flush_suppressed(self) -> str:
+        """
+        Returns the retained suppressed text for an unterminated block.
+
+        Returns:
+            str: All suppressed text, or only its last MAX_UNTERMINATED_FLUSH_CHARS
+            characters if more than that was suppressed.
+        """
+        flushed = "".join(self._suppressed)
+        if self._suppressed_truncated or len(flushed) > MAX_UNTERMINATED_FLUSH_CHARS:
+            logger.warning(f"Unterminated think block exceeded {MAX_UNTERMINATED_FLUSH_CHARS} characters; "
+                           f"flushing only its last {MAX_UNTERMINATED_FLUSH_CHARS}.")
+            self._suppressed_truncated = True
+            return flushed[-MAX_UNTERMINATED_FLUSH_CHARS:]
+        return flushed
+
     def finalize(self) -> str:
         """
         Finalizes the stream, processing any remaining buffered text.
@@ -196,16 +277,13 @@ class StreamingThinkRemover:
         if self.expect_only_closing and not self._thinking_handled:
             logger.warning(
                 "Finalizing stream in 'expectOnlyClosing' mode without ever finding a closing tag. Returning buffered content.")
-            return self._buffer
+            return self._flush_suppressed()
 
         if self._in_think_block:
-            match = self.close_tag_re.search(self._buffer)
-            if match:
-                logger.debug("Found and processed closing tag during finalization.")
-                return self._buffer[match.end():]
-
             logger.warning("Finalizing stream while in an unterminated think block. Flushing buffer as-is.")
-            return self._consumed_open_tag + self._buffer
+            flushed = self._flush_suppressed()
+            # A truncated tail no longer follows the opening tag, so the tag is not restored.
+            return flushed if self._suppressed_truncated else self._consumed_open_tag + flushed
 
         return self._buffer
 
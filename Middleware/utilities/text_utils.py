@@ -2,10 +2,20 @@
 
 import logging
 import re
-from typing import List, Dict
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Texts at least this long have their word counts memoized. Shorter texts are
+# cheaper to split again than to look up.
+MIN_MEMOIZED_TEXT_CHARS = 256
+
+# Upper bound on memoized word counts.
+MAX_MEMOIZED_WORD_COUNTS = 8192
+
 # Lower-cased key names whose values redact_sensitive_data() masks in log output.
 _SENSITIVE_KEYS = frozenset({
     'apikey', 'api_key',
@@ -56,9 +66,11 @@ def rough_estimate_token_length(text: str, safety_margin: float = 1.10) -> int:
     Returns:
         int: The estimated token length.
     """
-    words = text.split()
-    word_count = len(words)
     char_count = len(text)
+    if char_count >= MIN_MEMOIZED_TEXT_CHARS:
+        word_count = word_count_memo.count(text)
+    else:
+        word_count = len(text.split())
 
     tokens_word_est = word_count * 1.35
     tokens_char_est = char_count / 3.5
@@ -66,6 +78,123 @@ def rough_estimate_token_length(text: str, safety_margin: float = 1.10) -> int:
     return int(max(tokens_word_est, tokens_char_est) * safety_margin)
 
 
+@lru_cache(maxsize=1024)
+def _estimate_single_word_tokens(char_count: int) -> int:
+    """Returns rough_estimate_token_length() for a single word of a given length.
+
+    A lone word's estimate depends only on its length, so the per-word loops in
+    reduce_text_to_token_limit and split_into_tokenized_chunks look it up by
+    length instead of re-running the full estimator on every word.
+
+    Args:
+        char_count (int): The word's length in characters, including any
+            trailing space the caller counts.
+
+    Returns:
+        int: The estimated token length.
+    """
+    return int(max(1.35, char_count / 3.5) * 1.10)
+
+
+class WordCountMemo:
+    """
+    A thread-safe, process-wide LRU memo of word counts by text.
+
+    Token estimates are taken for the same texts over and over: every message
+    of the conversation on every request, by the chunker, the context clamp,
+    the compactor and the memory tools. Counting words means splitting the text
+    into a list of new strings, so for long messages the memo replaces that
+    allocation with a dict lookup. Keying on the text's content keeps it
+    correct when content is rewritten in place. The key is the text's hash
+    and length rather than the text, so the memo keeps no conversation text
+    alive after a request.
+
+    Each request parses fresh strings, so every lookup pays one O(n) hash();
+    that is still far cheaper than split(). benchmarks/word_count_memo_benchmark.py
+    measures 1.0 ms against 5.2 ms per request for 500 re-parsed ~1 KB
+    messages (2.2x at ~400 characters, 12x at ~4.5 KB). A hash collision can
+    only skew one token estimate, which already carries a safety margin;
+    nothing derived from it is persisted.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of WordCountMemo exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(WordCountMemo, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the count map and counters.
+        """
+        if self._initialized:
+            return
+
+        # (hash(text), len(text)) -> word count, least recently used first
+        self._counts: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._memo_lock = threading.Lock()
+        self._initialized = True
+
+    def count(self, text: str) -> int:
+        """
+        Returns the number of whitespace-separated words in text.
+
+        Args:
+            text (str): The text to count.
+
+        Returns:
+            int: ``len(text.split())``, computed only on a miss.
+        """
+        key = (hash(text), len(text))
+        with self._memo_lock:
+            cached = self._counts.get(key)
+            if cached is not None:
+                self._counts.move_to_end(key)
+                self._hits += 1
+                return cached
+            self._misses += 1
+
+        computed = len(text.split())
+        with self._memo_lock:
+            self._counts[key] = computed
+            while len(self._counts) > MAX_MEMOIZED_WORD_COUNTS:
+                self._counts.popitem(last=False)
+        return computed
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns memo counters.
+
+        Returns:
+            Dict[str, int]: ``hits``, ``misses``, and current ``entries``.
+        """
+        with self._memo_lock:
+            return {"hits": self._hits, "misses": self._misses, "entries": len(self._counts)}
+
+    def clear(self) -> None:
+        """
+        Drops every memoized count and resets the counters. Intended for test isolation.
+        """
+        with self._memo_lock:
+            self._counts.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+# Global singleton instance
+word_count_memo = WordCountMemo()
+
+
 def reduce_text_to_token_limit(text: str, num_tokens: int) -> str:
     """Reduces text from the end to fit within a token limit.
 
@@ -87,8 +216,7 @@ def reduce_text_to_token_limit(text: str, num_tokens: int) -> str:
     start_index = 0
 
     for i in range(len(words) - 1, -1, -1):
-        word = words[i]
-        cumulative_tokens += rough_estimate_token_length(word + ' ')
+        cumulative_tokens += _estimate_single_word_tokens(len(words[i]) + 1)
         if cumulative_tokens > num_tokens:
             start_index = i + 1
             break
@@ -116,7 +244,7 @@ def split_into_tokenized_chunks(text: str, chunk_size: int) -> List[str]:
     current_chunk_size = 0
 
     for word in words:
-        word_size = rough_estimate_token_length(word)
+        word_size = _estimate_single_word_tokens(len(word))
         if current_chunk_size + word_size > chunk_size:
             chunks.append(' '.join(current_chunk))
             current_chunk = []
@@ -212,6 +340,46 @@ def messages_to_text_block(messages: List[Dict[str, str]]) -> str:
     return chunk
 
 
+def _select_lookback_messages(messages: List[Dict[str, str]], lookbackStartTurn: int) -> List[Dict[str, str]]:
+    """
+    Selects the messages a lookback-based conversation search covers.
+
+    Args:
+        messages (List[Dict[str, str]]): The list of message dictionaries for the discussion.
+        lookbackStartTurn (int): The number of turns to look back in the conversation.
+            A value of 0 uses all messages except the last one.
+
+    Returns:
+        List[Dict[str, str]]: The selected messages.
+    """
+    if lookbackStartTurn > 0:
+        return messages[-lookbackStartTurn:]
+    elif len(messages) > 1:
+        return messages[:-1]
+    return []
+
+
+def get_message_chunk_groups(messages: List[Dict[str, str]], lookbackStartTurn: int, chunk_size: int) -> \
+        List[List[Dict[str, str]]]:
+    """
+    Groups the conversation into chunks of a specified size without rendering them.
+
+    Callers that work per message (such as the keyword index) use the groups
+    directly; ``messages_to_text_block`` renders a group into the text block
+    ``get_message_chunks`` returns for it.
+
+    Args:
+        messages (List[Dict[str, str]]): The list of message dictionaries for the discussion.
+        lookbackStartTurn (int): The number of turns to look back in the conversation.
+            A value of 0 uses all messages except the last one.
+        chunk_size (int): The maximum size of each chunk in tokens.
+
+    Returns:
+        List[List[Dict[str, str]]]: The messages of each chunk, oldest chunk first.
+    """
+    return chunk_messages_by_token_size(_select_lookback_messages(messages, lookbackStartTurn), chunk_size)
+
+
 def get_message_chunks(messages: List[Dict[str, str]], lookbackStartTurn: int, chunk_size: int) -> List[str]:
     """
     Break down the conversation into chunks of a specified size for processing.
@@ -225,14 +393,8 @@ def get_message_chunks(messages: List[Dict[str, str]], lookbackStartTurn: int, c
     Returns:
         List[str]: The list of message chunks as formatted text blocks.
     """
-    if lookbackStartTurn > 0:
-        pairs = messages[-lookbackStartTurn:]
-    elif len(messages) > 1:
-        pairs = messages[:-1]
-    else:
-        pairs = []
-
-    return messages_into_chunked_text_of_token_size(pairs, chunk_size)
+    return messages_into_chunked_text_of_token_size(_select_lookback_messages(messages, lookbackStartTurn),
+                                                    chunk_size)
 
 
 def clear_out_user_assistant_from_chunks(search_result_chunks):
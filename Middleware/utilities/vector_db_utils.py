@@ -5,15 +5,44 @@ import logging
 import math
 import os
 import sqlite3
-from typing import List, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
-from Middleware.utilities import config_utils
+from Middleware.utilities import config_utils, vector_index_utils
+from Middleware.utilities.embedding_matrix_cache import NUMPY_AVAILABLE, embedding_matrix_cache
 
 logger = logging.getLogger(__name__)
 
 # This prevents exceeding SQLite's expression depth limit (SQLITE_LIMIT_EXPR_DEPTH).
 MAX_KEYWORDS_FOR_SEARCH = 60
 
+# Upper bound on idle pooled connections across all discussion databases. A
+# single memory node issues several queries against one discussion, so even a
+# small pool turns nearly every open into a reuse; the least recently used
+# idle connection is closed first when the bound is reached.
+MAX_IDLE_CONNECTIONS = 16
+
+# Seconds an idle pooled connection is kept before it is closed. Long enough
+# to span the queries of one workflow run, short enough that an idle
+# discussion's database file is not held open (which on Windows would block
+# deleting or moving the discussion folder).
+IDLE_CONNECTION_TTL_SECONDS = 60
+
+# Connection tuning applied once when a pooled connection is opened. WAL lets
+# readers proceed while a memory is being written and, with synchronous=NORMAL,
+# makes each commit a sequential log append rather than a full sync; a crash
+# can lose at most the last commit, never corrupt the file. cache_size is in
+# KiB when negative (8 MiB here); mmap_size lets reads of the embedding BLOBs
+# come straight from the OS page cache.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-8192",
+    "PRAGMA mmap_size=67108864",
+)
+
 
 def _legacy_vector_db_path(discussion_id: str) -> str:
     """
@@ -85,8 +114,10 @@ def _get_db_path(discussion_id: str, api_key_hash: Optional[str] = None) -> str:
     ``{project_root}/Public/{discussion_id}_vector_memory.db`` and then the
     cwd-relative ``{cwd}/Public/{discussion_id}_vector_memory.db`` (these
     coincide only when the process was launched from the project root). No
-    automatic migration is performed; to migrate, a user can move the file
-    into the discussion folder manually.
+    automatic migration is performed; to migrate, stop the server and move the
+    file into the discussion folder manually. Because pooled connections use
+    WAL journaling, recent writes may still sit in the ``-wal`` sidecar next
+    to the file, so move any ``-wal`` and ``-shm`` files along with it.
 
     Args:
         discussion_id (str): The unique identifier for the discussion.
@@ -114,7 +145,8 @@ def _get_db_path(discussion_id: str, api_key_hash: Optional[str] = None) -> str:
         project_root_legacy = _legacy_vector_db_path(discussion_id)
         if os.path.exists(project_root_legacy):
             logger.info(
-                "Using legacy vector memory database at '%s'. Move the file to '%s' to migrate.",
+                "Using legacy vector memory database at '%s'. To migrate, stop the server and move the file "
+                "(with any -wal/-shm files beside it) to '%s'.",
                 project_root_legacy,
                 new_path,
             )
@@ -126,7 +158,8 @@ def _get_db_path(discussion_id: str, api_key_hash: Optional[str] = None) -> str:
         cwd_legacy = _legacy_vector_db_path_cwd(discussion_id)
         if os.path.abspath(cwd_legacy) != os.path.abspath(project_root_legacy) and os.path.exists(cwd_legacy):
             logger.info(
-                "Using legacy vector memory database at '%s'. Move the file to '%s' to migrate.",
+                "Using legacy vector memory database at '%s'. To migrate, stop the server and move the file "
+                "(with any -wal/-shm files beside it) to '%s'.",
                 cwd_legacy,
                 new_path,
             )
@@ -176,11 +209,340 @@ def setup_database_functions(connection: sqlite3.Connection, decay_rate: float =
     connection.create_function("recency_score", 1, recency_score, deterministic=False)
 
 
+class _PoolableConnection(sqlite3.Connection):
+    """
+    A sqlite3 connection owned by VectorDbConnectionPool.
+
+    Callers never hold one directly; each checkout is wrapped in its own
+    PooledConnection, and the pool closes the connection for real when it is
+    evicted, expires, or cannot be reused.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool_key: Optional[str] = None
+        self._file_identity: Optional[Tuple[int, int]] = None
+        # Incremented on every checkout; release() only accepts the current one.
+        self._lease_generation = 0
+        self._leased = False
+
+
+class PooledConnection:
+    """
+    One caller's lease on a pooled sqlite3 connection.
+
+    Callers keep the usual ``conn = get_db_connection(...)`` ...
+    ``conn.close()`` pattern; everything else is forwarded to the underlying
+    connection. ``close()`` hands the connection back to VectorDbConnectionPool
+    instead of closing it. Every checkout gets its own lease, so closing a
+    lease again is a no-op even after its connection was lent to another
+    caller, and using a closed lease raises ``sqlite3.ProgrammingError`` just
+    as a closed connection does.
+    """
+
+    __slots__ = ("_connection", "_generation")
+
+    def __init__(self, connection: _PoolableConnection, generation: int):
+        object.__setattr__(self, "_connection", connection)
+        object.__setattr__(self, "_generation", generation)
+
+    def _live_connection(self) -> _PoolableConnection:
+        """Returns the leased connection, or raises if this lease was closed."""
+        connection = self._connection
+        if connection is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return connection
+
+    def __getattr__(self, name):
+        return getattr(self._live_connection(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._live_connection(), name, value)
+
+    def __enter__(self):
+        self._live_connection().__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._live_connection().__exit__(exc_type, exc_value, traceback)
+
+    def close(self):
+        """Returns the connection to the pool; later calls do nothing."""
+        connection = self._connection
+        if connection is None:
+            return
+        object.__setattr__(self, "_connection", None)
+        vector_db_connection_pool.release(connection, self._generation)
+
+
+def _file_identity(db_path: str) -> Optional[Tuple[int, int]]:
+    """
+    Returns the (device, inode) of a database file, or None if it cannot be stat'ed.
+
+    Args:
+        db_path (str): The database file path.
+
+    Returns:
+        Optional[Tuple[int, int]]: The file's identity, or None.
+    """
+    try:
+        st = os.stat(db_path)
+    except (OSError, ValueError):
+        return None
+    return st.st_dev, st.st_ino
+
+
+def _is_poolable(db_path: str) -> bool:
+    """
+    Returns True if connections to db_path may be reused.
+
+    A plain ``:memory:`` (or empty) path opens a new private database on every
+    connect, so sharing one connection would change what callers observe.
+
+    Args:
+        db_path (str): The database path or URI.
+
+    Returns:
+        bool: True for files and ``file:`` URIs.
+    """
+    return db_path not in ("", ":memory:")
+
+
+def _open_connection(db_path: str, pooled: bool) -> sqlite3.Connection:
+    """
+    Opens and prepares a connection: row factory, recency_score, and (pooled) pragmas.
+
+    Args:
+        db_path (str): The database path or ``file:`` URI.
+        pooled (bool): If True, open a _PoolableConnection and apply _CONNECTION_PRAGMAS.
+
+    Returns:
+        sqlite3.Connection: The prepared connection.
+
+    Raises:
+        sqlite3.Error: If the database cannot be opened.
+    """
+    is_uri = db_path.startswith("file:")
+    if pooled:
+        conn = sqlite3.connect(db_path, check_same_thread=False, uri=is_uri, factory=_PoolableConnection)
+    else:
+        conn = sqlite3.connect(db_path, check_same_thread=False, uri=is_uri)
+    conn.row_factory = sqlite3.Row
+    setup_database_functions(conn)
+    if pooled:
+        for pragma in _CONNECTION_PRAGMAS:
+            try:
+                conn.execute(pragma)
+            except sqlite3.Error as e:
+                # Tuning only; e.g. some network filesystems refuse WAL.
+                logger.debug(f"Could not apply '{pragma}' to {db_path}: {e}")
+    return conn
+
+
+class VectorDbConnectionPool:
+    """
+    A thread-safe, process-wide pool of open vector memory database connections.
+
+    Connections are keyed by database path and leased exclusively: a connection
+    is only ever used by the one caller that acquired it until that caller
+    closes its lease, so the pool is as safe across threads and greenlets as
+    opening a connection per call was. Reuse keeps the recency_score registration, the
+    pragmas, and sqlite3's per-connection prepared statement cache alive across
+    calls instead of rebuilding them every time.
+
+    Before an idle connection is reused, its database file is re-stat'ed; if the
+    file was deleted or replaced since the connection was opened, the stale
+    connection is closed and a fresh one opened, so a pooled connection never
+    writes into an unlinked file.
+
+    Connections are opened in WAL mode, so a database's latest commits may live
+    in its ``-wal`` and ``-shm`` sidecar files until a checkpoint. Moving or
+    copying a database (for example, migrating a legacy file into the
+    discussion folder) must therefore be done with the server stopped, or with
+    the sidecar files moved alongside it; moving the ``.db`` file alone can
+    lose recent memories.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of VectorDbConnectionPool exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(VectorDbConnectionPool, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the idle map and counters.
+        """
+        if self._initialized:
+            return
+
+        # (id(conn)) -> (conn, parked_at); ordered oldest-parked first for LRU eviction.
+        self._idle: "OrderedDict[int, Tuple[_PoolableConnection, float]]" = OrderedDict()
+        self._stats: Dict[str, int] = {"opened": 0, "reused": 0, "discarded": 0, "evicted": 0}
+        self._pool_lock = threading.Lock()
+        self._initialized = True
+
+    def acquire(self, db_path: str) -> sqlite3.Connection:
+        """
+        Leases a connection to db_path, reusing an idle one when possible.
+
+        Args:
+            db_path (str): The database path or ``file:`` URI.
+
+        Returns:
+            sqlite3.Connection: A connection owned by the caller until it calls
+            ``close()``; for pooled paths, a PooledConnection lease.
+
+        Raises:
+            sqlite3.Error: If a new connection cannot be opened.
+        """
+        if not _is_poolable(db_path):
+            return _open_connection(db_path, pooled=False)
+
+        is_uri = db_path.startswith("file:")
+        stale = []
+        conn = None
+        with self._pool_lock:
+            stale.extend(self._prune_expired_locked())
+            for key in reversed(self._idle):
+                candidate, _ = self._idle[key]
+                if candidate._pool_key == db_path:
+                    del self._idle[key]
+                    conn = candidate
+                    break
+        if conn is not None and not is_uri and _file_identity(db_path) != conn._file_identity:
+            stale.append(conn)
+            conn = None
+            with self._pool_lock:
+                self._stats["discarded"] += 1
+        self._close_all(stale)
+
+        if conn is not None:
+            with self._pool_lock:
+                self._stats["reused"] += 1
+        else:
+            conn = _open_connection(db_path, pooled=True)
+            conn._pool_key = db_path
+            conn._file_identity = None if is_uri else _file_identity(db_path)
+            with self._pool_lock:
+                self._stats["opened"] += 1
+        with self._pool_lock:
+            conn._lease_generation += 1
+            conn._leased = True
+            generation = conn._lease_generation
+        return PooledConnection(conn, generation)
+
+    def release(self, conn: _PoolableConnection, generation: int) -> None:
+        """
+        Takes a leased connection back, rolling back anything left uncommitted.
+
+        A release for any lease other than the connection's current one is
+        ignored, so a stale ``close()`` can never return a connection that
+        another caller is still using.
+
+        Args:
+            conn (_PoolableConnection): The connection being returned.
+            generation (int): The lease generation handed out by ``acquire``.
+        """
+        with self._pool_lock:
+            if not conn._leased or conn._lease_generation != generation:
+                return
+            conn._leased = False
+        try:
+            if conn.in_transaction:
+                # Closing a connection discards an open transaction; a parked
+                # connection must behave the same for the next borrower.
+                conn.rollback()
+        except sqlite3.Error:
+            with self._pool_lock:
+                self._stats["discarded"] += 1
+            self._close_all([conn])
+            return
+
+        with self._pool_lock:
+            self._idle[id(conn)] = (conn, time.monotonic())
+            surplus = self._prune_expired_locked()
+            while len(self._idle) > MAX_IDLE_CONNECTIONS:
+                _, (oldest, _) = self._idle.popitem(last=False)
+                surplus.append(oldest)
+                self._stats["evicted"] += 1
+        self._close_all(surplus)
+
+    def _prune_expired_locked(self) -> List[_PoolableConnection]:
+        """
+        Removes idle connections older than the TTL. Caller must hold _pool_lock.
+
+        Returns:
+            List[_PoolableConnection]: The removed connections, to be closed outside the lock.
+        """
+        cutoff = time.monotonic() - IDLE_CONNECTION_TTL_SECONDS
+        expired = []
+        while self._idle:
+            key, (conn, parked_at) = next(iter(self._idle.items()))
+            if parked_at > cutoff:
+                break
+            del self._idle[key]
+            expired.append(conn)
+            self._stats["evicted"] += 1
+        return expired
+
+    @staticmethod
+    def _close_all(connections: List[_PoolableConnection]) -> None:
+        """
+        Closes connections for real, ignoring errors.
+
+        Args:
+            connections (List[_PoolableConnection]): The connections to close.
+        """
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns pool counters.
+
+        Returns:
+            Dict[str, int]: ``opened``, ``reused``, ``discarded`` (stale or broken
+            connections dropped), ``evicted`` (closed for age or the idle bound),
+            and current ``idle``.
+        """
+        with self._pool_lock:
+            return {**self._stats, "idle": len(self._idle)}
+
+    def clear(self) -> None:
+        """
+        Closes every idle connection and resets the counters. Intended for test isolation.
+        """
+        with self._pool_lock:
+            idle = [conn for conn, _ in self._idle.values()]
+            self._idle.clear()
+            self._stats = {"opened": 0, "reused": 0, "discarded": 0, "evicted": 0}
+        self._close_all(idle)
+
+
+# Global singleton instance
+vector_db_connection_pool = VectorDbConnectionPool()
+
+
 def get_db_connection(discussion_id: str, api_key_hash: Optional[str] = None) -> Optional[sqlite3.Connection]:
     """
-    Establishes a connection to a discussion-specific SQLite database.
+    Leases a connection to a discussion-specific SQLite database from the pool.
     Handles both standard file paths and SQLite URIs (e.g., for testing).
 
+    Calling ``close()`` on the returned connection hands it back to the pool;
+    each call returns a fresh lease, so closing one twice is harmless.
+
     Args:
         discussion_id (str): The unique identifier for the discussion.
         api_key_hash (str, optional): A 16-char hex hash of the API key for
@@ -191,13 +553,9 @@ def get_db_connection(discussion_id: str, api_key_hash: Optional[str] = None) ->
         Optional[sqlite3.Connection]: A database connection object if successful, otherwise None.
     """
     db_path = _get_db_path(discussion_id, api_key_hash=api_key_hash)
-    is_uri = db_path.startswith("file:")
 
     try:
-        conn = sqlite3.connect(db_path, check_same_thread=False, uri=is_uri)
-        conn.row_factory = sqlite3.Row
-        setup_database_functions(conn)
-        return conn
+        return vector_db_connection_pool.acquire(db_path)
     except sqlite3.Error as e:
         logger.error(f"Database connection error for {discussion_id} at path {db_path}: {e}")
         return None
@@ -537,13 +895,26 @@ def add_embeddings_to_db(discussion_id: str, embeddings: List[tuple], model: str
         logger.error(f"Failed to add embeddings for '{discussion_id}': Could not connect to database.")
         return 0
 
+    cache_key = (discussion_id, api_key_hash, model)
     try:
         # Each float32 is 4 bytes.
         rows = [(memory_id, model, len(blob) // 4, blob) for memory_id, blob in embeddings]
+        # When a search matrix for this model is cached, read the table signature
+        # before and after the write inside one transaction, so the new rows can
+        # be folded into the matrix without another writer slipping in between.
+        track_matrix = NUMPY_AVAILABLE and embedding_matrix_cache.contains(cache_key)
+        if track_matrix:
+            conn.execute('BEGIN IMMEDIATE')
+            signature_before = _embedding_signature(conn, model)
         conn.executemany(
             'INSERT OR REPLACE INTO memory_embeddings (memory_id, model, dim, vector) VALUES (?, ?, ?, ?)',
             rows)
+        if track_matrix:
+            signature_after = _embedding_signature(conn, model)
         conn.commit()
+        if track_matrix:
+            embedding_matrix_cache.apply_write(cache_key, signature_before, signature_after, embeddings)
+        _update_ann_index(conn, model, embeddings)
         logger.debug(f"Stored {len(rows)} embedding(s) for discussion {discussion_id} (model '{model}').")
         return len(rows)
     except Exception as e:
@@ -587,6 +958,185 @@ def get_all_embeddings(discussion_id: str, model: str,
             conn.close()
 
 
+def _embedding_signature(conn: sqlite3.Connection, model: str) -> Tuple[int, int, int]:
+    """
+    Reads a cheap fingerprint of one model's stored embeddings.
+
+    INSERT OR REPLACE gives a replaced row a new rowid, so the row count with
+    the max and sum of the rowids changes on every insert, replacement, and
+    delete, while only touching the primary-key index rather than the blobs.
+
+    Args:
+        conn (sqlite3.Connection): An open connection.
+        model (str): The embedding model name.
+
+    Returns:
+        Tuple[int, int, int]: (row count, max rowid, rowid sum).
+    """
+    row = conn.execute(
+        'SELECT COUNT(*), COALESCE(MAX(rowid), 0), COALESCE(SUM(rowid), 0) '
+        'FROM memory_embeddings WHERE model = ?', (model,)).fetchone()
+    return tuple(row)
+
+
+def get_embedding_signature(discussion_id: str, model: str,
+                            api_key_hash: Optional[str] = None) -> Optional[Tuple[int, int, int]]:
+    """
+    Returns the signature of one model's stored embeddings.
+
+    Used to decide whether a cached search matrix (see embedding_matrix_cache)
+    still matches the database.
+
+    Args:
+        discussion_id (str): The identifier for the discussion.
+        model (str): The embedding model name.
+        api_key_hash (str, optional): A 16-char hex hash of the API key for
+            per-user directory isolation.
+
+    Returns:
+        Optional[Tuple[int, int, int]]: The signature, or None if it could not be read.
+    """
+    conn = get_db_connection(discussion_id, api_key_hash=api_key_hash)
+    if conn is None:
+        return None
+
+    try:
+        return _embedding_signature(conn, model)
+    except Exception as e:
+        logger.error(f"Failed to read embedding signature for '{discussion_id}': {e}", exc_info=True)
+        return None
+    finally:
+        if conn:
+            conn.close()
+
+
+def _ann_index_path(conn: sqlite3.Connection) -> Optional[str]:
+    """
+    Returns the sidecar ANN index path for the database a connection is open on.
+
+    Args:
+        conn (sqlite3.Connection): An open connection.
+
+    Returns:
+        Optional[str]: The sidecar path, or None for in-memory databases.
+    """
+    row = conn.execute('PRAGMA database_list').fetchone()
+    db_file = row[2] if row is not None else None
+    if not isinstance(db_file, str) or not db_file:
+        return None
+    return vector_index_utils.get_index_path(db_file)
+
+
+def _update_ann_index(conn: sqlite3.Connection, model: str, embeddings: List[tuple]) -> None:
+    """
+    Assigns freshly written embeddings into the discussion's ANN index, if one exists.
+
+    Best-effort: a failure leaves the index with fewer vectors than the table,
+    which get_ann_candidate_ids detects and answers with exact search.
+
+    Args:
+        conn (sqlite3.Connection): The connection the embeddings were written on.
+        model (str): The embedding model name.
+        embeddings (List[tuple]): The (memory_id, vector_blob) pairs written.
+    """
+    try:
+        index_path = _ann_index_path(conn)
+        if index_path and os.path.exists(index_path):
+            vector_index_utils.add_to_ivf_index(index_path, model, embeddings)
+    except Exception as e:
+        logger.warning(f"Failed to update the ANN index for model '{model}': {e}")
+
+
+def get_ann_candidate_ids(discussion_id: str, model: str, query_vector: List[float],
+                          probes: int = vector_index_utils.DEFAULT_IVF_PROBES,
+                          api_key_hash: Optional[str] = None) -> Optional[List[int]]:
+    """
+    Returns approximate nearest-neighbour candidates from the discussion's IVF index.
+
+    The index is only trusted while it covers exactly as many vectors as the
+    embedding table holds for the model; otherwise (no index, an index built
+    for another model, or writes that missed it) None is returned and the
+    caller searches exactly.
+
+    Args:
+        discussion_id (str): The identifier for the discussion.
+        model (str): The embedding model name.
+        query_vector (List[float]): The query embedding.
+        probes (int): How many clusters to search. Higher is slower with better recall.
+        api_key_hash (str, optional): A 16-char hex hash of the API key for
+            per-user directory isolation.
+
+    Returns:
+        Optional[List[int]]: Unranked candidate memory ids, or None when the
+        index cannot be used.
+    """
+    conn = get_db_connection(discussion_id, api_key_hash=api_key_hash)
+    if conn is None:
+        return None
+
+    try:
+        index_path = _ann_index_path(conn)
+        info = vector_index_utils.get_ivf_index_info(index_path, model) if index_path else None
+        if info is None:
+            logger.info(f"No ANN index for model '{model}' in discussion '{discussion_id}'; using exact search. "
+                        f"Build one with Scripts/backfill_embeddings.py --build-index.")
+            return None
+        stored = _embedding_signature(conn, model)[0]
+        if info["count"] != stored:
+            logger.warning(f"ANN index for model '{model}' in discussion '{discussion_id}' covers {info['count']} "
+                           f"of {stored} embeddings; using exact search. Rebuild it with "
+                           f"Scripts/backfill_embeddings.py --build-index.")
+            return None
+        return vector_index_utils.probe_ivf_index(index_path, model, query_vector, probes)
+    except Exception as e:
+        logger.error(f"ANN index lookup failed for '{discussion_id}': {e}", exc_info=True)
+        return None
+    finally:
+        if conn:
+            conn.close()
+
+
+def get_embeddings_by_ids(discussion_id: str, model: str, memory_ids: List[int],
+                          api_key_hash: Optional[str] = None) -> List[tuple]:
+    """
+    Retrieves the stored embedding blobs of specific memories for one model.
+
+    Args:
+        discussion_id (str): The identifier for the discussion.
+        model (str): The embedding model name.
+        memory_ids (List[int]): The memory ids to fetch.
+        api_key_hash (str, optional): A 16-char hex hash of the API key for
+            per-user directory isolation.
+
+    Returns:
+        List[tuple]: (memory_id, vector_blob) pairs for the ids that have one.
+    """
+    if not memory_ids:
+        return []
+
+    conn = get_db_connection(discussion_id, api_key_hash=api_key_hash)
+    if conn is None:
+        return []
+
+    try:
+        pairs = []
+        # Stay well under SQLite's bound-parameter limit (999 on older builds).
+        for start in range(0, len(memory_ids), 500):
+            chunk = memory_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor = conn.execute(
+                f'SELECT memory_id, vector FROM memory_embeddings WHERE model = ? AND memory_id IN ({placeholders})',
+                [model, *chunk])
+            pairs.extend((row['memory_id'], row['vector']) for row in cursor.fetchall())
+        return pairs
+    except Exception as e:
+        logger.error(f"Failed to get embeddings by ids for '{discussion_id}': {e}", exc_info=True)
+        return []
+    finally:
+        if conn:
+            conn.close()
+
+
 def get_memories_without_embeddings(discussion_id: str, model: str, limit: int = 20,
                                     api_key_hash: Optional[str] = None) -> List[sqlite3.Row]:
     """
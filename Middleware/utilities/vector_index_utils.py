@@ -0,0 +1,417 @@
+# /Middleware/utilities/vector_index_utils.py
+"""
+Optional IVF (inverted file) approximate nearest-neighbour index for memory embeddings.
+
+Exact semantic search scores every stored vector. For discussions holding very
+large corpora (100k+ memories) an IVF index makes recall sublinear: vectors are
+clustered around ``nlist`` centroids with spherical k-means, and a search only
+scores the members of the ``probes`` clusters whose centroids are closest to
+the query. More probes means higher recall and more work; ``probes == nlist``
+is an exact search.
+
+The index is derived data kept in a sidecar SQLite file next to the
+discussion's database (``vector_memory.db`` -> ``vector_memory.ann.db``), so it
+can be deleted at any time and rebuilt with ``Scripts/backfill_embeddings.py
+--build-index``. Building (k-means) requires NumPy; probing and incremental
+inserts work with the standard library alone.
+"""
+
+import datetime
+import logging
+import math
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from Middleware.utilities.vector_math_utils import blob_to_vector, cosine_similarity
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Clusters probed per search when a node does not set vectorIndexProbes. With
+# the default sqrt(n) clusters this scores roughly 8 / sqrt(n) of the store
+# (about 2.5% at 100k memories) while keeping recall high for typical
+# embedding models.
+DEFAULT_IVF_PROBES = 8
+
+# k-means is trained on at most this many vectors per cluster; the remaining
+# vectors are only assigned. Training on a sample is standard for IVF and
+# keeps a build over hundreds of thousands of vectors to seconds.
+MAX_TRAINING_VECTORS_PER_LIST = 256
+
+# Rows assigned per matrix product while building, bounding peak memory to
+# roughly this many rows times the cluster count in float32 scores.
+_ASSIGNMENT_CHUNK_ROWS = 8192
+
+_INDEX_SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS ivf_meta (
+           model TEXT PRIMARY KEY,
+           dim INTEGER NOT NULL,
+           nlist INTEGER NOT NULL,
+           trained_count INTEGER NOT NULL,
+           built_at TEXT NOT NULL
+       )''',
+    '''CREATE TABLE IF NOT EXISTS ivf_centroids (
+           model TEXT NOT NULL,
+           list_no INTEGER NOT NULL,
+           vector BLOB NOT NULL,
+           PRIMARY KEY (model, list_no)
+       )''',
+    '''CREATE TABLE IF NOT EXISTS ivf_assignments (
+           model TEXT NOT NULL,
+           memory_id INTEGER NOT NULL,
+           list_no INTEGER NOT NULL,
+           PRIMARY KEY (model, memory_id)
+       )''',
+    'CREATE INDEX IF NOT EXISTS ivf_assignments_by_list ON ivf_assignments (model, list_no)',
+)
+
+# Upper bound on centroid sets kept in memory (one per indexed discussion and
+# model); the least recently used set is dropped first.
+MAX_CACHED_CENTROID_SETS = 64
+
+# (index_path, model) -> (built_at, dim, centroids). Centroids only change on a
+# rebuild, which always writes a new built_at, so the cached copy is checked
+# against the index's built_at on every probe.
+_centroid_cache: "OrderedDict[Tuple[str, str], Tuple[str, int, List]]" = OrderedDict()
+_centroid_cache_lock = threading.Lock()
+
+
+def get_index_path(db_path: str) -> Optional[str]:
+    """
+    Returns the sidecar index path for a vector memory database file.
+
+    Args:
+        db_path (str): The discussion's SQLite database path.
+
+    Returns:
+        Optional[str]: ``<db without extension>.ann.db``, or None for in-memory
+        databases and URIs, which have no directory to hold a sidecar.
+    """
+    if not db_path or db_path == ":memory:" or db_path.startswith("file:"):
+        return None
+    return os.path.splitext(db_path)[0] + ".ann.db"
+
+
+def default_list_count(vector_count: int) -> int:
+    """
+    Returns the conventional IVF cluster count for a store size: about sqrt(n).
+
+    Args:
+        vector_count (int): The number of vectors to index.
+
+    Returns:
+        int: The cluster count (at least 1, at most vector_count).
+    """
+    return max(1, min(vector_count, int(round(math.sqrt(vector_count)))))
+
+
+def _connect(index_path: str) -> sqlite3.Connection:
+    """
+    Opens the sidecar index database, creating its tables if needed.
+
+    Args:
+        index_path (str): The sidecar file.
+
+    Returns:
+        sqlite3.Connection: An open connection.
+    """
+    conn = sqlite3.connect(index_path, check_same_thread=False)
+    for statement in _INDEX_SCHEMA:
+        conn.execute(statement)
+    return conn
+
+
+def build_ivf_index(index_path: str, model: str, id_blob_pairs: Sequence[Tuple[int, bytes]],
+                    list_count: Optional[int] = None, iterations: int = 10, seed: int = 0) -> int:
+    """
+    Trains and writes an IVF index for one model, replacing any previous one.
+
+    Args:
+        index_path (str): The sidecar index file (created if missing).
+        model (str): The embedding model the vectors belong to.
+        id_blob_pairs (Sequence[Tuple[int, bytes]]): Every stored (memory_id, float32 blob).
+        list_count (Optional[int]): The number of clusters; defaults to
+            default_list_count(len(id_blob_pairs)).
+        iterations (int): k-means iterations. Defaults to 10.
+        seed (int): Random seed for centroid initialization and sampling.
+
+    Returns:
+        int: The number of vectors indexed.
+
+    Raises:
+        RuntimeError: If NumPy is not installed.
+        ValueError: If there are no vectors or their dimensions differ.
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("Building an IVF index requires NumPy (pip install numpy).")
+    if not id_blob_pairs:
+        raise ValueError(f"No embeddings stored for model '{model}'; nothing to index.")
+
+    ids = [memory_id for memory_id, _ in id_blob_pairs]
+    try:
+        vectors = np.vstack([np.frombuffer(blob, dtype=np.float32) for _, blob in id_blob_pairs])
+    except ValueError:
+        raise ValueError(f"Stored embeddings for model '{model}' do not all have the same dimension.")
+    vectors = _normalize_rows(vectors)
+    count, dim = vectors.shape
+    nlist = min(count, max(1, list_count or default_list_count(count)))
+
+    rng = np.random.default_rng(seed)
+    training = vectors
+    max_training = nlist * MAX_TRAINING_VECTORS_PER_LIST
+    if count > max_training:
+        training = vectors[rng.choice(count, size=max_training, replace=False)]
+    centroids = _train_centroids(training, nlist, iterations, rng)
+    assignments = _assign(vectors, centroids)
+
+    built_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    conn = _connect(index_path)
+    try:
+        conn.execute('DELETE FROM ivf_meta WHERE model = ?', (model,))
+        conn.execute('DELETE FROM ivf_centroids WHERE model = ?', (model,))
+        conn.execute('DELETE FROM ivf_assignments WHERE model = ?', (model,))
+        conn.execute('INSERT INTO ivf_meta (model, dim, nlist, trained_count, built_at) VALUES (?, ?, ?, ?, ?)',
+                     (model, dim, nlist, count, built_at))
+        conn.executemany('INSERT INTO ivf_centroids (model, list_no, vector) VALUES (?, ?, ?)',
+                         [(model, list_no, centroids[list_no].tobytes()) for list_no in range(nlist)])
+        conn.executemany('INSERT INTO ivf_assignments (model, memory_id, list_no) VALUES (?, ?, ?)',
+                         [(model, memory_id, int(list_no)) for memory_id, list_no in zip(ids, assignments)])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    logger.info("Built IVF index for model '%s': %d vectors in %d lists at %s.", model, count, nlist, index_path)
+    return count
+
+
+def _normalize_rows(matrix):
+    """
+    Scales each row to unit length, leaving all-zero rows unchanged.
+
+    Args:
+        matrix (np.ndarray): A 2-D float32 array.
+
+    Returns:
+        np.ndarray: The row-normalized array.
+    """
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+def _assign(vectors, centroids):
+    """
+    Returns the index of each vector's most similar centroid.
+
+    Args:
+        vectors (np.ndarray): Row-normalized vectors.
+        centroids (np.ndarray): Row-normalized centroids.
+
+    Returns:
+        np.ndarray: One cluster number per vector.
+    """
+    assignments = np.empty(vectors.shape[0], dtype=np.int64)
+    for start in range(0, vectors.shape[0], _ASSIGNMENT_CHUNK_ROWS):
+        block = vectors[start:start + _ASSIGNMENT_CHUNK_ROWS]
+        assignments[start:start + block.shape[0]] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def _train_centroids(vectors, nlist: int, iterations: int, rng):
+    """
+    Runs spherical k-means (cosine similarity) and returns unit-length centroids.
+
+    Args:
+        vectors (np.ndarray): Row-normalized training vectors.
+        nlist (int): The number of clusters.
+        iterations (int): The number of refinement passes.
+        rng (np.random.Generator): The random source.
+
+    Returns:
+        np.ndarray: An (nlist, dim) array of centroids.
+    """
+    centroids = vectors[rng.choice(vectors.shape[0], size=nlist, replace=False)].copy()
+    for _ in range(max(0, iterations)):
+        assignments = _assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        sizes = np.bincount(assignments, minlength=nlist)
+        empty = np.flatnonzero(sizes == 0)
+        if empty.size:
+            # Reseed empty clusters from random vectors so every list is used.
+            sums[empty] = vectors[rng.choice(vectors.shape[0], size=empty.size, replace=False)]
+        centroids = _normalize_rows(sums)
+    return centroids
+
+
+def _load_centroids(conn: sqlite3.Connection, index_path: str, model: str) -> Optional[Tuple[int, List]]:
+    """
+    Returns (dim, centroids) for a model, using the in-process copy when current.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the sidecar index.
+        index_path (str): The sidecar file, part of the cache key.
+        model (str): The embedding model.
+
+    Returns:
+        Optional[Tuple[int, List]]: The dimension and the centroid vectors
+        (array('f') each, in list order), or None if the model has no index.
+    """
+    meta = conn.execute('SELECT dim, built_at FROM ivf_meta WHERE model = ?', (model,)).fetchone()
+    if meta is None:
+        return None
+    dim, built_at = meta
+    key = (index_path, model)
+    with _centroid_cache_lock:
+        cached = _centroid_cache.get(key)
+        if cached is not None and cached[0] == built_at:
+            _centroid_cache.move_to_end(key)
+            return cached[1], cached[2]
+
+    rows = conn.execute('SELECT vector FROM ivf_centroids WHERE model = ? ORDER BY list_no',
+                        (model,)).fetchall()
+    centroids = [blob_to_vector(blob) for (blob,) in rows]
+    with _centroid_cache_lock:
+        _centroid_cache[key] = (built_at, dim, centroids)
+        _centroid_cache.move_to_end(key)
+        while len(_centroid_cache) > MAX_CACHED_CENTROID_SETS:
+            _centroid_cache.popitem(last=False)
+    return dim, centroids
+
+
+def _nearest_lists(query_vector: Sequence[float], centroids: List, count: int) -> List[int]:
+    """
+    Returns the numbers of the ``count`` centroids most similar to a vector.
+
+    Args:
+        query_vector (Sequence[float]): The vector to place.
+        centroids (List): The centroid vectors, in list order.
+        count (int): How many list numbers to return.
+
+    Returns:
+        List[int]: List numbers, most similar first.
+    """
+    scored = sorted(range(len(centroids)), key=lambda i: cosine_similarity(query_vector, centroids[i]),
+                    reverse=True)
+    return scored[:count]
+
+
+def add_to_ivf_index(index_path: str, model: str, id_blob_pairs: Iterable[Tuple[int, bytes]]) -> int:
+    """
+    Assigns newly written vectors to their nearest existing cluster.
+
+    Centroids are not retrained, so heavy growth after a build gradually lowers
+    recall; get_ivf_index_info reports ``trained_count`` so a caller can tell
+    when a rebuild is worthwhile.
+
+    Args:
+        index_path (str): The sidecar index file.
+        model (str): The embedding model the vectors belong to.
+        id_blob_pairs (Iterable[Tuple[int, bytes]]): (memory_id, float32 blob) pairs.
+
+    Returns:
+        int: The number of vectors assigned; 0 when the model has no index.
+    """
+    conn = _connect(index_path)
+    try:
+        loaded = _load_centroids(conn, index_path, model)
+        if loaded is None:
+            return 0
+        dim, centroids = loaded
+        rows = []
+        for memory_id, blob in id_blob_pairs:
+            vector = blob_to_vector(blob)
+            if len(vector) != dim:
+                logger.warning("Not indexing memory %s: dimension %d does not match the index's %d.",
+                               memory_id, len(vector), dim)
+                continue
+            rows.append((model, memory_id, _nearest_lists(vector, centroids, 1)[0]))
+        conn.executemany('INSERT OR REPLACE INTO ivf_assignments (model, memory_id, list_no) VALUES (?, ?, ?)',
+                         rows)
+        conn.commit()
+        return len(rows)
+    finally:
+        conn.close()
+
+
+def get_ivf_index_info(index_path: str, model: str) -> Optional[Dict[str, int]]:
+    """
+    Describes a model's index.
+
+    Args:
+        index_path (str): The sidecar index file.
+        model (str): The embedding model.
+
+    Returns:
+        Optional[Dict[str, int]]: ``count`` (indexed vectors), ``dim``, ``nlist``,
+        and ``trained_count`` (vectors present when it was built), or None when
+        the file or the model's index does not exist.
+    """
+    if not os.path.exists(index_path):
+        return None
+    conn = _connect(index_path)
+    try:
+        meta = conn.execute('SELECT dim, nlist, trained_count FROM ivf_meta WHERE model = ?', (model,)).fetchone()
+        if meta is None:
+            return None
+        count = conn.execute('SELECT COUNT(*) FROM ivf_assignments WHERE model = ?', (model,)).fetchone()[0]
+        return {"count": count, "dim": meta[0], "nlist": meta[1], "trained_count": meta[2]}
+    finally:
+        conn.close()
+
+
+def probe_ivf_index(index_path: str, model: str, query_vector: Sequence[float],
+                    probes: int = DEFAULT_IVF_PROBES) -> Optional[List[int]]:
+    """
+    Returns the candidate memory ids for a query: the members of its nearest clusters.
+
+    The candidates are unranked; the caller scores them exactly.
+
+    Args:
+        index_path (str): The sidecar index file.
+        model (str): The embedding model.
+        query_vector (Sequence[float]): The query embedding.
+        probes (int): How many clusters to search; clamped to [1, nlist].
+
+    Returns:
+        Optional[List[int]]: Candidate memory ids, or None when the model has no
+        index or the query's dimension does not match it.
+    """
+    conn = _connect(index_path)
+    try:
+        loaded = _load_centroids(conn, index_path, model)
+        if loaded is None:
+            return None
+        dim, centroids = loaded
+        if len(query_vector) != dim:
+            logger.warning("Query embedding dimension %d does not match the IVF index's %d.",
+                           len(query_vector), dim)
+            return None
+        lists = _nearest_lists(query_vector, centroids, max(1, probes))
+        placeholders = ','.join('?' * len(lists))
+        rows = conn.execute(
+            f'SELECT memory_id FROM ivf_assignments WHERE model = ? AND list_no IN ({placeholders})',
+            [model, *lists]).fetchall()
+        return [memory_id for (memory_id,) in rows]
+    finally:
+        conn.close()
+
+
+def clear_centroid_cache() -> None:
+    """
+    Drops every cached centroid set. Intended for test isolation.
+    """
+    with _centroid_cache_lock:
+        _centroid_cache.clear()
@@ -5,8 +5,13 @@ from dataclasses import replace as dc_replace
 from typing import Any, Callable
 
 from Middleware.services.llm_dispatch_service import LLMDispatchService
+from Middleware.services.memory_job_service import memory_job_service
 from Middleware.services.memory_service import MemoryService
-from Middleware.utilities.config_utils import get_discussion_chat_summary_file_path, get_discussion_memory_file_path
+from Middleware.utilities.config_utils import (
+    get_discussion_chat_summary_file_path,
+    get_discussion_memory_file_path,
+    get_memory_job_queue_settings,
+)
 from Middleware.utilities.file_utils import read_chunks_with_hashes, update_chunks_with_hashes
 from Middleware.utilities.hashing_utils import extract_text_blocks_from_hashed_chunks
 from Middleware.workflows.handlers.base.base_workflow_node_handler import BaseHandler
@@ -82,6 +87,8 @@ class MemoryNodeHandler(BaseHandler):
                 semantic_query=semantic_query,
                 embedding_endpoint_name=context.config.get("embeddingEndpointName"),
                 use_entity_expansion=context.config.get("useEntityExpansion", False),
+                vector_index=context.config.get("vectorIndex", "exact"),
+                vector_index_probes=context.config.get("vectorIndexProbes"),
                 request_id=context.request_id
             )
 
@@ -352,6 +359,9 @@ class MemoryNodeHandler(BaseHandler):
         and crash the post-responder chain whenever a request arrived without a
         [DiscussionId] tag.)
 
+        A node with 'runInBackground' set queues the persistent memory creation on the
+        memory job queue and returns at once instead of running it inline.
+
         Args:
             context (ExecutionContext): The runtime context for the current node.
 
@@ -368,5 +378,9 @@ class MemoryNodeHandler(BaseHandler):
                 return "No discussionId on this request; memories were not generated."
             return self._handle_recent_memory_parser(context.request_id, None, context.messages,
                                                         api_key=context.api_key)
+        elif context.config.get("runInBackground", False):
+            workers, max_defer_seconds, db_path = get_memory_job_queue_settings()
+            memory_job_service.enqueue_quality_memory(context, workers, max_defer_seconds, db_path)
+            return None
         else:
             return self._handle_memory_file(context)
@@ -571,6 +571,9 @@ class SpecializedNodeHandler(BaseHandler):
         save_kwargs = {"filepath": resolved_filepath, "content": resolved_content}
         if mode is not None:
             save_kwargs["mode"] = mode
+        # Opt-in: concurrent appends to the same file share one fsync.
+        if mode == "append" and context.config.get("groupCommit") is True:
+            save_kwargs["group_commit"] = True
         if needs_find:
             save_kwargs["find"] = self.workflow_variable_service.apply_variables(
                 find_template, context
@@ -4,12 +4,17 @@ import json
 import logging
 import os
 from html.parser import HTMLParser
-from typing import Any, Dict, FrozenSet, List, Optional
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional
 from urllib.parse import urljoin, urlsplit
 
 import requests
+from requests.structures import CaseInsensitiveDict
 
+from Middleware.services.http_session_pool_service import web_fetch_session_pool
+from Middleware.services.web_fetch_cache_service import html_text_memo, web_fetch_cache_service
+from Middleware.utilities.config_utils import get_current_username, get_web_fetch_cache_settings
 from Middleware.utilities.network_security_utils import check_url_allowed
+from Middleware.utilities.sensitive_logging_utils import is_encryption_active
 from Middleware.workflows.handlers.base.base_workflow_node_handler import BaseHandler
 from Middleware.workflows.handlers.impl.extension_node_helpers import (
     maybe_stream, resolve_allowed_hosts, validate_bool, validate_max_bytes, validate_timeout,
@@ -35,6 +40,20 @@ _VALID_ON_ERROR = ("raise", "return")
 # active under the address guard, where requests is not following redirects itself,
 # so this stripping has to be done here.
 _CROSS_HOST_SENSITIVE_HEADERS = frozenset({"authorization", "cookie", "proxy-authorization"})
+# A request that already carries its own validators is the workflow author's
+# conditional request; it bypasses the cache so the author sees the real 304.
+_CONDITIONAL_REQUEST_HEADERS = frozenset({"if-none-match", "if-modified-since", "if-match",
+                                          "if-unmodified-since", "if-range"})
+
+
+class _CacheLookup(NamedTuple):
+    """The cache state of one cacheable WebFetch request."""
+
+    username: str
+    key: str
+    max_bytes: int
+    db_path: Optional[str]
+    entry: Optional[Dict[str, Any]]
 
 
 class _ResponseTooLargeError(Exception):
@@ -117,16 +136,27 @@ class _HtmlTextExtractor(HTMLParser):
 def _strip_html(html: str) -> str:
     """Runs the stdlib stripper over an HTML string and returns the visible text.
 
+    The result is memoized by the SHA-256 of the HTML (see ``HtmlTextMemo``), so a
+    page fetched again with an unchanged body is not parsed again. Encrypted
+    users' pages are never memoized, as the memo keeps the text in memory.
+
     Args:
         html (str): The HTML source to extract visible text from.
 
     Returns:
         str: The visible text content with non-visible container tags stripped.
     """
-    extractor = _HtmlTextExtractor()
-    extractor.feed(html)
-    extractor.close()
-    return extractor.get_text()
+    memoize = not is_encryption_active()
+    digest = html_text_memo.digest(html) if memoize else None
+    text = html_text_memo.get(digest) if memoize else None
+    if text is None:
+        extractor = _HtmlTextExtractor()
+        extractor.feed(html)
+        extractor.close()
+        text = extractor.get_text()
+        if memoize:
+            html_text_memo.put(digest, text)
+    return text
 
 
 class WebFetchHandler(BaseHandler):
@@ -136,6 +166,10 @@ class WebFetchHandler(BaseHandler):
     Issues an HTTP request to a user-configured URL using the `requests` library
     and returns the response in the configured output format. All string fields
     (url, header values, body) support workflow variable substitution.
+
+    Requests go through pooled sessions (``web_fetch_session_pool``) so keep-alive
+    connections are reused across nodes. A node that sets ``cacheTtlSeconds``
+    caches its GET responses in ``web_fetch_cache_service``.
     """
 
     def handle(self, context: ExecutionContext) -> Any:
@@ -152,8 +186,9 @@ class WebFetchHandler(BaseHandler):
         Raises:
             ValueError: If required config is missing, an enum field has an invalid
                 value, `timeout`/`maxResponseBytes` is not numeric, `timeout` is
-                non-positive, `allowRedirects`/`verify` is not a boolean, or `caBundle`
-                is set but is not a string or points at a file that does not exist.
+                non-positive, `cacheTtlSeconds` is not a non-negative number,
+                `allowRedirects`/`verify` is not a boolean, or `caBundle` is set but
+                is not a string or points at a file that does not exist.
             requests.exceptions.RequestException: When `onError` is "raise" and the
                 request fails (connection error, timeout, or HTTP 4xx/5xx).
             _ResponseTooLargeError: When `onError` is "raise" and the response body
@@ -173,6 +208,7 @@ class WebFetchHandler(BaseHandler):
         allow_redirects = validate_bool(config.get("allowRedirects", True), "allowRedirects", "WebFetch")
         max_bytes = validate_max_bytes(config.get("maxResponseBytes", _DEFAULT_MAX_RESPONSE_BYTES), "WebFetch")
         block_private = validate_bool(config.get("blockPrivateAddresses", False), "blockPrivateAddresses", "WebFetch")
+        cache_ttl = self._validate_cache_ttl(config.get("cacheTtlSeconds", 0))
         allowed_hosts = resolve_allowed_hosts(
             config.get("allowedHosts"), context, self.workflow_variable_service, "WebFetch"
         )
@@ -202,23 +238,47 @@ class WebFetchHandler(BaseHandler):
                      method, url, timeout, output_format, bool(proxies), verify)
 
         cap_enabled = max_bytes > 0
+        cache = self._lookup_cache(cache_ttl, method, url, headers, body, proxies, verify, allow_redirects)
+        cached_entry = cache.entry if cache is not None else None
         try:
-            response = self._request_with_guard(
-                method=method,
-                url=url,
-                headers=headers,
-                data=body,
-                timeout=timeout,
-                proxies=proxies,
-                verify=verify,
-                allow_redirects=allow_redirects,
-                stream=cap_enabled,
-                block_private=block_private,
-                allowed_hosts=allowed_hosts,
-            )
-            response.raise_for_status()
-            if cap_enabled:
-                self._load_capped_content(response, max_bytes)
+            if cached_entry is not None and cached_entry["fresh"]:
+                # No connection is made, but the cached URLs must still satisfy the
+                # node's current address policy.
+                self._check_cached_urls((url, cached_entry["url"]), block_private, allowed_hosts)
+                self._check_cached_size(cached_entry, max_bytes)
+                logger.debug("WebFetch served the response from the cache")
+                response = self._response_from_cache(cached_entry)
+            else:
+                response = self._request_with_guard(
+                    method=method,
+                    url=url,
+                    headers=self._conditional_headers(headers, cached_entry),
+                    data=body,
+                    timeout=timeout,
+                    proxies=proxies,
+                    verify=verify,
+                    allow_redirects=allow_redirects,
+                    stream=cap_enabled,
+                    block_private=block_private,
+                    allowed_hosts=allowed_hosts,
+                )
+                if cached_entry is not None and response.status_code == 304:
+                    response.close()
+                    logger.debug("WebFetch revalidated the cached response (304 Not Modified)")
+                    refreshed = web_fetch_cache_service.revalidated(
+                        cache.username, cache.key, cached_entry, response.headers, cache_ttl, cache.max_bytes, cache.db_path)
+                    self._check_cached_size(refreshed, max_bytes)
+                    response = self._response_from_cache(refreshed)
+                else:
+                    response.raise_for_status()
+                    if cap_enabled:
+                        self._load_capped_content(response, max_bytes)
+                    if cache is not None and response.status_code == 200:
+                        web_fetch_cache_service.store(
+                            cache.username, cache.key, url=response.url or url, status_code=response.status_code,
+                            reason=response.reason, headers=response.headers, encoding=response.encoding,
+                            body=response.content, ttl_seconds=cache_ttl, max_bytes=cache.max_bytes,
+                            db_path=cache.db_path)
         except (requests.exceptions.RequestException, _ResponseTooLargeError) as exc:
             logger.warning("WebFetch request failed: %s", exc)
             if on_error == "raise":
@@ -272,6 +332,9 @@ class WebFetchHandler(BaseHandler):
     ):
         """Issues the request, enforcing the SSRF address policy on every hop.
 
+        Every hop is sent on a session borrowed from ``web_fetch_session_pool``, so
+        connections are reused across hops and across nodes.
+
         When neither ``blockPrivateAddresses`` nor ``allowedHosts`` is set the guard is
         inert and ``requests`` handles redirects itself (the node's original behavior).
         When the guard is active, redirects are followed manually so each hop's host is
@@ -298,9 +361,20 @@ class WebFetchHandler(BaseHandler):
             _AddressNotAllowedError: When a hop's target violates the SSRF address policy.
             requests.exceptions.TooManyRedirects: When the redirect chain exceeds the limit.
         """
+        session = web_fetch_session_pool.acquire()
+        try:
+            return self._send_with_guard(session, method, url, headers, data, timeout, proxies, verify,
+                                         allow_redirects, stream, block_private, allowed_hosts)
+        finally:
+            web_fetch_session_pool.release(session)
+
+    def _send_with_guard(self, session: requests.Session, method: str, url: str, headers: Dict[str, str],
+                         data: Optional[str], timeout: float, proxies: Optional[Dict[str, str]], verify: Any,
+                         allow_redirects: bool, stream: bool, block_private: bool, allowed_hosts: FrozenSet[str]):
+        """Sends the request and any redirect hops on one session; see ``_request_with_guard``."""
         guard_active = block_private or bool(allowed_hosts)
         if not guard_active:
-            return requests.request(
+            return session.request(
                 method=method,
                 url=url,
                 headers=headers if headers else None,
@@ -319,7 +393,7 @@ class WebFetchHandler(BaseHandler):
                 raise _AddressNotAllowedError(
                     f"WebFetch blocked a request to a disallowed address: {reason}."
                 )
-            response = requests.request(
+            response = session.request(
                 method=current_method,
                 url=current_url,
                 headers=current_headers if current_headers else None,
@@ -358,6 +432,145 @@ class WebFetchHandler(BaseHandler):
             f"WebFetch exceeded the maximum of {_MAX_REDIRECTS} redirects."
         )
 
+    @staticmethod
+    def _validate_cache_ttl(value: Any) -> float:
+        """Validates ``cacheTtlSeconds``, the node's opt-in to the WebFetch cache.
+
+        Args:
+            value (Any): The configured value; 0 (the default) disables caching.
+
+        Returns:
+            float: The longest time, in seconds, a response may be served from the cache.
+
+        Raises:
+            ValueError: When the value is not a non-negative number.
+        """
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            raise ValueError(f"WebFetch 'cacheTtlSeconds' must be a non-negative number; got {value!r}.")
+        return float(value)
+
+    @staticmethod
+    def _lookup_cache(cache_ttl: float, method: str, url: str, headers: Dict[str, str], body: Optional[str],
+                      proxies: Optional[Dict[str, str]], verify: Any,
+                      allow_redirects: bool) -> Optional[_CacheLookup]:
+        """Looks up a cacheable request in the WebFetch cache.
+
+        Only a GET without a body or caller-supplied validators is cacheable, and
+        only when the node sets ``cacheTtlSeconds`` and the ``webFetchCache`` user
+        setting has not turned the cache off. Encrypted users' responses are kept
+        in memory only.
+
+        Args:
+            cache_ttl (float): The node's cacheTtlSeconds.
+            method (str): The HTTP method.
+            url (str): The fully resolved request URL.
+            headers (Dict[str, str]): The resolved request headers.
+            body (Optional[str]): The resolved request body, or None.
+            proxies (Optional[Dict[str, str]]): The proxy mapping, or None.
+            verify (Any): The TLS-verification setting.
+            allow_redirects (bool): Whether redirects are followed.
+
+        Returns:
+            Optional[_CacheLookup]: The key, limits and stored entry (None when there
+            is none yet), or None when the request is not cacheable.
+        """
+        if cache_ttl <= 0 or method != "GET" or body is not None:
+            return None
+        if any(name.lower() in _CONDITIONAL_REQUEST_HEADERS for name in headers):
+            return None
+        settings = get_web_fetch_cache_settings()
+        if settings is None:
+            return None
+        max_bytes, db_path = settings
+        if is_encryption_active():
+            db_path = None
+        username = get_current_username()
+        key = web_fetch_cache_service.build_key(username, url, headers, proxies, verify, allow_redirects)
+        return _CacheLookup(username, key, max_bytes, db_path,
+                            web_fetch_cache_service.lookup(username, key, max_bytes, db_path))
+
+    @staticmethod
+    def _conditional_headers(headers: Dict[str, str], cached_entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Adds the validators of a stale cached response to the request headers.
+
+        Args:
+            headers (Dict[str, str]): The resolved request headers.
+            cached_entry (Optional[Dict[str, Any]]): The stale entry, or None.
+
+        Returns:
+            Dict[str, str]: The headers with If-None-Match / If-Modified-Since added
+            when the entry has an ETag / Last-Modified; otherwise ``headers`` itself.
+        """
+        if cached_entry is None:
+            return headers
+        stored = CaseInsensitiveDict(cached_entry["headers"])
+        conditional = dict(headers)
+        if stored.get("ETag"):
+            conditional["If-None-Match"] = stored["ETag"]
+        if stored.get("Last-Modified"):
+            conditional["If-Modified-Since"] = stored["Last-Modified"]
+        return conditional
+
+    @staticmethod
+    def _check_cached_urls(urls: Iterable[str], block_private: bool, allowed_hosts: FrozenSet[str]) -> None:
+        """Applies the SSRF address policy to the URLs behind a fresh cached response.
+
+        Args:
+            urls (Iterable[str]): The requested URL and the final URL the entry came from.
+            block_private (bool): Whether to block private/internal addresses.
+            allowed_hosts (FrozenSet[str]): The lowercased host allowlist (empty = no allowlist).
+
+        Raises:
+            _AddressNotAllowedError: When a URL violates the policy.
+        """
+        if not (block_private or allowed_hosts):
+            return
+        for cached_url in urls:
+            reason = check_url_allowed(cached_url, block_private, allowed_hosts)
+            if reason:
+                raise _AddressNotAllowedError(
+                    f"WebFetch blocked a request to a disallowed address: {reason}."
+                )
+
+    @staticmethod
+    def _check_cached_size(entry: Dict[str, Any], max_bytes: int) -> None:
+        """Applies the node's ``maxResponseBytes`` to a cached body.
+
+        The entry may have been stored by a node with a larger cap, so the
+        current node's cap is enforced here just as it is on a live read.
+
+        Args:
+            entry (Dict[str, Any]): The entry from the WebFetch cache.
+            max_bytes (int): The node's cap; 0 disables it.
+
+        Raises:
+            _ResponseTooLargeError: When the cached body exceeds ``max_bytes``.
+        """
+        if 0 < max_bytes < len(entry["body"]):
+            raise _ResponseTooLargeError(
+                f"WebFetch response exceeded the {max_bytes}-byte cap (maxResponseBytes)."
+            )
+
+    @staticmethod
+    def _response_from_cache(entry: Dict[str, Any]) -> requests.Response:
+        """Rebuilds a fully read ``requests.Response`` from a cached entry.
+
+        Args:
+            entry (Dict[str, Any]): The entry from the WebFetch cache.
+
+        Returns:
+            requests.Response: A response whose .text/.json()/.headers match the stored one.
+        """
+        response = requests.Response()
+        response.status_code = entry["status_code"]
+        response.reason = entry["reason"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = entry["encoding"]
+        response.url = entry["url"]
+        response._content = entry["body"]
+        response._content_consumed = True
+        return response
+
     @staticmethod
     def _same_host(url_a: str, url_b: str) -> bool:
         """Reports whether two URLs share the same host (case-insensitive).
@@ -0,0 +1,368 @@
+# /Middleware/workflows/managers/workflow_compiler.py
+
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from Middleware.common.constants import VALID_NODE_TYPES
+from Middleware.utilities.config_cache import config_cache, thaw
+from Middleware.utilities.config_utils import try_get_endpoint_config
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on how many compiled workflows are retained. Mirrors the config
+# cache's bound; a compiled plan is only ever as large as its workflow file.
+MAX_COMPILED_WORKFLOWS = 512
+
+# Matches a reference to an earlier node's output anywhere in a string, not
+# only as the leading name of a placeholder: ``{agent1Output}``,
+# ``{% if agent1Output == 'X' %}``, ``{{ agent_outputs.agent1Output }}`` and
+# ``{{ agent_outputs['agent1'] }}`` all depend on node 1. Over-matching only
+# adds a dependency, so the parallel scheduler errs towards running in order.
+_AGENT_OUTPUT_REFERENCE_PATTERN = re.compile(
+    r'\bagent(\d+)Output\b|\bagent_outputs\s*(?:\.|\[\s*[\'"])\s*agent(\d+)')
+
+
+def get_node_display_name(config: Dict) -> str:
+    """
+    Builds the display name used for a node in logs and the execution summary.
+
+    Prefers 'title', then 'agentName', otherwise returns 'N/A'.
+    For CustomWorkflow nodes, appends ' -> WorkflowName'.
+    For ConditionalCustomWorkflow nodes, appends ' -> [WF1, WF2, ...]' showing
+    possible workflow destinations (truncated to first 2 if more than 3).
+
+    Args:
+        config (Dict): The node configuration dictionary.
+
+    Returns:
+        str: A display string for the node.
+    """
+    base_name = config.get("title") or config.get("agentName") or "N/A"
+
+    # For sub-workflow nodes, append the workflow name for easier correlation
+    node_type = config.get("type", "Standard")
+    if node_type == "CustomWorkflow":
+        workflow_name = config.get("workflowName")
+        if workflow_name:
+            return f"{base_name} -> {workflow_name}"
+    elif node_type == "ConditionalCustomWorkflow":
+        conditional_workflows = config.get("conditionalWorkflows", {})
+        if conditional_workflows:
+            workflow_names = list(conditional_workflows.values())
+            if len(workflow_names) <= 3:
+                return f"{base_name} -> [{', '.join(workflow_names)}]"
+            else:
+                return f"{base_name} -> [{', '.join(workflow_names[:2])}, +{len(workflow_names)-2} more]"
+
+    return base_name
+
+
+def find_agent_output_references(value: Any) -> FrozenSet[str]:
+    """
+    Collects every earlier-node output a node configuration refers to.
+
+    Walks nested dicts and lists and scans each whole string, so references
+    inside ``{name}`` placeholders, Jinja2 expressions and statements, and
+    ``agent_outputs`` lookups are all found.
+
+    Args:
+        value (Any): A node configuration, or any JSON-shaped value.
+
+    Returns:
+        FrozenSet[str]: The referenced outputs, normalized to ``agentNOutput``.
+    """
+    found = set()
+    pending = [value]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, str):
+            if 'agent' in item:
+                for output_number, lookup_number in _AGENT_OUTPUT_REFERENCE_PATTERN.findall(item):
+                    found.add(f"agent{output_number or lookup_number}Output")
+        elif isinstance(item, dict):
+            pending.extend(item.values())
+        elif isinstance(item, list):
+            pending.extend(item)
+    return frozenset(found)
+
+
+def find_responder_index(nodes: List[Dict]) -> Optional[int]:
+    """
+    Finds the index of the node that returns the response to the user.
+
+    A node is the responder if it opts in via 'is_responder' (or the legacy
+    'returnToUser' alias); the first such node wins. Failing any explicit
+    opt-in, the last node responds.
+
+    Args:
+        nodes (List[Dict]): The workflow's node configurations.
+
+    Returns:
+        Optional[int]: The responder's index, or None for an empty workflow.
+    """
+    for idx, node in enumerate(nodes):
+        if node.get('is_responder', node.get('returnToUser', False)):
+            return idx
+    return len(nodes) - 1 if nodes else None
+
+
+@dataclass(frozen=True)
+class CompiledWorkflow:
+    """
+    Everything about a workflow that can be worked out without running it.
+
+    Built once per version of a workflow file and shared by every request that
+    runs it. The parsed document itself stays read-only; ``instantiate`` hands
+    each run its own mutable copy, since node configs are modified in place
+    during execution (prompt overrides, numeric field coercion).
+
+    Attributes:
+        name (str): The workflow name (the file name without extension).
+        document (Any): The read-only parsed workflow file.
+        node_types (Tuple[str, ...]): Each node's type; unknown types are
+            recorded as 'Standard', matching how they are executed.
+        node_names (Tuple[str, ...]): Each node's display name.
+        agent_output_references (Tuple[FrozenSet[str], ...]): The earlier-node
+            outputs (``agentNOutput``) each node's configuration refers to.
+        responder_index (Optional[int]): The index of the responding node, or
+            None for an empty workflow.
+        has_timestamped_node (bool): True if any node sets
+            'addDiscussionIdTimestampsForLLM'.
+    """
+    name: str
+    document: Any
+    node_types: Tuple[str, ...]
+    node_names: Tuple[str, ...]
+    agent_output_references: Tuple[FrozenSet[str], ...]
+    responder_index: Optional[int]
+    has_timestamped_node: bool
+
+    @property
+    def node_count(self) -> int:
+        """The number of nodes in the workflow."""
+        return len(self.node_types)
+
+    def instantiate(self) -> Tuple[Dict[str, Any], List[Dict]]:
+        """
+        Creates a private, mutable copy of the workflow for one run.
+
+        Supports both dictionary-based (new) and list-based (legacy) workflow formats.
+
+        Returns:
+            Tuple[Dict[str, Any], List[Dict]]: The top-level workflow settings
+            (empty for the legacy list format) and the node configurations.
+        """
+        return split_workflow_document(thaw(self.document))
+
+
+def split_workflow_document(document: Any) -> Tuple[Any, Any]:
+    """
+    Separates a parsed workflow file into its top-level settings and node list.
+
+    Args:
+        document (Any): The parsed workflow file; either a dict with a 'nodes'
+            key (new format) or a bare list of nodes (legacy format).
+
+    Returns:
+        Tuple[Any, Any]: The workflow settings and the node configurations.
+    """
+    if isinstance(document, dict):
+        return document, document.get("nodes", [])
+    return {}, document
+
+
+def compile_workflow(name: str, document: Any, validate: bool = True) -> CompiledWorkflow:
+    """
+    Compiles a parsed workflow file into a CompiledWorkflow.
+
+    When validating, unknown node types and endpoints that do not exist are
+    logged as warnings here, once per version of the file, instead of surfacing
+    only when the node is reached. Neither is an error: unknown types run as
+    'Standard' (as they always have), and an endpoint name that contains a
+    variable placeholder, or that is missing for the compiling user, may still
+    resolve at run time.
+
+    Args:
+        name (str): The workflow name, used in log messages.
+        document (Any): The parsed workflow file.
+        validate (bool): If True, log warnings for unknown node types and
+            missing endpoints. Defaults to True.
+
+    Returns:
+        CompiledWorkflow: The compiled plan.
+    """
+    _, nodes = split_workflow_document(document)
+    if not isinstance(nodes, list):
+        nodes = []
+    nodes = [node if isinstance(node, dict) else {} for node in nodes]
+
+    node_types = []
+    for idx, node in enumerate(nodes):
+        node_type = node.get("type", "Standard")
+        if node_type not in VALID_NODE_TYPES:
+            if validate:
+                logger.warning(f"Workflow '{name}' step {idx}: '{node_type}' is not a valid node type. "
+                               f"It will run as 'Standard'.")
+            node_type = "Standard"
+        node_types.append(node_type)
+        if validate:
+            _warn_if_endpoint_missing(name, idx, node.get("endpointName"))
+
+    return CompiledWorkflow(
+        name=name,
+        document=document,
+        node_types=tuple(node_types),
+        node_names=tuple(get_node_display_name(node) for node in nodes),
+        agent_output_references=tuple(find_agent_output_references(node) for node in nodes),
+        responder_index=find_responder_index(nodes),
+        has_timestamped_node=any(node.get("addDiscussionIdTimestampsForLLM", False) for node in nodes),
+    )
+
+
+def _warn_if_endpoint_missing(workflow_name: str, idx: int, endpoint_name: Any) -> None:
+    """
+    Logs a warning when a node names a literal endpoint that does not exist.
+
+    Args:
+        workflow_name (str): The workflow name, used in the message.
+        idx (int): The node's index, used in the message.
+        endpoint_name (Any): The node's 'endpointName' value.
+    """
+    if not isinstance(endpoint_name, str) or not endpoint_name or '{' in endpoint_name:
+        return
+    try:
+        if try_get_endpoint_config(endpoint_name) is None:
+            logger.warning(f"Workflow '{workflow_name}' step {idx}: endpoint '{endpoint_name}' was not found.")
+    except Exception as e:
+        logger.debug(f"Could not check endpoint '{endpoint_name}' for workflow '{workflow_name}': {e}")
+
+
+class WorkflowCompiler:
+    """
+    A thread-safe, process-wide cache of compiled workflows.
+
+    Workflow files are read through the shared config cache, which re-stats the
+    file on every lookup and re-parses it only when it has changed. A compiled
+    plan is kept alongside the exact parsed document it was built from, so it is
+    rebuilt precisely when the config cache hands back a new document, i.e. when
+    the file's modification time, size, or inode has changed. Edits to a
+    workflow therefore take effect on the next request, with no restart.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of WorkflowCompiler exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(WorkflowCompiler, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the plan map and hit/miss counters.
+        """
+        if self._initialized:
+            return
+
+        # path -> compiled plan (whose .document is the config cache's object)
+        self._plans: Dict[str, CompiledWorkflow] = {}
+        self._hits = 0
+        self._compiles = 0
+        self._plan_lock = threading.Lock()
+        self._initialized = True
+
+    def get(self, path: str) -> CompiledWorkflow:
+        """
+        Returns the compiled plan for a workflow file, compiling it if needed.
+
+        Args:
+            path (str): The workflow file.
+
+        Returns:
+            CompiledWorkflow: The plan for the file's current contents.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            json.JSONDecodeError: If the file is not valid JSON.
+        """
+        document = config_cache.get(path)
+
+        with self._plan_lock:
+            plan = self._plans.get(path)
+            if plan is not None and plan.document is document:
+                self._hits += 1
+                return plan
+            self._compiles += 1
+
+        name = os.path.splitext(os.path.basename(path))[0] if isinstance(path, str) else str(path)
+        plan = compile_workflow(name, document)
+        with self._plan_lock:
+            self._plans.pop(path, None)
+            self._plans[path] = plan
+            while len(self._plans) > MAX_COMPILED_WORKFLOWS:
+                self._plans.pop(next(iter(self._plans)))
+        return plan
+
+    def precompile_directory(self, directory: str) -> int:
+        """
+        Compiles every workflow file under a directory tree.
+
+        Used at startup so the first request for each workflow does not pay for
+        reading and compiling it. Files that fail to load are logged and skipped.
+
+        Args:
+            directory (str): The root to search, typically ``Configs/Workflows``.
+
+        Returns:
+            int: The number of workflows compiled.
+        """
+        compiled = 0
+        for root, _, files in os.walk(directory):
+            for file_name in sorted(files):
+                if not file_name.endswith(".json"):
+                    continue
+                path = os.path.join(root, file_name)
+                try:
+                    self.get(path)
+                    compiled += 1
+                except Exception as e:
+                    logger.warning(f"Could not precompile workflow '{path}': {e}")
+        return compiled
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns compiler counters.
+
+        Returns:
+            Dict[str, int]: ``hits`` (plans reused as-is), ``compiles`` (first
+            compiles and recompiles after a change), and current ``entries``.
+        """
+        with self._plan_lock:
+            return {
+                "hits": self._hits,
+                "compiles": self._compiles,
+                "entries": len(self._plans),
+            }
+
+    def clear(self) -> None:
+        """
+        Drops every compiled plan and resets the counters. Intended for test isolation.
+        """
+        with self._plan_lock:
+            self._plans.clear()
+            self._hits = 0
+            self._compiles = 0
+
+
+# Global singleton instance
+workflow_compiler = WorkflowCompiler()
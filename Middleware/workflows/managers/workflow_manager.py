@@ -1,6 +1,5 @@
 # /Middleware/workflows/managers/workflow_manager.py
 
-import json
 import logging
 import uuid
 from typing import Dict, List, Generator, Union, Optional
@@ -12,7 +11,7 @@ from Middleware.utilities.config_utils import (
     get_active_conversational_memory_tool_name, get_active_recent_memory_tool_name,
     get_file_memory_tool_name,
     get_chat_summary_tool_workflow_name,
-    get_workflow_path as default_get_workflow_path
+    get_workflow_path as default_get_workflow_path,
 )
 from Middleware.utilities.prompt_extraction_utils import extract_discussion_id, remove_discussion_id_tag
 from Middleware.workflows.handlers.impl.context_compactor_handler import ContextCompactorHandler
@@ -24,6 +23,7 @@ from Middleware.workflows.handlers.impl.standard_node_handler import StandardNod
 from Middleware.workflows.handlers.impl.sub_workflow_handler import SubWorkflowHandler
 from Middleware.workflows.handlers.impl.tool_node_handler import ToolNodeHandler
 from Middleware.workflows.handlers.impl.web_fetch_handler import WebFetchHandler
+from Middleware.workflows.managers.workflow_compiler import workflow_compiler
 from Middleware.workflows.managers.workflow_variable_manager import WorkflowVariableManager
 from Middleware.workflows.processors.workflows_processor import WorkflowProcessor
 
@@ -165,6 +165,7 @@ class WorkflowManager:
             **kwargs: Additional keyword arguments, including an optional `path_finder_func` or 'workflow_user_folder_override'.
         """
         workflow_user_folder_override = kwargs.pop('workflow_user_folder_override', None)
+        self.workflow_user_folder_override = workflow_user_folder_override
         if workflow_user_folder_override:
             # Use a lambda to curry the folder override argument into the default path finder
             self.path_finder_func = lambda wn: default_get_workflow_path(wn,
@@ -305,16 +306,10 @@ class WorkflowManager:
         try:
             config_file = self.path_finder_func(self.workflowConfigName)
             logger.info(f"Loading workflow: {config_file}")
-            with open(config_file) as f:
-                loaded_json_config = json.load(f)
-
-            # Support both dictionary-based (new) and list-based (legacy) workflow formats.
-            if isinstance(loaded_json_config, dict):
-                workflow_file_config = loaded_json_config
-                nodes_config = workflow_file_config.get("nodes", [])
-            else:
-                workflow_file_config = {}
-                nodes_config = loaded_json_config
+            # The compiled plan is shared across requests and rebuilt only when the
+            # file changes; each run gets its own mutable copy of the nodes.
+            workflow_plan = workflow_compiler.get(config_file)
+            workflow_file_config, nodes_config = workflow_plan.instantiate()
 
             processor = WorkflowProcessor(
                 node_handlers=self.node_handlers,
@@ -323,6 +318,7 @@ class WorkflowManager:
                 workflow_config_name=self.workflowConfigName,
                 workflow_file_config=workflow_file_config,
                 configs=nodes_config,
+                workflow_plan=workflow_plan,
                 request_id=request_id,
                 workflow_id=workflow_id,
                 discussion_id=discussion_id,
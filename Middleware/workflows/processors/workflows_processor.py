@@ -3,8 +3,9 @@
 import json
 import logging
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from copy import deepcopy
-from typing import Dict, List, Generator, Any, Optional, TYPE_CHECKING
+from typing import Dict, List, Generator, Any, Optional, Set, Tuple, TYPE_CHECKING
 
 from Middleware.common import instance_global_variables
 from Middleware.common.constants import VALID_NODE_TYPES
@@ -13,11 +14,17 @@ from Middleware.models.llm_handler import LlmHandler
 from Middleware.services.cancellation_service import cancellation_service
 from Middleware.services.llm_service import LlmHandlerService
 from Middleware.services.locking_service import LockingService
+from Middleware.services.metrics_service import metrics_service
 from Middleware.services.timestamp_service import TimestampService
 from Middleware.utilities.config_utils import get_chat_template_name, get_endpoint_config
 from Middleware.utilities.encryption_utils import get_encryption_key_if_available, get_api_key_hash_if_available
-from Middleware.utilities.sensitive_logging_utils import sensitive_log, log_prompt_content
+from Middleware.utilities.sensitive_logging_utils import (
+    sensitive_log, log_prompt_content, is_encryption_active, set_encryption_context,
+)
 from Middleware.utilities.streaming_utils import post_process_llm_output
+from Middleware.workflows.managers.workflow_compiler import (
+    CompiledWorkflow, compile_workflow, find_agent_output_references, get_node_display_name,
+)
 from Middleware.workflows.models.execution_context import ExecutionContext, NodeExecutionInfo
 from Middleware.workflows.streaming.response_handler import StreamingResponseHandler
 
@@ -31,8 +38,39 @@ logger = logging.getLogger(__name__)
 class WorkflowProcessor:
     """
     Processes a pre-configured workflow by executing its nodes sequentially.
+
+    A workflow that sets ``"parallelNodeExecution": true`` at its top level may
+    instead run the nodes before its responder concurrently, wherever the
+    ``{agentNOutput}`` references between them allow it. The responder and every
+    node after it always run sequentially, in order.
     """
 
+    # Number of nodes a parallel workflow runs at once when it does not set
+    # 'maxParallelNodes'. Parallel nodes mostly wait on network I/O (LLM calls,
+    # web fetches, lookups), so the pool's threads (green threads under
+    # Eventlet) are cheap; the bound keeps one request from flooding a backend.
+    _DEFAULT_MAX_PARALLEL_NODES = 4
+
+    # Node types whose effect depends on running in workflow order rather than
+    # only on their inputs: they write discussion or custom-file state, take a
+    # lock, or run arbitrary code (sub-workflows, tools). In parallel mode such a
+    # node waits for every earlier node, and every later node waits for it, so
+    # read-only lookups (memory, summary and custom-file reads, vector and
+    # keyword searches) stay concurrent yet still see every earlier write. A
+    # node's 'parallelBarrier' boolean overrides its type's default in either
+    # direction. An ImageProcessor with 'addAsUserMessage' is also a barrier, as
+    # it inserts its description into the shared conversation (see
+    # _is_parallel_barrier).
+    _PARALLEL_BARRIER_NODE_TYPES = frozenset({
+        "WorkflowLock",
+        "SaveCustomFile",
+        "ConversationMemory", "FullChatSummary", "RecentMemory", "chatSummarySummarizer",
+        "WriteCurrentSummaryToFileAndReturnIt", "QualityMemory",
+        "ContextCompactor",
+        "CustomWorkflow", "ConditionalCustomWorkflow", "ConversationChunkProcessor",
+        "PythonModule", "MCPToolCall", "CurlCommand",
+    })
+
     def __init__(self,
                  node_handlers: Dict[str, Any],
                  llm_handler_service: LlmHandlerService,
@@ -51,7 +89,8 @@ class WorkflowProcessor:
                  scoped_inputs: Optional[List[str]] = None,
                  api_key: Optional[str] = None,
                  tools: Optional[List[Dict]] = None,
-                 tool_choice: Optional[Any] = None
+                 tool_choice: Optional[Any] = None,
+                 workflow_plan: Optional[CompiledWorkflow] = None
                  ):
         """
         Initializes the WorkflowProcessor instance.
@@ -75,6 +114,8 @@ class WorkflowProcessor:
             api_key (Optional[str]): The API key from the request, used for encryption context.
             tools (Optional[List[Dict]]): Tool definitions from the incoming request.
             tool_choice (Optional[Any]): Tool selection policy from the incoming request.
+            workflow_plan (Optional[CompiledWorkflow]): The precompiled plan for `configs`.
+                When omitted, one is compiled from `configs` when execution starts.
         """
         self.node_handlers = node_handlers
         self.llm_handler_service = llm_handler_service
@@ -98,6 +139,7 @@ class WorkflowProcessor:
         self.api_key_hash = get_api_key_hash_if_available(api_key) if api_key else None
         self.tools = tools
         self.tool_choice = tool_choice
+        self.workflow_plan = workflow_plan
 
         self.agent_inputs = {}
         if scoped_inputs:
@@ -208,24 +250,24 @@ class WorkflowProcessor:
         Returns:
             A display string for the node, suitable for logging summaries.
         """
-        base_name = config.get("title") or config.get("agentName") or "N/A"
+        return get_node_display_name(config)
 
-        # For sub-workflow nodes, append the workflow name for easier correlation
-        node_type = config.get("type", "Standard")
-        if node_type == "CustomWorkflow":
-            workflow_name = config.get("workflowName")
-            if workflow_name:
-                return f"{base_name} -> {workflow_name}"
-        elif node_type == "ConditionalCustomWorkflow":
-            conditional_workflows = config.get("conditionalWorkflows", {})
-            if conditional_workflows:
-                workflow_names = list(conditional_workflows.values())
-                if len(workflow_names) <= 3:
-                    return f"{base_name} -> [{', '.join(workflow_names)}]"
-                else:
-                    return f"{base_name} -> [{', '.join(workflow_names[:2])}, +{len(workflow_names)-2} more]"
+    def _get_workflow_plan(self) -> CompiledWorkflow:
+        """
+        Returns the compiled plan for this run's node configurations.
 
-        return base_name
+        Uses the plan supplied by the WorkflowManager when it describes these
+        configs, and otherwise compiles one on the spot (e.g. for a processor
+        constructed directly with an in-memory node list).
+
+        Returns:
+            CompiledWorkflow: The plan for `self.configs`.
+        """
+        plan = self.workflow_plan
+        if plan is None or plan.node_count != len(self.configs):
+            plan = compile_workflow(self.workflow_config_name, list(self.configs), validate=False)
+            self.workflow_plan = plan
+        return plan
 
     def _resolve_early_template(self, value: Optional[str]) -> Optional[str]:
         """Resolves scoped-input/workflow variables in a config string value.
@@ -285,7 +327,8 @@ class WorkflowProcessor:
 
         Outputs a formatted summary showing each node's index, type, name,
         endpoint details, and execution time. The summary is bracketed by
-        header and footer lines containing the workflow name.
+        header and footer lines containing the workflow name. Each node's time
+        is also recorded in the wilmer_node_execution_seconds histogram.
 
         Args:
             node_execution_infos: List of NodeExecutionInfo objects containing
@@ -297,19 +340,25 @@ class WorkflowProcessor:
         logger.info(f"=== Workflow Node Execution Summary: {self.workflow_config_name} ===")
         for info in node_execution_infos:
             logger.info(str(info))
+            metrics_service.observe("wilmer_node_execution_seconds", info.execution_time_seconds,
+                                    {"node_type": info.node_type, "workflow": self.workflow_config_name})
         logger.info(f"=== End of Summary: {self.workflow_config_name} ===")
 
     def execute(self) -> Generator[Any, None, None]:
         """
         Executes the main workflow logic by processing nodes sequentially.
+
+        When the workflow enables 'parallelNodeExecution', the nodes before the
+        responder are first run by _execute_nodes_in_parallel; the loop below then
+        continues from the responder.
         """
         returned_to_user = False
         agent_outputs = {}
         start_time = time.perf_counter()
         node_execution_infos: List[NodeExecutionInfo] = []
 
-        is_any_node_timestamped = bool(self.discussion_id) and any(
-            node_config.get("addDiscussionIdTimestampsForLLM", False) for node_config in self.configs)
+        plan = self._get_workflow_plan()
+        is_any_node_timestamped = bool(self.discussion_id) and plan.has_timestamped_node
 
         # Timestamp history is resolved once at the start of the entire workflow run
         # rather than once per node. This ensures that the placeholder written by the
@@ -323,7 +372,15 @@ class WorkflowProcessor:
                                                                  api_key_hash=self.api_key_hash)
 
         try:
-            for idx, config in enumerate(self.configs):
+            first_sequential_idx = 0
+            parallel_workers = self._get_parallel_worker_count()
+            if parallel_workers and plan.responder_index is not None and plan.responder_index > 1:
+                self._execute_nodes_in_parallel(plan, plan.responder_index, agent_outputs,
+                                                node_execution_infos, parallel_workers)
+                first_sequential_idx = plan.responder_index
+
+            for idx in range(first_sequential_idx, len(self.configs)):
+                config = self.configs[idx]
                 # Check for cancellation at the start of each node execution
                 if cancellation_service.is_cancelled(self.request_id):
                     logger.warning(
@@ -335,7 +392,7 @@ class WorkflowProcessor:
                 # Start timing for this node
                 node_start_time = time.perf_counter()
                 node_type = config.get("type", "Standard")
-                node_name = self._get_node_name(config)
+                node_name = plan.node_names[idx]
                 endpoint_name, endpoint_url = self._get_endpoint_details(config)
 
                 is_post_return = returned_to_user
@@ -343,22 +400,14 @@ class WorkflowProcessor:
                     f'------Workflow {self.workflow_config_name}; step {idx}; node type: {node_type}'
                     f'{" [post-returnToUser]" if is_post_return else ""}')
 
-                if "systemPrompt" in config or "prompt" in config:
-                    if self.override_first_available_prompts:
-                        if self.first_node_system_prompt_override is not None:
-                            config["systemPrompt"] = self.first_node_system_prompt_override
-                        if self.first_node_prompt_override is not None:
-                            config["prompt"] = self.first_node_prompt_override
-                        self.override_first_available_prompts = False
+                self._apply_first_node_prompt_overrides(config)
 
                 combined_agent_variables = {**self.agent_inputs, **agent_outputs}
 
-                # A node is the responder if it opts in via 'is_responder' (the
-                # documented key, renamed from the original 'returnToUser', which is
-                # still honored as an alias) or, failing any explicit opt-in, if it is
+                # The responder is precomputed by the plan: the first node opting in
+                # via 'is_responder' (or its legacy alias 'returnToUser'), otherwise
                 # the last node in the workflow.
-                node_is_responder = config.get('is_responder', config.get('returnToUser', False))
-                if not returned_to_user and (node_is_responder or idx == len(self.configs) - 1):
+                if idx == plan.responder_index:
                     returned_to_user = True
                     logger.debug("Executing a responding node flow.")
 
@@ -517,6 +566,221 @@ class WorkflowProcessor:
                 f"Unlocking locks for InstanceID: '{instance_global_variables.INSTANCE_ID}' and workflow ID: '{self.workflow_id}'")
             self.locking_service.delete_node_locks(instance_global_variables.INSTANCE_ID, self.workflow_id)
 
+    def _apply_first_node_prompt_overrides(self, config: Dict) -> bool:
+        """
+        Applies the first-node prompt overrides to the first node that has a prompt.
+
+        Args:
+            config (Dict): The node configuration, modified in place.
+
+        Returns:
+            bool: True if the overrides were applied to this node.
+        """
+        if not self.override_first_available_prompts or ("systemPrompt" not in config and "prompt" not in config):
+            return False
+        if self.first_node_system_prompt_override is not None:
+            config["systemPrompt"] = self.first_node_system_prompt_override
+        if self.first_node_prompt_override is not None:
+            config["prompt"] = self.first_node_prompt_override
+        self.override_first_available_prompts = False
+        return True
+
+    def _get_parallel_worker_count(self) -> int:
+        """
+        Reads the workflow-level parallel execution settings.
+
+        Returns:
+            int: The maximum number of nodes to run at once, or 0 when the
+            workflow does not enable 'parallelNodeExecution'.
+        """
+        if not isinstance(self.workflow_file_config, dict) or \
+                self.workflow_file_config.get("parallelNodeExecution") is not True:
+            return 0
+        raw = self.workflow_file_config.get("maxParallelNodes", self._DEFAULT_MAX_PARALLEL_NODES)
+        try:
+            return max(1, int(raw))
+        except (ValueError, TypeError):
+            logger.warning("Workflow setting 'maxParallelNodes' is not an integer: '%s'. Using default %d.",
+                           raw, self._DEFAULT_MAX_PARALLEL_NODES)
+            return self._DEFAULT_MAX_PARALLEL_NODES
+
+    def _build_node_dependencies(self, plan: CompiledWorkflow, node_count: int,
+                                 rescanned: Dict[int, frozenset]) -> List[Set[int]]:
+        """
+        Infers which earlier nodes each of the first `node_count` nodes must wait for.
+
+        A node depends on every earlier node whose output it references, in
+        either placeholder or Jinja2 form. Barrier nodes (see _is_parallel_barrier)
+        depend on every earlier node, and every later node depends on them.
+        References to later nodes are ignored, as they are unresolved in
+        sequential order too.
+
+        Args:
+            plan (CompiledWorkflow): The compiled plan for this run.
+            node_count (int): How many leading nodes to schedule.
+            rescanned (Dict[int, frozenset]): Replacement output references for
+                nodes whose config changed after compilation (prompt overrides).
+
+        Returns:
+            List[Set[int]]: For each node index, the indices it depends on.
+        """
+        dependencies: List[Set[int]] = []
+        last_barrier = None
+        for idx in range(node_count):
+            if self._is_parallel_barrier(plan.node_types[idx], self.configs[idx]):
+                dependencies.append(set(range(idx)))
+                last_barrier = idx
+                continue
+            referenced = rescanned.get(idx, plan.agent_output_references[idx])
+            node_deps = {earlier for earlier in range(idx) if f"agent{earlier + 1}Output" in referenced}
+            if last_barrier is not None:
+                node_deps.add(last_barrier)
+            dependencies.append(node_deps)
+        return dependencies
+
+    def _is_parallel_barrier(self, node_type: str, config: Dict) -> bool:
+        """
+        Decides whether a node must run in workflow order in parallel mode.
+
+        Args:
+            node_type (str): The node's compiled type.
+            config (Dict): The node's configuration.
+
+        Returns:
+            bool: The node's 'parallelBarrier' setting if it is a boolean,
+            otherwise whether its type is in _PARALLEL_BARRIER_NODE_TYPES or it
+            is an ImageProcessor that adds its output to the conversation.
+        """
+        override = config.get("parallelBarrier")
+        if isinstance(override, bool):
+            return override
+        if node_type == "ImageProcessor" and config.get("addAsUserMessage", False):
+            return True
+        return node_type in self._PARALLEL_BARRIER_NODE_TYPES
+
+    def _execute_nodes_in_parallel(self, plan: CompiledWorkflow, node_count: int, agent_outputs: Dict,
+                                   node_execution_infos: List[NodeExecutionInfo], max_workers: int) -> None:
+        """
+        Runs the first `node_count` (pre-responder) nodes, concurrently where independent.
+
+        Each node is submitted as soon as every node it depends on has finished,
+        with at most `max_workers` running at once. Outputs are recorded into
+        `agent_outputs` under the same ``agentNOutput`` keys as sequential
+        execution. Cancellation is checked before each node is submitted. On a
+        failure or cancellation no further nodes are started, the nodes already
+        running are allowed to finish, and then the error from the lowest
+        failing step (or the cancellation) is raised.
+
+        Args:
+            plan (CompiledWorkflow): The compiled plan for this run.
+            node_count (int): The number of leading nodes to run (the responder index).
+            agent_outputs (Dict): The run's agent outputs, updated in place.
+            node_execution_infos (List[NodeExecutionInfo]): The run's execution
+                summary, extended in step order.
+            max_workers (int): The maximum number of nodes to run at once.
+
+        Raises:
+            EarlyTerminationException: If the request is cancelled, or a node
+                terminates the workflow.
+        """
+        rescanned = {}
+        for idx in range(node_count):
+            if self._apply_first_node_prompt_overrides(self.configs[idx]):
+                rescanned[idx] = find_agent_output_references(self.configs[idx])
+        dependencies = self._build_node_dependencies(plan, node_count, rescanned)
+        dependency_summary = {idx: sorted(deps) for idx, deps in enumerate(dependencies) if deps}
+        logger.info(f"Workflow {self.workflow_config_name}: running steps 0-{node_count - 1} in parallel "
+                    f"(up to {max_workers} at once); dependencies: {dependency_summary}")
+
+        request_context = (
+            instance_global_variables.get_workflow_override(),
+            instance_global_variables.get_api_type(),
+            instance_global_variables.get_request_user(),
+            is_encryption_active(),
+        )
+        pending = set(range(node_count))
+        completed: Set[int] = set()
+        running = {}
+        infos = []
+        failure: Optional[Tuple[int, BaseException]] = None
+        cancelled = False
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="wilmer-node") as executor:
+            while pending or running:
+                if failure is None and not cancelled:
+                    for idx in sorted(i for i in pending if dependencies[i] <= completed):
+                        if cancellation_service.is_cancelled(self.request_id):
+                            logger.warning(
+                                f"Request {self.request_id} has been cancelled. Terminating workflow early. "
+                                f"(step {idx}, parallel, workflow={self.workflow_config_name})")
+                            cancelled = True
+                            break
+                        pending.discard(idx)
+                        combined_agent_variables = {**self.agent_inputs, **agent_outputs}
+                        future = executor.submit(self._run_parallel_node, plan, idx,
+                                                 combined_agent_variables, request_context)
+                        running[future] = idx
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx = running.pop(future)
+                    try:
+                        result, info = future.result()
+                    except BaseException as e:
+                        if failure is None or idx < failure[0]:
+                            failure = (idx, e)
+                        continue
+                    agent_outputs[f'agent{idx + 1}Output'] = result
+                    completed.add(idx)
+                    infos.append(info)
+
+        node_execution_infos.extend(sorted(infos, key=lambda info: info.node_index))
+        if failure is not None:
+            raise failure[1]
+        if cancelled:
+            cancellation_service.acknowledge_cancellation(self.request_id)
+            raise EarlyTerminationException(f"Workflow execution cancelled for request {self.request_id}")
+
+    def _run_parallel_node(self, plan: CompiledWorkflow, idx: int, agent_outputs: Dict,
+                           request_context: tuple) -> Tuple[Any, NodeExecutionInfo]:
+        """
+        Executes one non-responding node on a pool thread.
+
+        Args:
+            plan (CompiledWorkflow): The compiled plan for this run.
+            idx (int): The node's index.
+            agent_outputs (Dict): The agent inputs and the outputs available to this node.
+            request_context (tuple): The submitting request's workflow override,
+                API type, user, and encryption flag, re-applied on this thread.
+
+        Returns:
+            Tuple[Any, NodeExecutionInfo]: The node's result and its execution record.
+        """
+        workflow_override, api_type, request_user, encryption_active = request_context
+        instance_global_variables.set_workflow_override(workflow_override)
+        instance_global_variables.set_api_type(api_type)
+        instance_global_variables.set_request_user(request_user)
+        set_encryption_context(encryption_active)
+
+        config = self.configs[idx]
+        node_start_time = time.perf_counter()
+        node_type = config.get("type", "Standard")
+        endpoint_name, endpoint_url = self._get_endpoint_details(config)
+        logger.info(f'------Workflow {self.workflow_config_name}; step {idx}; node type: {node_type} [parallel]')
+
+        result = self._process_section(config=config, agent_outputs=agent_outputs, is_responding_node=False)
+
+        return result, NodeExecutionInfo(
+            node_index=idx + 1,
+            node_type=node_type,
+            node_name=plan.node_names[idx],
+            endpoint_name=endpoint_name,
+            endpoint_url=endpoint_url,
+            execution_time_seconds=time.perf_counter() - node_start_time
+        )
+
     # All node config fields that must be integers when consumed downstream.
     # Maps field name -> default value (None means no default; leave absent).
     _INT_CONFIG_FIELDS = {
@@ -635,14 +899,22 @@ class WorkflowProcessor:
                 if (not force_gen_prompt and not add_user_prompt) or block_gen_prompt:
                     add_generation_prompt = False
 
-            self.llm_handler = self.llm_handler_service.load_model_from_config(
+            # Responses streamed to the client are never cached; the node must
+            # opt in, since caching is only safe for deterministic prompts.
+            cache_responses = bool(config.get("cacheResponses", False)) and not is_streaming_for_node
+            llm_handler = self.llm_handler_service.load_model_from_config(
                 endpoint_name, preset, is_streaming_for_node,
                 config.get("maxContextTokenSize", 4096),
                 max_response_tokens,
-                addGenerationPrompt=add_generation_prompt
+                addGenerationPrompt=add_generation_prompt,
+                cache_responses=cache_responses,
+                cache_api_key_hash=self.api_key_hash if cache_responses else None
             )
         else:
-            self.llm_handler = LlmHandler(None, get_chat_template_name(), 0, 0, True)
+            llm_handler = LlmHandler(None, get_chat_template_name(), 0, 0, True)
+        # Kept on the instance for callers that inspect the last node's handler;
+        # the context below uses the local, which parallel nodes cannot clobber.
+        self.llm_handler = llm_handler
 
         messages_to_send = self.messages
         if self.discussion_id and config.get("addDiscussionIdTimestampsForLLM", False):
@@ -667,7 +939,7 @@ class WorkflowProcessor:
             stream=is_streaming_for_node,
             agent_inputs=self.agent_inputs,
             agent_outputs=agent_outputs,
-            llm_handler=self.llm_handler,
+            llm_handler=llm_handler,
             workflow_variable_service=self.workflow_variable_service,
             workflow_manager=self.node_handlers["CustomWorkflow"].workflow_manager,
             node_handlers=self.node_handlers,
@@ -409,6 +409,9 @@ class StreamingResponseHandler:
             str: Formatted SSE or NDJSON strings ready to be sent to the client.
         """
         requires_complex_buffering = self._requires_complex_buffering()
+        # Built once per response: the model name, chunk id and JSON envelope
+        # are fixed here instead of being rebuilt for every token.
+        chunk_encoder = api_helpers.create_stream_chunk_encoder(self.request_id)
         trim_whitespace = self.endpoint_config.get("trimBeginningAndEndLineBreaks", False)
         finish_already_sent = False
         stream_finish_reason = None
@@ -454,7 +457,8 @@ class StreamingResponseHandler:
                     self.full_response_text += pending_text
                     pending_json = api_helpers.build_response_json(
                         token=pending_text, finish_reason=None,
-                        request_id=self.request_id
+                        request_id=self.request_id,
+                        encoder=chunk_encoder,
                     )
                     yield api_helpers.sse_format(pending_json, self.output_format)
 
@@ -483,7 +487,8 @@ class StreamingResponseHandler:
                         self.full_response_text += content_delta
                         content_json = api_helpers.build_response_json(
                             token=content_delta, finish_reason=None,
-                            request_id=self.request_id
+                            request_id=self.request_id,
+                            encoder=chunk_encoder,
                         )
                         yield api_helpers.sse_format(content_json, self.output_format)
                     if finish_reason:
@@ -491,6 +496,7 @@ class StreamingResponseHandler:
                             token="", finish_reason=finish_reason,
                             request_id=self.request_id,
                             tool_calls=self._drain_ollama_tool_calls(),
+                            encoder=chunk_encoder,
                         )
                         yield api_helpers.sse_format(completion_json, self.output_format)
                         finish_already_sent = True
@@ -507,6 +513,7 @@ class StreamingResponseHandler:
                     finish_reason=finish_reason,
                     request_id=self.request_id,
                     tool_calls=tool_calls_delta,
+                    encoder=chunk_encoder,
                 )
                 yield api_helpers.sse_format(completion_json, self.output_format)
                 if finish_reason:
@@ -554,7 +561,8 @@ class StreamingResponseHandler:
                 self.full_response_text += content_to_yield
                 completion_json = api_helpers.build_response_json(
                     token=content_to_yield, finish_reason=None,
-                    request_id=self.request_id
+                    request_id=self.request_id,
+                    encoder=chunk_encoder,
                 )
                 yield api_helpers.sse_format(completion_json, self.output_format)
 
@@ -570,7 +578,8 @@ class StreamingResponseHandler:
                 self.full_response_text += final_content_to_yield
                 completion_json = api_helpers.build_response_json(
                     token=final_content_to_yield, finish_reason=None,
-                    request_id=self.request_id
+                    request_id=self.request_id,
+                    encoder=chunk_encoder,
                 )
                 yield api_helpers.sse_format(completion_json, self.output_format)
 
@@ -589,6 +598,7 @@ class StreamingResponseHandler:
                     token="", finish_reason=None,
                     request_id=self.request_id,
                     tool_calls=liveness_tool_calls,
+                    encoder=chunk_encoder,
                 )
                 yield api_helpers.sse_format(liveness_json, self.output_format)
 
@@ -596,7 +606,8 @@ class StreamingResponseHandler:
                 else (stream_finish_reason or "stop")
             final_completion_json = api_helpers.build_response_json(token="", finish_reason=final_finish_reason,
                                                                     request_id=self.request_id,
-                                                                    tool_calls=accumulated_tool_calls)
+                                                                    tool_calls=accumulated_tool_calls,
+                                                                    encoder=chunk_encoder)
             yield api_helpers.sse_format(final_completion_json, self.output_format)
 
         if self.output_format not in ('ollamagenerate', 'ollamaapichat'):
@@ -3,9 +3,11 @@
 import asyncio
 import json
 import logging
+import threading
+import time
 from contextlib import asynccontextmanager
 from datetime import timedelta
-from typing import Any, Coroutine, Dict, List, Optional
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple
 
 from Middleware.utilities.config_utils import load_mcp_server_config
 
@@ -13,6 +15,23 @@ logger = logging.getLogger(__name__)
 
 _VALID_TRANSPORTS = ("stdio", "sse", "streamable_http")
 
+# Defaults for servers that set "keepAlive": the number of sessions kept open
+# (which is also the number of calls the server is sent at once), how long an
+# unused session stays open, and how long a list_tools result is reused.
+DEFAULT_MAX_SESSIONS = 1
+DEFAULT_IDLE_TIMEOUT_SECONDS = 300.0
+DEFAULT_TOOLS_CACHE_SECONDS = 300.0
+
+# An idle session unused for this long is pinged before it is handed out, so a
+# server that exited or dropped the connection while idle is replaced instead
+# of failing the next call.
+HEALTH_CHECK_AFTER_SECONDS = 30.0
+HEALTH_CHECK_TIMEOUT_SECONDS = 5.0
+
+# How often the pool's event loop closes sessions idle past their server's
+# idleTimeoutSeconds.
+IDLE_SWEEP_INTERVAL_SECONDS = 15.0
+
 
 class MCPToolCallError(RuntimeError):
     """Raised when an MCP tool invocation fails for any reason."""
@@ -79,9 +98,43 @@ def _load_validated_server_config(server_name: str) -> Dict[str, Any]:
             f"MCP server '{server_name}' has invalid or missing 'transport' "
             f"(must be one of {_VALID_TRANSPORTS}; got {transport!r})."
         )
+    if server_config.get("keepAlive"):
+        _pool_settings(server_config, server_name)
     return server_config
 
 
+def _pool_settings(server_config: Dict[str, Any], server_name: str) -> Tuple[int, float, float]:
+    """Reads and validates the session pool settings of a "keepAlive" server.
+
+    Args:
+        server_config (Dict[str, Any]): The loaded MCP server configuration.
+        server_name (str): The MCP server name, for error messages.
+
+    Returns:
+        Tuple[int, float, float]: ``maxSessions``, ``idleTimeoutSeconds`` and
+            ``toolsCacheSeconds``, with defaults applied.
+
+    Raises:
+        MCPToolCallError: If ``maxSessions`` is not a positive integer, or either
+            duration is not a non-negative number.
+    """
+    max_sessions = server_config.get("maxSessions", DEFAULT_MAX_SESSIONS)
+    if isinstance(max_sessions, bool) or not isinstance(max_sessions, int) or max_sessions < 1:
+        raise MCPToolCallError(
+            f"MCP server '{server_name}' 'maxSessions' must be a positive integer; got {max_sessions!r}."
+        )
+    durations = []
+    for field, default in (("idleTimeoutSeconds", DEFAULT_IDLE_TIMEOUT_SECONDS),
+                           ("toolsCacheSeconds", DEFAULT_TOOLS_CACHE_SECONDS)):
+        value = server_config.get(field, default)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            raise MCPToolCallError(
+                f"MCP server '{server_name}' '{field}' must be a non-negative number; got {value!r}."
+            )
+        durations.append(float(value))
+    return max_sessions, durations[0], durations[1]
+
+
 def _innermost_exception(exc: BaseException) -> BaseException:
     """Returns the first leaf exception inside possibly-nested exception groups.
 
@@ -97,7 +150,8 @@ def _innermost_exception(exc: BaseException) -> BaseException:
     return exc
 
 
-def _run_mcp_operation(coro: Coroutine, server_name: str, op_name: str, timeout: float) -> Any:
+def _run_mcp_operation(coro: Coroutine, server_name: str, op_name: str, timeout: float,
+                       runner: Callable[[Coroutine], Any] = asyncio.run) -> Any:
     """Runs an async MCP operation with a timeout, unwrapping anyio's group wrapping.
 
     Args:
@@ -105,6 +159,9 @@ def _run_mcp_operation(coro: Coroutine, server_name: str, op_name: str, timeout:
         server_name (str): The MCP server name, for error messages.
         op_name (str): The tool or operation name, for error messages.
         timeout (float): Overall per-call timeout in seconds.
+        runner (Callable[[Coroutine], Any]): Runs the coroutine to completion from
+            this thread; ``asyncio.run`` for a one-off connection, or
+            ``mcp_session_pool.run`` for a pooled session.
 
     Returns:
         Any: Whatever the coroutine returns.
@@ -113,7 +170,7 @@ def _run_mcp_operation(coro: Coroutine, server_name: str, op_name: str, timeout:
         MCPToolCallError: If the operation times out or fails for any reason.
     """
     try:
-        return asyncio.run(asyncio.wait_for(coro, timeout=timeout))
+        return runner(asyncio.wait_for(coro, timeout=timeout))
     except MCPToolCallError:
         raise
     except asyncio.TimeoutError as exc:
@@ -145,9 +202,11 @@ class MCPClient:
     ``OfflineWikiApiClient``): a workflow handler instantiates one and calls it. The
     client is stateless (the server is named per call and its connection settings are
     loaded from ``Public/Configs/MCPServers/`` at call time), so a single instance can
-    be reused across calls and servers. Each call opens a fresh connection via the
-    official ``mcp`` Python SDK, dispatches on the server's configured transport
+    be reused across calls and servers. By default each call opens a fresh connection
+    via the official ``mcp`` Python SDK, dispatches on the server's configured transport
     (stdio, sse, or streamable_http), performs the operation, and closes the connection.
+    Servers whose config sets ``"keepAlive": true`` are instead called through
+    ``mcp_session_pool``, which keeps initialized sessions open between calls.
     """
 
     def call_tool(
@@ -173,7 +232,8 @@ class MCPClient:
                 and the ``session.call_tool`` call) via ``asyncio.wait_for`` (and is
                 also passed to ``call_tool`` as ``read_timeout_seconds``). A stdio
                 server that spawns but never completes the MCP handshake therefore
-                cannot block the calling worker indefinitely.
+                cannot block the calling worker indefinitely. For a "keepAlive"
+                server it also bounds the wait for a free pooled session.
 
         Returns:
             str: The flattened tool result.
@@ -184,6 +244,14 @@ class MCPClient:
                 failure occurs during the call.
         """
         server_config = _load_validated_server_config(server_name)
+        if server_config.get("keepAlive"):
+            return _run_mcp_operation(
+                mcp_session_pool.call_tool(server_config, server_name, tool_name, arguments or {}, timeout),
+                server_name,
+                tool_name,
+                timeout,
+                runner=mcp_session_pool.run,
+            )
         return _run_mcp_operation(
             _run_tool_call(server_config, server_name, tool_name, arguments or {}, timeout),
             server_name,
@@ -196,7 +264,8 @@ class MCPClient:
         Lists the tools exposed by a named MCP server, normalized for prompt formatting.
 
         Each tool is normalized to the ``{"llm_schema": {...}}`` shape that the agentic
-        workflow's prompt formatter expects, keyed by tool name.
+        workflow's prompt formatter expects, keyed by tool name. For a "keepAlive"
+        server the raw tool list is reused for ``toolsCacheSeconds``.
 
         Args:
             server_name (str): The name of an MCP server config under ``Public/Configs/MCPServers/``.
@@ -214,12 +283,21 @@ class MCPClient:
                 handshake or call times out, or any other failure occurs.
         """
         server_config = _load_validated_server_config(server_name)
-        tools = _run_mcp_operation(
-            _run_list_tools(server_config, server_name, timeout),
-            server_name,
-            "list_tools",
-            timeout,
-        )
+        if server_config.get("keepAlive"):
+            tools = _run_mcp_operation(
+                mcp_session_pool.list_tools(server_config, server_name, timeout),
+                server_name,
+                "list_tools",
+                timeout,
+                runner=mcp_session_pool.run,
+            )
+        else:
+            tools = _run_mcp_operation(
+                _run_list_tools(server_config, server_name, timeout),
+                server_name,
+                "list_tools",
+                timeout,
+            )
 
         normalized: Dict[str, Dict[str, Any]] = {}
         for tool in tools:
@@ -392,6 +470,22 @@ async def _call_tool_in_session(
             read_timeout_seconds=read_timeout,
         )
 
+    return _tool_result_to_text(result, tool_name)
+
+
+def _tool_result_to_text(result: Any, tool_name: str) -> str:
+    """Flattens a CallToolResult, raising if the tool reported an error.
+
+    Args:
+        result (Any): The CallToolResult returned by ``session.call_tool``.
+        tool_name (str): The MCP tool that was invoked, for the error message.
+
+    Returns:
+        str: The flattened tool result.
+
+    Raises:
+        MCPToolCallError: If the tool result is flagged as an error.
+    """
     if getattr(result, "isError", False):
         raise MCPToolCallError(
             f"MCP tool '{tool_name}' reported an error: "
@@ -442,3 +536,380 @@ def _flatten_content(content: List[Any]) -> str:
             dump = getattr(item, "model_dump", None)
             parts.append(json.dumps(dump(mode="json")) if callable(dump) else str(item))
     return "".join(parts)
+
+
+class _PooledSession:
+    """An initialized ClientSession held open by its own owner task on the pool loop.
+
+    anyio requires the transport and session contexts to be entered and exited by
+    the same task, so each session gets an owner task that opens them, publishes the
+    session through ``ready``, and waits on ``closing`` before unwinding them.
+    Calls run in other tasks and only send requests through the session.
+    """
+
+    def __init__(self):
+        self.session: Any = None
+        self.ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.closing = asyncio.Event()
+        self.owner: Optional[asyncio.Task] = None
+        self.last_used = time.monotonic()
+
+    @property
+    def alive(self) -> bool:
+        return not self.closing.is_set() and self.owner is not None and not self.owner.done()
+
+
+class _ServerPool:
+    """The idle sessions, concurrency limit and cached tool list of one server.
+
+    Only touched from the pool's event loop thread, so it needs no lock.
+    """
+
+    def __init__(self, fingerprint: str, max_sessions: int, idle_timeout: float, tools_ttl: float):
+        self.fingerprint = fingerprint
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.tools_ttl = tools_ttl
+        self.semaphore = asyncio.Semaphore(max_sessions)
+        # Most recently used last, so reuse favours the warmest session.
+        self.idle: List[_PooledSession] = []
+        # (expires_at, raw tools) from the last list_tools, if still cacheable.
+        self.tools: Optional[Tuple[float, List[Any]]] = None
+
+
+class MCPSessionPool:
+    """
+    A thread-safe singleton that keeps initialized MCP sessions open between calls.
+
+    Used for servers whose config sets ``"keepAlive": true``. A daemon thread runs
+    one asyncio event loop that owns every pooled session; worker threads submit
+    operations to it and block on the result, so a call to a warm server skips the
+    subprocess spawn or HTTP connect and the ``initialize`` handshake entirely.
+
+    Each server gets at most ``maxSessions`` sessions, and calls beyond that wait
+    for one to be returned, which also caps how many calls the server is sent at
+    once. A session that has sat idle for ``HEALTH_CHECK_AFTER_SECONDS`` is pinged
+    before reuse, a session whose call failed or timed out is closed rather than
+    returned, and sessions idle past ``idleTimeoutSeconds`` are closed by a
+    periodic sweep. Editing a server's config file retires its existing sessions
+    the next time the server is called.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Ensures only one instance of MCPSessionPool exists (singleton pattern).
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(MCPSessionPool, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initializes the server map and counters; the event loop starts on first use.
+        """
+        if self._initialized:
+            return
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._servers: Dict[str, _ServerPool] = {}
+        self._stats: Dict[str, int] = self._empty_stats()
+        self._pool_lock = threading.Lock()
+        self._initialized = True
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {"opened": 0, "reused": 0, "discarded": 0, "health_check_failures": 0,
+                "idle_closed": 0, "tools_cache_hits": 0, "tools_cache_misses": 0}
+
+    def _count(self, stat: str) -> None:
+        with self._pool_lock:
+            self._stats[stat] += 1
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Returns the pool's event loop, starting its thread and idle sweep if needed.
+        """
+        with self._pool_lock:
+            if self._loop is None or self._thread is None or not self._thread.is_alive():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="mcp-session-pool", daemon=True)
+                thread.start()
+                asyncio.run_coroutine_threadsafe(self._sweep_idle(), loop)
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def run(self, coro: Coroutine) -> Any:
+        """
+        Runs a coroutine on the pool's event loop and blocks until it finishes.
+
+        Args:
+            coro (Coroutine): The operation, already bounded by a timeout.
+
+        Returns:
+            Any: Whatever the coroutine returns; its exception is re-raised here.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def _server_pool(self, server_config: Dict[str, Any], server_name: str) -> _ServerPool:
+        """
+        Returns the server's pool, replacing it if the server's config changed.
+        """
+        fingerprint = json.dumps(server_config, sort_keys=True, default=str)
+        pool = self._servers.get(server_name)
+        if pool is None or pool.fingerprint != fingerprint:
+            if pool is not None:
+                for entry in pool.idle:
+                    self._close(entry)
+            pool = self._servers[server_name] = _ServerPool(fingerprint, *_pool_settings(server_config, server_name))
+        return pool
+
+    async def _own_session(self, entry: _PooledSession, server_config: Dict[str, Any],
+                           server_name: str, timeout: float) -> None:
+        """
+        Opens the transport and session, publishes the session, and holds both open until closed.
+        """
+        from mcp import ClientSession
+
+        try:
+            async with _connect_streams(server_config, server_name, timeout) as (read_stream, write_stream):
+                async with ClientSession(read_stream, write_stream) as session:
+                    await session.initialize()
+                    entry.session = session
+                    if not entry.ready.done():
+                        entry.ready.set_result(session)
+                    await entry.closing.wait()
+        except asyncio.CancelledError:
+            if not entry.ready.done():
+                entry.ready.cancel()
+        except BaseException as exc:
+            # Nothing awaits the owner task, so the failure is handed to whoever
+            # is waiting for the session rather than re-raised into the loop.
+            if not entry.ready.done():
+                entry.ready.set_exception(exc)
+            else:
+                logger.debug("Pooled MCP session for '%s' ended: %s", server_name, exc)
+
+    async def _open(self, server_config: Dict[str, Any], server_name: str, timeout: float) -> _PooledSession:
+        """
+        Starts a new session and waits for its initialize handshake to finish.
+        """
+        entry = _PooledSession()
+        entry.owner = asyncio.ensure_future(self._own_session(entry, server_config, server_name, timeout))
+        try:
+            await asyncio.shield(entry.ready)
+        except BaseException:
+            self._close(entry)
+            raise
+        self._count("opened")
+        return entry
+
+    async def _checkout(self, pool: _ServerPool, server_config: Dict[str, Any], server_name: str,
+                        timeout: float) -> _PooledSession:
+        """
+        Takes a healthy idle session, or opens a new one. Caller must hold the pool semaphore.
+        """
+        while pool.idle:
+            entry = pool.idle.pop()
+            if not entry.alive:
+                self._close(entry)
+                self._count("discarded")
+                continue
+            if time.monotonic() - entry.last_used >= HEALTH_CHECK_AFTER_SECONDS:
+                try:
+                    await asyncio.wait_for(entry.session.send_ping(),
+                                           timeout=min(timeout, HEALTH_CHECK_TIMEOUT_SECONDS))
+                except Exception as exc:
+                    logger.debug("Pooled MCP session for '%s' failed its health check: %s", server_name, exc)
+                    self._close(entry)
+                    self._count("health_check_failures")
+                    continue
+                except BaseException:
+                    self._close(entry)
+                    raise
+            self._count("reused")
+            return entry
+        return await self._open(server_config, server_name, timeout)
+
+    @asynccontextmanager
+    async def _lease(self, server_config: Dict[str, Any], server_name: str, timeout: float):
+        """
+        Lends a session for one operation, returning it to the pool only if the operation succeeded.
+        """
+        pool = self._server_pool(server_config, server_name)
+        async with pool.semaphore:
+            entry = await self._checkout(pool, server_config, server_name, timeout)
+            try:
+                yield entry.session
+            except BaseException:
+                # A failed or cancelled request may leave the session mid-response.
+                self._close(entry)
+                self._count("discarded")
+                raise
+            entry.last_used = time.monotonic()
+            if entry.alive and self._servers.get(server_name) is pool and len(pool.idle) < pool.max_sessions:
+                pool.idle.append(entry)
+            else:
+                self._close(entry)
+
+    async def _with_session(self, server_config: Dict[str, Any], server_name: str, timeout: float,
+                            operation: Callable[[Any], Coroutine]) -> Any:
+        """
+        Runs an operation on a leased session, retrying once on a fresh session if the
+        leased one turns out to be closed.
+
+        A closed or broken stream fails the send before the request reaches the server
+        (typically a server that exited while idle), so the retry can never run a tool
+        twice.
+        """
+        from anyio import BrokenResourceError, ClosedResourceError
+
+        try:
+            async with self._lease(server_config, server_name, timeout) as session:
+                return await operation(session)
+        except (BrokenResourceError, ClosedResourceError) as exc:
+            logger.debug("Pooled MCP session for '%s' was closed (%r); retrying on a new session.",
+                         server_name, exc)
+        async with self._lease(server_config, server_name, timeout) as session:
+            return await operation(session)
+
+    async def call_tool(self, server_config: Dict[str, Any], server_name: str, tool_name: str,
+                        arguments: Dict[str, Any], timeout: float) -> str:
+        """
+        Calls one tool on a pooled session. Must run on the pool's event loop (see ``run``).
+
+        Args:
+            server_config (Dict[str, Any]): The loaded MCP server configuration.
+            server_name (str): The MCP server name.
+            tool_name (str): The MCP tool to invoke.
+            arguments (Dict[str, Any]): The arguments to pass to the tool.
+            timeout (float): Per-call timeout in seconds; also the per-tool read timeout.
+
+        Returns:
+            str: The flattened tool result.
+
+        Raises:
+            MCPToolCallError: If the tool result is flagged as an error.
+        """
+        result = await self._with_session(
+            server_config, server_name, timeout,
+            lambda session: session.call_tool(tool_name, arguments=arguments,
+                                              read_timeout_seconds=timedelta(seconds=timeout)))
+        return _tool_result_to_text(result, tool_name)
+
+    async def list_tools(self, server_config: Dict[str, Any], server_name: str, timeout: float) -> List[Any]:
+        """
+        Lists a server's tools on a pooled session, reusing a recent result. Must run on
+        the pool's event loop (see ``run``).
+
+        Args:
+            server_config (Dict[str, Any]): The loaded MCP server configuration.
+            server_name (str): The MCP server name.
+            timeout (float): Per-call timeout in seconds.
+
+        Returns:
+            List[Any]: The raw tool objects reported by the server, or an empty list.
+        """
+        pool = self._server_pool(server_config, server_name)
+        if pool.tools is not None and time.monotonic() < pool.tools[0]:
+            self._count("tools_cache_hits")
+            return pool.tools[1]
+        self._count("tools_cache_misses")
+        result = await self._with_session(server_config, server_name, timeout,
+                                          lambda session: session.list_tools())
+        tools = getattr(result, "tools", []) or []
+        if pool.tools_ttl > 0 and self._servers.get(server_name) is pool:
+            pool.tools = (time.monotonic() + pool.tools_ttl, tools)
+        return tools
+
+    @staticmethod
+    def _close(entry: _PooledSession) -> None:
+        """
+        Asks a session's owner task to unwind; a session still opening is cancelled outright.
+        """
+        entry.closing.set()
+        if entry.session is None and entry.owner is not None:
+            entry.owner.cancel()
+
+    def _close_idle(self, expired_only: bool) -> List[_PooledSession]:
+        """
+        Closes idle sessions, or only those idle past their server's idleTimeoutSeconds.
+        Must run on the pool's event loop.
+        """
+        now = time.monotonic()
+        closed = []
+        for pool in self._servers.values():
+            keep = []
+            for entry in pool.idle:
+                if expired_only and now - entry.last_used < pool.idle_timeout:
+                    keep.append(entry)
+                else:
+                    self._close(entry)
+                    closed.append(entry)
+            pool.idle = keep
+        return closed
+
+    def _close_expired(self) -> int:
+        """
+        Closes sessions idle past their server's idleTimeoutSeconds. Must run on the pool's event loop.
+
+        Returns:
+            int: The number of sessions closed.
+        """
+        closed = len(self._close_idle(expired_only=True))
+        with self._pool_lock:
+            self._stats["idle_closed"] += closed
+        return closed
+
+    async def _sweep_idle(self) -> None:
+        """
+        Periodically closes sessions idle past their server's idleTimeoutSeconds.
+        """
+        while True:
+            await asyncio.sleep(IDLE_SWEEP_INTERVAL_SECONDS)
+            self._close_expired()
+
+    async def _reset(self) -> None:
+        """
+        Closes every idle session, waits briefly for them to unwind, and forgets all servers.
+        """
+        owners = [entry.owner for entry in self._close_idle(expired_only=False) if entry.owner is not None]
+        self._servers.clear()
+        if owners:
+            await asyncio.wait(owners, timeout=HEALTH_CHECK_TIMEOUT_SECONDS)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns pool counters.
+
+        Returns:
+            Dict[str, int]: ``opened`` (sessions started), ``reused`` (calls served by a
+            warm session), ``discarded`` (sessions dropped after a failed call or found
+            dead), ``health_check_failures``, ``idle_closed``, ``tools_cache_hits`` and
+            ``tools_cache_misses``, and the current ``idle`` session count.
+        """
+        with self._pool_lock:
+            stats = dict(self._stats)
+        stats["idle"] = sum(len(pool.idle) for pool in list(self._servers.values()))
+        return stats
+
+    def clear(self) -> None:
+        """
+        Closes every idle session and resets the counters. Intended for test isolation.
+        """
+        with self._pool_lock:
+            loop = self._loop if self._thread is not None and self._thread.is_alive() else None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self._reset(), loop).result()
+        with self._pool_lock:
+            self._stats = self._empty_stats()
+
+
+# Global singleton instance
+mcp_session_pool = MCPSessionPool()
@@ -3,10 +3,12 @@ import logging
 import os
 import re
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from dataclasses import replace as dc_replace
 from typing import List, Dict, Any, Optional
 
+from Middleware.common import instance_global_variables
 from Middleware.services.embedding_service import EmbeddingService
 from Middleware.services.llm_service import LlmHandlerService
 from Middleware.services.memory_service import MemoryService
@@ -19,10 +21,12 @@ from Middleware.utilities.file_utils import read_chunks_with_hashes, \
     read_plain_text_file, write_plain_text_file
 from Middleware.utilities.hashing_utils import extract_text_blocks_from_hashed_chunks, find_last_matching_hash_message, \
     chunk_messages_with_hashes, hash_single_message
+from Middleware.utilities.keyword_index import keyword_index_cache
 from Middleware.utilities.prompt_extraction_utils import extract_last_n_turns
-from Middleware.utilities.search_utils import filter_keywords_by_speakers, advanced_search_in_chunks, search_in_chunks
-from Middleware.utilities.text_utils import get_message_chunks, clear_out_user_assistant_from_chunks, \
-    rough_estimate_token_length
+from Middleware.utilities.search_utils import filter_keywords_by_speakers
+from Middleware.utilities.sensitive_logging_utils import is_encryption_active, set_encryption_context
+from Middleware.utilities.text_utils import get_message_chunk_groups, clear_out_user_assistant_from_chunks, \
+    messages_to_text_block, rough_estimate_token_length
 from Middleware.workflows.models.execution_context import ExecutionContext
 
 logger = logging.getLogger(__name__)
@@ -108,6 +112,10 @@ class SlowButQualityRAGTool:
         processed, the corresponding hash is written to the hash log, making the
         process resumable if interrupted.
 
+        With 'memoryGenerationConcurrency' above 1, up to that many chunks are
+        extracted at once on a thread pool; storage and hash logging still happen
+        one chunk at a time, in the original order.
+
         Args:
             hashed_chunks (List[tuple]): A list of tuples, each containing (text_chunk, hash).
             config (Dict): The configuration dictionary for this memory operation.
@@ -122,9 +130,82 @@ Memory Text:
 [TextChunk]
 JSON Output:"""
 
-        vector_workflow_name = config.get('vectorMemoryWorkflowName')
+        work = [(chunk, chunk_hash) for chunk, chunk_hash in hashed_chunks if chunk.strip()]
+        concurrency = self._get_memory_generation_concurrency(config)
+        total_memories_stored = 0
+
+        if concurrency > 1 and len(work) > 1:
+            # Chunks are extracted concurrently, but every result is committed on this
+            # thread in the original chunk order, so the hash log advances exactly as
+            # it would sequentially and an interrupted pass resumes at the same place.
+            # Each LLM call still goes through the endpoint concurrency gate.
+            request_context = (
+                instance_global_variables.get_workflow_override(),
+                instance_global_variables.get_api_type(),
+                instance_global_variables.get_request_user(),
+                is_encryption_active(),
+            )
+            logger.info(f"Generating vector memories for {len(work)} chunks, up to {concurrency} at once.")
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(work)),
+                                    thread_name_prefix="wilmer-memory") as executor:
+                futures = [
+                    executor.submit(self._generate_vector_memory_in_worker, chunk, config, context,
+                                    rag_prompt, rag_system_prompt, request_context)
+                    for chunk, _ in work
+                ]
+                try:
+                    for (_, chunk_hash), future in zip(work, futures):
+                        total_memories_stored += self._store_vector_memories_for_chunk(
+                            future.result(), chunk_hash, config, context)
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+            return total_memories_stored
+
+        llm_context = self._build_vector_memory_llm_context(config, context)
+        for chunk, chunk_hash in work:
+            json_string_output = self._generate_vector_memory_output(
+                chunk, config, context, llm_context, rag_prompt, rag_system_prompt)
+            total_memories_stored += self._store_vector_memories_for_chunk(
+                json_string_output, chunk_hash, config, context)
+
+        return total_memories_stored
+
+    @staticmethod
+    def _get_memory_generation_concurrency(config: Dict) -> int:
+        """
+        Reads 'memoryGenerationConcurrency' from the discussion ID workflow settings.
+
+        Args:
+            config (Dict): The discussion ID workflow settings dictionary.
+
+        Returns:
+            int: How many vector memory chunks may be extracted at once (1 when
+            unset or invalid, which keeps the strictly sequential behavior).
+        """
+        concurrency = config.get('memoryGenerationConcurrency', 1)
+        if not isinstance(concurrency, int) or isinstance(concurrency, bool) or concurrency < 1:
+            logger.warning("memoryGenerationConcurrency must be an integer of at least 1. Ignoring: %r",
+                           concurrency)
+            return 1
+        return concurrency
+
+    @staticmethod
+    def _build_vector_memory_llm_context(config: Dict, context: ExecutionContext) -> ExecutionContext:
+        """
+        Builds the execution context for direct-LLM vector memory extraction.
+
+        Args:
+            config (Dict): The configuration dictionary for this memory operation.
+            context (ExecutionContext): The current workflow execution context.
+
+        Returns:
+            ExecutionContext: A copy of the context carrying the vector memory LLM
+            handler, or no handler when 'vectorMemoryWorkflowName' is set.
+        """
         llm_handler = None
-        if not vector_workflow_name:
+        if not config.get('vectorMemoryWorkflowName'):
             endpoint_name = config.get('vectorMemoryEndpointName', config.get('endpointName'))
             preset_name = config.get('vectorMemoryPreset', config.get('preset'))
             max_tokens = config.get("vectorMemoryMaxResponseSizeInTokens", 1024)
@@ -134,85 +215,141 @@ JSON Output:"""
                 endpoint_data, preset_name, endpoint_name, False,
                 endpoint_data.get("maxContextTokenSize", 4096), max_tokens
             )
+        return dc_replace(context, llm_handler=llm_handler, config=config)
 
-        temp_llm_context = dc_replace(context, llm_handler=llm_handler, config=config)
+    def _generate_vector_memory_output(self, chunk: str, config: Dict, context: ExecutionContext,
+                                       llm_context: ExecutionContext, rag_prompt: str,
+                                       rag_system_prompt: str) -> Optional[str]:
+        """
+        Extracts the raw memory JSON for one chunk via the configured workflow or a direct LLM call.
 
-        total_memories_stored = 0
+        Args:
+            chunk (str): The text chunk to extract memories from.
+            config (Dict): The configuration dictionary for this memory operation.
+            context (ExecutionContext): The current workflow execution context.
+            llm_context (ExecutionContext): The context from _build_vector_memory_llm_context.
+            rag_prompt (str): The user prompt for the direct LLM call.
+            rag_system_prompt (str): The system prompt for the direct LLM call.
 
-        for chunk, chunk_hash in hashed_chunks:
-            if not chunk.strip():
-                continue
-
-            json_string_output = None
-            if vector_workflow_name:
-                logger.info(f"Using workflow '{vector_workflow_name}' to generate vector memory.")
-                scoped_inputs = [chunk]
-                json_string_output = context.workflow_manager.run_custom_workflow(
-                    workflow_name=vector_workflow_name,
-                    request_id=context.request_id,
-                    discussion_id=context.discussion_id,
-                    messages=context.messages,
-                    non_responder=True,
-                    scoped_inputs=scoped_inputs,
-                    api_key=context.api_key
-                )
-            else:
-                json_string_output = self.process_single_chunk(
-                    chunk, rag_prompt, rag_system_prompt, temp_llm_context
-                )
+        Returns:
+            Optional[str]: The raw workflow or LLM output.
+        """
+        vector_workflow_name = config.get('vectorMemoryWorkflowName')
+        if vector_workflow_name:
+            logger.info(f"Using workflow '{vector_workflow_name}' to generate vector memory.")
+            scoped_inputs = [chunk]
+            return context.workflow_manager.run_custom_workflow(
+                workflow_name=vector_workflow_name,
+                request_id=context.request_id,
+                discussion_id=context.discussion_id,
+                messages=context.messages,
+                non_responder=True,
+                scoped_inputs=scoped_inputs,
+                api_key=context.api_key
+            )
+        return self.process_single_chunk(chunk, rag_prompt, rag_system_prompt, llm_context)
 
-            if json_string_output:
-                parsed_json = self._parse_llm_json_output(json_string_output)
-
-                memories_to_process = []
-                if isinstance(parsed_json, dict):
-                    memories_to_process.append(parsed_json)
-                elif isinstance(parsed_json, list):
-                    memories_to_process = parsed_json
-
-                successful_adds = 0
-                stored_summaries = []
-                stored_id_text_pairs = []
-                for memory_metadata in memories_to_process:
-                    if isinstance(memory_metadata, dict):
-                        required_keys = ['title', 'summary', 'entities', 'key_phrases']
-                        if all(k in memory_metadata for k in required_keys):
-                            memory_summary = memory_metadata['summary']
-                            memory_id = vector_db_utils.add_memory_to_vector_db(
-                                context.discussion_id,
-                                memory_summary,
-                                json.dumps(memory_metadata),
-                                api_key_hash=context.api_key_hash,
-                                index_topics=bool(config.get('vectorMemoryIndexTopics', False)),
-                            )
-                            if memory_id is not None:
-                                successful_adds += 1
-                                stored_summaries.append(memory_summary)
-                                stored_id_text_pairs.append((memory_id, memory_summary))
-
-                if successful_adds > 0:
-                    # Write the hash immediately after successfully storing memories for this chunk
-                    # This makes the process resumable: if interrupted, we can pick up from the last hash
-                    vector_db_utils.add_vector_check_hash(
-                        context.discussion_id, chunk_hash, api_key_hash=context.api_key_hash
-                    )
-                    logger.info(
-                        f"Successfully generated and stored {successful_adds} vector memory/memories for discussion {context.discussion_id}. Hash logged for resumability.")
-                    total_memories_stored += successful_adds
-                    # Both run after the hash log on purpose: a failure in either must
-                    # not cause this chunk's facts to be re-extracted (and duplicated in
-                    # the vector DB) on the next pass. The facts stay searchable either way.
-                    self._store_embeddings_for_new_memories(config, context, stored_id_text_pairs)
-                    self._update_state_document(config, context, stored_summaries)
-                elif memories_to_process:
-                    logger.error(
-                        "Vector DB rejected all %d parsed memory/memories for this chunk; "
-                        "hash not logged, chunk will be retried on the next pass.",
-                        len(memories_to_process))
-                else:
-                    logger.error("Received empty response from LLM/workflow for vector memory generation.")
+    def _generate_vector_memory_in_worker(self, chunk: str, config: Dict, context: ExecutionContext,
+                                          rag_prompt: str, rag_system_prompt: str,
+                                          request_context: tuple) -> Optional[str]:
+        """
+        Extracts one chunk's memory JSON on a pool thread.
 
-        return total_memories_stored
+        The request-scoped settings are re-applied because they are thread-local,
+        and each chunk gets its own LLM handler because an LlmApiService tracks a
+        single in-flight call.
+
+        Args:
+            chunk (str): The text chunk to extract memories from.
+            config (Dict): The configuration dictionary for this memory operation.
+            context (ExecutionContext): The current workflow execution context.
+            rag_prompt (str): The user prompt for the direct LLM call.
+            rag_system_prompt (str): The system prompt for the direct LLM call.
+            request_context (tuple): The submitting request's workflow override,
+                API type, user, and encryption flag.
+
+        Returns:
+            Optional[str]: The raw workflow or LLM output.
+        """
+        workflow_override, api_type, request_user, encryption_active = request_context
+        instance_global_variables.set_workflow_override(workflow_override)
+        instance_global_variables.set_api_type(api_type)
+        instance_global_variables.set_request_user(request_user)
+        set_encryption_context(encryption_active)
+
+        llm_context = self._build_vector_memory_llm_context(config, context)
+        return self._generate_vector_memory_output(chunk, config, context, llm_context, rag_prompt,
+                                                   rag_system_prompt)
+
+    def _store_vector_memories_for_chunk(self, json_string_output: Optional[str], chunk_hash: str,
+                                         config: Dict, context: ExecutionContext) -> int:
+        """
+        Stores the memories parsed from one chunk's output and logs the chunk hash.
+
+        After a chunk's memories are stored, its hash is written to the hash log,
+        making the process resumable if interrupted.
+
+        Args:
+            json_string_output (Optional[str]): The raw workflow or LLM output for the chunk.
+            chunk_hash (str): The hash of the chunk.
+            config (Dict): The configuration dictionary for this memory operation.
+            context (ExecutionContext): The current workflow execution context.
+
+        Returns:
+            int: The number of memories stored for the chunk.
+        """
+        if not json_string_output:
+            return 0
+
+        parsed_json = self._parse_llm_json_output(json_string_output)
+
+        memories_to_process = []
+        if isinstance(parsed_json, dict):
+            memories_to_process.append(parsed_json)
+        elif isinstance(parsed_json, list):
+            memories_to_process = parsed_json
+
+        successful_adds = 0
+        stored_summaries = []
+        stored_id_text_pairs = []
+        for memory_metadata in memories_to_process:
+            if isinstance(memory_metadata, dict):
+                required_keys = ['title', 'summary', 'entities', 'key_phrases']
+                if all(k in memory_metadata for k in required_keys):
+                    memory_summary = memory_metadata['summary']
+                    memory_id = vector_db_utils.add_memory_to_vector_db(
+                        context.discussion_id,
+                        memory_summary,
+                        json.dumps(memory_metadata),
+                        api_key_hash=context.api_key_hash,
+                        index_topics=bool(config.get('vectorMemoryIndexTopics', False)),
+                    )
+                    if memory_id is not None:
+                        successful_adds += 1
+                        stored_summaries.append(memory_summary)
+                        stored_id_text_pairs.append((memory_id, memory_summary))
+
+        if successful_adds > 0:
+            # Write the hash immediately after successfully storing memories for this chunk
+            # This makes the process resumable: if interrupted, we can pick up from the last hash
+            vector_db_utils.add_vector_check_hash(
+                context.discussion_id, chunk_hash, api_key_hash=context.api_key_hash
+            )
+            logger.info(
+                f"Successfully generated and stored {successful_adds} vector memory/memories for discussion {context.discussion_id}. Hash logged for resumability.")
+            # Both run after the hash log on purpose: a failure in either must
+            # not cause this chunk's facts to be re-extracted (and duplicated in
+            # the vector DB) on the next pass. The facts stay searchable either way.
+            self._store_embeddings_for_new_memories(config, context, stored_id_text_pairs)
+            self._update_state_document(config, context, stored_summaries)
+        elif memories_to_process:
+            logger.error(
+                "Vector DB rejected all %d parsed memory/memories for this chunk; "
+                "hash not logged, chunk will be retried on the next pass.",
+                len(memories_to_process))
+        else:
+            logger.error("Received empty response from LLM/workflow for vector memory generation.")
+        return successful_adds
 
     def _store_embeddings_for_new_memories(self, config: Dict, context: ExecutionContext,
                                            id_text_pairs: List[tuple]) -> None:
@@ -403,11 +540,14 @@ JSON Output:"""
         """
         if len(context.messages) <= lookbackStartTurn:
             return 'There are no memories. This conversation has not gone long enough for there to be memories.'
-        message_copy = deepcopy(context.messages)
-        pair_chunks = get_message_chunks(message_copy, lookbackStartTurn, 400)
-        last_n_turns = extract_last_n_turns(message_copy, 10, context.llm_handler.takes_message_collection)
+        # Nothing below mutates the messages, so they are read in place rather than copied.
+        chunk_groups = get_message_chunk_groups(context.messages, lookbackStartTurn, 400)
+        last_n_turns = extract_last_n_turns(context.messages, 10, context.llm_handler.takes_message_collection)
         keywords = filter_keywords_by_speakers(last_n_turns, keywords)
-        search_result_chunks = advanced_search_in_chunks(pair_chunks, keywords, 10)
+        index_key = ("conversation", context.api_key_hash, context.discussion_id) if context.discussion_id else None
+        best_chunks = keyword_index_cache.search_chunks(
+            index_key, [[message['content'] for message in group] for group in chunk_groups], keywords, 10)
+        search_result_chunks = [messages_to_text_block(chunk_groups[i]) for i in best_chunks]
         search_result_chunks = clear_out_user_assistant_from_chunks(search_result_chunks)
         filtered_chunks = [s for s in search_result_chunks if s]
         return '--ChunkBreak--'.join(filtered_chunks)
@@ -433,10 +573,11 @@ JSON Output:"""
         pair_chunks = extract_text_blocks_from_hashed_chunks(hash_chunks)
         if len(pair_chunks) > 3:
             pair_chunks = pair_chunks[:-3]
-        last_n_turns = extract_last_n_turns(deepcopy(context.messages), 10,
-                                            context.llm_handler.takes_message_collection)
+        last_n_turns = extract_last_n_turns(context.messages, 10, context.llm_handler.takes_message_collection)
         keywords = filter_keywords_by_speakers(last_n_turns, keywords)
-        search_result_chunks = search_in_chunks(pair_chunks, keywords, 10)
+        index_key = ("memories", api_key_hash, context.discussion_id)
+        matches = keyword_index_cache.match_documents(index_key, pair_chunks, keywords, 10)
+        search_result_chunks = [pair_chunks[i] for i in matches]
         search_result_chunks = clear_out_user_assistant_from_chunks(search_result_chunks)
         filtered_chunks = [s for s in search_result_chunks if s]
         return '\n\n'.join(filtered_chunks)
@@ -713,9 +854,7 @@ JSON Output:"""
         api_key_hash = context.api_key_hash
         encryption_key = context.encryption_key
         filepath = get_discussion_memory_file_path(context.discussion_id, api_key_hash=api_key_hash)
-        existing_chunks = read_chunks_with_hashes(filepath, encryption_key=encryption_key)
-        updated_chunks = existing_chunks + replaced
-        update_chunks_with_hashes(updated_chunks, filepath, mode="overwrite", encryption_key=encryption_key)
+        update_chunks_with_hashes(replaced, filepath, mode="append", encryption_key=encryption_key)
 
     def perform_rag_on_conversation_chunk(self, rag_system_prompt: str, rag_prompt: str, text_chunk: str,
                                           context: ExecutionContext) -> str:
@@ -12,11 +12,19 @@
 # backfills a small batch per memory cycle (embeddingBackfillBatchSize). This
 # script just does the whole backlog at once for users with years of memories.
 #
+# --build-index additionally (re)builds the optional IVF approximate
+# nearest-neighbour index used by VectorMemorySearch nodes with
+# "vectorIndex": "ivf". It is written next to the database
+# (vector_memory.db -> vector_memory.ann.db) and requires NumPy. With
+# --index-only the backfill is skipped and no embeddings server is needed.
+#
 # Examples (from the project root):
 #   python Scripts/backfill_embeddings.py --db Public/DiscussionIds/mychat/vector_memory.db \
 #       --url http://localhost:8081 --model nomic-embed-text
 #   python Scripts/backfill_embeddings.py --db /path/to/vector_memory.db \
 #       --url http://localhost:11434 --api-shape ollama --model nomic-embed-text
+#   python Scripts/backfill_embeddings.py --db /path/to/vector_memory.db \
+#       --model nomic-embed-text --index-only --build-index
 
 import argparse
 import os
@@ -26,6 +34,12 @@ from array import array
 
 import requests
 
+# Add the project root to sys.path so Middleware imports work
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from Middleware.utilities import vector_index_utils
+
 CREATE_EMBEDDINGS_TABLE = '''
     CREATE TABLE IF NOT EXISTS memory_embeddings (
         memory_id INTEGER NOT NULL,
@@ -68,11 +82,21 @@ def fetch_embeddings(session, base_url, api_shape, model, api_key, texts, timeou
     return vectors
 
 
+def build_index(conn, db_path, model, list_count):
+    """Builds the IVF index over every stored vector for a model. Returns the number indexed."""
+    pairs = [(row["memory_id"], row["vector"]) for row in conn.execute(
+        'SELECT memory_id, vector FROM memory_embeddings WHERE model = ? ORDER BY memory_id', (model,))]
+    index_path = vector_index_utils.get_index_path(db_path)
+    count = vector_index_utils.build_ivf_index(index_path, model, pairs, list_count=list_count)
+    print(f"Built ANN index for model '{model}' at '{index_path}': {count} vectors.")
+    return count
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Backfill embeddings for an existing WilmerAI vector memory database.")
     parser.add_argument("--db", required=True, help="Path to the vector_memory.db file.")
-    parser.add_argument("--url", required=True, help="Base URL of the embeddings server.")
+    parser.add_argument("--url", help="Base URL of the embeddings server. Required unless --index-only.")
     parser.add_argument("--model", required=True,
                         help="Embedding model name. Must match the endpoint's "
                              "modelNameToSendToAPI so Wilmer's search finds these vectors.")
@@ -84,10 +108,23 @@ def main():
                         help="Texts per embedding request. Default: 32.")
     parser.add_argument("--timeout", type=int, default=120,
                         help="Per-request timeout in seconds. Default: 120.")
+    parser.add_argument("--build-index", action="store_true",
+                        help="After the backfill, (re)build the IVF approximate nearest-neighbour "
+                             "index for --model. Requires NumPy.")
+    parser.add_argument("--index-only", action="store_true",
+                        help="Skip the backfill; only build the index from the vectors already stored.")
+    parser.add_argument("--index-lists", type=int, default=None,
+                        help="Number of IVF clusters. Default: about the square root of the vector count.")
     args = parser.parse_args()
 
     if args.batch_size < 1:
         parser.error("--batch-size must be at least 1.")
+    if args.index_only and not args.build_index:
+        parser.error("--index-only requires --build-index.")
+    if not args.index_only and not args.url:
+        parser.error("--url is required unless --index-only is given.")
+    if args.index_lists is not None and args.index_lists < 1:
+        parser.error("--index-lists must be at least 1.")
 
     # sqlite3.connect would silently create an empty database at a typo'd
     # path; require an existing file instead.
@@ -111,7 +148,18 @@ def main():
     conn.execute(CREATE_EMBEDDINGS_TABLE)
     conn.commit()
 
+    if args.index_only:
+        try:
+            build_index(conn, args.db, args.model, args.index_lists)
+        except (RuntimeError, ValueError) as e:
+            print(f"Error: could not build the index: {e}")
+            return 1
+        finally:
+            conn.close()
+        return 0
+
     total = conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+    index_path = vector_index_utils.get_index_path(args.db)
     session = requests.Session()
     done = 0
     failures = 0
@@ -144,6 +192,13 @@ def main():
             "INSERT OR REPLACE INTO memory_embeddings (memory_id, model, dim, vector) "
             "VALUES (?, ?, ?, ?)", payload)
         conn.commit()
+        if not args.build_index and os.path.exists(index_path):
+            # Keep an existing index in step so searches can keep using it.
+            try:
+                vector_index_utils.add_to_ivf_index(
+                    index_path, args.model, [(memory_id, blob) for memory_id, _, _, blob in payload])
+            except sqlite3.Error as e:
+                print(f"\nWarning: could not update the index ({e}); rebuild it with --build-index.")
         done += len(rows)
         print(f"\rEmbedded {done} memories...", end="", flush=True)
 
@@ -151,11 +206,18 @@ def main():
         '''SELECT COUNT(*) FROM memories
            WHERE id NOT IN (SELECT memory_id FROM memory_embeddings WHERE model = ?)''',
         (args.model,)).fetchone()[0]
-    conn.close()
 
     print(f"\nDone. {total} memories total, {done} embedded this run, {remaining} remaining "
           f"for model '{args.model}'.")
-    return 0 if remaining == 0 else 1
+    index_failed = False
+    if args.build_index:
+        try:
+            build_index(conn, args.db, args.model, args.index_lists)
+        except (RuntimeError, ValueError) as e:
+            print(f"Error: could not build the index: {e}")
+            index_failed = True
+    conn.close()
+    return 0 if remaining == 0 and not index_failed else 1
 
 
 if __name__ == "__main__":
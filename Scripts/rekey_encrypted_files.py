@@ -39,6 +39,7 @@ from Middleware.utilities.encryption_utils import (
     encrypt_bytes,
     decrypt_bytes,
 )
+from Middleware.utilities.file_utils import compact_record_log
 
 
 def find_discussion_directory(user_config_path: str) -> str:
@@ -313,6 +314,9 @@ def main():
         if filepath in already_done:
             print(f"  {relative}: skipped (already processed)")
             continue
+        # Fold any appended records into the file first; the record log is
+        # encrypted record by record with the old key and is not re-keyed itself.
+        compact_record_log(filepath, old_key)
         result = process_file(filepath, old_key, new_key)
         status = "processed" if result else "already plaintext"
         print(f"  {relative}: {status}")
@@ -0,0 +1,21 @@
+from Middleware.services.metrics_service import metrics_service
+
+
+def test_metrics_endpoint_serves_prometheus_text(client):
+    """Tests that /metrics returns the registry in the Prometheus text format."""
+    metrics_service.increment("wilmer_cancellations_total")
+    metrics_service.observe("wilmer_backend_ttft_seconds", 0.2, {"endpoint": "Local"})
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.content_type == "text/plain; version=0.0.4; charset=utf-8"
+    body = response.get_data(as_text=True)
+    assert "\nwilmer_cancellations_total 1\n" in body
+    assert 'wilmer_backend_ttft_seconds_count{endpoint="Local"} 1' in body
+    assert "# TYPE wilmer_cache_hit_ratio gauge" in body
+
+
+def test_metrics_endpoint_is_get_only(client):
+    """Tests that /metrics does not accept writes."""
+    assert client.post('/metrics').status_code == 405
@@ -147,6 +147,23 @@ def test_chat_completions_streaming_has_connection_close(client, mocker):
     assert response.headers.get('Connection') == 'close'
 
 
+def test_streaming_under_waitress_omits_connection_header(client, mocker):
+    """Waitress rejects hop-by-hop headers from the app, so none is set when it is the server."""
+
+    def stream_generator():
+        yield "data: chunk1\n\n"
+
+    mock_handle_prompt = mocker.patch('Middleware.api.handlers.impl.openai_api_handler.handle_user_prompt')
+    mock_handle_prompt.return_value = stream_generator()
+
+    payload = {"prompt": "Test prompt", "stream": True}
+    response = client.post('/v1/completions', json=payload,
+                           environ_overrides={'SERVER_SOFTWARE': 'waitress'})
+
+    assert response.status_code == 200
+    assert 'Connection' not in response.headers
+
+
 def test_completions_streaming_has_connection_close(client, mocker):
     """Tests that streaming /v1/completions responses include Connection: close header."""
 
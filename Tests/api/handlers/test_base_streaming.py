@@ -3,8 +3,9 @@
 # Direct tests for the shared streaming machinery in
 # Middleware/api/handlers/base/base_streaming.py: the implementation selector,
 # request-context capture/restore across the view's finally-clear, the Eventlet
-# heartbeat, the Eventlet pre-response error path, and the Eventlet mid-stream
-# disconnect teardown chain (cancel -> reader kill -> acknowledge -> release).
+# heartbeat, the Eventlet pre-response error path, the Eventlet mid-stream
+# disconnect teardown chain (cancel -> reader kill -> acknowledge -> release),
+# and the Eventlet write coalescing.
 # The Flask test client never monkey-patches Eventlet, so the endpoint-level
 # tests only exercise the fallback path; these tests cover the rest.
 
@@ -263,3 +264,61 @@ class TestEventletMidStreamDisconnect:
             "reader teardown must acknowledge the requested cancellation"
         assert idempotency_service.get_request_id_for_key('key-dc') is None, \
             "reader teardown must release the idempotency entry"
+
+
+class TestEventletCoalescing:
+    """With streamCoalescing enabled, chunks already queued behind the one being
+    sent go out in the same write, the terminator is still detected per chunk,
+    and nothing the backend yields after the terminator reaches the client."""
+
+    def _stream(self, app, monkeypatch, backend, settings):
+        pytest.importorskip("eventlet")
+        monkeypatch.setattr(base_streaming, '_get_coalescing_settings', lambda: settings)
+        with app.test_request_context('/v1/chat/completions'):
+            response = base_streaming.stream_with_eventlet_optimized(
+                _sse_config(), backend, 'req-co', [{"role": "user", "content": "hi"}], True)
+            return response.response
+
+    def test_queued_chunks_are_merged_up_to_terminator(self, app, monkeypatch, reset_services):
+        def backend(req_id, messages, stream, api_key=None, tools=None, tool_choice=None):
+            for token in ('a', 'b', 'c'):
+                yield f'data: {token}\n\n'
+            yield 'data: [DONE]\n\n'
+            yield 'data: post-return\n\n'
+
+        writes = list(self._stream(app, monkeypatch, backend, (65536, 0.05)))
+
+        assert len(writes) < 4, "queued chunks must share a write"
+        assert b''.join(writes) == b'data: a\n\ndata: b\n\ndata: c\n\ndata: [DONE]\n\n'
+
+    def test_max_bytes_bounds_each_write(self, app, monkeypatch, reset_services):
+        def backend(req_id, messages, stream, api_key=None, tools=None, tool_choice=None):
+            for token in ('a', 'b', 'c'):
+                yield f'data: {token}\n\n'
+            yield 'data: [DONE]\n\n'
+
+        writes = list(self._stream(app, monkeypatch, backend, (len(b'data: a\n\n') * 2, 0.05)))
+
+        assert writes == [b'data: a\n\ndata: b\n\n', b'data: c\n\ndata: [DONE]\n\n']
+
+    def test_backend_error_raised_after_merged_chunks_are_sent(self, app, monkeypatch, reset_services):
+        def backend(req_id, messages, stream, api_key=None, tools=None, tool_choice=None):
+            yield 'data: a\n\n'
+            yield 'data: b\n\n'
+            raise RuntimeError("backend failed mid-stream")
+
+        gen = self._stream(app, monkeypatch, backend, (65536, 0.05))
+
+        assert next(gen) == b'data: a\n\ndata: b\n\n'
+        with pytest.raises(RuntimeError):
+            next(gen)
+
+    def test_disabled_sends_each_chunk_separately(self, app, monkeypatch, reset_services):
+        def backend(req_id, messages, stream, api_key=None, tools=None, tool_choice=None):
+            yield 'data: a\n\n'
+            yield 'data: b\n\n'
+            yield 'data: [DONE]\n\n'
+
+        writes = list(self._stream(app, monkeypatch, backend, None))
+
+        assert writes == [b'data: a\n\n', b'data: b\n\n', b'data: [DONE]\n\n']
@@ -53,6 +53,33 @@ def test_build_response_json_unsupported_type(monkeypatch):
         api_helpers.build_response_json("token")
 
 
+def test_build_response_json_delegates_to_encoder(mocker):
+    """A stream's encoder serializes the chunk instead of the per-call builder path."""
+    mock_response_builder = mocker.patch('Middleware.api.api_helpers.response_builder')
+    encoder = mocker.Mock()
+    encoder.encode.return_value = '{"encoded": true}'
+
+    result = api_helpers.build_response_json("tok", None, request_id="r", encoder=encoder)
+
+    assert result == '{"encoded": true}'
+    encoder.encode.assert_called_once_with("tok", None, additional_fields=None, tool_calls=None)
+    mock_response_builder.build_openai_chat_completion_chunk.assert_not_called()
+
+
+def test_create_stream_chunk_encoder_uses_current_api_type(mocker):
+    """The encoder is shaped for the current API type and the resolved model name."""
+    from Middleware.common import instance_global_variables
+    instance_global_variables.set_api_type("ollamaapichat")
+    mocker.patch('Middleware.api.api_helpers.get_model_name', return_value="alice:Coding")
+
+    encoder = api_helpers.create_stream_chunk_encoder("req-9")
+
+    chunk = json.loads(encoder.encode("hi"))
+    assert chunk["model"] == "alice:Coding"
+    assert chunk["request_id"] == "req-9"
+    assert chunk["message"] == {"role": "assistant", "content": "hi"}
+
+
 class TestWorkflowOverride:
     """Tests for workflow override functionality via model field."""
 
@@ -7,6 +7,7 @@ from Middleware.api.concurrency_middleware import (
     ConcurrencyLimitMiddleware,
     _SemaphoreReleasingIterator,
 )
+from Middleware.services.metrics_service import metrics_service
 
 
 def _make_simple_app(body_chunks):
@@ -351,3 +352,39 @@ def test_wilmer_level_default_still_acquires_semaphore(mocker):
     assert captured["status"] == "503 Service Unavailable"
 
     sem.release()
+
+
+def test_semaphore_wait_is_observed():
+    """Every gated request records how long it waited for a slot."""
+    mw = ConcurrencyLimitMiddleware(_make_simple_app([b"ok"]), threading.BoundedSemaphore(1))
+
+    captured, body = _call_middleware(mw)
+    b"".join(body)
+    body.close()
+
+    text = metrics_service.render_prometheus()
+    assert 'wilmer_concurrency_wait_seconds_count{level="wilmer"} 1' in text
+    assert "wilmer_concurrency_rejections_total{" not in text
+
+
+def test_acquire_timeout_is_counted_as_a_rejection():
+    """A 503 from a timed-out acquire is counted as well as timed."""
+    sem = threading.BoundedSemaphore(1)
+    sem.acquire()
+    mw = ConcurrencyLimitMiddleware(_make_simple_app([b"unused"]), sem, acquire_timeout=0.05)
+
+    _call_middleware(mw)
+
+    text = metrics_service.render_prometheus()
+    assert 'wilmer_concurrency_rejections_total{level="wilmer"} 1' in text
+    assert 'wilmer_concurrency_wait_seconds_count{level="wilmer"} 1' in text
+    sem.release()
+
+
+def test_ungated_request_records_no_wait():
+    """GET requests bypass the semaphore and leave no wait observation."""
+    mw = ConcurrencyLimitMiddleware(_make_simple_app([b"ok"]), threading.BoundedSemaphore(1))
+
+    _call_middleware(mw, method="GET")
+
+    assert "wilmer_concurrency_wait_seconds_count" not in metrics_service.render_prometheus()
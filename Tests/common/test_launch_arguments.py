@@ -10,7 +10,7 @@ _STAMPED_ATTRIBUTES = [
     "CONFIG_DIRECTORY", "PUBLIC_DIRECTORY", "USERS", "LOGGING_DIRECTORY",
     "USER_LEVEL_SQLITE_DIRECTORY", "DISCUSSION_DIRECTORY", "FILE_LOGGING",
     "PORT", "LISTEN_ADDRESS", "CONCURRENCY_LIMIT", "CONCURRENCY_TIMEOUT",
-    "CONCURRENCY_LEVEL",
+    "CONCURRENCY_LEVEL", "PRECOMPILE_WORKFLOWS",
 ]
 
 
@@ -92,6 +92,14 @@ class TestParseAndApplyLaunchArguments:
         assert instance_global_variables.CONCURRENCY_TIMEOUT == 30
         assert instance_global_variables.CONCURRENCY_LEVEL == "endpoint"
 
+    def test_precompile_workflows_flag(self, mocker):
+        instance_global_variables.PRECOMPILE_WORKFLOWS = False
+        self._parse(mocker)
+        assert instance_global_variables.PRECOMPILE_WORKFLOWS is False
+
+        self._parse(mocker, "--precompile-workflows")
+        assert instance_global_variables.PRECOMPILE_WORKFLOWS is True
+
     def test_listen_accepts_explicit_address(self, mocker):
         self._parse(mocker, "--listen", "192.168.1.5")
         assert instance_global_variables.LISTEN_ADDRESS == "192.168.1.5"
@@ -4,6 +4,23 @@ import pytest
 
 from Middleware.api.api_server import ApiServer
 from Middleware.api.app import app as flask_app
+from Middleware.services.categorization_cache_service import categorization_cache_service
+from Middleware.services.http_session_pool_service import http_session_pool_service, web_fetch_session_pool
+from Middleware.services.idempotency_service import idempotency_service
+from Middleware.services.llm_response_cache_service import llm_response_cache_service
+from Middleware.services.memory_job_service import memory_job_service
+from Middleware.services.metrics_service import metrics_service
+from Middleware.services.token_count_service import token_count_service
+from Middleware.services.web_fetch_cache_service import html_text_memo, web_fetch_cache_service
+from Middleware.utilities.config_cache import config_cache
+from Middleware.utilities.embedding_cache import embedding_cache
+from Middleware.utilities.embedding_matrix_cache import embedding_matrix_cache
+from Middleware.utilities.encryption_utils import fernet_key_cache
+from Middleware.utilities.keyword_index import keyword_index_cache
+from Middleware.utilities.text_utils import word_count_memo
+from Middleware.utilities.vector_db_utils import vector_db_connection_pool
+from Middleware.workflows.managers.workflow_compiler import workflow_compiler
+from Middleware.workflows.tools.mcp_client_tool import mcp_session_pool
 
 
 @pytest.fixture(scope="session")
@@ -22,3 +39,42 @@ def app():
 def client(app):
     """A test client for the app."""
     return app.test_client()
+
+
+# Process-wide singletons (caches, memos, pools and registries) that every
+# test starts and ends with empty, so nothing one test loads, counts, opens or
+# queues can leak into another. Each exposes a clear() intended for test
+# isolation; a new singleton only needs an entry here.
+RESETTABLE_SINGLETONS = (
+    config_cache,
+    workflow_compiler,
+    http_session_pool_service,
+    idempotency_service,
+    vector_db_connection_pool,
+    mcp_session_pool,
+    embedding_matrix_cache,
+    embedding_cache,
+    keyword_index_cache,
+    token_count_service,
+    word_count_memo,
+    fernet_key_cache,
+    categorization_cache_service,
+    llm_response_cache_service,
+    web_fetch_cache_service,
+    html_text_memo,
+    web_fetch_session_pool,
+    memory_job_service,
+    metrics_service,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_singletons():
+    """
+    Clears every singleton in RESETTABLE_SINGLETONS before and after each test.
+    """
+    for singleton in RESETTABLE_SINGLETONS:
+        singleton.clear()
+    yield
+    for singleton in RESETTABLE_SINGLETONS:
+        singleton.clear()
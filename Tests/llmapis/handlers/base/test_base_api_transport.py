@@ -17,6 +17,7 @@ import requests
 
 from Middleware.llmapis.handlers.base.base_api_transport import BaseApiTransport, _AbortHandle
 from Middleware.services.cancellation_service import cancellation_service
+from Middleware.services.http_session_pool_service import http_session_pool_service
 
 
 @pytest.fixture
@@ -59,19 +60,21 @@ class TestExecuteNonStreamingPost:
     def test_preflight_cancellation_returns_none_without_posting(self, transport,
                                                                  setup_cancellation_service, mocker):
         """The transport's own pre-flight check (the EmbeddingApiHandler path):
-        an already-cancelled request returns None, never POSTs, and closes the session."""
+        an already-cancelled request returns None, never POSTs, and hands the
+        session back to the shared pool."""
         request_id = "transport_precancel_1"
         cancellation_service.request_cancellation(request_id)
 
-        mock_post = mocker.patch.object(transport.session, "post")
-        mock_close = mocker.patch.object(transport.session, "close")
+        session = transport.session
+        mock_post = mocker.patch.object(session, "post")
+        mock_release = mocker.patch.object(http_session_pool_service, "release")
 
         result = transport.execute_non_streaming_post(
             "http://localhost:9000/v1/x", {}, request_id=request_id)
 
         assert result is None
         mock_post.assert_not_called()
-        mock_close.assert_called_once()
+        mock_release.assert_called_once_with(session)
 
     def test_http_error_status_is_retried_then_raised(self, transport,
                                                       setup_cancellation_service, mocker):
@@ -132,6 +135,22 @@ class TestSuppressRetriesConstruction:
             transport.execute_non_streaming_post("http://x", {})
         assert mock_post.call_count == 1
 
+    def test_session_is_borrowed_lazily_and_returned_on_close(self):
+        http_session_pool_service.clear()
+        transport = BaseApiTransport(base_url="http://pooled:1", api_key="k", headers={})
+        assert http_session_pool_service.get_stats() == {}
+
+        first = transport.session
+        transport.close()
+        second = transport.session
+        transport.close()
+
+        assert first is second
+        stats = http_session_pool_service.get_stats()["http://pooled:1"]
+        assert stats["created"] == 1
+        assert stats["reused"] == 1
+        http_session_pool_service.clear()
+
     def test_default_read_timeout_is_14400_and_overridable(self):
         assert BaseApiTransport(base_url="http://x", api_key="k", headers={}).read_timeout == 14400
         assert BaseApiTransport(base_url="http://x", api_key="k", headers={},
@@ -0,0 +1,127 @@
+# tests/llmapis/handlers/base/test_base_llm_api_handler_response_cache.py
+
+import pytest
+
+from Middleware.llmapis.handlers.base.base_llm_api_handler import LlmApiHandler
+from Middleware.services.llm_response_cache_service import llm_response_cache_service
+
+MODULE = "Middleware.llmapis.handlers.base.base_llm_api_handler"
+
+
+class MockLlmApiHandler(LlmApiHandler):
+    """Concrete implementation of LlmApiHandler for testing."""
+
+    def _get_api_endpoint_url(self) -> str:
+        return "http://localhost:8000/api/test"
+
+    def _prepare_payload(self, conversation, system_prompt, prompt, *, tools=None, tool_choice=None,
+                         structured_output_schema=None):
+        return {"prompt": prompt, "stream": self.stream}
+
+    def _process_stream_data(self, data_str: str):
+        return {"token": data_str, "finish_reason": None}
+
+    def _parse_non_stream_response(self, response_json):
+        return response_json.get("text", "")
+
+
+@pytest.fixture
+def handler(mocker):
+    mocker.patch(f"{MODULE}.get_current_username", return_value="alice")
+    mocker.patch(f"{MODULE}.get_llm_response_cache_settings", return_value=(60, 10, None))
+    return MockLlmApiHandler(
+        base_url="http://localhost:8000",
+        api_key="test_key",
+        gen_input={},
+        model_name="test_model",
+        headers={"Content-Type": "application/json"},
+        stream=False,
+        api_type_config={},
+        endpoint_config={},
+        max_tokens=100
+    )
+
+
+@pytest.fixture
+def mock_post(handler, mocker):
+    return mocker.patch.object(handler, "execute_non_streaming_post", return_value={"text": "keywords"})
+
+
+def _call(handler, prompt, api_key_hash=None):
+    """Mirrors LlmApiService: answer a hit from the lookup, send a miss through the handler."""
+    lookup = handler.lookup_cached_response(prompt=prompt, api_key_hash=api_key_hash)
+    if lookup is not None and lookup.response is not None:
+        return lookup.response
+    return handler.handle_non_streaming(prompt=prompt, cache_lookup=lookup)
+
+
+class TestNonStreamingResponseCache:
+    """Tests for lookup_cached_response and the cache_lookup option of handle_non_streaming."""
+
+    def test_identical_payload_is_served_from_cache(self, handler, mock_post):
+        assert _call(handler, "Extract") == "keywords"
+        assert _call(handler, "Extract") == "keywords"
+
+        mock_post.assert_called_once()
+        assert llm_response_cache_service.get_stats()["hits"] == 1
+
+    def test_lookup_never_contacts_the_backend(self, handler, mock_post):
+        lookup = handler.lookup_cached_response(prompt="Extract")
+
+        assert lookup.response is None
+        assert lookup.url == "http://localhost:8000/api/test"
+        assert lookup.payload == {"prompt": "Extract", "stream": False}
+        mock_post.assert_not_called()
+
+    def test_miss_sends_the_prepared_payload(self, handler, mock_post, mocker):
+        lookup = handler.lookup_cached_response(prompt="Extract")
+        prepare = mocker.spy(handler, "_prepare_payload")
+
+        handler.handle_non_streaming(prompt="Extract", cache_lookup=lookup)
+
+        prepare.assert_not_called()
+        assert mock_post.call_args[0][:2] == (lookup.url, lookup.payload)
+
+    def test_different_payload_misses(self, handler, mock_post):
+        _call(handler, "Extract")
+        _call(handler, "Summarize")
+        assert mock_post.call_count == 2
+
+    def test_cache_is_not_used_without_a_lookup(self, handler, mock_post):
+        handler.handle_non_streaming(prompt="Extract")
+        handler.handle_non_streaming(prompt="Extract")
+        assert mock_post.call_count == 2
+        assert llm_response_cache_service.get_stats()["stores"] == 0
+
+    def test_disabled_settings_return_no_lookup(self, handler, mock_post, mocker):
+        mocker.patch(f"{MODULE}.get_llm_response_cache_settings", return_value=None)
+        assert handler.lookup_cached_response(prompt="Extract") is None
+        _call(handler, "Extract")
+        _call(handler, "Extract")
+        assert mock_post.call_count == 2
+        assert llm_response_cache_service.get_stats()["stores"] == 0
+
+    def test_empty_and_cancelled_responses_are_not_cached(self, handler, mock_post):
+        mock_post.return_value = {"text": ""}
+        _call(handler, "Extract")
+        mock_post.return_value = None
+        _call(handler, "Extract")
+        assert llm_response_cache_service.get_stats()["stores"] == 0
+
+    def test_entries_are_scoped_by_api_key_hash(self, handler, mock_post):
+        _call(handler, "Extract", api_key_hash="aaa")
+        _call(handler, "Extract", api_key_hash="bbb")
+        _call(handler, "Extract", api_key_hash="aaa")
+        assert mock_post.call_count == 2
+
+    @pytest.mark.parametrize("encrypted", [False, True])
+    def test_disk_tier_is_skipped_while_encryption_is_active(self, handler, mock_post, mocker, tmp_path,
+                                                            encrypted):
+        db_path = str(tmp_path / "llm_response_cache.db")
+        mocker.patch(f"{MODULE}.get_llm_response_cache_settings", return_value=(60, 10, db_path))
+        mocker.patch(f"{MODULE}.is_encryption_active", return_value=encrypted)
+        put = mocker.spy(llm_response_cache_service, "put")
+
+        _call(handler, "Extract")
+
+        assert put.call_args[0][4] == (None if encrypted else db_path)
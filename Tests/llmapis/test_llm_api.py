@@ -3,7 +3,9 @@ from unittest.mock import mock_open, MagicMock
 
 import pytest
 
+from Middleware.llmapis.handlers.base.base_llm_api_handler import ResponseCacheLookup
 from Middleware.llmapis.llm_api import LlmApiService
+from Middleware.services.metrics_service import metrics_service
 
 MOCK_ENDPOINT_CONFIG = {
     "endpoint": "http://localhost:1234",
@@ -185,6 +187,78 @@ class TestLlmApiService:
         mock_handler_instance.handle_non_streaming.assert_called_once()
         assert service.is_busy() is False
 
+    def test_get_response_from_llm_skips_the_cache_unless_enabled(self, mock_configs, mocker):
+        """
+        Tests that only a service with cache_responses looks the call up in the response cache.
+        """
+        mocker.patch("Middleware.llmapis.llm_api.LlmApiService.create_api_handler")
+        service = LlmApiService(endpoint="test", presetname="test", max_tokens=128, stream=False)
+        mock_handler_instance = MagicMock()
+        mock_handler_instance.handle_non_streaming.return_value = "Test response"
+        service._api_handler = mock_handler_instance
+
+        service.get_response_from_llm(prompt="Hello")
+
+        mock_handler_instance.lookup_cached_response.assert_not_called()
+        assert "cache_lookup" not in mock_handler_instance.handle_non_streaming.call_args.kwargs
+
+    def test_get_response_from_llm_answers_a_cache_hit_without_the_endpoint_gate(self, mock_configs, mocker):
+        """
+        Tests that a cache hit is returned before an endpoint slot is taken and is
+        not recorded as backend latency.
+        """
+        mocker.patch("Middleware.llmapis.llm_api.LlmApiService.create_api_handler")
+        acquire = mocker.patch("Middleware.llmapis.llm_api._acquire_endpoint_gate")
+        observe = mocker.patch("Middleware.llmapis.llm_api.metrics_service.observe")
+        service = LlmApiService(endpoint="test", presetname="test", max_tokens=128, stream=False)
+        service.cache_responses = True
+        service.cache_api_key_hash = "abc"
+        mock_handler_instance = MagicMock()
+        mock_handler_instance.lookup_cached_response.return_value = ResponseCacheLookup(
+            "http://localhost:1234/v1", {}, "alice", "key", 10, None, "Cached response")
+        service._api_handler = mock_handler_instance
+
+        response = service.get_response_from_llm(prompt="Hello")
+
+        assert response == "Cached response"
+        assert mock_handler_instance.lookup_cached_response.call_args.kwargs["api_key_hash"] == "abc"
+        mock_handler_instance.handle_non_streaming.assert_not_called()
+        acquire.assert_not_called()
+        observe.assert_not_called()
+        assert service.is_busy() is False
+
+    def test_get_response_from_llm_passes_a_cache_miss_to_the_handler(self, mock_configs, mocker):
+        """
+        Tests that a cache miss is sent through the handler with its lookup, so the
+        prepared payload is reused and the response stored.
+        """
+        mocker.patch("Middleware.llmapis.llm_api.LlmApiService.create_api_handler")
+        service = LlmApiService(endpoint="test", presetname="test", max_tokens=128, stream=False)
+        service.cache_responses = True
+        lookup = ResponseCacheLookup("http://localhost:1234/v1", {}, "alice", "key", 10, None, None)
+        mock_handler_instance = MagicMock()
+        mock_handler_instance.lookup_cached_response.return_value = lookup
+        mock_handler_instance.handle_non_streaming.return_value = "Test response"
+        service._api_handler = mock_handler_instance
+
+        assert service.get_response_from_llm(prompt="Hello") == "Test response"
+        assert mock_handler_instance.handle_non_streaming.call_args.kwargs["cache_lookup"] is lookup
+
+    def test_get_response_from_llm_calls_the_backend_when_the_cache_lookup_fails(self, mock_configs, mocker):
+        """
+        Tests that a failing cache lookup falls back to an uncached backend call.
+        """
+        mocker.patch("Middleware.llmapis.llm_api.LlmApiService.create_api_handler")
+        service = LlmApiService(endpoint="test", presetname="test", max_tokens=128, stream=False)
+        service.cache_responses = True
+        mock_handler_instance = MagicMock()
+        mock_handler_instance.lookup_cached_response.side_effect = RuntimeError("boom")
+        mock_handler_instance.handle_non_streaming.return_value = "Test response"
+        service._api_handler = mock_handler_instance
+
+        assert service.get_response_from_llm(prompt="Hello") == "Test response"
+        assert "cache_lookup" not in mock_handler_instance.handle_non_streaming.call_args.kwargs
+
     def test_get_response_from_llm_streaming(self, mock_configs, mocker):
         """
         Tests the streaming path of get_response_from_llm.
@@ -399,3 +473,58 @@ class TestLlmApiService:
 
         mock_handler_instance.close.assert_called_once()
         assert service.is_busy() is False
+
+
+class TestLlmApiMetrics:
+    """Tests for the backend latency and token metrics recorded per endpoint."""
+
+    @pytest.fixture
+    def service(self, mock_configs, mocker):
+        mocker.patch("Middleware.llmapis.llm_api.OpenAiApiHandler")
+        return lambda stream: LlmApiService(endpoint="Local", presetname="test_preset", max_tokens=16,
+                                            stream=stream)
+
+    def test_non_streaming_call_records_latency(self, service):
+        llm = service(False)
+        llm._api_handler.handle_non_streaming.return_value = "ok"
+
+        llm.get_response_from_llm(prompt="hi")
+
+        text = metrics_service.render_prometheus()
+        assert 'wilmer_backend_latency_seconds_count{endpoint="Local",stream="false"} 1' in text
+        assert "wilmer_backend_ttft_seconds_count" not in text
+
+    def test_streaming_call_records_ttft_latency_and_tokens(self, service):
+        llm = service(True)
+        llm._api_handler.handle_streaming.return_value = iter(
+            [{"token": "a"}, {"token": ""}, {"token": "b", "finish_reason": "stop"}])
+
+        list(llm.get_response_from_llm(prompt="hi"))
+
+        text = metrics_service.render_prometheus()
+        assert 'wilmer_backend_ttft_seconds_count{endpoint="Local"} 1' in text
+        assert 'wilmer_backend_latency_seconds_count{endpoint="Local",stream="true"} 1' in text
+        assert 'wilmer_tokens_streamed_total{endpoint="Local"} 2' in text
+
+    def test_abandoned_stream_still_counts_its_tokens(self, service):
+        llm = service(True)
+        llm._api_handler.handle_streaming.return_value = iter([{"token": "a"}, {"token": "b"}])
+
+        stream = llm.get_response_from_llm(prompt="hi")
+        next(stream)
+        stream.close()
+
+        text = metrics_service.render_prometheus()
+        assert 'wilmer_tokens_streamed_total{endpoint="Local"} 1' in text
+        assert "wilmer_backend_latency_seconds_count" not in text
+
+    def test_failed_call_is_counted_as_an_error(self, service):
+        llm = service(False)
+        llm._api_handler.handle_non_streaming.side_effect = ConnectionError("down")
+
+        with pytest.raises(ConnectionError):
+            llm.get_response_from_llm(prompt="hi")
+
+        text = metrics_service.render_prometheus()
+        assert 'wilmer_backend_errors_total{endpoint="Local"} 1' in text
+        assert "wilmer_backend_latency_seconds_count" not in text
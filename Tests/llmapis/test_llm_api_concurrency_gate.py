@@ -21,6 +21,7 @@ import pytest
 
 from Middleware.common import instance_global_variables
 from Middleware.llmapis.llm_api import LlmApiService
+from Middleware.services.metrics_service import metrics_service
 
 
 PRIMARY_CONFIG = {
@@ -508,6 +509,48 @@ class TestEndpointModeStreaming:
         sem.release()
 
 
+# ----------------------------------------------------------------------------
+# Endpoint mode: waits and timeouts are recorded as metrics
+# ----------------------------------------------------------------------------
+
+class TestEndpointModeMetrics:
+    def test_gate_wait_is_observed(self, plain_endpoint, gate_env):
+        gate_env.set("endpoint", limit=1)
+        service = LlmApiService(endpoint="PLAIN", presetname="p", max_tokens=16, stream=False)
+        handler = MagicMock()
+        handler.handle_non_streaming.return_value = "ok"
+        service._api_handler = handler
+
+        service.get_response_from_llm(prompt="hi")
+
+        text = metrics_service.render_prometheus()
+        assert 'wilmer_concurrency_wait_seconds_count{level="endpoint"} 1' in text
+        assert 'wilmer_concurrency_rejections_total{level="endpoint"}' not in text
+
+    def test_gate_timeout_is_counted_as_a_rejection(self, plain_endpoint, gate_env):
+        gate_env.set("endpoint", limit=1, timeout=0.05)
+        gate_env.semaphore.acquire()
+        service = LlmApiService(endpoint="PLAIN", presetname="p", max_tokens=16, stream=False)
+        service._api_handler = MagicMock()
+
+        with pytest.raises(TimeoutError):
+            service.get_response_from_llm(prompt="hi")
+
+        assert 'wilmer_concurrency_rejections_total{level="endpoint"} 1' in metrics_service.render_prometheus()
+        gate_env.semaphore.release()
+
+    def test_wilmer_mode_records_no_gate_wait(self, plain_endpoint, gate_env):
+        gate_env.set("wilmer", limit=1)
+        service = LlmApiService(endpoint="PLAIN", presetname="p", max_tokens=16, stream=False)
+        handler = MagicMock()
+        handler.handle_non_streaming.return_value = "ok"
+        service._api_handler = handler
+
+        service.get_response_from_llm(prompt="hi")
+
+        assert "wilmer_concurrency_wait_seconds_count" not in metrics_service.render_prometheus()
+
+
 # ----------------------------------------------------------------------------
 # Cross-mode: the same Wilmer instance can run many concurrent requests in
 # endpoint mode, with the LLM calls themselves serialized.
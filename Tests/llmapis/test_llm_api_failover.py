@@ -253,6 +253,15 @@ class TestBackupPresetName:
         assert backup._endpoint_name == "BACKUP"
         assert backup._presetname == "primary_preset"
 
+    def test_backup_inherits_cache_responses(self, single_chain):
+        service = LlmApiService(endpoint="PRIMARY", presetname="primary_preset", max_tokens=128)
+        assert service._build_backup_service().cache_responses is False
+        service = LlmApiService(endpoint="PRIMARY", presetname="primary_preset", max_tokens=128,
+                                cache_responses=True, cache_api_key_hash="abc123")
+        backup = service._build_backup_service()
+        assert backup.cache_responses is True
+        assert backup.cache_api_key_hash == "abc123"
+
     def test_backup_uses_backup_preset_name_when_set(self, mocker, base_mocks):
         """A configured backupPresetName overrides the inherited preset name so a
         heterogeneous backup can point at a preset that exists for its own API type."""
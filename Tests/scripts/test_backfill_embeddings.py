@@ -300,3 +300,53 @@ def test_fetch_embeddings_empty_vector_raises():
 
     with pytest.raises(ValueError, match="non-empty vectors"):
         fetch_embeddings(session, "http://x", "ollama", "m", "", ["a"], 60)
+
+
+# === ANN index options ===
+
+def test_index_only_requires_build_index(mocker, tmp_path, mock_post):
+    db = tmp_path / "vector_memory.db"
+    _make_wilmer_db(db, ["one"])
+
+    with pytest.raises(SystemExit) as exc_info:
+        _run_main(mocker, ["--db", str(db), "--model", "m", "--index-only"])
+
+    assert exc_info.value.code == 2
+
+
+def test_url_required_unless_index_only(mocker, tmp_path, mock_post):
+    db = tmp_path / "vector_memory.db"
+    _make_wilmer_db(db, ["one"])
+
+    with pytest.raises(SystemExit) as exc_info:
+        _run_main(mocker, ["--db", str(db), "--model", "m"])
+
+    assert exc_info.value.code == 2
+
+
+def test_index_only_without_numpy_reports_error(mocker, tmp_path, mock_post, capsys):
+    mocker.patch("Scripts.backfill_embeddings.vector_index_utils.NUMPY_AVAILABLE", False)
+    db = tmp_path / "vector_memory.db"
+    _make_wilmer_db(db, ["one"])
+
+    rc = _run_main(mocker, ["--db", str(db), "--model", "m", "--index-only", "--build-index"])
+
+    assert rc == 1
+    mock_post.assert_not_called()
+    assert "requires NumPy" in capsys.readouterr().out
+    assert not (tmp_path / "vector_memory.ann.db").exists()
+
+
+def test_backfill_then_build_index_writes_sidecar(mocker, tmp_path, mock_post):
+    pytest.importorskip("numpy")
+    from Middleware.utilities import vector_index_utils
+    db = tmp_path / "vector_memory.db"
+    _make_wilmer_db(db, ["alpha", "beta"])
+    mock_post.return_value = _FakeResponse(_openai_body([(0, [1.0, 0.0]), (1, [0.0, 1.0])]))
+
+    rc = _run_main(mocker, ["--db", str(db), "--url", "http://x", "--model", "emb-model",
+                            "--build-index", "--index-lists", "2"])
+
+    assert rc == 0
+    info = vector_index_utils.get_ivf_index_info(str(tmp_path / "vector_memory.ann.db"), "emb-model")
+    assert info == {"count": 2, "dim": 2, "nlist": 2, "trained_count": 2}
@@ -291,6 +291,40 @@ class TestMain:
         assert positional_args[2] is None
         mock_remove_journal.assert_called_once()
 
+    @patch.dict(os.environ, {}, clear=False)
+    @patch(f"{MODULE}.input", return_value="Y")
+    @patch(f"{MODULE}._remove_journal")
+    @patch(f"{MODULE}._save_journal")
+    @patch(f"{MODULE}._load_journal", return_value={"completed": []})
+    @patch(f"{MODULE}.compact_record_log")
+    @patch(f"{MODULE}.process_file")
+    @patch(f"{MODULE}.collect_json_files")
+    @patch(f"{MODULE}.os.path.isdir", return_value=True)
+    @patch(f"{MODULE}.find_discussion_directory", return_value="/fake/discussions")
+    @patch(f"{MODULE}.find_user_config_path", return_value="/fake/config/testuser.json")
+    @patch(f"{MODULE}.argparse.ArgumentParser")
+    def test_main_compacts_record_logs_before_processing(
+        self, mock_parser_cls, mock_find_config, mock_find_disc,
+        mock_isdir, mock_collect, mock_process, mock_compact, mock_load_journal,
+        mock_save_journal, mock_remove_journal, mock_input,
+    ):
+        """Each file's record log is folded in with the old key before the file itself is processed."""
+        os.environ.pop("WILMER_API_KEY", None)
+        os.environ.pop("WILMER_NEW_API_KEY", None)
+
+        args = self._make_args(api_key="old-secret", new_api_key=None)
+        mock_parser_cls.return_value.parse_args.return_value = args
+        mock_collect.return_value = ["/fake/discussions/abc123/file1.json"]
+        order = []
+        mock_compact.side_effect = lambda *a: order.append("compact")
+        mock_process.side_effect = lambda *a: order.append("process") or True
+
+        main()
+
+        old_key = derive_fernet_key("old-secret", username="testuser")
+        mock_compact.assert_called_once_with("/fake/discussions/abc123/file1.json", old_key)
+        assert order == ["compact", "process"]
+
     @patch.dict(os.environ, {}, clear=False)
     @patch(f"{MODULE}.input", return_value="Y")
     @patch(f"{MODULE}._remove_journal")
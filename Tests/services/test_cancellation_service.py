@@ -4,6 +4,7 @@ import pytest
 import threading
 import time
 from Middleware.services.cancellation_service import CancellationService, cancellation_service
+from Middleware.services.metrics_service import metrics_service
 
 
 class TestCancellationService:
@@ -49,6 +50,17 @@ class TestCancellationService:
 
         assert service.is_cancelled(request_id), "Request should be marked as cancelled"
 
+    def test_request_cancellation_is_counted_once(self):
+        """Test that each newly cancelled request increments the cancellation metric once."""
+        service = CancellationService()
+
+        service.request_cancellation("req_a")
+        service.request_cancellation("req_a")
+        service.request_cancellation("req_b")
+        service.request_cancellation("")
+
+        assert "\nwilmer_cancellations_total 2\n" in metrics_service.render_prometheus()
+
     def test_request_cancellation_empty_id(self):
         """Test that request_cancellation handles empty request IDs gracefully."""
         service = CancellationService()
@@ -0,0 +1,52 @@
+# Tests/services/test_categorization_cache_service.py
+
+from Middleware.services import categorization_cache_service as cache_module
+from Middleware.services.categorization_cache_service import (
+    CategorizationCacheService,
+    categorization_cache_service,
+)
+
+CATEGORIES = {"CODING": {"workflow": "CodingWorkflow", "description": "Code."}}
+MESSAGES = [{"role": "user", "content": "Fix my script."}]
+
+
+def _key(**overrides):
+    args = {"username": "alice", "api_key_hash": None, "workflow_name": "CategorizationWF",
+            "categories": CATEGORIES, "messages": MESSAGES, **overrides}
+    return CategorizationCacheService.build_key(**args)
+
+
+class TestCategorizationCacheService:
+    """Tests for the CategorizationCacheService singleton."""
+
+    def test_singleton_pattern(self):
+        assert CategorizationCacheService() is CategorizationCacheService()
+        assert categorization_cache_service is CategorizationCacheService()
+
+    def test_key_covers_every_input(self):
+        keys = {
+            _key(),
+            _key(username="bob"),
+            _key(api_key_hash="abc123"),
+            _key(workflow_name="OtherWF"),
+            _key(categories={**CATEGORIES, "CHAT": {"workflow": "ChatWorkflow", "description": "Chat."}}),
+            _key(messages=[{"role": "assistant", "content": "Fix my script."}]),
+            _key(messages=[{**MESSAGES[0], "tool_calls": [{"id": "call_1"}]}]),
+        }
+        assert len(keys) == 7
+        assert _key() == _key(messages=[dict(MESSAGES[0])])
+
+    def test_get_and_put(self):
+        key = _key()
+        assert categorization_cache_service.get(key, 60) is None
+        categorization_cache_service.put(key, "CODING")
+        assert categorization_cache_service.get(key, 60) == "CODING"
+        stats = categorization_cache_service.get_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1 and stats["entries"] == 1
+
+    def test_cache_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(cache_module, "MAX_CACHED_CATEGORIZATIONS", 2)
+        for name in ("a", "b", "c"):
+            categorization_cache_service.put(_key(username=name), "CODING")
+        assert categorization_cache_service.get_stats()["entries"] == 2
+        assert categorization_cache_service.get(_key(username="a"), 60) is None
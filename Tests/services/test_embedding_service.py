@@ -110,6 +110,69 @@ class TestEmbeddingServicePassthrough:
         mock_get.assert_called_once_with(["hello"], request_id="req-9")
         assert result == [[0.1, 0.2]]
 
+    def test_repeated_texts_are_served_from_cache(self, mock_configs, mocker):
+        mocker.patch('Middleware.utilities.embedding_cache.config_utils.get_config_value', return_value=None)
+        service = EmbeddingService("Embedding-Endpoint")
+        mock_get = mocker.patch.object(service._handler, 'get_embeddings',
+                                       side_effect=lambda texts, request_id=None: [[float(len(t))] for t in texts])
+
+        first = service.get_embeddings(["aa", "b"])
+        second = service.get_embeddings(["b", "ccc", "aa", "ccc"])
+
+        assert first == [[2.0], [1.0]]
+        assert second == [[1.0], [3.0], [2.0], [3.0]]
+        # Only the distinct uncached text reaches the backend on the second call.
+        assert mock_get.call_args_list[1].args[0] == ["ccc"]
+
+    def test_fully_cached_batch_skips_backend(self, mock_configs, mocker):
+        from Middleware.utilities.embedding_cache import embedding_cache
+        mocker.patch('Middleware.utilities.embedding_cache.config_utils.get_config_value', return_value=None)
+        service = EmbeddingService("Embedding-Endpoint")
+        mock_get = mocker.patch.object(service._handler, 'get_embeddings', return_value=[[0.1, 0.2]])
+
+        service.get_embeddings(["hello"])
+        result = service.get_embeddings(["hello"])
+
+        assert result == [[0.1, 0.2]]
+        mock_get.assert_called_once()
+        assert embedding_cache.get_stats()["saved_calls"] == 1
+
+    def test_cancelled_request_is_not_cached(self, mock_configs, mocker):
+        mocker.patch('Middleware.utilities.embedding_cache.config_utils.get_config_value', return_value=None)
+        service = EmbeddingService("Embedding-Endpoint")
+        mock_get = mocker.patch.object(service._handler, 'get_embeddings', side_effect=[None, [[1.0]]])
+
+        assert service.get_embeddings(["hello"]) is None
+        assert service.get_embeddings(["hello"]) == [[1.0]]
+        assert mock_get.call_count == 2
+
+    def test_short_batch_returns_none_and_caches_nothing(self, mock_configs, mocker):
+        from Middleware.utilities.embedding_cache import embedding_cache
+        mocker.patch('Middleware.utilities.embedding_cache.config_utils.get_config_value', return_value=None)
+        service = EmbeddingService("Embedding-Endpoint")
+        mocker.patch.object(service._handler, 'get_embeddings', return_value=[[1.0]])
+
+        assert service.get_embeddings(["a", "b"]) is None
+        assert embedding_cache.get_many(service._cache_namespace, ["a", "b"]) == [None, None]
+
+    def test_same_named_endpoints_on_different_servers_do_not_share_vectors(self, mocker):
+        """Two users' endpoint configs named alike must not answer from each other's cache."""
+        mocker.patch('Middleware.utilities.embedding_cache.config_utils.get_config_value', return_value=None)
+        mocker.patch('Middleware.services.embedding_service.get_api_type_config', return_value={
+            "type": "openAIEmbeddings",
+        })
+        endpoint_config = mocker.patch('Middleware.services.embedding_service.get_endpoint_config')
+        endpoint_config.return_value = {"endpoint": "http://server-a:8000", "apiTypeConfigFileName": "OpenAI-Embeddings"}
+        first = EmbeddingService("Embedding-Endpoint")
+        endpoint_config.return_value = {"endpoint": "http://server-b:8000", "apiTypeConfigFileName": "OpenAI-Embeddings"}
+        second = EmbeddingService("Embedding-Endpoint")
+        mocker.patch.object(first._handler, 'get_embeddings', return_value=[[1.0]])
+        mock_second = mocker.patch.object(second._handler, 'get_embeddings', return_value=[[2.0]])
+
+        assert first.get_embeddings(["hello"]) == [[1.0]]
+        assert second.get_embeddings(["hello"]) == [[2.0]]
+        mock_second.assert_called_once()
+
     def test_close_delegates_to_handler(self, mock_configs, mocker):
         service = EmbeddingService("Embedding-Endpoint")
         mock_close = mocker.patch.object(service._handler, 'close')
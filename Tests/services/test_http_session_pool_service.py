@@ -0,0 +1,227 @@
+# tests/services/test_http_session_pool_service.py
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+import pytest
+
+from Middleware.llmapis.handlers.base.base_api_transport import _AbortHandle
+from Middleware.services import http_session_pool_service as pool_module
+from Middleware.services.http_session_pool_service import (
+    HttpSessionPoolService,
+    WebFetchSessionPool,
+    http_session_pool_service,
+    web_fetch_session_pool,
+)
+
+
+class TestHttpSessionPoolService:
+    """Test suite for the HttpSessionPoolService class."""
+
+    def setup_method(self):
+        """Reset the process-wide singleton before each test."""
+        http_session_pool_service.clear()
+
+    def teardown_method(self):
+        """Ensure no sessions leak from the singleton after each test."""
+        http_session_pool_service.clear()
+
+    def test_singleton_pattern(self):
+        """Two constructions return the same instance."""
+        assert HttpSessionPoolService() is HttpSessionPoolService()
+
+    def test_global_instance(self):
+        """The module-level instance is the singleton."""
+        assert http_session_pool_service is HttpSessionPoolService()
+
+    def test_released_session_is_reused_for_same_origin(self):
+        """Base URLs differing only in path share one pool key and one session."""
+        first = http_session_pool_service.acquire("http://localhost:5001/v1", False)
+        http_session_pool_service.release(first)
+        second = http_session_pool_service.acquire("HTTP://LOCALHOST:5001/api", False)
+
+        assert second is first
+        stats = http_session_pool_service.get_stats()["http://localhost:5001"]
+        assert stats["created"] == 1
+        assert stats["reused"] == 1
+        assert stats["in_use"] == 1
+        assert stats["idle"] == 0
+
+    def test_retry_policy_is_part_of_the_key(self):
+        """A no-retry borrower never receives a session carrying 5xx retries."""
+        retrying = http_session_pool_service.acquire("http://localhost:5001", False)
+        http_session_pool_service.release(retrying)
+        no_retry = http_session_pool_service.acquire("http://localhost:5001", True)
+
+        assert no_retry is not retrying
+        assert no_retry.get_adapter("http://localhost:5001").max_retries.total == 0
+        assert "http://localhost:5001 (no-retry)" in http_session_pool_service.get_stats()
+
+    def test_concurrent_borrowers_get_distinct_sessions(self):
+        """Each borrower owns its session (and its single connection) exclusively."""
+        a = http_session_pool_service.acquire("http://localhost:5001")
+        b = http_session_pool_service.acquire("http://localhost:5001")
+
+        assert a is not b
+        assert a.get_adapter("http://localhost:5001")._pool_maxsize == 1
+        assert http_session_pool_service.get_stats()["http://localhost:5001"]["in_use"] == 2
+
+    def test_aborted_session_is_discarded_not_pooled(self):
+        """An abort tears down only the borrowed session; release then drops it."""
+        session = http_session_pool_service.acquire("http://localhost:5001")
+        _AbortHandle(session, "req-1", "streaming").abort()
+        http_session_pool_service.release(session)
+
+        stats = http_session_pool_service.get_stats()["http://localhost:5001"]
+        assert stats["discarded"] == 1
+        assert stats["idle"] == 0
+        assert http_session_pool_service.acquire("http://localhost:5001") is not session
+
+    def test_idle_sessions_are_bounded_per_key(self, monkeypatch):
+        """Releases beyond the idle cap close the surplus session."""
+        monkeypatch.setattr(pool_module, "MAX_IDLE_SESSIONS_PER_KEY", 1)
+        a = http_session_pool_service.acquire("http://localhost:5001")
+        b = http_session_pool_service.acquire("http://localhost:5001")
+        b.close = MagicMock()
+
+        http_session_pool_service.release(a)
+        http_session_pool_service.release(b)
+
+        stats = http_session_pool_service.get_stats()["http://localhost:5001"]
+        assert stats["idle"] == 1
+        assert stats["evicted"] == 1
+        b.close.assert_called_once()
+
+    def test_idle_sessions_expire_after_ttl(self, monkeypatch):
+        """A parked session older than the TTL is closed instead of reused."""
+        clock = [1000.0]
+        monkeypatch.setattr(pool_module.time, "monotonic", lambda: clock[0])
+        session = http_session_pool_service.acquire("http://localhost:5001")
+        session.close = MagicMock()
+        http_session_pool_service.release(session)
+
+        clock[0] += pool_module.IDLE_SESSION_TTL_SECONDS + 1
+        fresh = http_session_pool_service.acquire("http://localhost:5001")
+
+        assert fresh is not session
+        session.close.assert_called_once()
+        assert http_session_pool_service.get_stats()["http://localhost:5001"]["evicted"] == 1
+
+    def test_release_of_foreign_session_closes_it(self):
+        """A session the pool did not lend is closed, never parked."""
+        foreign = MagicMock()
+
+        http_session_pool_service.release(foreign)
+
+        foreign.close.assert_called_once()
+        assert http_session_pool_service.get_stats() == {}
+
+    def test_cookies_do_not_carry_over_between_borrowers(self, cookie_server):
+        """A cookie set on one borrow is not sent when the session is lent again."""
+        first = http_session_pool_service.acquire(cookie_server)
+        response = first.get(cookie_server)
+        http_session_pool_service.release(first)
+        second = http_session_pool_service.acquire(cookie_server)
+
+        assert second is first
+        assert response.cookies.get("session") == "abc"
+        assert second.get(cookie_server).text == ""
+        assert len(second.cookies) == 0
+
+    def test_release_none_is_noop(self):
+        """Releasing nothing is harmless so callers can release unconditionally."""
+        http_session_pool_service.release(None)
+        assert http_session_pool_service.get_stats() == {}
+
+
+class _CookieSettingHandler(BaseHTTPRequestHandler):
+    """Answers every GET with a cookie and echoes back the Cookie header it received."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = (self.headers.get("Cookie") or "").encode("utf-8")
+        self.send_response(200)
+        self.send_header("Set-Cookie", "session=abc; Path=/")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def cookie_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CookieSettingHandler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestWebFetchSessionPool:
+    """Test suite for the WebFetchSessionPool class."""
+
+    def test_singleton_pattern(self):
+        """Two constructions return the same instance, which is the module-level one."""
+        assert WebFetchSessionPool() is WebFetchSessionPool()
+        assert web_fetch_session_pool is WebFetchSessionPool()
+
+    def test_released_session_is_reused(self):
+        """The next borrower receives the session parked by the last one."""
+        first = web_fetch_session_pool.acquire()
+        web_fetch_session_pool.release(first)
+
+        assert web_fetch_session_pool.acquire() is first
+        stats = web_fetch_session_pool.get_stats()
+        assert (stats["created"], stats["reused"], stats["in_use"], stats["idle"]) == (1, 1, 1, 0)
+
+    def test_sessions_do_not_persist_cookies(self, cookie_server):
+        """A cookie set by one fetch is never sent by the next one."""
+        session = web_fetch_session_pool.acquire()
+
+        first = session.get(cookie_server)
+        second = session.get(cookie_server)
+
+        assert first.cookies.get("session") == "abc"
+        assert second.text == ""
+        assert len(session.cookies) == 0
+
+    def test_idle_sessions_are_bounded(self, monkeypatch):
+        """Releases beyond the idle cap close the surplus session."""
+        monkeypatch.setattr(pool_module, "MAX_IDLE_WEB_FETCH_SESSIONS", 1)
+        a = web_fetch_session_pool.acquire()
+        b = web_fetch_session_pool.acquire()
+        b.close = MagicMock()
+
+        web_fetch_session_pool.release(a)
+        web_fetch_session_pool.release(b)
+
+        stats = web_fetch_session_pool.get_stats()
+        assert (stats["idle"], stats["evicted"]) == (1, 1)
+        b.close.assert_called_once()
+
+    def test_idle_sessions_expire_after_ttl(self, monkeypatch):
+        """A parked session older than the TTL is closed instead of reused."""
+        clock = [1000.0]
+        monkeypatch.setattr(pool_module.time, "monotonic", lambda: clock[0])
+        session = web_fetch_session_pool.acquire()
+        session.close = MagicMock()
+        web_fetch_session_pool.release(session)
+
+        clock[0] += pool_module.IDLE_SESSION_TTL_SECONDS + 1
+
+        assert web_fetch_session_pool.acquire() is not session
+        session.close.assert_called_once()
+
+    def test_release_of_foreign_session_closes_it(self):
+        """A session the pool did not lend is closed, never parked."""
+        foreign = MagicMock()
+
+        web_fetch_session_pool.release(foreign)
+
+        foreign.close.assert_called_once()
+        assert web_fetch_session_pool.get_stats()["idle"] == 0
@@ -1589,6 +1589,15 @@ class TestComputeConversationTokenBudget:
         assert budget == 100 - 200 - 0 - 0 - 512
         assert any("budget" in r.message for r in caplog.records)
 
+    def test_exact_counter_ignores_estimation_level(self, mocker):
+        """With a tokenizer-backed counter the budget is in real tokens: the level is not applied."""
+        estimate = mocker.patch('Middleware.services.llm_dispatch_service.rough_estimate_token_length')
+        handler = self._handler(mocker, {"maxContextTokenSize": 1000,
+                                         "wilmerContextEstimationLevel": "xaggressive"}, max_tokens=200)
+        budget = LLMDispatchService._compute_conversation_token_budget(handler, "sys", None, lambda text: 7)
+        assert budget == 1000 - 200 - 7 - 0 - 512
+        estimate.assert_not_called()
+
 
 class TestTrimMessagesToTokenBudget:
     """Tests for the static _trim_messages_to_token_budget helper."""
@@ -1652,6 +1661,14 @@ class TestTrimMessagesToTokenBudget:
         result = LLMDispatchService._trim_messages_to_token_budget(messages, 100000)
         assert len(result) == 2
 
+    def test_uses_exact_counter_when_given(self, mocker):
+        """A tokenizer-backed counter replaces the estimator for every message."""
+        estimate = mocker.patch('Middleware.services.llm_dispatch_service.rough_estimate_token_length')
+        messages = [{"role": "user", "content": f"m{i}"} for i in range(5)]
+        result = LLMDispatchService._trim_messages_to_token_budget(messages, 250, lambda text: 100)
+        assert [m["content"] for m in result] == ["m3", "m4"]
+        estimate.assert_not_called()
+
 
 class TestClampChatCollectionToBudget:
     """Tests for the static _clamp_chat_collection_to_budget helper."""
@@ -0,0 +1,152 @@
+# Tests/services/test_llm_response_cache_service.py
+
+import sqlite3
+
+from Middleware.services import llm_response_cache_service as cache_module
+from Middleware.services.llm_response_cache_service import (
+    LlmResponseCacheService,
+    llm_response_cache_service,
+)
+
+URL = "http://localhost:5000/v1/chat/completions"
+PAYLOAD = {"model": "m", "messages": [{"role": "user", "content": "Extract keywords."}], "temperature": 0}
+
+
+def _key(**overrides):
+    args = {"username": "alice", "api_key_hash": None, "url": URL, "payload": PAYLOAD, **overrides}
+    return LlmResponseCacheService.build_key(**args)
+
+
+def _clock(monkeypatch, start=1000.0):
+    clock = [start]
+    monkeypatch.setattr(cache_module.time, "time", lambda: clock[0])
+    return clock
+
+
+class TestLlmResponseCacheService:
+    """Tests for the LlmResponseCacheService singleton."""
+
+    def test_singleton_pattern(self):
+        assert LlmResponseCacheService() is LlmResponseCacheService()
+        assert llm_response_cache_service is LlmResponseCacheService()
+
+    def test_key_covers_every_input_and_ignores_key_order(self):
+        keys = {
+            _key(),
+            _key(username="bob"),
+            _key(api_key_hash="abc123"),
+            _key(url="http://localhost:5001/v1/chat/completions"),
+            _key(payload={**PAYLOAD, "temperature": 0.7}),
+        }
+        assert len(keys) == 5
+        assert _key() == _key(payload=dict(reversed(list(PAYLOAD.items()))))
+
+    def test_get_and_put_return_copies(self):
+        key = _key()
+        assert llm_response_cache_service.get("alice", key, 60) is None
+        response = {"content": "", "tool_calls": [{"id": "call_1"}], "finish_reason": "tool_calls"}
+        llm_response_cache_service.put("alice", key, response, 10)
+        response["tool_calls"].clear()
+
+        cached = llm_response_cache_service.get("alice", key, 60)
+        assert cached["tool_calls"] == [{"id": "call_1"}]
+        cached["tool_calls"].clear()
+        assert llm_response_cache_service.get("alice", key, 60)["tool_calls"] == [{"id": "call_1"}]
+        stats = llm_response_cache_service.get_stats()
+        assert stats["hits"] == 2 and stats["misses"] == 1 and stats["stores"] == 1
+
+    def test_entries_expire_after_ttl(self, monkeypatch):
+        clock = _clock(monkeypatch)
+        llm_response_cache_service.put("alice", _key(), "keywords", 10)
+        clock[0] += 59
+        assert llm_response_cache_service.get("alice", _key(), 60) == "keywords"
+        clock[0] += 2
+        assert llm_response_cache_service.get("alice", _key(), 60) is None
+        assert llm_response_cache_service.get_stats()["expirations"] == 1
+
+    def test_least_recently_used_entry_is_evicted(self):
+        for name in ("a", "b"):
+            llm_response_cache_service.put("alice", _key(payload={**PAYLOAD, "seed": name}), name, 2)
+        llm_response_cache_service.get("alice", _key(payload={**PAYLOAD, "seed": "a"}), 60)
+        llm_response_cache_service.put("alice", _key(payload={**PAYLOAD, "seed": "c"}), "c", 2)
+
+        assert llm_response_cache_service.get("alice", _key(payload={**PAYLOAD, "seed": "b"}), 60) is None
+        assert llm_response_cache_service.get("alice", _key(payload={**PAYLOAD, "seed": "a"}), 60) == "a"
+        assert llm_response_cache_service.get_stats()["evictions"] == 1
+
+    def test_a_users_limit_never_evicts_another_users_entries(self):
+        llm_response_cache_service.put("alice", _key(), "alice's", 10)
+        for name in ("a", "b", "c"):
+            llm_response_cache_service.put("bob", _key(username="bob", payload={**PAYLOAD, "seed": name}), name, 1)
+
+        assert llm_response_cache_service.get("alice", _key(), 60) == "alice's"
+        assert llm_response_cache_service.get_stats()["entries"] == 2
+
+
+class TestLlmResponseCachePersistence:
+    """Tests for the optional SQLite tier."""
+
+    def test_entries_survive_a_cleared_memory_tier(self, tmp_path):
+        db_path = str(tmp_path / "cache" / "llm_response_cache.db")
+        llm_response_cache_service.put("alice", _key(), {"content": "hi", "tool_calls": []}, 10, db_path)
+        llm_response_cache_service.clear()
+
+        assert llm_response_cache_service.get("alice", _key(), 60, db_path) == {"content": "hi", "tool_calls": []}
+        assert llm_response_cache_service.get("alice", _key(), 60, db_path) == {"content": "hi", "tool_calls": []}
+        stats = llm_response_cache_service.get_stats()
+        assert stats["disk_hits"] == 1 and stats["hits"] == 1
+
+    def test_expired_disk_entries_are_removed(self, tmp_path, monkeypatch):
+        clock = _clock(monkeypatch)
+        db_path = str(tmp_path / "llm_response_cache.db")
+        llm_response_cache_service.put("alice", _key(), "old", 10, db_path)
+        llm_response_cache_service.clear()
+        clock[0] += 120
+
+        assert llm_response_cache_service.get("alice", _key(), 60, db_path) is None
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0] == 0
+
+    def test_disk_tier_is_trimmed_to_max_entries(self, tmp_path, monkeypatch):
+        clock = _clock(monkeypatch)
+        db_path = str(tmp_path / "llm_response_cache.db")
+        for name in ("a", "b", "c"):
+            clock[0] += 1
+            llm_response_cache_service.put("alice", _key(payload={**PAYLOAD, "seed": name}), name, 2, db_path)
+
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0] == 2
+        llm_response_cache_service.clear()
+        assert llm_response_cache_service.get("alice", _key(payload={**PAYLOAD, "seed": "a"}), 60, db_path) is None
+        assert llm_response_cache_service.get("alice", _key(payload={**PAYLOAD, "seed": "c"}), 60, db_path) == "c"
+
+    def test_unreadable_file_is_a_miss(self, tmp_path):
+        db_path = tmp_path / "llm_response_cache.db"
+        db_path.write_bytes(b"not a database" * 100)
+
+        llm_response_cache_service.put("alice", _key(), "kept in memory", 10, str(db_path))
+        llm_response_cache_service.clear()
+        assert llm_response_cache_service.get("alice", _key(), 60, str(db_path)) is None
+
+    def test_disk_trim_is_per_user(self, tmp_path):
+        db_path = str(tmp_path / "llm_response_cache.db")
+        llm_response_cache_service.put("alice", _key(), "alice's", 10, db_path)
+        for name in ("a", "b"):
+            llm_response_cache_service.put("bob", _key(username="bob", payload={**PAYLOAD, "seed": name}), name, 1,
+                                           db_path)
+        llm_response_cache_service.clear()
+
+        assert llm_response_cache_service.get("alice", _key(), 60, db_path) == "alice's"
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0] == 2
+
+    def test_file_without_username_column_is_upgraded(self, tmp_path):
+        db_path = str(tmp_path / "llm_response_cache.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("CREATE TABLE llm_responses ("
+                         "cache_key TEXT PRIMARY KEY, response TEXT NOT NULL, stored_at REAL NOT NULL)")
+
+        llm_response_cache_service.put("alice", _key(), "stored", 10, db_path)
+        llm_response_cache_service.clear()
+
+        assert llm_response_cache_service.get("alice", _key(), 60, db_path) == "stored"
@@ -64,7 +64,9 @@ def test_initialize_llm_handler_with_explicit_params(
         stream=True,
         truncate_length=2048,
         max_tokens=512,
-        addGenerationPrompt=False
+        addGenerationPrompt=False,
+        cache_responses=True,
+        cache_api_key_hash="abc123"
     )
 
     # Assert
@@ -73,7 +75,9 @@ def test_initialize_llm_handler_with_explicit_params(
         endpoint="test_endpoint",
         presetname="test_preset",
         stream=True,
-        max_tokens=512
+        max_tokens=512,
+        cache_responses=True,
+        cache_api_key_hash="abc123"
     )
     mock_get_chat_template_name.assert_not_called()
     mock_LlmHandler.assert_called_once_with(
@@ -125,7 +129,9 @@ def test_initialize_llm_handler_with_defaults(
         endpoint="test_endpoint",
         presetname="test_preset",
         stream=False,
-        max_tokens=1024
+        max_tokens=1024,
+        cache_responses=False,
+        cache_api_key_hash=None
     )
     mock_get_chat_template_name.assert_called_once()
     mock_LlmHandler.assert_called_once_with(
@@ -205,7 +211,9 @@ def test_load_model_from_config_success(
         stream=True,
         truncate_length=8192,
         max_tokens=123,
-        addGenerationPrompt=True
+        addGenerationPrompt=True,
+        cache_responses=True,
+        cache_api_key_hash="abc123"
     )
 
     # Assert
@@ -217,7 +225,9 @@ def test_load_model_from_config_success(
         True,
         8192,
         123,
-        True
+        True,
+        True,
+        "abc123"
     )
     assert result == mock_handler_instance
 
@@ -232,7 +242,8 @@ def test_load_model_from_config_forwards_documented_defaults(
     """
     Tests that calling load_model_from_config with only the required arguments
     forwards the documented defaults (stream=False, truncate_length=4096,
-    max_tokens=400, addGenerationPrompt=None) to initialize_llm_handler.
+    max_tokens=400, addGenerationPrompt=None, cache_responses=False,
+    cache_api_key_hash=None) to initialize_llm_handler.
     """
     # Arrange
     mock_get_endpoint_config.return_value = MOCK_ENDPOINT_CONFIG
@@ -254,6 +265,8 @@ def test_load_model_from_config_forwards_documented_defaults(
         False,
         4096,
         400,
+        None,
+        False,
         None
     )
     assert result == mock_handler_instance
@@ -0,0 +1,265 @@
+# Tests/services/test_memory_job_service.py
+
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from Middleware.common import instance_global_variables
+from Middleware.services import memory_job_service as job_module
+from Middleware.services.memory_job_service import MemoryJobService, memory_job_service
+from Middleware.workflows.models.execution_context import ExecutionContext
+
+
+def _context(discussion_id="disc-1", content="hello", **overrides):
+    args = {
+        "request_id": "req-1",
+        "workflow_id": "MemoryWorkflow",
+        "discussion_id": discussion_id,
+        "config": {"type": "QualityMemory", "runInBackground": True},
+        "messages": [{"role": "user", "content": content}],
+        "stream": False,
+        **overrides,
+    }
+    return ExecutionContext(**args)
+
+
+def _row_count(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM memory_jobs").fetchone()[0]
+
+
+@pytest.fixture
+def runs(mocker):
+    """Replaces the job body with a recorder and yields the recorded jobs."""
+    recorded = []
+    mocker.patch.object(memory_job_service, "_run_job", side_effect=recorded.append)
+    yield recorded
+    memory_job_service.wait_until_idle(5)
+
+
+@pytest.fixture
+def blocking_runs(mocker):
+    """Like runs, but the first job blocks until the returned event is set."""
+    recorded = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def run(job):
+        recorded.append(job)
+        started.set()
+        assert release.wait(5)
+
+    mocker.patch.object(memory_job_service, "_run_job", side_effect=run)
+    yield recorded, started, release
+    release.set()
+    memory_job_service.wait_until_idle(5)
+
+
+class TestMemoryJobQueue:
+    """Tests for queueing, coalescing and running jobs."""
+
+    def test_singleton_pattern(self):
+        assert MemoryJobService() is MemoryJobService()
+        assert memory_job_service is MemoryJobService()
+
+    def test_key_separates_users_api_keys_and_discussions(self):
+        keys = {
+            MemoryJobService.build_key("alice", None, "d1"),
+            MemoryJobService.build_key("bob", None, "d1"),
+            MemoryJobService.build_key("alice", "hash", "d1"),
+            MemoryJobService.build_key("alice", None, "d2"),
+        }
+        assert len(keys) == 4
+
+    def test_job_runs_in_the_background(self, runs):
+        memory_job_service.enqueue_quality_memory(_context(), 1, 0)
+
+        assert memory_job_service.wait_until_idle(5)
+        assert [job["discussion_id"] for job in runs] == ["disc-1"]
+        assert runs[0]["config"]["type"] == "QualityMemory"
+        stats = memory_job_service.get_stats()
+        assert stats["enqueued"] == 1 and stats["completed"] == 1 and stats["pending"] == 0
+
+    def test_pending_jobs_for_a_discussion_are_coalesced(self, blocking_runs):
+        recorded, started, release = blocking_runs
+        memory_job_service.enqueue_quality_memory(_context(content="first"), 1, 0)
+        assert started.wait(5)
+
+        assert memory_job_service.enqueue_quality_memory(_context(content="second"), 1, 0) is False
+        assert memory_job_service.enqueue_quality_memory(_context(content="third"), 1, 0) is True
+        release.set()
+
+        assert memory_job_service.wait_until_idle(5)
+        assert [job["messages"][0]["content"] for job in recorded] == ["first", "third"]
+        stats = memory_job_service.get_stats()
+        assert stats["enqueued"] == 2 and stats["coalesced"] == 1 and stats["completed"] == 2
+
+    def test_failed_job_is_counted_and_dropped(self, mocker):
+        mocker.patch.object(memory_job_service, "_run_job", side_effect=RuntimeError("backend down"))
+        memory_job_service.enqueue_quality_memory(_context(), 1, 0)
+
+        assert memory_job_service.wait_until_idle(5)
+        stats = memory_job_service.get_stats()
+        assert stats["failed"] == 1 and stats["pending"] == 0
+
+
+class TestLiveTrafficPriority:
+    """Tests for deferring jobs while live requests hold the request semaphore."""
+
+    @pytest.fixture(autouse=True)
+    def semaphore(self, monkeypatch):
+        semaphore = threading.BoundedSemaphore(1)
+        monkeypatch.setattr(instance_global_variables, "_request_semaphore", semaphore)
+        monkeypatch.setattr(job_module, "IDLE_POLL_SECONDS", 0.01)
+        return semaphore
+
+    def test_job_waits_for_the_request_to_finish(self, runs, semaphore):
+        semaphore.acquire()
+        memory_job_service.enqueue_quality_memory(_context(), 1, 30)
+
+        assert not memory_job_service.wait_until_idle(0.2)
+        assert runs == []
+        semaphore.release()
+
+        assert memory_job_service.wait_until_idle(5)
+        assert len(runs) == 1
+        stats = memory_job_service.get_stats()
+        assert stats["deferred"] == 1 and stats["defer_timeouts"] == 0
+
+    def test_job_runs_anyway_after_max_defer(self, runs, semaphore):
+        semaphore.acquire()
+        try:
+            memory_job_service.enqueue_quality_memory(_context(), 1, 0.05)
+            assert memory_job_service.wait_until_idle(5)
+        finally:
+            semaphore.release()
+
+        assert len(runs) == 1
+        assert memory_job_service.get_stats()["defer_timeouts"] == 1
+
+    def test_probe_does_not_keep_the_slot(self, runs, semaphore):
+        memory_job_service.enqueue_quality_memory(_context(), 1, 30)
+        assert memory_job_service.wait_until_idle(5)
+        assert semaphore.acquire(blocking=False)
+        semaphore.release()
+
+
+class TestMemoryJobPersistence:
+    """Tests for the SQLite queue file."""
+
+    def test_pending_job_is_persisted_until_it_finishes(self, blocking_runs, tmp_path):
+        recorded, started, release = blocking_runs
+        db_path = str(tmp_path / "queue" / "memory_jobs.db")
+        memory_job_service.enqueue_quality_memory(_context(), 1, 0, db_path)
+        assert started.wait(5)
+        assert _row_count(db_path) == 1
+
+        release.set()
+        assert memory_job_service.wait_until_idle(5)
+        assert _row_count(db_path) == 0
+
+    def test_jobs_from_a_previous_run_are_recovered(self, runs, tmp_path):
+        db_path = str(tmp_path / "memory_jobs.db")
+        leftover = {
+            "job_key": MemoryJobService.build_key(None, None, "old-disc"), "job_id": "abc", "username": None,
+            "workflow_override": None, "api_type": None, "encryption_active": False,
+            "workflow_id": "run-1", "workflow_name": "MemoryWorkflow", "workflow_user_folder_override": None,
+            "discussion_id": "old-disc", "config": {}, "workflow_config": {},
+            "messages": [{"role": "user", "content": "left over"}], "api_key_hash": None,
+            "max_defer_seconds": 0, "enqueued_at": 1.0,
+        }
+        memory_job_service._write_to_disk(db_path, leftover)
+
+        memory_job_service.enqueue_quality_memory(_context(), 1, 0, db_path)
+
+        assert memory_job_service.wait_until_idle(5)
+        assert [job["discussion_id"] for job in runs] == ["old-disc", "disc-1"]
+        assert runs[0]["api_key"] is None and runs[0]["db_path"] == db_path
+        assert memory_job_service.get_stats()["recovered"] == 1
+        assert _row_count(db_path) == 0
+
+    def test_recover_runs_persisted_jobs_without_a_new_request(self, runs, tmp_path):
+        db_path = str(tmp_path / "memory_jobs.db")
+        memory_job_service._write_to_disk(db_path, {
+            "job_key": MemoryJobService.build_key(None, None, "old-disc"), "job_id": "abc",
+            "discussion_id": "old-disc", "max_defer_seconds": 0, "enqueued_at": 1.0,
+        })
+
+        assert memory_job_service.recover(db_path) == 1
+        assert memory_job_service.recover(db_path) == 0
+
+        assert memory_job_service.wait_until_idle(5)
+        assert [job["discussion_id"] for job in runs] == ["old-disc"]
+        assert _row_count(db_path) == 0
+
+    def test_job_records_the_workflow_name_and_folder_override(self, blocking_runs, mocker, tmp_path):
+        recorded, started, release = blocking_runs
+        manager = mocker.Mock(workflowConfigName="MainWorkflow", workflow_user_folder_override="/shared/alice")
+        db_path = str(tmp_path / "memory_jobs.db")
+
+        memory_job_service.enqueue_quality_memory(_context(workflow_id="a1b2c3", workflow_manager=manager), 1, 0,
+                                                  db_path)
+        assert started.wait(5)
+
+        job = recorded[0]
+        assert job["workflow_id"] == "a1b2c3"
+        assert job["workflow_name"] == "MainWorkflow"
+        assert job["workflow_user_folder_override"] == "/shared/alice"
+        with sqlite3.connect(db_path) as conn:
+            persisted = json.loads(conn.execute("SELECT payload FROM memory_jobs").fetchone()[0])
+        assert persisted["workflow_name"] == "MainWorkflow"
+        assert persisted["workflow_user_folder_override"] == "/shared/alice"
+
+    def test_jobs_carrying_an_api_key_are_not_persisted(self, blocking_runs, tmp_path):
+        recorded, started, release = blocking_runs
+        db_path = tmp_path / "memory_jobs.db"
+        context = _context(api_key="sk-secret", api_key_hash="hash", encryption_key=b"key")
+        memory_job_service.enqueue_quality_memory(context, 1, 0, str(db_path))
+        assert started.wait(5)
+
+        assert not db_path.exists()
+        assert recorded[0]["api_key"] == "sk-secret" and recorded[0]["encryption_key"] == b"key"
+
+    def test_unreadable_file_still_runs_the_job(self, runs, tmp_path):
+        db_path = tmp_path / "memory_jobs.db"
+        db_path.write_bytes(b"not a database" * 100)
+
+        memory_job_service.enqueue_quality_memory(_context(), 1, 0, str(db_path))
+
+        assert memory_job_service.wait_until_idle(5)
+        assert len(runs) == 1
+
+
+class TestRunJob:
+    """Tests for rebuilding the request context inside a worker."""
+
+    def test_request_context_is_reapplied_and_cleared(self, mocker):
+        seen = {}
+        manager_cls = mocker.patch("Middleware.workflows.managers.workflow_manager.WorkflowManager")
+        rag_cls = mocker.patch("Middleware.workflows.tools.slow_but_quality_rag_tool.SlowButQualityRAGTool")
+
+        def flow(context):
+            seen["context"] = context
+            seen["user"] = instance_global_variables.get_request_user()
+            seen["api_type"] = instance_global_variables.get_api_type()
+
+        rag_cls.return_value.handle_discussion_id_flow.side_effect = flow
+        job = {
+            "job_id": "abc", "username": "alice", "workflow_override": None, "api_type": "ollamaapichat",
+            "encryption_active": False, "workflow_id": "a1b2c3", "workflow_name": "MemoryWorkflow",
+            "workflow_user_folder_override": "/shared/alice", "discussion_id": "disc-1",
+            "config": {"type": "QualityMemory"}, "workflow_config": {}, "messages": [],
+            "api_key": None, "encryption_key": None, "api_key_hash": "hash",
+        }
+
+        MemoryJobService._run_job(job)
+
+        manager_cls.assert_called_once_with(workflow_config_name="MemoryWorkflow",
+                                            workflow_user_folder_override="/shared/alice")
+        context = seen["context"]
+        assert context.discussion_id == "disc-1" and context.api_key_hash == "hash"
+        assert context.workflow_manager is manager_cls.return_value
+        assert seen["user"] == "alice" and seen["api_type"] == "ollamaapichat"
+        assert instance_global_variables.get_request_user() is None
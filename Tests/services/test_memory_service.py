@@ -559,6 +559,70 @@ def test_search_semantic_mode_ranks_by_cosine(mocker, memory_service):
     assert result == 'closest\n\n---\n\nfarther'
 
 
+def test_search_semantic_mode_reuses_cached_matrix(mocker, memory_service):
+    pytest.importorskip("numpy")
+    mocker.patch('Middleware.services.memory_service.NUMPY_AVAILABLE', True)
+    mock_service_cls = mocker.patch('Middleware.services.memory_service.EmbeddingService')
+    instance = mock_service_cls.return_value
+    instance.model_name = 'emb-model'
+    instance.get_embeddings.return_value = [[1.0, 0.0]]
+    mocker.patch('Middleware.services.memory_service.vector_db_utils.get_embedding_signature',
+                 return_value=(2, 2, 3))
+    mock_all = mocker.patch('Middleware.services.memory_service.vector_db_utils.get_all_embeddings',
+                            return_value=[(1, _vec_blob([0.0, 1.0])), (2, _vec_blob([1.0, 0.0]))])
+    mock_by_ids = mocker.patch('Middleware.services.memory_service.vector_db_utils.get_memories_by_ids',
+                               return_value=[{'memory_text': 'closest'}])
+
+    for _ in range(2):
+        memory_service.search_vector_memories(
+            "disc", "kw", limit=5, search_mode="semantic", embedding_endpoint_name="Emb")
+
+    mock_all.assert_called_once()
+    assert mock_by_ids.call_args_list[-1][0][1] == [2, 1]
+
+
+def test_search_semantic_ivf_mode_rescores_index_candidates(mocker, memory_service):
+    mock_service_cls = mocker.patch('Middleware.services.memory_service.EmbeddingService')
+    instance = mock_service_cls.return_value
+    instance.model_name = 'emb-model'
+    instance.get_embeddings.return_value = [[1.0, 0.0]]
+    mock_candidates = mocker.patch('Middleware.services.memory_service.vector_db_utils.get_ann_candidate_ids',
+                                   return_value=[1, 2])
+    mocker.patch('Middleware.services.memory_service.vector_db_utils.get_embeddings_by_ids',
+                 return_value=[(1, _vec_blob([0.0, 1.0])), (2, _vec_blob([1.0, 0.0]))])
+    mock_all = mocker.patch('Middleware.services.memory_service.vector_db_utils.get_all_embeddings')
+    mock_by_ids = mocker.patch('Middleware.services.memory_service.vector_db_utils.get_memories_by_ids',
+                               return_value=[{'memory_text': 'closest'}])
+
+    memory_service.search_vector_memories(
+        "disc", "kw", limit=5, search_mode="semantic", embedding_endpoint_name="Emb",
+        vector_index="ivf", vector_index_probes=3)
+
+    mock_candidates.assert_called_once_with("disc", "emb-model", [1.0, 0.0], 3, api_key_hash=None)
+    mock_all.assert_not_called()
+    mock_by_ids.assert_called_once_with("disc", [2, 1], api_key_hash=None)
+
+
+def test_search_semantic_ivf_mode_without_usable_index_searches_exactly(mocker, memory_service):
+    mocker.patch('Middleware.services.memory_service.NUMPY_AVAILABLE', False)
+    mock_service_cls = mocker.patch('Middleware.services.memory_service.EmbeddingService')
+    instance = mock_service_cls.return_value
+    instance.model_name = 'emb-model'
+    instance.get_embeddings.return_value = [[1.0, 0.0]]
+    mock_candidates = mocker.patch('Middleware.services.memory_service.vector_db_utils.get_ann_candidate_ids',
+                                   return_value=None)
+    mocker.patch('Middleware.services.memory_service.vector_db_utils.get_all_embeddings',
+                 return_value=[(1, _vec_blob([0.0, 1.0])), (2, _vec_blob([1.0, 0.0]))])
+    mock_by_ids = mocker.patch('Middleware.services.memory_service.vector_db_utils.get_memories_by_ids',
+                               return_value=[{'memory_text': 'closest'}])
+
+    memory_service.search_vector_memories(
+        "disc", "kw", limit=5, search_mode="semantic", embedding_endpoint_name="Emb", vector_index="ivf")
+
+    assert mock_candidates.call_args[0][3] == 8  # DEFAULT_IVF_PROBES
+    mock_by_ids.assert_called_once_with("disc", [2, 1], api_key_hash=None)
+
+
 def test_search_semantic_mode_without_endpoint_falls_back_to_keyword(mocker, memory_service):
     mock_keyword = mocker.patch(
         'Middleware.services.memory_service.vector_db_utils.search_memories_by_keyword',
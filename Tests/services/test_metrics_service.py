@@ -0,0 +1,120 @@
+# Tests/services/test_metrics_service.py
+
+import pytest
+
+from Middleware.services import metrics_service as metrics_module
+from Middleware.services.metrics_service import MetricsService, metrics_service
+
+
+def _lines(text, prefix):
+    return [line for line in text.splitlines() if line.startswith(prefix)]
+
+
+class TestMetricsRegistry:
+    """Tests for recording counters and histograms."""
+
+    def test_singleton_pattern(self):
+        assert MetricsService() is MetricsService()
+        assert metrics_service is MetricsService()
+
+    def test_undeclared_or_mistyped_metric_is_rejected(self):
+        with pytest.raises(ValueError):
+            metrics_service.increment("wilmer_not_a_metric")
+        with pytest.raises(ValueError):
+            metrics_service.observe("wilmer_cancellations_total", 1.0)
+
+    def test_counter_series_are_kept_per_label_set(self):
+        metrics_service.increment("wilmer_tokens_streamed_total", {"endpoint": "A"}, 3)
+        metrics_service.increment("wilmer_tokens_streamed_total", {"endpoint": "A"}, 2)
+        metrics_service.increment("wilmer_tokens_streamed_total", {"endpoint": "B"})
+
+        text = metrics_service.render_prometheus()
+
+        assert 'wilmer_tokens_streamed_total{endpoint="A"} 5' in text
+        assert 'wilmer_tokens_streamed_total{endpoint="B"} 1' in text
+        assert metrics_service.get_stats()["counter_series"] == 2
+
+    def test_histogram_buckets_are_cumulative(self):
+        labels = {"node_type": "Standard", "workflow": "General"}
+        for value in (0.003, 0.2, 0.2, 400.0):
+            metrics_service.observe("wilmer_node_execution_seconds", value, labels)
+
+        text = metrics_service.render_prometheus()
+        series = 'node_type="Standard",workflow="General"'
+
+        assert f'wilmer_node_execution_seconds_bucket{{{series},le="0.005"}} 1' in text
+        assert f'wilmer_node_execution_seconds_bucket{{{series},le="0.1"}} 1' in text
+        assert f'wilmer_node_execution_seconds_bucket{{{series},le="0.25"}} 3' in text
+        assert f'wilmer_node_execution_seconds_bucket{{{series},le="300"}} 3' in text
+        assert f'wilmer_node_execution_seconds_bucket{{{series},le="+Inf"}} 4' in text
+        assert f'wilmer_node_execution_seconds_count{{{series}}} 4' in text
+        assert f'wilmer_node_execution_seconds_sum{{{series}}} 400.403' in text
+
+    def test_value_on_a_bucket_bound_falls_in_that_bucket(self):
+        metrics_service.observe("wilmer_concurrency_wait_seconds", 1.0, {"level": "wilmer"})
+
+        text = metrics_service.render_prometheus()
+
+        assert 'wilmer_concurrency_wait_seconds_bucket{level="wilmer",le="0.5"} 0' in text
+        assert 'wilmer_concurrency_wait_seconds_bucket{level="wilmer",le="1"} 1' in text
+
+    def test_label_values_are_escaped(self):
+        metrics_service.increment("wilmer_backend_errors_total", {"endpoint": 'a"b\\c\nd'})
+
+        assert 'wilmer_backend_errors_total{endpoint="a\\"b\\\\c\\nd"} 1' in metrics_service.render_prometheus()
+
+    def test_every_declared_metric_has_help_and_type(self):
+        text = metrics_service.render_prometheus()
+
+        for name, (metric_type, _) in metrics_module.METRICS.items():
+            assert f"# TYPE {name} {metric_type}" in text
+            assert _lines(text, f"# HELP {name} ")
+
+    def test_clear_drops_all_series(self):
+        metrics_service.increment("wilmer_cancellations_total")
+        metrics_service.observe("wilmer_backend_ttft_seconds", 0.1, {"endpoint": "A"})
+
+        metrics_service.clear()
+
+        assert metrics_service.get_stats() == {"counter_series": 0, "histogram_series": 0}
+        assert not _lines(metrics_service.render_prometheus(), "wilmer_cancellations_total ")
+
+
+class TestCacheMetrics:
+    """Tests for exporting the hit ratios of the in-process caches."""
+
+    def test_hit_ratio_is_read_from_the_cache_stats(self, monkeypatch):
+        class FakeCache:
+            @staticmethod
+            def get_stats():
+                return {"hits": 3, "disk_hits": 1, "misses": 4}
+
+        monkeypatch.setattr(metrics_module, "CACHE_STATS_SOURCES", {
+            "fake": (__name__, "fake_cache", ("hits", "disk_hits"), ("misses",)),
+        })
+        monkeypatch.setitem(globals(), "fake_cache", FakeCache())
+
+        text = metrics_service.render_prometheus()
+
+        assert 'wilmer_cache_hits{cache="fake"} 4' in text
+        assert 'wilmer_cache_misses{cache="fake"} 4' in text
+        assert 'wilmer_cache_hit_ratio{cache="fake"} 0.5' in text
+
+    def test_unused_cache_reports_a_zero_ratio(self, monkeypatch):
+        monkeypatch.setattr(metrics_module, "CACHE_STATS_SOURCES", {
+            "config": metrics_module.CACHE_STATS_SOURCES["config"],
+        })
+
+        assert metrics_service.collect_cache_stats() == {"config": {"hits": 0, "misses": 0, "hit_ratio": 0.0}}
+
+    def test_unavailable_cache_is_skipped(self, monkeypatch):
+        monkeypatch.setattr(metrics_module, "CACHE_STATS_SOURCES", {
+            "missing": ("Middleware.does_not_exist", "cache", ("hits",), ("misses",)),
+        })
+
+        assert metrics_service.collect_cache_stats() == {}
+
+    def test_every_configured_cache_is_exported(self):
+        exported = metrics_service.collect_cache_stats()
+
+        assert set(exported) == set(metrics_module.CACHE_STATS_SOURCES)
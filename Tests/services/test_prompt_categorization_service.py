@@ -3,9 +3,17 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from Middleware.services.categorization_cache_service import categorization_cache_service
 from Middleware.services.prompt_categorization_service import PromptCategorizationService
 
 
+@pytest.fixture(autouse=True)
+def categorization_cache_disabled(mocker):
+    """Keeps the categorization cache off unless a test enables it."""
+    return mocker.patch('Middleware.services.prompt_categorization_service.get_categorization_cache_settings',
+                        return_value=None)
+
+
 @pytest.fixture
 def mock_routing_config():
     """Provides a standard, valid routing configuration dictionary."""
@@ -222,7 +230,7 @@ class TestCategorizationAndRouting:
 
         service.get_prompt_category(messages, request_id, discussion_id, stream=True)
 
-        mock_categorize.assert_called_once_with(messages, request_id)
+        mock_categorize.assert_called_once_with(messages, request_id, api_key=None)
         # Verify the correct workflow was instantiated and run
         MockWorkflowManager.assert_called_once_with(workflow_config_name="CodingWorkflow")
         mock_workflow_instance.run_workflow.assert_called_once_with(
@@ -248,7 +256,7 @@ class TestCategorizationAndRouting:
 
         service.get_prompt_category(messages, request_id, discussion_id, stream=False)
 
-        mock_categorize.assert_called_once_with(messages, request_id)
+        mock_categorize.assert_called_once_with(messages, request_id, api_key=None)
         mock_conversational_method.assert_called_once_with(messages, request_id, discussion_id, False, api_key=None,
                                                               tools=None, tool_choice=None)
 
@@ -796,3 +804,101 @@ class TestGetPromptCategoryRoutingWithUnderscoreKeys:
         underscore_service.get_prompt_category(messages, "req-1", "disc-1", stream=False)
 
         mock_conv.assert_called_once()
+
+
+class TestCategorizationCache:
+    """Tests reuse of cached categorizations for repeated conversations."""
+
+    @pytest.fixture
+    def cache_enabled(self, mocker, categorization_cache_disabled):
+        categorization_cache_disabled.return_value = (300, 0)
+        mocker.patch('Middleware.services.prompt_categorization_service.get_current_username',
+                     return_value='alice')
+        mocker.patch('Middleware.services.prompt_categorization_service.get_active_categorization_workflow_name',
+                     return_value='CategorizationWF')
+        return categorization_cache_disabled
+
+    @staticmethod
+    def _categorizer(service, mocker, *outputs):
+        workflow_manager = MagicMock()
+        workflow_manager.run_workflow.side_effect = list(outputs)
+        mocker.patch.object(service, '_configure_workflow_manager', return_value=workflow_manager)
+        return workflow_manager
+
+    def test_repeated_conversation_skips_workflow(self, service, mocker, cache_enabled):
+        workflow_manager = self._categorizer(service, mocker, "CODING")
+        messages = [{"role": "user", "content": "Fix my script."}]
+
+        assert service._categorize_request(messages, "req-1") == "CODING"
+        assert service._categorize_request([dict(m) for m in messages], "req-2") == "CODING"
+
+        assert workflow_manager.run_workflow.call_count == 1
+        stats = categorization_cache_service.get_stats()
+        assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 1, 1)
+        assert stats["hit_rate"] == 0.5
+
+    def test_disabled_by_default(self, service, mocker):
+        workflow_manager = self._categorizer(service, mocker, "CODING", "CODING")
+        messages = [{"role": "user", "content": "Fix my script."}]
+
+        service._categorize_request(messages, "req-1")
+        service._categorize_request(messages, "req-2")
+
+        assert workflow_manager.run_workflow.call_count == 2
+        assert categorization_cache_service.get_stats()["entries"] == 0
+
+    def test_different_conversation_or_api_key_misses(self, service, mocker, cache_enabled):
+        workflow_manager = self._categorizer(service, mocker, "CODING", "TECHNICAL", "CODING")
+
+        service._categorize_request([{"role": "user", "content": "Fix my script."}], "req-1")
+        service._categorize_request([{"role": "user", "content": "My wifi is down."}], "req-2")
+        service._categorize_request([{"role": "user", "content": "Fix my script."}], "req-3", api_key="other")
+
+        assert workflow_manager.run_workflow.call_count == 3
+
+    def test_unknown_is_not_cached(self, service, mocker, cache_enabled):
+        workflow_manager = self._categorizer(service, mocker, "no idea", "CODING")
+        messages = [{"role": "user", "content": "Hmm."}]
+
+        assert service._categorize_request(messages, "req-1") == "UNKNOWN"
+        assert service._categorize_request(messages, "req-2") == "CODING"
+        assert workflow_manager.run_workflow.call_count == 2
+
+    def test_category_can_opt_out(self, mocker, mock_routing_config, cache_enabled):
+        mock_routing_config["CODING"]["cacheCategorization"] = False
+        mocker.patch('Middleware.services.prompt_categorization_service.get_categories_config',
+                     return_value=mock_routing_config)
+        mocker.patch('Middleware.services.prompt_categorization_service.get_max_categorization_attempts',
+                     return_value=1)
+        service = PromptCategorizationService()
+        workflow_manager = self._categorizer(service, mocker, "CODING", "CODING")
+        messages = [{"role": "user", "content": "Fix my script."}]
+
+        service._categorize_request(messages, "req-1")
+        service._categorize_request(messages, "req-2")
+
+        assert workflow_manager.run_workflow.call_count == 2
+        assert categorization_cache_service.get_stats()["opt_outs"] == 2
+
+    def test_message_count_limits_key_to_recent_messages(self, service, mocker, cache_enabled):
+        cache_enabled.return_value = (300, 1)
+        workflow_manager = self._categorizer(service, mocker, "CODING")
+
+        service._categorize_request([{"role": "user", "content": "old"}, {"role": "user", "content": "new"}], "r1")
+        service._categorize_request([{"role": "user", "content": "older"}, {"role": "user", "content": "new"}], "r2")
+
+        assert workflow_manager.run_workflow.call_count == 1
+
+    def test_entries_expire_after_ttl(self, service, mocker, cache_enabled, monkeypatch):
+        from Middleware.services import categorization_cache_service as cache_module
+        clock = [100.0]
+        monkeypatch.setattr(cache_module.time, "monotonic", lambda: clock[0])
+        workflow_manager = self._categorizer(service, mocker, "CODING", "CODING")
+        messages = [{"role": "user", "content": "Fix my script."}]
+
+        service._categorize_request(messages, "req-1")
+        clock[0] += 301
+        service._categorize_request(messages, "req-2")
+
+        assert workflow_manager.run_workflow.call_count == 2
+        assert categorization_cache_service.get_stats()["expirations"] == 1
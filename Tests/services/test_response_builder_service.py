@@ -1,5 +1,7 @@
 # Tests/services/test_response_builder_service.py
 
+import json
+
 import pytest
 
 from Middleware.common import instance_global_variables
@@ -825,3 +827,92 @@ def test_shared_folder_defaults_to_underscore_shared(mocker):
     service.build_openai_models_response()
 
     assert mock_get_workflows.call_args.kwargs['shared_folder_override'] == '_shared'
+
+
+class TestStreamChunkEncoder:
+    """Tests for the per-stream StreamChunkEncoder."""
+
+    TOKENS = ["Hello", 'quote " and \\ backslash', "line\nbreak\ttab", "naïve ☃ 日本語", "\x01\x1f", "</script>"]
+
+    def _expected(self, encoder, token, finish_reason=None, tool_calls=None):
+        """The chunk the builder itself produces, with the encoder's fixed fields."""
+        builder = rbs_module._FixedModelResponseBuilder(encoder.model_name)
+        if encoder.api_type == "ollamagenerate":
+            chunk = builder.build_ollama_generate_chunk(token, finish_reason, encoder.request_id)
+        elif encoder.api_type == "ollamaapichat":
+            chunk = builder.build_ollama_chat_chunk(token, finish_reason, encoder.request_id, tool_calls=tool_calls)
+        elif encoder.api_type == "openaicompletion":
+            chunk = builder.build_openai_completion_chunk(token, finish_reason)
+        else:
+            chunk = builder.build_openai_chat_completion_chunk(token, finish_reason, tool_calls=tool_calls)
+        if "id" in chunk:
+            chunk["id"] = encoder.chunk_id
+            chunk["created"] = encoder.created
+        return json.dumps(chunk, ensure_ascii=False)
+
+    @pytest.fixture
+    def fixed_time(self, mocker):
+        mocker.patch.object(rbs_module, "_utc_now_iso", return_value="2024-11-23T00:00:00.000000Z")
+
+    @pytest.mark.parametrize("api_type", rbs_module.STREAMING_API_TYPES)
+    @pytest.mark.parametrize("request_id", [None, "req-1"])
+    def test_content_chunks_match_builder_output(self, fixed_time, api_type, request_id):
+        """The spliced fast path is byte-for-byte the builder's JSON."""
+        encoder = rbs_module.StreamChunkEncoder(api_type, request_id, model_name="test-model")
+        for token in self.TOKENS:
+            assert encoder.encode(token) == self._expected(encoder, token)
+
+    @pytest.mark.parametrize("api_type", rbs_module.STREAMING_API_TYPES)
+    def test_final_chunks_match_builder_output(self, fixed_time, api_type):
+        encoder = rbs_module.StreamChunkEncoder(api_type, "req-1", model_name="test-model")
+        assert encoder.encode("", finish_reason="stop") == self._expected(encoder, "", "stop")
+        assert encoder.encode("tail", finish_reason="length") == self._expected(encoder, "tail", "length")
+
+    def test_tool_call_chunk_uses_builder(self, fixed_time):
+        encoder = rbs_module.StreamChunkEncoder("openaichatcompletion", model_name="test-model")
+        tool_calls = [{"index": 0, "id": "call_1", "function": {"name": "f", "arguments": "{}"}}]
+        assert encoder.encode("", tool_calls=tool_calls) == self._expected(encoder, "", tool_calls=tool_calls)
+
+    def test_additional_fields_are_merged(self):
+        encoder = rbs_module.StreamChunkEncoder("openaichatcompletion", model_name="test-model")
+        chunk = json.loads(encoder.encode("hi", additional_fields={"usage": {"total_tokens": 3}}))
+        assert chunk["usage"] == {"total_tokens": 3}
+        assert chunk["choices"][0]["delta"] == {"content": "hi"}
+
+    def test_id_and_created_are_stable_across_the_stream(self):
+        encoder = rbs_module.StreamChunkEncoder("openaichatcompletion", model_name="test-model")
+        chunks = [json.loads(encoder.encode(t)) for t in ("a", "b")] + [json.loads(encoder.encode("", "stop"))]
+        assert len({c["id"] for c in chunks}) == 1
+        assert len({c["created"] for c in chunks}) == 1
+        assert chunks[0]["id"].startswith("chatcmpl-")
+
+    def test_ollama_created_at_is_per_chunk(self, mocker):
+        mocker.patch.object(rbs_module, "_utc_now_iso", side_effect=["t-envelope", "t1", "t2"])
+        encoder = rbs_module.StreamChunkEncoder("ollamaapichat", model_name="test-model")
+        assert json.loads(encoder.encode("a"))["created_at"] == "t1"
+        assert json.loads(encoder.encode("b"))["created_at"] == "t2"
+
+    def test_model_name_resolved_once(self, mocker):
+        get_model_name = mocker.patch('Middleware.api.api_helpers.get_model_name', return_value="resolved")
+        encoder = rbs_module.StreamChunkEncoder("ollamagenerate")
+        for _ in range(3):
+            encoder.encode("tok")
+        encoder.encode("", finish_reason="stop")
+        assert encoder.model_name == "resolved"
+        assert get_model_name.call_count == 1
+
+    def test_unsupported_api_type_raises(self):
+        with pytest.raises(ValueError, match="Unsupported API type for streaming: nope"):
+            rbs_module.StreamChunkEncoder("nope", model_name="m")
+
+    def test_orjson_rejection_falls_back_to_stdlib(self, mocker):
+        """Strings orjson refuses (lone surrogates) still serialize like json.dumps."""
+        fake_orjson = mocker.Mock()
+        fake_orjson.dumps.side_effect = TypeError("str is not valid UTF-8: surrogates not allowed")
+        mocker.patch.object(rbs_module, "orjson", fake_orjson)
+        assert rbs_module._json_string("a\ud800b") == json.dumps("a\ud800b", ensure_ascii=False)
+
+    def test_orjson_output_matches_stdlib(self):
+        pytest.importorskip("orjson")
+        for token in self.TOKENS:
+            assert rbs_module._json_string(token) == json.dumps(token, ensure_ascii=False)
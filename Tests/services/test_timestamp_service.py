@@ -21,7 +21,7 @@ def mock_dependencies(mocker):
     # Patching file system and hashing utilities
     mock_get_path = mocker.patch('Middleware.services.timestamp_service.get_discussion_timestamp_file_path')
     mock_load_file = mocker.patch('Middleware.services.timestamp_service.load_timestamp_file')
-    mock_save_file = mocker.patch('Middleware.services.timestamp_service.save_timestamp_file')
+    mock_update_file = mocker.patch('Middleware.services.timestamp_service.update_timestamp_file')
     mock_hash = mocker.patch('Middleware.services.timestamp_service.hash_single_message')
 
     # Mocking datetime utilities with functional implementations for predictable logic
@@ -58,7 +58,7 @@ def mock_dependencies(mocker):
     return {
         "get_path": mock_get_path,
         "load_file": mock_load_file,
-        "save_file": mock_save_file,
+        "update_file": mock_update_file,
         "hash": mock_hash,
         "MOCK_NOW": MOCK_NOW,
         "format_ago": mock_format_relative_ago,
@@ -109,10 +109,10 @@ class TestTimestampService:
 
         timestamp_service.save_placeholder_timestamp("id")
 
-        expected_saved_data = {PLACEHOLDER_HASH: T_NOW_STR}
-        mock_dependencies["save_file"].assert_called_once_with(
+        mock_dependencies["load_file"].assert_not_called()
+        mock_dependencies["update_file"].assert_called_once_with(
             mock_dependencies["get_path"].return_value,
-            expected_saved_data,
+            {PLACEHOLDER_HASH: T_NOW_STR},
             encryption_key=None
         )
 
@@ -125,10 +125,11 @@ class TestTimestampService:
 
         timestamp_service.commit_assistant_response("id", content)
 
-        expected_saved_data = {"new_hash": T_PLACEHOLDER}
-        mock_dependencies["save_file"].assert_called_once_with(
+        # The placeholder's time moves to the response hash and the placeholder is dropped.
+        mock_dependencies["update_file"].assert_called_once_with(
             mock_dependencies["get_path"].return_value,
-            expected_saved_data,
+            {"new_hash": T_PLACEHOLDER},
+            removed=[PLACEHOLDER_HASH],
             encryption_key=None
         )
 
@@ -141,7 +142,7 @@ class TestTimestampService:
         timestamp_service.commit_assistant_response("id", "content")
 
         expected_saved_data = {"new_hash": T_NOW_STR}
-        mock_dependencies["save_file"].assert_called_once_with(
+        mock_dependencies["update_file"].assert_called_once_with(
             mock_dependencies["get_path"].return_value,
             expected_saved_data,
             encryption_key=None
@@ -154,9 +155,10 @@ class TestTimestampService:
         timestamp_service.commit_assistant_response("id", "")
 
         mock_dependencies["hash"].assert_not_called()
-        # The file is saved, but it's now empty.
-        mock_dependencies["save_file"].assert_called_once_with(
+        # Only the placeholder removal is written.
+        mock_dependencies["update_file"].assert_called_once_with(
             mock_dependencies["get_path"].return_value, {},
+            removed=[PLACEHOLDER_HASH],
             encryption_key=None
         )
 
@@ -168,7 +170,7 @@ class TestTimestampService:
         timestamp_service.commit_assistant_response("id", "")
 
         mock_dependencies["hash"].assert_not_called()
-        mock_dependencies["save_file"].assert_not_called()
+        mock_dependencies["update_file"].assert_not_called()
 
     # ##########################################
     # ##### Tests for resolve_and_track_history
@@ -191,9 +193,10 @@ class TestTimestampService:
             'crashed_hash': T_PLACEHOLDER,
             'user_hash': f"({(original_datetime.strptime(T_PLACEHOLDER.strip('() '), TS_FORMAT) - timedelta(seconds=1)).strftime(TS_FORMAT)})"
         }
-        mock_dependencies["save_file"].assert_called_once()
-        args, _ = mock_dependencies["save_file"].call_args
+        mock_dependencies["update_file"].assert_called_once()
+        args, kwargs = mock_dependencies["update_file"].call_args
         assert args[1] == final_saved_data
+        assert kwargs["removed"] == [PLACEHOLDER_HASH]
 
     def test_resolve_and_track_new_conversation(self, timestamp_service, mock_dependencies):
         """Tests chronological backfill for a brand new conversation."""
@@ -209,8 +212,8 @@ class TestTimestampService:
         timestamp_service.resolve_and_track_history(messages, "convo")
 
         expected_saved_data = {"hash1": T_NOW_M1S, "hash2": T_NOW_STR}
-        mock_dependencies["save_file"].assert_called_once()
-        args, _ = mock_dependencies["save_file"].call_args
+        mock_dependencies["update_file"].assert_called_once()
+        args, _ = mock_dependencies["update_file"].call_args
         assert args[1] == expected_saved_data
 
     def test_resolve_and_track_generation_prompt_skip(self, timestamp_service, mock_dependencies):
@@ -227,8 +230,8 @@ class TestTimestampService:
 
         assert mock_dependencies["hash"].call_count == 1
         expected_saved_data = {"hash1": T_NOW_STR}
-        mock_dependencies["save_file"].assert_called_once()
-        args, _ = mock_dependencies["save_file"].call_args
+        mock_dependencies["update_file"].assert_called_once()
+        args, _ = mock_dependencies["update_file"].call_args
         assert args[1] == expected_saved_data
 
     def test_resolve_and_track_cleans_legacy_placeholder(self, timestamp_service, mock_dependencies):
@@ -240,10 +243,11 @@ class TestTimestampService:
 
         timestamp_service.resolve_and_track_history(messages, "convo")
 
-        expected_saved_data = {"hash1": T_OLD}
-        mock_dependencies["save_file"].assert_called_once()
-        args, _ = mock_dependencies["save_file"].call_args
-        assert args[1] == expected_saved_data
+        # Nothing new to track; only the placeholder removal is written.
+        mock_dependencies["update_file"].assert_called_once()
+        args, kwargs = mock_dependencies["update_file"].call_args
+        assert args[1] == {}
+        assert kwargs["removed"] == [PLACEHOLDER_HASH]
 
     def test_resolve_and_track_ignores_system_messages(self, timestamp_service, mock_dependencies):
         """Ensures system messages are neither hashed nor timestamped."""
@@ -259,8 +263,8 @@ class TestTimestampService:
 
         mock_dependencies["hash"].assert_called_once_with(messages[1])
         expected_saved_data = {"hash_user": T_NOW_STR}
-        mock_dependencies["save_file"].assert_called_once()
-        args, _ = mock_dependencies["save_file"].call_args
+        mock_dependencies["update_file"].assert_called_once()
+        args, _ = mock_dependencies["update_file"].call_args
         assert args[1] == expected_saved_data
 
     def test_resolve_and_track_mixed_known_unknown_anchor_adoption(self, timestamp_service, mock_dependencies):
@@ -283,13 +287,13 @@ class TestTimestampService:
 
         timestamp_service.resolve_and_track_history(messages, "convo")
 
+        # hash_mid is already known, so it is not rewritten; it only becomes the new anchor.
         expected_saved_data = {
             'hash_new': T_NOW_STR,  # Anchored to "now"
-            'hash_mid': T_MID,  # Already known, unchanged; becomes the new anchor
             'hash_old': T_MID_M1S,  # Adopts the known anchor minus one second
         }
-        mock_dependencies["save_file"].assert_called_once()
-        args, _ = mock_dependencies["save_file"].call_args
+        mock_dependencies["update_file"].assert_called_once()
+        args, _ = mock_dependencies["update_file"].call_args
         assert args[1] == expected_saved_data
 
     def test_resolve_placeholder_unresolvable_without_assistant_message(self, timestamp_service, mock_dependencies,
@@ -312,10 +316,10 @@ class TestTimestampService:
 
         mock_warning.assert_called_once()
         assert "Could not find a suitable assistant message" in mock_warning.call_args[0][0]
-        mock_dependencies["save_file"].assert_called_once()
-        args, _ = mock_dependencies["save_file"].call_args
-        assert PLACEHOLDER_HASH not in args[1]
+        mock_dependencies["update_file"].assert_called_once()
+        args, kwargs = mock_dependencies["update_file"].call_args
         assert args[1] == {'hash_user': T_NOW_STR}
+        assert kwargs["removed"] == [PLACEHOLDER_HASH]
 
     # ##########################################
     # ##### Tests for format_messages_with_timestamps
@@ -424,10 +428,9 @@ class TestTimestampService:
 
         timestamp_service.save_specific_timestamp(discussion_id, content, timestamp)
 
-        expected_saved_data = {"new_hash": "(T_Now)"}
-        mock_dependencies["save_file"].assert_called_once()
-        args, _ = mock_dependencies["save_file"].call_args
-        assert args[1] == expected_saved_data
+        mock_dependencies["update_file"].assert_called_once_with(
+            mock_dependencies["get_path"].return_value, {"new_hash": "(T_Now)"}, encryption_key=None
+        )
 
     def test_save_specific_timestamp_update_existing(self, timestamp_service, mock_dependencies):
         """Ensures the method updates a timestamp if the hash exists but the timestamp differs."""
@@ -437,10 +440,9 @@ class TestTimestampService:
 
         timestamp_service.save_specific_timestamp("id", content, "(T_New)")
 
-        expected_saved_data = {"existing_hash": "(T_New)"}
-        mock_dependencies["save_file"].assert_called_once()
-        args, _ = mock_dependencies["save_file"].call_args
-        assert args[1] == expected_saved_data
+        mock_dependencies["update_file"].assert_called_once_with(
+            mock_dependencies["get_path"].return_value, {"existing_hash": "(T_New)"}, encryption_key=None
+        )
 
     def test_save_specific_timestamp_no_change(self, timestamp_service, mock_dependencies):
         """Ensures the method does not save if the hash and timestamp already match."""
@@ -450,7 +452,7 @@ class TestTimestampService:
 
         timestamp_service.save_specific_timestamp("id", content, "(T_Now)")
 
-        mock_dependencies["save_file"].assert_not_called()
+        mock_dependencies["update_file"].assert_not_called()
 
     def test_save_specific_timestamp_preserves_placeholder(self, timestamp_service, mock_dependencies):
         """Ensures that placeholders in the file are preserved (cleanup is handled elsewhere)."""
@@ -460,11 +462,10 @@ class TestTimestampService:
 
         timestamp_service.save_specific_timestamp("id", content, "(T_New)")
 
-        # Placeholder remains; only the new hash is added
-        expected_saved_data = {PLACEHOLDER_HASH: "(T_Stale)", "new_hash": "(T_New)"}
-        mock_dependencies["save_file"].assert_called_once_with(
+        # Only the new hash is written; the placeholder is not removed
+        mock_dependencies["update_file"].assert_called_once_with(
             mock_dependencies["get_path"].return_value,
-            expected_saved_data,
+            {"new_hash": "(T_New)"},
             encryption_key=None
         )
 
@@ -481,7 +482,7 @@ class TestTimestampService:
 
         timestamp_service.save_specific_timestamp("id", content, "(T1)")
 
-        mock_dependencies["save_file"].assert_not_called()
+        mock_dependencies["update_file"].assert_not_called()
 
     @pytest.mark.parametrize("discussion_id, content, timestamp", [
         (None, "content", "(TS)"), ("", "content", "(TS)"),
@@ -496,7 +497,7 @@ class TestTimestampService:
 
         mock_dependencies["get_path"].assert_not_called()
         mock_dependencies["hash"].assert_not_called()
-        mock_dependencies["save_file"].assert_not_called()
+        mock_dependencies["update_file"].assert_not_called()
 
     # ##########################################
     # ##### Tests for get_time_context_summary
@@ -571,19 +572,20 @@ class TestTimestampService:
             {'role': 'user', 'content': 'Hello'},
             {'role': 'assistant', 'content': 'Roland:'}  # Generation prompt
         ]
-        # Stateful load/save backed by a shared dict so the placeholder written by
+        # Stateful load/update backed by a shared dict so the placeholder written by
         # save_placeholder_timestamp is actually found by commit_assistant_response.
         file_state = {}
 
         def _load_file(path, encryption_key=None):
             return dict(file_state)
 
-        def _save_file(path, data, encryption_key=None):
-            file_state.clear()
-            file_state.update(data)
+        def _update_file(path, updates, removed=(), encryption_key=None):
+            for key in removed:
+                file_state.pop(key, None)
+            file_state.update(updates)
 
         mock_dependencies["load_file"].side_effect = _load_file
-        mock_dependencies["save_file"].side_effect = _save_file
+        mock_dependencies["update_file"].side_effect = _update_file
         mock_dependencies["hash"].side_effect = ['hash1', 'hash2']
         T_NOW_STR = f"({MOCK_NOW.strftime(TS_FORMAT)})"
 
@@ -596,8 +598,8 @@ class TestTimestampService:
         assistant_response = "Hi there! How can I help?"
         timestamp_service.commit_assistant_response("convo", assistant_response)
 
-        # Saved three times: history tracking, placeholder save, and commit.
-        assert mock_dependencies["save_file"].call_count == 3
+        # Written three times: history tracking, placeholder save, and commit.
+        assert mock_dependencies["update_file"].call_count == 3
         # The commit consumed the placeholder and bound its time to the response hash.
         assert PLACEHOLDER_HASH not in file_state
         assert file_state['hash2'] == T_NOW_STR
@@ -631,7 +633,7 @@ class TestTimestampService:
         timestamp_service.resolve_and_track_history(new_messages, "convo")
 
         # Placeholder should have been resolved
-        assert PLACEHOLDER_HASH not in mock_dependencies["save_file"].call_args_list[-1][0][1]
+        assert mock_dependencies["update_file"].call_args_list[-1][1]["removed"] == [PLACEHOLDER_HASH]
 
     def test_methods_are_noop_without_discussion_id(self, timestamp_service, mock_dependencies):
         """All service entry points are no-ops without a discussion_id: nothing is loaded or saved."""
@@ -646,7 +648,7 @@ class TestTimestampService:
         timestamp_service.commit_assistant_response(None, "content")
 
         mock_dependencies["load_file"].assert_not_called()
-        mock_dependencies["save_file"].assert_not_called()
+        mock_dependencies["update_file"].assert_not_called()
 
     def test_multiple_regenerations_do_not_replace_placeholder(self, timestamp_service, mock_dependencies):
         """Tests behavior B: regenerations don't replace the placeholder until next user turn."""
@@ -671,10 +673,10 @@ class TestTimestampService:
         mock_dependencies["hash"].side_effect = ['hash3', 'hash3', 'hash1']
         timestamp_service.resolve_and_track_history(regen_messages, "convo")
 
-        last_save_call = mock_dependencies["save_file"].call_args_list[-1][0][1]
-        assert PLACEHOLDER_HASH not in last_save_call  # Placeholder was consumed
-        assert 'hash3' in last_save_call  # New response was assigned the placeholder time
-        assert last_save_call['hash3'] == T_PLACEHOLDER  # Verify it got the placeholder timestamp
+        args, kwargs = mock_dependencies["update_file"].call_args_list[-1]
+        assert kwargs["removed"] == [PLACEHOLDER_HASH]  # Placeholder was consumed
+        assert 'hash3' in args[1]  # New response was assigned the placeholder time
+        assert args[1]['hash3'] == T_PLACEHOLDER  # Verify it got the placeholder timestamp
 
     def test_placeholder_resolution_with_generation_prompt_last(self, timestamp_service, mock_dependencies):
         """Tests behavior E: placeholder resolution when the last message is a generation prompt."""
@@ -702,8 +704,7 @@ class TestTimestampService:
         timestamp_service.resolve_and_track_history(messages, "convo")
 
         # The placeholder should have been applied to the previous assistant message (not the generation prompt)
-        last_save_call = mock_dependencies["save_file"].call_args_list[-1][0][1]
-        assert PLACEHOLDER_HASH not in last_save_call
-        assert last_save_call['hash2'] == T_PLACEHOLDER  # Previous assistant message got the placeholder
-        assert last_save_call['hash1'] == "(Old1)"
-        assert last_save_call['hash3'] == "(Old3)"
+        args, kwargs = mock_dependencies["update_file"].call_args_list[-1]
+        assert kwargs["removed"] == [PLACEHOLDER_HASH]
+        # Previous assistant message got the placeholder; the known hashes are left untouched
+        assert args[1] == {'hash2': T_PLACEHOLDER}
@@ -0,0 +1,167 @@
+# Tests/services/test_token_count_service.py
+
+import os
+
+import pytest
+
+from Middleware.services import token_count_service as tcs_module
+from Middleware.services.token_count_service import (
+    TokenCountService,
+    resolve_tokenizer_path,
+    token_count_service,
+)
+from Middleware.utilities.text_utils import rough_estimate_token_length
+
+
+class _FakeEncoding:
+    def __init__(self, ids):
+        self.ids = ids
+
+
+class _FakeTokenizer:
+    """Counts one token per character, so expected counts are easy to read."""
+
+    loaded_paths = []
+
+    def __init__(self):
+        self.encode_calls = 0
+
+    @classmethod
+    def from_file(cls, path):
+        cls.loaded_paths.append(path)
+        with open(path, encoding="utf-8") as f:
+            if f.read() == "broken":
+                raise ValueError("not a tokenizer")
+        return cls()
+
+    def encode(self, text, add_special_tokens=True):
+        self.encode_calls += 1
+        return _FakeEncoding(list(range(len(text))))
+
+
+@pytest.fixture
+def fake_tokenizers(mocker):
+    """Stands in for the optional ``tokenizers`` package."""
+    _FakeTokenizer.loaded_paths = []
+    mocker.patch.object(tcs_module, "Tokenizer", _FakeTokenizer)
+    mocker.patch.object(tcs_module, "TOKENIZERS_AVAILABLE", True)
+    return _FakeTokenizer
+
+
+@pytest.fixture
+def tokenizer_file(tmp_path):
+    path = tmp_path / "tokenizer.json"
+    path.write_text("{}", encoding="utf-8")
+    return str(path)
+
+
+class TestResolveTokenizerPath:
+    """Tests for resolving the ``tokenizerFile`` endpoint setting."""
+
+    def test_absent_or_invalid_is_none(self):
+        assert resolve_tokenizer_path(None) is None
+        assert resolve_tokenizer_path({}) is None
+        assert resolve_tokenizer_path({"tokenizerFile": "  "}) is None
+        assert resolve_tokenizer_path({"tokenizerFile": 5}) is None
+
+    def test_absolute_path_is_kept(self, tokenizer_file):
+        assert resolve_tokenizer_path({"tokenizerFile": tokenizer_file}) == tokenizer_file
+
+    def test_relative_path_resolves_against_configs_directory(self, mocker, tmp_path):
+        mocker.patch.object(tcs_module, "get_root_config_directory", return_value=str(tmp_path))
+        resolved = resolve_tokenizer_path({"tokenizerFile": "Tokenizers/qwen.json"})
+        assert resolved == os.path.join(str(tmp_path), "Tokenizers", "qwen.json")
+
+
+class TestTokenCountService:
+    """Tests for the TokenCountService singleton."""
+
+    def test_singleton_pattern(self):
+        assert TokenCountService() is TokenCountService()
+        assert token_count_service is TokenCountService()
+
+    def test_without_tokenizer_uses_estimate(self):
+        text = "one two three four five"
+        assert token_count_service.get_counter({"maxContextTokenSize": 100}) is None
+        assert token_count_service.count(text, {}) == rough_estimate_token_length(text)
+        assert token_count_service.count(text) == rough_estimate_token_length(text)
+
+    def test_exact_counts_from_tokenizer(self, fake_tokenizers, tokenizer_file):
+        counter = token_count_service.get_counter({"tokenizerFile": tokenizer_file})
+        assert counter("hello") == 5
+        assert token_count_service.count("hello world", {"tokenizerFile": tokenizer_file}) == 11
+
+    def test_tokenizer_loaded_once_and_counts_memoized(self, fake_tokenizers, tokenizer_file):
+        config = {"tokenizerFile": tokenizer_file}
+        for _ in range(3):
+            assert token_count_service.count("same text", config) == 9
+        assert fake_tokenizers.loaded_paths == [tokenizer_file]
+        stats = token_count_service.get_stats()
+        assert stats["tokenizer_loads"] == 1
+        assert stats["count_misses"] == 1
+        assert stats["count_hits"] == 2
+
+    def test_changed_file_is_reloaded(self, fake_tokenizers, tokenizer_file):
+        config = {"tokenizerFile": tokenizer_file}
+        token_count_service.count("text", config)
+        with open(tokenizer_file, "w", encoding="utf-8") as f:
+            f.write('{"version": 2}')
+        token_count_service.count("text", config)
+        assert len(fake_tokenizers.loaded_paths) == 2
+        assert token_count_service.get_stats()["count_misses"] == 2
+
+    def test_missing_file_falls_back_and_warns_once(self, fake_tokenizers, tmp_path, caplog):
+        config = {"tokenizerFile": str(tmp_path / "missing.json")}
+        with caplog.at_level("WARNING"):
+            assert token_count_service.get_counter(config) is None
+            assert token_count_service.count("a b c", config) == rough_estimate_token_length("a b c")
+        assert sum("was not found" in r.message for r in caplog.records) == 1
+        assert token_count_service.get_stats()["load_failures"] == 1
+
+    def test_unloadable_file_falls_back(self, fake_tokenizers, tmp_path, caplog):
+        path = tmp_path / "tokenizer.json"
+        path.write_text("broken", encoding="utf-8")
+        with caplog.at_level("WARNING"):
+            assert token_count_service.get_counter({"tokenizerFile": str(path)}) is None
+        assert any("Could not load tokenizer" in r.message for r in caplog.records)
+
+    def test_package_missing_falls_back(self, mocker, tokenizer_file, caplog):
+        mocker.patch.object(tcs_module, "TOKENIZERS_AVAILABLE", False)
+        with caplog.at_level("WARNING"):
+            assert token_count_service.get_counter({"tokenizerFile": tokenizer_file}) is None
+        assert any("'tokenizers' package is not installed" in r.message for r in caplog.records)
+
+    def test_cached_counts_are_bounded(self, mocker, fake_tokenizers, tokenizer_file):
+        mocker.patch.object(tcs_module, "MAX_CACHED_TOKEN_COUNTS", 2)
+        counter = token_count_service.get_counter({"tokenizerFile": tokenizer_file})
+        for text in ["a", "bb", "ccc"]:
+            counter(text)
+        assert token_count_service.get_stats()["cached_counts"] == 2
+
+    def test_cached_counts_are_bounded_by_chars(self, mocker, fake_tokenizers, tokenizer_file):
+        mocker.patch.object(tcs_module, "MAX_CACHED_TOKEN_COUNT_CHARS", 5)
+        counter = token_count_service.get_counter({"tokenizerFile": tokenizer_file})
+        for text in ["aa", "bb", "cc"]:
+            counter(text)
+        stats = token_count_service.get_stats()
+        assert stats["cached_counts"] == 2
+        assert stats["cached_chars"] == 4
+
+    def test_oversized_texts_are_not_cached(self, mocker, fake_tokenizers, tokenizer_file):
+        mocker.patch.object(tcs_module, "MAX_CACHED_TOKEN_COUNT_TEXT_CHARS", 2)
+        counter = token_count_service.get_counter({"tokenizerFile": tokenizer_file})
+        counter("ccc")
+        assert token_count_service.get_stats()["cached_counts"] == 0
+
+    def test_real_tokenizers_package(self, tmp_path):
+        """Counts with the real ``tokenizers`` package when it is installed."""
+        tokenizers = pytest.importorskip("tokenizers")
+        from tokenizers.models import WordLevel
+        from tokenizers.pre_tokenizers import Whitespace
+
+        tokenizer = tokenizers.Tokenizer(WordLevel({"hello": 0, "world": 1, "[UNK]": 2}, unk_token="[UNK]"))
+        tokenizer.pre_tokenizer = Whitespace()
+        path = tmp_path / "tokenizer.json"
+        tokenizer.save(str(path))
+
+        assert token_count_service.count("hello world again", {"tokenizerFile": str(path)}) == 3
@@ -0,0 +1,251 @@
+# Tests/services/test_web_fetch_cache_service.py
+
+import json
+import sqlite3
+
+import pytest
+from requests.structures import CaseInsensitiveDict
+
+from Middleware.services import web_fetch_cache_service as cache_module
+from Middleware.services.web_fetch_cache_service import (
+    HtmlTextMemo,
+    WebFetchCacheService,
+    freshness_lifetime,
+    html_text_memo,
+    web_fetch_cache_service,
+)
+
+URL = "https://docs.example.com/page"
+MAX_BYTES = 1024 * 1024
+
+
+def _key(**overrides):
+    args = {"username": "alice", "url": URL, "headers": {"Accept": "text/html"}, "proxies": None,
+            "verify": True, "allow_redirects": True, **overrides}
+    return WebFetchCacheService.build_key(**args)
+
+
+def _clock(monkeypatch, start=1000.0):
+    clock = [start]
+    monkeypatch.setattr(cache_module.time, "time", lambda: clock[0])
+    return clock
+
+
+def _store(key, headers=None, body=b"<p>docs</p>", ttl=60, max_bytes=MAX_BYTES, db_path=None, url=URL,
+           username="alice"):
+    return web_fetch_cache_service.store(
+        username, key, url=url, status_code=200, reason="OK", headers=headers or {"Content-Type": "text/html"},
+        encoding="utf-8", body=body, ttl_seconds=ttl, max_bytes=max_bytes, db_path=db_path)
+
+
+class TestFreshnessLifetime:
+    """Tests for the RFC 7234 freshness rules."""
+
+    @pytest.mark.parametrize("headers, expected", [
+        ({}, 60.0),
+        ({"Cache-Control": "max-age=10"}, 10.0),
+        ({"Cache-Control": "public, max-age=\"3600\""}, 60.0),
+        ({"Cache-Control": "max-age=30", "Age": "25"}, 5.0),
+        ({"Cache-Control": "max-age=30", "Age": "99"}, 0.0),
+        ({"Cache-Control": "no-cache"}, 0.0),
+        ({"Cache-Control": "no-store"}, None),
+        ({"Vary": "*"}, None),
+        ({"Date": "Sun, 06 Nov 1994 08:49:37 GMT", "Expires": "Sun, 06 Nov 1994 08:50:07 GMT"}, 30.0),
+        ({"Expires": "0"}, 0.0),
+        ({"Cache-Control": "max-age=20", "Expires": "0"}, 20.0),
+    ])
+    def test_lifetime(self, headers, expected):
+        assert freshness_lifetime(CaseInsensitiveDict(headers), 60, now=1000.0) == expected
+
+
+class TestWebFetchCacheService:
+    """Tests for the WebFetchCacheService singleton."""
+
+    def test_singleton_pattern(self):
+        assert WebFetchCacheService() is WebFetchCacheService()
+        assert web_fetch_cache_service is WebFetchCacheService()
+
+    def test_key_covers_every_input_and_ignores_header_case_and_order(self):
+        keys = {
+            _key(),
+            _key(username="bob"),
+            _key(url=URL + "?v=2"),
+            _key(headers={"Accept": "application/json"}),
+            _key(proxies={"http": "socks5://p:1080", "https": "socks5://p:1080"}),
+            _key(verify=False),
+            _key(allow_redirects=False),
+        }
+        assert len(keys) == 7
+        assert _key(headers={"accept": "text/html"}) == _key()
+        assert _key(headers={"A": "1", "B": "2"}) == _key(headers={"B": "2", "A": "1"})
+
+    def test_fresh_entry_is_a_hit(self, monkeypatch):
+        clock = _clock(monkeypatch)
+        _store(_key())
+
+        clock[0] += 59
+        entry = web_fetch_cache_service.lookup("alice", _key(), MAX_BYTES)
+
+        assert entry["fresh"] is True
+        assert entry["body"] == b"<p>docs</p>"
+        assert web_fetch_cache_service.get_stats()["hits"] == 1
+
+    def test_stale_entry_is_returned_for_revalidation_and_counts_as_a_miss(self, monkeypatch):
+        clock = _clock(monkeypatch)
+        _store(_key(), headers={"ETag": '"v1"'})
+
+        clock[0] += 61
+        entry = web_fetch_cache_service.lookup("alice", _key(), MAX_BYTES)
+
+        assert entry["fresh"] is False
+        assert web_fetch_cache_service.get_stats()["misses"] == 1
+
+    def test_no_store_and_unvalidatable_stale_responses_are_not_stored(self):
+        assert _store(_key(), headers={"Cache-Control": "no-store"}) is False
+        assert _store(_key(), headers={"Cache-Control": "no-cache"}) is False
+        assert _store(_key(), headers={"Cache-Control": "no-cache", "Last-Modified": "x"}) is True
+
+    def test_no_store_response_replaces_an_earlier_entry(self):
+        _store(_key())
+
+        _store(_key(), headers={"Cache-Control": "no-store"})
+
+        assert web_fetch_cache_service.lookup("alice", _key(), MAX_BYTES) is None
+
+    def test_revalidation_merges_headers_and_renews_freshness(self, monkeypatch):
+        clock = _clock(monkeypatch)
+        _store(_key(), headers={"ETag": '"v1"', "Content-Type": "text/html", "Content-Length": "11"})
+        clock[0] += 100
+        stale = web_fetch_cache_service.lookup("alice", _key(), MAX_BYTES)
+
+        refreshed = web_fetch_cache_service.revalidated(
+            "alice", _key(), stale,
+            CaseInsensitiveDict({"etag": '"v1"', "Cache-Control": "max-age=30", "Content-Length": "0"}),
+            60, MAX_BYTES)
+
+        assert refreshed["body"] == b"<p>docs</p>"
+        assert refreshed["headers"]["Cache-Control"] == "max-age=30"
+        assert refreshed["headers"]["Content-Length"] == "11"
+        assert [name.lower() for name in refreshed["headers"]].count("etag") == 1
+        clock[0] += 29
+        assert web_fetch_cache_service.lookup("alice", _key(), MAX_BYTES)["fresh"] is True
+        assert web_fetch_cache_service.get_stats()["revalidated"] == 1
+
+    def test_memory_tier_is_bounded_by_size(self):
+        # Each entry counts as about 1,350 bytes with its headers and overhead.
+        max_bytes = 3000
+        for i in range(4):
+            _store(_key(url=f"{URL}/{i}"), body=b"x" * 800, max_bytes=max_bytes)
+
+        stats = web_fetch_cache_service.get_stats()
+        assert stats["bytes"] <= max_bytes
+        assert stats["evictions"] == 2
+        assert web_fetch_cache_service.lookup("alice", _key(url=f"{URL}/0"), max_bytes) is None
+        assert web_fetch_cache_service.lookup("alice", _key(url=f"{URL}/3"), max_bytes) is not None
+
+    def test_a_users_bound_never_evicts_another_users_entries(self):
+        _store(_key())
+        for i in range(3):
+            _store(_key(username="bob", url=f"{URL}/{i}"), body=b"x" * 800, max_bytes=1500, username="bob")
+
+        assert web_fetch_cache_service.lookup("alice", _key(), MAX_BYTES) is not None
+        assert web_fetch_cache_service.get_stats()["entries"] == 2
+
+    def test_response_larger_than_the_cache_is_not_stored(self):
+        assert _store(_key(), body=b"x" * 5000, max_bytes=1000) is False
+        assert web_fetch_cache_service.get_stats()["entries"] == 0
+
+    def test_entries_survive_a_cleared_memory_tier(self, tmp_path):
+        db_path = str(tmp_path / "cache" / "web_fetch_cache.db")
+        _store(_key(), body=b"\x00binary\xff", db_path=db_path)
+
+        web_fetch_cache_service.clear()
+        entry = web_fetch_cache_service.lookup("alice", _key(), MAX_BYTES, db_path)
+
+        assert entry["body"] == b"\x00binary\xff"
+        assert entry["headers"] == {"Content-Type": "text/html"}
+        assert web_fetch_cache_service.get_stats()["disk_hits"] == 1
+        assert web_fetch_cache_service.lookup("alice", _key(), MAX_BYTES, db_path) is not None
+        assert web_fetch_cache_service.get_stats()["hits"] == 1
+
+    def test_disk_tier_is_trimmed_to_max_bytes_oldest_first(self, tmp_path, monkeypatch):
+        clock = _clock(monkeypatch)
+        db_path = str(tmp_path / "web_fetch_cache.db")
+        for i in range(4):
+            clock[0] += 1
+            _store(_key(url=f"{URL}/{i}"), body=b"x" * 800, max_bytes=3000, db_path=db_path, url=f"{URL}/{i}")
+
+        with sqlite3.connect(db_path) as conn:
+            rows = conn.execute("SELECT metadata FROM web_fetch_responses").fetchall()
+            total = conn.execute("SELECT SUM(size) FROM web_fetch_responses").fetchone()[0]
+        assert len(rows) == 2
+        assert total <= 3000
+        assert sorted(json.loads(row[0])["url"] for row in rows) == [f"{URL}/2", f"{URL}/3"]
+
+    def test_disk_trim_is_per_user(self, tmp_path):
+        db_path = str(tmp_path / "web_fetch_cache.db")
+        _store(_key(), db_path=db_path)
+        for i in range(2):
+            _store(_key(username="bob", url=f"{URL}/{i}"), body=b"x" * 800, max_bytes=1500, db_path=db_path,
+                   username="bob")
+
+        web_fetch_cache_service.clear()
+        assert web_fetch_cache_service.lookup("alice", _key(), MAX_BYTES, db_path) is not None
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM web_fetch_responses").fetchone()[0] == 2
+
+    def test_file_without_username_column_is_upgraded(self, tmp_path):
+        db_path = str(tmp_path / "web_fetch_cache.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("CREATE TABLE web_fetch_responses (cache_key TEXT PRIMARY KEY, metadata TEXT NOT NULL, "
+                         "body BLOB NOT NULL, size INTEGER NOT NULL, stored_at REAL NOT NULL)")
+
+        _store(_key(), db_path=db_path)
+        web_fetch_cache_service.clear()
+
+        assert web_fetch_cache_service.lookup("alice", _key(), MAX_BYTES, db_path) is not None
+
+    def test_unreadable_file_is_a_miss(self, tmp_path):
+        db_path = tmp_path / "web_fetch_cache.db"
+        db_path.write_bytes(b"not a database")
+
+        assert web_fetch_cache_service.lookup("alice", _key(), MAX_BYTES, str(db_path)) is None
+        assert web_fetch_cache_service.get_stats()["misses"] == 1
+
+    def test_clear_resets_everything(self):
+        _store(_key())
+        web_fetch_cache_service.lookup("alice", _key(), MAX_BYTES)
+
+        web_fetch_cache_service.clear()
+
+        assert web_fetch_cache_service.get_stats() == {"hits": 0, "disk_hits": 0, "misses": 0, "revalidated": 0,
+                                                       "stores": 0, "evictions": 0, "entries": 0, "bytes": 0}
+
+
+class TestHtmlTextMemo:
+    """Tests for the HtmlTextMemo singleton."""
+
+    def test_singleton_pattern(self):
+        assert HtmlTextMemo() is HtmlTextMemo()
+        assert html_text_memo is HtmlTextMemo()
+
+    def test_get_after_put(self):
+        digest = html_text_memo.digest("<p>a</p>")
+
+        assert html_text_memo.get(digest) is None
+        html_text_memo.put(digest, "a")
+
+        assert html_text_memo.get(digest) == "a"
+        assert html_text_memo.get_stats() == {"hits": 1, "misses": 1, "entries": 1, "chars": 1}
+
+    def test_least_recently_used_text_is_evicted(self, monkeypatch):
+        monkeypatch.setattr(cache_module, "MAX_MEMOIZED_HTML_TEXTS", 2)
+        html_text_memo.put("a", "1")
+        html_text_memo.put("b", "2")
+        html_text_memo.get("a")
+
+        html_text_memo.put("c", "3")
+
+        assert html_text_memo.get("b") is None
+        assert html_text_memo.get("a") == "1"
+        assert html_text_memo.get_stats()["entries"] == 2
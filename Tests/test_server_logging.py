@@ -430,3 +430,81 @@ class TestResolveLoggingDirectory:
 
         assert instance_global_variables.LOGGING_DIRECTORY == "plain-logs"
         assert capsys.readouterr().err == ""
+
+
+class TestPrecompileWorkflows:
+    """Tests for the optional startup workflow precompilation."""
+
+    @pytest.fixture(autouse=True)
+    def reset_globals(self):
+        saved = instance_global_variables.PRECOMPILE_WORKFLOWS
+        yield
+        instance_global_variables.PRECOMPILE_WORKFLOWS = saved
+
+    def test_disabled_by_default_does_nothing(self):
+        from Middleware.common.server_startup import precompile_workflows
+        instance_global_variables.PRECOMPILE_WORKFLOWS = False
+
+        with patch("Middleware.workflows.managers.workflow_compiler.workflow_compiler.precompile_directory") as mock_pre:
+            assert precompile_workflows() == 0
+
+        mock_pre.assert_not_called()
+
+    def test_enabled_walks_the_workflows_directory(self):
+        from Middleware.common.server_startup import precompile_workflows
+        instance_global_variables.PRECOMPILE_WORKFLOWS = True
+
+        with patch("Middleware.utilities.config_utils.get_root_config_directory", return_value="cfg"), \
+                patch("Middleware.workflows.managers.workflow_compiler.workflow_compiler.precompile_directory",
+                      return_value=3) as mock_pre:
+            assert precompile_workflows() == 3
+
+        mock_pre.assert_called_once_with(os.path.join("cfg", "Workflows"))
+
+    def test_failure_never_blocks_startup(self):
+        from Middleware.common.server_startup import precompile_workflows
+        instance_global_variables.PRECOMPILE_WORKFLOWS = True
+
+        with patch("Middleware.utilities.config_utils.get_root_config_directory", side_effect=RuntimeError("boom")):
+            assert precompile_workflows() == 0
+
+
+class TestRecoverMemoryJobs:
+    """Tests for re-queueing persisted background memory jobs at startup."""
+
+    @staticmethod
+    def _leftover(discussion_id):
+        from Middleware.services.memory_job_service import MemoryJobService
+        return {
+            "job_key": MemoryJobService.build_key("alice", None, discussion_id), "job_id": "abc",
+            "username": "alice", "workflow_override": None, "api_type": None, "encryption_active": False,
+            "workflow_id": "wf-run", "workflow_name": "MemoryWorkflow", "workflow_user_folder_override": None,
+            "discussion_id": discussion_id, "config": {}, "workflow_config": {}, "messages": [],
+            "api_key_hash": None, "max_defer_seconds": 0, "enqueued_at": 1.0,
+        }
+
+    def test_each_users_queue_file_is_recovered(self, tmp_path):
+        from Middleware.common.server_startup import recover_memory_jobs
+        from Middleware.services.memory_job_service import memory_job_service
+
+        def settings():
+            user = instance_global_variables.get_request_user()
+            return 2, 0, str(tmp_path / user / "memory_jobs.db")
+
+        memory_job_service._write_to_disk(str(tmp_path / "alice" / "memory_jobs.db"), self._leftover("old-disc"))
+        runs = []
+        with patch("Middleware.utilities.config_utils.get_memory_job_queue_settings", side_effect=settings), \
+                patch.object(memory_job_service, "_run_job", side_effect=runs.append):
+            assert recover_memory_jobs(["alice", "bob"]) == 1
+            assert memory_job_service.wait_until_idle(5)
+
+        assert [job["discussion_id"] for job in runs] == ["old-disc"]
+        assert not (tmp_path / "bob").exists()
+        assert instance_global_variables.get_request_user() is None
+
+    def test_failure_never_blocks_startup(self):
+        from Middleware.common.server_startup import recover_memory_jobs
+
+        with patch("Middleware.utilities.config_utils.get_memory_job_queue_settings",
+                   side_effect=RuntimeError("boom")):
+            assert recover_memory_jobs(None) == 0
@@ -0,0 +1,141 @@
+# Tests/utilities/test_config_cache.py
+
+import copy
+import json
+import os
+
+import pytest
+
+from Middleware.utilities.config_cache import ConfigCache, ReadOnlyDict, ReadOnlyList, config_cache, freeze, thaw
+
+
+def _write(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return str(path)
+
+
+def _bump_mtime(path):
+    """Forces a distinct mtime so the test does not depend on filesystem timestamp resolution."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestReadOnlyViews:
+    """Tests for the freeze/thaw helpers and the read-only container types."""
+
+    def test_freeze_is_recursive_and_still_json_compatible(self):
+        frozen = freeze({"a": [1, {"b": 2}], "c": {"d": []}})
+
+        assert isinstance(frozen, ReadOnlyDict) and isinstance(frozen, dict)
+        assert isinstance(frozen["a"], ReadOnlyList)
+        assert isinstance(frozen["a"][1], ReadOnlyDict)
+        assert json.loads(json.dumps(frozen)) == {"a": [1, {"b": 2}], "c": {"d": []}}
+
+    @pytest.mark.parametrize("mutate", [
+        lambda d: d.__setitem__("x", 1),
+        lambda d: d.__delitem__("a"),
+        lambda d: d.update({"x": 1}),
+        lambda d: d.pop("a"),
+        lambda d: d.setdefault("x", 1),
+        lambda d: d.clear(),
+        lambda d: d["a"].append(3),
+        lambda d: d["a"].__setitem__(0, 9),
+        lambda d: d["c"].update({"x": 1}),
+    ], ids=["setitem", "delitem", "update", "pop", "setdefault", "clear",
+            "nested_list_append", "nested_list_setitem", "nested_dict_update"])
+    def test_mutation_raises_type_error(self, mutate):
+        frozen = freeze({"a": [1, 2], "c": {}})
+        with pytest.raises(TypeError, match="read-only"):
+            mutate(frozen)
+
+    def test_deepcopy_and_thaw_return_plain_mutable_copies(self):
+        frozen = freeze({"a": [1, {"b": 2}]})
+
+        for copied in (copy.deepcopy(frozen), thaw(frozen)):
+            assert type(copied) is dict
+            assert type(copied["a"]) is list
+            assert type(copied["a"][1]) is dict
+            copied["a"][1]["b"] = 3
+        assert frozen["a"][1]["b"] == 2
+
+    def test_shallow_copy_and_dict_constructor_are_mutable_at_top_level(self):
+        frozen = freeze({"a": 1})
+        for copied in (copy.copy(frozen), dict(frozen), {**frozen}):
+            copied["a"] = 2
+        assert frozen["a"] == 1
+
+
+class TestConfigCache:
+    """Tests for the stat-revalidated ConfigCache."""
+
+    def test_singleton_pattern(self):
+        assert ConfigCache() is ConfigCache()
+        assert config_cache is ConfigCache()
+
+    def test_unchanged_file_is_parsed_once(self, tmp_path, mocker):
+        path = _write(tmp_path / "a.json", {"k": "v"})
+        spy = mocker.spy(json, "load")
+
+        first = config_cache.get(path)
+        second = config_cache.get(path)
+
+        assert first is second
+        assert first == {"k": "v"}
+        assert spy.call_count == 1
+        assert config_cache.get_stats() == {"hits": 1, "misses": 1, "uncached": 0, "entries": 1}
+
+    def test_changed_file_is_reparsed(self, tmp_path):
+        path = _write(tmp_path / "a.json", {"k": "v"})
+        assert config_cache.get(path) == {"k": "v"}
+
+        _write(tmp_path / "a.json", {"k": "changed"})
+        _bump_mtime(path)
+
+        assert config_cache.get(path) == {"k": "changed"}
+        assert config_cache.get_stats()["misses"] == 2
+
+    def test_load_returns_independent_mutable_copy(self, tmp_path):
+        path = _write(tmp_path / "a.json", {"nodes": [{"type": "Standard"}]})
+
+        loaded = config_cache.load(path)
+        loaded["nodes"][0]["type"] = "Mutated"
+        loaded["nodes"].append({})
+
+        assert config_cache.get(path) == {"nodes": [{"type": "Standard"}]}
+        assert config_cache.get_stats()["misses"] == 1
+
+    def test_missing_file_raises_and_is_not_cached(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            config_cache.get(str(tmp_path / "missing.json"))
+        assert config_cache.get_stats()["entries"] == 0
+        assert config_cache.get_stats()["uncached"] == 1
+
+    def test_invalid_json_raises_and_is_not_cached(self, tmp_path):
+        path = tmp_path / "bad.json"
+        path.write_text("{not json", encoding="utf-8")
+
+        with pytest.raises(json.JSONDecodeError):
+            config_cache.get(str(path))
+        assert config_cache.get_stats()["entries"] == 0
+
+    def test_invalidate_forces_reparse(self, tmp_path):
+        path = _write(tmp_path / "a.json", {"k": "v"})
+        config_cache.get(path)
+
+        config_cache.invalidate(path)
+        config_cache.get(path)
+
+        assert config_cache.get_stats()["misses"] == 2
+
+    def test_lru_cap_evicts_oldest(self, tmp_path, monkeypatch):
+        from Middleware.utilities import config_cache as cache_module
+        monkeypatch.setattr(cache_module, "MAX_CACHED_FILES", 2)
+        paths = [_write(tmp_path / f"{i}.json", {"i": i}) for i in range(3)]
+
+        for path in paths:
+            config_cache.get(path)
+        config_cache.get(paths[0])
+
+        stats = config_cache.get_stats()
+        assert stats["entries"] == 2
+        assert stats["misses"] == 4
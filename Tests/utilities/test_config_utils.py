@@ -1380,6 +1380,164 @@ class TestGetLivenessToolCall:
         assert config_utils.get_liveness_tool_call() is None
 
 
+class TestGetCategorizationCacheSettings:
+    """Tests for get_categorization_cache_settings."""
+
+    @staticmethod
+    def _config(mocker, values):
+        mocker.patch('Middleware.utilities.config_utils.get_config_value', side_effect=values.get)
+
+    def test_disabled_without_ttl(self, mocker):
+        self._config(mocker, {})
+        assert config_utils.get_categorization_cache_settings() is None
+        self._config(mocker, {"categorizationCacheTtlSeconds": 0})
+        assert config_utils.get_categorization_cache_settings() is None
+
+    def test_ttl_and_message_count(self, mocker):
+        self._config(mocker, {"categorizationCacheTtlSeconds": 600})
+        assert config_utils.get_categorization_cache_settings() == (600, 0)
+        self._config(mocker, {"categorizationCacheTtlSeconds": 600, "categorizationCacheMessageCount": 3})
+        assert config_utils.get_categorization_cache_settings() == (600, 3)
+
+    @pytest.mark.parametrize("values", [
+        {"categorizationCacheTtlSeconds": "600"},
+        {"categorizationCacheTtlSeconds": -5},
+        {"categorizationCacheTtlSeconds": True},
+        {"categorizationCacheTtlSeconds": 600, "categorizationCacheMessageCount": -1},
+        {"categorizationCacheTtlSeconds": 600, "categorizationCacheMessageCount": 2.5},
+    ])
+    def test_malformed_is_disabled(self, mocker, values):
+        self._config(mocker, values)
+        assert config_utils.get_categorization_cache_settings() is None
+
+
+class TestGetLlmResponseCacheSettings:
+    """Tests for get_llm_response_cache_settings."""
+
+    @staticmethod
+    def _config(mocker, value):
+        mocker.patch('Middleware.utilities.config_utils.get_config_value', return_value=value)
+
+    @pytest.mark.parametrize("value", [None, True, {}])
+    def test_defaults(self, mocker, value):
+        self._config(mocker, value)
+        assert config_utils.get_llm_response_cache_settings() == (3600, 512, None)
+
+    def test_false_disables_the_cache(self, mocker):
+        self._config(mocker, False)
+        assert config_utils.get_llm_response_cache_settings() is None
+
+    def test_custom_limits_and_persistence(self, mocker):
+        self._config(mocker, {"ttlSeconds": 60, "maxEntries": 5, "persist": True})
+        mocker.patch('Middleware.utilities.config_utils.get_custom_dblite_filepath', return_value='/data/dbs')
+        assert config_utils.get_llm_response_cache_settings() == (
+            60, 5, os.path.join('/data/dbs', 'llm_response_cache.db'))
+
+    @pytest.mark.parametrize("value", [
+        "yes",
+        {"ttlSeconds": 0},
+        {"ttlSeconds": "60"},
+        {"maxEntries": 0},
+        {"maxEntries": 2.5},
+        {"persist": "true"},
+    ])
+    def test_malformed_is_disabled(self, mocker, value):
+        self._config(mocker, value)
+        assert config_utils.get_llm_response_cache_settings() is None
+
+
+class TestGetWebFetchCacheSettings:
+    """Tests for get_web_fetch_cache_settings."""
+
+    @staticmethod
+    def _config(mocker, value):
+        mocker.patch('Middleware.utilities.config_utils.get_config_value', return_value=value)
+
+    @pytest.mark.parametrize("value", [None, True, {}])
+    def test_defaults(self, mocker, value):
+        self._config(mocker, value)
+        assert config_utils.get_web_fetch_cache_settings() == (64 * 1024 * 1024, None)
+
+    def test_false_disables_the_cache(self, mocker):
+        self._config(mocker, False)
+        assert config_utils.get_web_fetch_cache_settings() is None
+
+    def test_custom_limit_and_persistence(self, mocker):
+        self._config(mocker, {"maxBytes": 1024, "persist": True})
+        mocker.patch('Middleware.utilities.config_utils.get_custom_dblite_filepath', return_value='/data/dbs')
+        assert config_utils.get_web_fetch_cache_settings() == (1024, os.path.join('/data/dbs', 'web_fetch_cache.db'))
+
+    @pytest.mark.parametrize("value", [
+        "yes",
+        {"maxBytes": 0},
+        {"maxBytes": 2.5},
+        {"maxBytes": True},
+        {"persist": "true"},
+    ])
+    def test_malformed_is_disabled(self, mocker, value):
+        self._config(mocker, value)
+        assert config_utils.get_web_fetch_cache_settings() is None
+
+
+class TestGetMemoryJobQueueSettings:
+    """Tests for get_memory_job_queue_settings."""
+
+    @pytest.fixture(autouse=True)
+    def db_dir(self, mocker):
+        mocker.patch('Middleware.utilities.config_utils.get_custom_dblite_filepath', return_value='/data/dbs')
+
+    @staticmethod
+    def _config(mocker, value):
+        mocker.patch('Middleware.utilities.config_utils.get_config_value', return_value=value)
+
+    @pytest.mark.parametrize("value", [None, {}])
+    def test_defaults(self, mocker, value):
+        self._config(mocker, value)
+        assert config_utils.get_memory_job_queue_settings() == (1, 300, os.path.join('/data/dbs', 'memory_jobs.db'))
+
+    def test_custom_settings(self, mocker):
+        self._config(mocker, {"workers": 3, "maxDeferSeconds": 0})
+        assert config_utils.get_memory_job_queue_settings()[:2] == (3, 0)
+
+    @pytest.mark.parametrize("value", [
+        "yes",
+        {"workers": 0},
+        {"workers": True},
+        {"workers": 1.5},
+        {"maxDeferSeconds": -1},
+        {"maxDeferSeconds": "60"},
+    ])
+    def test_malformed_uses_defaults(self, mocker, value):
+        self._config(mocker, value)
+        assert config_utils.get_memory_job_queue_settings()[:2] == (1, 300)
+
+
+class TestGetStreamCoalescingSettings:
+    """Tests for get_stream_coalescing_settings, the user-level stream write batching config."""
+
+    @pytest.mark.parametrize("value", [None, False])
+    def test_disabled_when_unset_or_false(self, mocker, value):
+        mocker.patch('Middleware.utilities.config_utils.get_config_value', return_value=value)
+        assert config_utils.get_stream_coalescing_settings() is None
+
+    def test_true_uses_defaults(self, mocker):
+        mocker.patch('Middleware.utilities.config_utils.get_config_value', return_value=True)
+        assert config_utils.get_stream_coalescing_settings() == (16384, 0.016)
+
+    def test_object_overrides_defaults(self, mocker):
+        mocker.patch('Middleware.utilities.config_utils.get_config_value',
+                     return_value={"maxBytes": 4096, "maxDelayMs": 0})
+        assert config_utils.get_stream_coalescing_settings() == (4096, 0.0)
+
+    @pytest.mark.parametrize("bad_value", [
+        "yes", 16, {"maxBytes": 0}, {"maxBytes": "16k"}, {"maxBytes": True},
+        {"maxDelayMs": -1}, {"maxDelayMs": "16"},
+    ])
+    def test_malformed_is_disabled(self, mocker, bad_value):
+        mocker.patch('Middleware.utilities.config_utils.get_config_value', return_value=bad_value)
+        assert config_utils.get_stream_coalescing_settings() is None
+
+
 class TestWorkflowExistsInSharedFolderTraversal:
     """The shared-workflow folder name comes from the request model field and
     selects which workflow (including PythonModule/CurlCommand nodes) runs, so a
@@ -1603,7 +1761,7 @@ class TestConfigPathBuilders:
                      return_value='main_routing')
         mocker.patch('Middleware.utilities.config_utils.get_root_config_directory',
                      return_value='/cfg')
-        mock_load = mocker.patch('Middleware.utilities.config_utils.load_config',
+        mock_load = mocker.patch('Middleware.utilities.config_utils.load_config_view',
                                  return_value={"cats": []})
 
         result = config_utils.get_categories_config()
@@ -1614,7 +1772,7 @@ class TestConfigPathBuilders:
     def test_get_api_type_config_loads_from_apitypes(self, mocker):
         mocker.patch('Middleware.utilities.config_utils.get_root_config_directory',
                      return_value='/cfg')
-        mock_load = mocker.patch('Middleware.utilities.config_utils.load_config',
+        mock_load = mocker.patch('Middleware.utilities.config_utils.load_config_view',
                                  return_value={"type": "openai"})
 
         result = config_utils.get_api_type_config('OpenAI')
@@ -1627,7 +1785,7 @@ class TestConfigPathBuilders:
                      return_value='sub')
         mocker.patch('Middleware.utilities.config_utils.get_root_config_directory',
                      return_value='/cfg')
-        mock_load = mocker.patch('Middleware.utilities.config_utils.load_config',
+        mock_load = mocker.patch('Middleware.utilities.config_utils.load_config_view',
                                  return_value={"endpoint": "http://x"})
 
         result = config_utils.get_endpoint_config('my_endpoint')
@@ -0,0 +1,91 @@
+# Tests/utilities/test_embedding_cache.py
+
+import pytest
+
+from Middleware.utilities import embedding_cache as cache_module
+from Middleware.utilities.embedding_cache import EmbeddingCache, embedding_cache, text_digest
+
+
+@pytest.fixture
+def disk_tier(tmp_path, mocker):
+    """Enables the on-disk tier in a temp directory."""
+    mocker.patch.object(cache_module.config_utils, "get_config_value",
+                        side_effect=lambda key: True if key == "embeddingCacheOnDisk" else None)
+    mocker.patch.object(cache_module.config_utils, "get_custom_dblite_filepath", return_value=str(tmp_path))
+    mocker.patch.object(cache_module.config_utils, "get_current_username", return_value="tester")
+    return tmp_path / "EmbeddingCache.tester.sqlite"
+
+
+@pytest.fixture
+def no_disk_tier(mocker):
+    mocker.patch.object(cache_module.config_utils, "get_config_value", return_value=None)
+
+
+class TestEmbeddingCache:
+    """Tests for the content-addressed embedding cache."""
+
+    def test_singleton_pattern(self):
+        assert EmbeddingCache() is embedding_cache
+
+    def test_text_digest_is_sha256(self):
+        assert text_digest("abc") == "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad"
+
+    def test_round_trip_preserves_exact_values(self, no_disk_tier):
+        vector = [0.1, -2.5e-7, 3.141592653589793]
+        embedding_cache.put_many("m", ["hello"], [vector])
+
+        assert embedding_cache.get_many("m", ["hello", "other"]) == [vector, None]
+        stats = embedding_cache.get_stats()
+        assert stats["memory_hits"] == 1 and stats["misses"] == 1
+
+    def test_entries_are_scoped_by_model(self, no_disk_tier):
+        embedding_cache.put_many("model-a", ["hello"], [[1.0]])
+
+        assert embedding_cache.get_many("model-b", ["hello"]) == [None]
+
+    def test_returned_vectors_are_copies(self, no_disk_tier):
+        embedding_cache.put_many("m", ["hello"], [[1.0, 2.0]])
+
+        embedding_cache.get_many("m", ["hello"])[0].append(3.0)
+
+        assert embedding_cache.get_many("m", ["hello"]) == [[1.0, 2.0]]
+
+    def test_lru_bound_evicts_oldest(self, no_disk_tier, monkeypatch):
+        monkeypatch.setattr(cache_module, "MAX_CACHED_EMBEDDINGS", 2)
+        embedding_cache.put_many("m", ["a", "b"], [[1.0], [2.0]])
+        embedding_cache.get_many("m", ["a"])
+        embedding_cache.put_many("m", ["c"], [[3.0]])
+
+        assert embedding_cache.get_many("m", ["a", "b", "c"]) == [[1.0], None, [3.0]]
+
+    def test_disk_tier_survives_memory_clear(self, disk_tier):
+        embedding_cache.put_many("m", ["hello"], [[0.5, 0.25]])
+        embedding_cache.clear()
+
+        assert embedding_cache.get_many("m", ["hello"]) == [[0.5, 0.25]]
+        assert embedding_cache.get_stats()["disk_hits"] == 1
+        assert disk_tier.exists()
+        # Promoted back into memory.
+        assert embedding_cache.get_stats()["entries"] == 1
+
+    def test_disk_tier_is_skipped_for_encrypted_requests(self, disk_tier, mocker):
+        mocker.patch.object(cache_module, "is_encryption_active", return_value=True)
+
+        embedding_cache.put_many("m", ["secret"], [[1.0]])
+
+        assert not disk_tier.exists()
+
+    def test_disk_tier_is_pruned_to_bound(self, disk_tier, monkeypatch):
+        monkeypatch.setattr(cache_module, "MAX_DISK_CACHED_EMBEDDINGS", 2)
+        embedding_cache.put_many("m", ["a", "b", "c"], [[1.0], [2.0], [3.0]])
+        embedding_cache.clear()
+
+        assert embedding_cache.get_many("m", ["a", "b", "c"]) == [None, [2.0], [3.0]]
+
+    def test_disk_errors_are_counted_not_raised(self, disk_tier, mocker):
+        mocker.patch.object(cache_module.sqlite3, "connect", side_effect=cache_module.sqlite3.OperationalError("locked"))
+
+        embedding_cache.put_many("m", ["a"], [[1.0]])
+
+        assert embedding_cache.get_many("m", ["a"]) == [[1.0]]
+        assert embedding_cache.get_stats()["disk_errors"] == 1
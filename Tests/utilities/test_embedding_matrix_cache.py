@@ -0,0 +1,122 @@
+# Tests/utilities/test_embedding_matrix_cache.py
+
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from Middleware.utilities import embedding_matrix_cache as cache_module
+from Middleware.utilities.embedding_matrix_cache import EmbeddingMatrix, EmbeddingMatrixCache, embedding_matrix_cache
+from Middleware.utilities.vector_math_utils import rank_by_cosine, vector_to_blob
+
+KEY = ("disc", None, "emb-model")
+
+
+def _pairs(vectors, start_id=1):
+    return [(start_id + i, vector_to_blob(v)) for i, v in enumerate(vectors)]
+
+
+class TestEmbeddingMatrix:
+    """Tests for the pre-normalized matrix and its top-k search."""
+
+    def test_top_k_matches_stdlib_ranking(self):
+        rng = random.Random(7)
+        vectors = [[rng.uniform(-1, 1) for _ in range(16)] for _ in range(200)]
+        query = [rng.uniform(-1, 1) for _ in range(16)]
+        matrix = EmbeddingMatrix(16, signature=None)
+        matrix.upsert(_pairs(vectors))
+
+        expected = rank_by_cosine(query, _pairs(vectors), 10)
+        actual = matrix.top_k(query, 10)
+
+        assert [memory_id for memory_id, _ in actual] == [memory_id for memory_id, _ in expected]
+        for (_, a), (_, b) in zip(actual, expected):
+            assert a == pytest.approx(b, abs=1e-5)
+
+    def test_top_n_larger_than_matrix_returns_all(self):
+        matrix = EmbeddingMatrix(2, signature=None)
+        matrix.upsert(_pairs([[0.0, 1.0], [1.0, 0.0]]))
+
+        assert [memory_id for memory_id, _ in matrix.top_k([1.0, 0.0], 50)] == [2, 1]
+
+    def test_upsert_replaces_existing_rows_and_appends_new_ones(self):
+        matrix = EmbeddingMatrix(2, signature=None)
+        matrix.upsert(_pairs([[1.0, 0.0], [0.0, 1.0]]))
+
+        matrix.upsert([(1, vector_to_blob([0.0, 1.0])), (3, vector_to_blob([1.0, 0.0]))])
+
+        assert len(matrix) == 3
+        assert matrix.top_k([1.0, 0.0], 1)[0][0] == 3
+
+    def test_upsert_skips_wrong_dimension(self):
+        matrix = EmbeddingMatrix(2, signature=None)
+
+        skipped = matrix.upsert([(1, vector_to_blob([1.0, 0.0])), (2, vector_to_blob([1.0, 0.0, 0.0]))])
+
+        assert skipped == 1
+        assert len(matrix) == 1
+
+    def test_zero_vectors_score_zero(self):
+        matrix = EmbeddingMatrix(2, signature=None)
+        matrix.upsert(_pairs([[0.0, 0.0], [1.0, 0.0]]))
+
+        assert matrix.top_k([1.0, 0.0], 2) == [(2, pytest.approx(1.0)), (1, 0.0)]
+
+
+class TestEmbeddingMatrixCache:
+    """Tests for the signature-checked LRU cache."""
+
+    def test_singleton_pattern(self):
+        assert EmbeddingMatrixCache() is embedding_matrix_cache
+
+    def test_load_then_search_hits_with_same_signature(self):
+        embedding_matrix_cache.load(KEY, (2, 2, 3), _pairs([[1.0, 0.0], [0.0, 1.0]]), [1.0, 0.0], 5)
+
+        ranked = embedding_matrix_cache.search(KEY, (2, 2, 3), [0.0, 1.0], 5)
+
+        assert [memory_id for memory_id, _ in ranked] == [2, 1]
+        stats = embedding_matrix_cache.get_stats()
+        assert stats["hits"] == 1 and stats["loads"] == 1 and stats["entries"] == 1
+
+    def test_changed_signature_is_a_miss(self):
+        embedding_matrix_cache.load(KEY, (1, 1, 1), _pairs([[1.0, 0.0]]), [1.0, 0.0], 5)
+
+        assert embedding_matrix_cache.search(KEY, (2, 3, 4), [1.0, 0.0], 5) is None
+        assert embedding_matrix_cache.search(KEY, None, [1.0, 0.0], 5) is None
+
+    def test_unknown_signature_is_searched_but_not_cached(self):
+        ranked = embedding_matrix_cache.load(KEY, None, _pairs([[1.0, 0.0]]), [1.0, 0.0], 5)
+
+        assert ranked == [(1, pytest.approx(1.0))]
+        assert not embedding_matrix_cache.contains(KEY)
+
+    def test_apply_write_appends_when_signature_matches(self):
+        embedding_matrix_cache.load(KEY, "before", _pairs([[1.0, 0.0]]), [1.0, 0.0], 5)
+
+        embedding_matrix_cache.apply_write(KEY, "before", "after", [(2, vector_to_blob([0.0, 1.0]))])
+
+        ranked = embedding_matrix_cache.search(KEY, "after", [0.0, 1.0], 5)
+        assert [memory_id for memory_id, _ in ranked] == [2, 1]
+        assert embedding_matrix_cache.get_stats()["appends"] == 1
+
+    def test_apply_write_drops_entry_when_signature_diverged(self):
+        embedding_matrix_cache.load(KEY, "old", _pairs([[1.0, 0.0]]), [1.0, 0.0], 5)
+
+        embedding_matrix_cache.apply_write(KEY, "someone-else-wrote", "after", [(2, vector_to_blob([0.0, 1.0]))])
+
+        assert not embedding_matrix_cache.contains(KEY)
+
+    def test_query_dimension_mismatch_returns_empty(self):
+        embedding_matrix_cache.load(KEY, "sig", _pairs([[1.0, 0.0]]), [1.0, 0.0], 5)
+
+        assert embedding_matrix_cache.search(KEY, "sig", [1.0, 0.0, 0.0], 5) == []
+
+    def test_byte_budget_evicts_least_recently_used(self, monkeypatch):
+        monkeypatch.setattr(cache_module, "MAX_CACHED_MATRIX_BYTES", 10)
+        embedding_matrix_cache.load(("a", None, "m"), "s", _pairs([[1.0, 0.0]]), [1.0, 0.0], 1)
+        embedding_matrix_cache.load(("b", None, "m"), "s", _pairs([[1.0, 0.0]]), [1.0, 0.0], 1)
+
+        assert not embedding_matrix_cache.contains(("a", None, "m"))
+        assert embedding_matrix_cache.contains(("b", None, "m"))
+        assert embedding_matrix_cache.get_stats()["evictions"] == 1
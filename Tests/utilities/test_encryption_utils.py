@@ -2,8 +2,11 @@
 import pytest
 from cryptography.fernet import InvalidToken
 
+from Middleware.utilities import encryption_utils
 from Middleware.utilities.encryption_utils import (
+    FernetKeyCache,
     derive_fernet_key,
+    fernet_key_cache,
     hash_api_key,
     encrypt_bytes,
     decrypt_bytes,
@@ -213,3 +216,64 @@ class TestConvenienceHelpers:
         result = get_api_key_hash_if_available("my-key")
         assert isinstance(result, str)
         assert len(result) == 16
+
+    def test_encryption_key_is_derived_once_per_session(self, mocker):
+        mocker.patch('Middleware.utilities.config_utils.get_encrypt_using_api_key', return_value=True)
+        mocker.patch('Middleware.utilities.config_utils.get_current_username', return_value='alice')
+        derive = mocker.spy(encryption_utils, 'derive_fernet_key')
+        keys = {get_encryption_key_if_available("my-key") for _ in range(5)}
+        assert keys == {derive_fernet_key("my-key", username="alice")}
+        assert derive.call_count == 1
+        assert fernet_key_cache.get_stats()["derivations_saved"] == 4
+
+
+class TestFernetKeyCache:
+    """Tests for the FernetKeyCache singleton."""
+
+    def test_singleton_pattern(self):
+        assert FernetKeyCache() is FernetKeyCache()
+        assert fernet_key_cache is FernetKeyCache()
+
+    def test_cached_key_matches_derivation(self):
+        assert fernet_key_cache.get_key("k", "alice") == derive_fernet_key("k", username="alice")
+        assert fernet_key_cache.get_key("k") == derive_fernet_key("k")
+        assert fernet_key_cache.get_stats() == {
+            "derivations": 2, "derivations_saved": 0, "expirations": 0, "entries": 2}
+
+    def test_key_and_username_are_both_part_of_the_cache_key(self):
+        keys = {
+            fernet_key_cache.get_key("k1", "alice"),
+            fernet_key_cache.get_key("k2", "alice"),
+            fernet_key_cache.get_key("k1", "bob"),
+            fernet_key_cache.get_key("k1", None),
+            fernet_key_cache.get_key("k1", "None"),
+        }
+        assert len(keys) == 5
+        assert fernet_key_cache.get_stats()["derivations"] == 5
+
+    def test_raw_api_key_is_not_stored(self):
+        fernet_key_cache.get_key("super-secret-key", "alice")
+        assert all("super-secret-key" not in digest for digest in fernet_key_cache._keys)
+
+    def test_idle_keys_expire(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(encryption_utils.time, "monotonic", lambda: clock[0])
+        fernet_key_cache.get_key("k", "alice")
+        clock[0] += encryption_utils.FERNET_KEY_IDLE_TTL_SECONDS - 1
+        fernet_key_cache.get_key("k", "alice")  # use refreshes the idle clock
+        clock[0] += encryption_utils.FERNET_KEY_IDLE_TTL_SECONDS - 1
+        fernet_key_cache.get_key("k", "alice")
+        assert fernet_key_cache.get_stats()["derivations"] == 1
+        clock[0] += encryption_utils.FERNET_KEY_IDLE_TTL_SECONDS + 1
+        fernet_key_cache.get_key("k", "alice")
+        stats = fernet_key_cache.get_stats()
+        assert stats["derivations"] == 2
+        assert stats["expirations"] == 1
+
+    def test_cache_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(encryption_utils, "MAX_CACHED_FERNET_KEYS", 2)
+        for api_key in ("a", "b", "c"):
+            fernet_key_cache.get_key(api_key, "alice")
+        assert fernet_key_cache.get_stats()["entries"] == 2
+        fernet_key_cache.get_key("a", "alice")
+        assert fernet_key_cache.get_stats()["derivations"] == 4
@@ -1,13 +1,18 @@
 import json
+import shutil
+import threading
+import zlib
 from pathlib import Path
 from unittest.mock import MagicMock, mock_open
 
 import pytest
 
+from Middleware.utilities import file_utils
 from Middleware.utilities.file_utils import (
     _resolve_case_insensitive_path,
     _read_json_file,
     _write_json_file,
+    compact_record_log,
     ensure_json_file_exists,
     load_custom_file,
     load_timestamp_file,
@@ -18,6 +23,7 @@ from Middleware.utilities.file_utils import (
     save_custom_file,
     save_timestamp_file,
     update_chunks_with_hashes,
+    update_timestamp_file,
     write_chunks_with_hashes,
     write_condensation_tracker,
     write_plain_text_file,
@@ -107,6 +113,7 @@ class TestEnsureJsonFileExists:
         Verifies that an existing file's content is loaded and returned.
         """
         mock_path = MagicMock(spec=Path)
+        mock_path.with_name.return_value.exists.return_value = False  # no record log
         mock_path.exists.return_value = True
         mocker.patch('Middleware.utilities.file_utils._resolve_case_insensitive_path', return_value=mock_path)
 
@@ -125,6 +132,7 @@ class TestEnsureJsonFileExists:
         raises a TypeError with a clear message instead of returning bad data.
         """
         mock_path = MagicMock(spec=Path)
+        mock_path.with_name.return_value.exists.return_value = False  # no record log
         mock_path.exists.return_value = True
         mocker.patch('Middleware.utilities.file_utils._resolve_case_insensitive_path', return_value=mock_path)
         mocker.patch.object(mock_path, 'open', mock_open(read_data=json.dumps({"not": "a list"})))
@@ -137,7 +145,7 @@ class TestEnsureJsonFileExists:
         Verifies that a new file is created with an empty list if it doesn't exist.
         """
         mocker.patch('Middleware.utilities.file_utils._resolve_case_insensitive_path', return_value=None)
-        mock_write_json = mocker.patch('Middleware.utilities.file_utils._write_json_file')
+        mock_write_json = mocker.patch('Middleware.utilities.file_utils._replace_json_file')
 
         mock_path_instance = MagicMock(spec=Path)
         mocker.patch('Middleware.utilities.file_utils.Path', return_value=mock_path_instance)
@@ -154,7 +162,7 @@ class TestEnsureJsonFileExists:
         Verifies that a new file is created with provided initial data.
         """
         mocker.patch('Middleware.utilities.file_utils._resolve_case_insensitive_path', return_value=None)
-        mock_write_json = mocker.patch('Middleware.utilities.file_utils._write_json_file')
+        mock_write_json = mocker.patch('Middleware.utilities.file_utils._replace_json_file')
 
         mock_path_instance = MagicMock(spec=Path)
         mocker.patch('Middleware.utilities.file_utils.Path', return_value=mock_path_instance)
@@ -205,6 +213,87 @@ class TestSaveCustomFile:
 
         assert Path(filepath).read_text(encoding='utf-8') == "hello"
 
+    def test_save_custom_file_append_writes_in_place(self, tmp_path):
+        """Append mode should extend the existing file rather than replace it, leaving no journal behind."""
+        filepath = tmp_path / "log.txt"
+        save_custom_file(str(filepath), "first\n")
+        inode = filepath.stat().st_ino
+
+        save_custom_file(str(filepath), "second\n", mode="append")
+
+        assert filepath.stat().st_ino == inode
+        assert filepath.read_text(encoding='utf-8') == "first\nsecond\n"
+        assert not (tmp_path / "log.txt.append-journal").exists()
+
+    def test_interrupted_append_is_rolled_back_by_next_append(self, tmp_path):
+        """A journal left by a crash mid-append truncates the torn bytes before the next append."""
+        filepath = tmp_path / "log.txt"
+        filepath.write_bytes(b"first\nsec")
+        (tmp_path / "log.txt.append-journal").write_text("6 13\n")
+
+        save_custom_file(str(filepath), "third\n", mode="append")
+
+        assert filepath.read_text(encoding='utf-8') == "first\nthird\n"
+        assert not (tmp_path / "log.txt.append-journal").exists()
+
+    def test_interrupted_append_is_rolled_back_on_load(self, tmp_path):
+        filepath = tmp_path / "log.txt"
+        filepath.write_bytes(b"first\nsec")
+        (tmp_path / "log.txt.append-journal").write_text("6 13\n")
+
+        assert load_custom_file(str(filepath)) == "first\n"
+        assert not (tmp_path / "log.txt.append-journal").exists()
+
+    @pytest.mark.parametrize("content", [b"first\n", b"first\nsecond\n", b"edited by hand since the crash\n"],
+                             ids=["nothing-written", "append-complete", "file-changed"])
+    def test_stale_append_journal_leaves_file_untouched(self, tmp_path, content):
+        """Only a file whose size lies between the journaled sizes is truncated."""
+        filepath = tmp_path / "log.txt"
+        filepath.write_bytes(content)
+        (tmp_path / "log.txt.append-journal").write_text("6 13\n")
+
+        save_custom_file(str(filepath), "x", mode="append")
+
+        assert filepath.read_bytes() == content + b"x"
+        assert not (tmp_path / "log.txt.append-journal").exists()
+
+    def test_overwrite_discards_append_journal(self, tmp_path):
+        filepath = tmp_path / "log.txt"
+        filepath.write_bytes(b"first\nsec")
+        (tmp_path / "log.txt.append-journal").write_text("6 13\n")
+
+        save_custom_file(str(filepath), "fresh")
+
+        assert filepath.read_text(encoding='utf-8') == "fresh"
+        assert not (tmp_path / "log.txt.append-journal").exists()
+
+    def test_group_commit_batches_queued_appends(self, tmp_path, mocker):
+        """Appends queued while the file is busy are written together with a single journaled write."""
+        filepath = tmp_path / "log.txt"
+        spy = mocker.spy(file_utils, "_journaled_append")
+        file_lock = file_utils._get_custom_file_lock(filepath)
+        queue_key = str(filepath.absolute())
+
+        with file_lock:
+            threads = [threading.Thread(target=save_custom_file, args=(str(filepath), f"line {i}\n"),
+                                        kwargs={"mode": "append", "group_commit": True}) for i in range(4)]
+            for i, thread in enumerate(threads):
+                thread.start()
+                while len(file_utils._group_commit_queues.get(queue_key, [])) <= i:
+                    pass
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert spy.call_count == 1
+        assert filepath.read_text(encoding='utf-8') == "line 0\nline 1\nline 2\nline 3\n"
+        assert queue_key not in file_utils._group_commit_queues
+
+    def test_group_commit_failure_is_raised(self, tmp_path, mocker):
+        mocker.patch.object(file_utils, "_journaled_append", side_effect=OSError("disk full"))
+
+        with pytest.raises(IOError, match="Could not write to file"):
+            save_custom_file(str(tmp_path / "log.txt"), "line\n", mode="append", group_commit=True)
+
     def test_save_custom_file_io_error(self, mocker):
         """
         Verifies that an IOError is raised if the temp file cannot be written.
@@ -388,36 +477,34 @@ class TestChunkAndHashFunctions:
 
         assert result == [('block1', 'hash1'), ('block2', 'hash2')]
 
-    def test_write_chunks_with_hashes_append(self, mocker):
-        mocker.patch('Middleware.utilities.file_utils.ensure_json_file_exists',
-                     return_value=[{'text_block': 'old', 'hash': 'old_hash'}])
-        mock_write = mocker.patch('Middleware.utilities.file_utils._write_json_file')
-        mocker.patch('Middleware.utilities.file_utils._resolve_case_insensitive_path')
+    def test_write_chunks_with_hashes_append(self, tmp_path):
+        filepath = tmp_path / "memories.json"
+        filepath.write_text(json.dumps([{'text_block': 'old', 'hash': 'old_hash'}]))
 
-        new_chunks = [('new', 'new_hash')]
+        write_chunks_with_hashes([('new', 'new_hash')], str(filepath), overwrite=False)
 
-        write_chunks_with_hashes(new_chunks, '/fake/path.json', overwrite=False)
+        # The JSON file is untouched; the new chunk sits in its record log until compaction.
+        assert json.loads(filepath.read_text()) == [{'text_block': 'old', 'hash': 'old_hash'}]
+        assert (tmp_path / "memories.json.records").exists()
+        assert read_chunks_with_hashes(str(filepath)) == [('old', 'old_hash'), ('new', 'new_hash')]
 
-        expected_data = [
-            {'text_block': 'old', 'hash': 'old_hash'},
-            {'text_block': 'new', 'hash': 'new_hash'},
-        ]
-        mock_write.assert_called_once()
-        assert mock_write.call_args[0][1] == expected_data
+    def test_write_chunks_with_hashes_append_creates_missing_file(self, tmp_path):
+        filepath = tmp_path / "memories.json"
 
-    def test_write_chunks_with_hashes_overwrite(self, mocker):
-        mocker.patch('Middleware.utilities.file_utils.ensure_json_file_exists',
-                     return_value=[{'text_block': 'old', 'hash': 'old_hash'}])
-        mock_write = mocker.patch('Middleware.utilities.file_utils._write_json_file')
-        mocker.patch('Middleware.utilities.file_utils._resolve_case_insensitive_path')
+        write_chunks_with_hashes([('new', 'new_hash')], str(filepath), overwrite=False)
 
-        new_chunks = [('new', 'new_hash')]
+        assert json.loads(filepath.read_text()) == [{'text_block': 'new', 'hash': 'new_hash'}]
+        assert not (tmp_path / "memories.json.records").exists()
 
-        write_chunks_with_hashes(new_chunks, '/fake/path.json', overwrite=True)
+    def test_write_chunks_with_hashes_overwrite(self, tmp_path):
+        filepath = tmp_path / "memories.json"
+        filepath.write_text(json.dumps([{'text_block': 'old', 'hash': 'old_hash'}]))
+        write_chunks_with_hashes([('pending', 'pending_hash')], str(filepath), overwrite=False)
 
-        expected_data = [{'text_block': 'new', 'hash': 'new_hash'}]
-        mock_write.assert_called_once()
-        assert mock_write.call_args[0][1] == expected_data
+        write_chunks_with_hashes([('new', 'new_hash')], str(filepath), overwrite=True)
+
+        assert json.loads(filepath.read_text()) == [{'text_block': 'new', 'hash': 'new_hash'}]
+        assert not (tmp_path / "memories.json.records").exists()
 
     def test_update_chunks_dispatches_to_write_chunks(self, mocker):
         mock_write = mocker.patch('Middleware.utilities.file_utils.write_chunks_with_hashes')
@@ -434,6 +521,7 @@ class TestTimestampAndCustomFileFunctions:
 
     def test_load_timestamp_file_exists(self, mocker):
         mock_path = MagicMock(spec=Path)
+        mock_path.with_name.return_value.exists.return_value = False  # no record log
         mock_path.exists.return_value = True
         mocker.patch('Middleware.utilities.file_utils._resolve_case_insensitive_path', return_value=mock_path)
         # Real json.load parses the file content, so the parsing path is exercised.
@@ -452,6 +540,7 @@ class TestTimestampAndCustomFileFunctions:
 
     def test_save_timestamp_file(self, mocker):
         mock_path = MagicMock(spec=Path)
+        mock_path.with_name.return_value.exists.return_value = False  # no record log
         mocker.patch('Middleware.utilities.file_utils._resolve_case_insensitive_path', return_value=mock_path)
         mock_write = mocker.patch('Middleware.utilities.file_utils._write_json_file')
 
@@ -854,3 +943,189 @@ class TestPlainTextFileIO:
         file_path.write_text("plain old text")
 
         assert read_plain_text_file(str(file_path), encryption_key=key) == "plain old text"
+
+
+# ###############################################################
+# Section: Tests for the append-only record log
+# ###############################################################
+
+class TestRecordLog:
+    """Tests for the record log that memory and timestamp appends go through."""
+
+    @staticmethod
+    def _log(file_path: Path) -> Path:
+        return file_path.with_name(file_path.name + ".records")
+
+    def test_update_timestamp_file_sets_and_removes(self, tmp_path):
+        filepath = tmp_path / "timestamps.json"
+        save_timestamp_file(str(filepath), {"a": "(T1)", "placeholder": "(T2)"})
+
+        update_timestamp_file(str(filepath), {"b": "(T2)"}, removed=["placeholder"])
+        update_timestamp_file(str(filepath), {"a": "(T3)"})
+
+        assert json.loads(filepath.read_text()) == {"a": "(T1)", "placeholder": "(T2)"}
+        assert load_timestamp_file(str(filepath)) == {"a": "(T3)", "b": "(T2)"}
+
+    def test_update_timestamp_file_creates_missing_file(self, tmp_path):
+        filepath = tmp_path / "sub" / "timestamps.json"
+
+        update_timestamp_file(str(filepath), {"a": "(T1)"})
+
+        assert json.loads(filepath.read_text()) == {"a": "(T1)"}
+        assert not self._log(filepath).exists()
+
+    def test_update_timestamp_file_without_changes_writes_nothing(self, tmp_path):
+        filepath = tmp_path / "timestamps.json"
+
+        update_timestamp_file(str(filepath), {}, removed=[])
+
+        assert not filepath.exists()
+
+    def test_save_timestamp_file_drops_pending_records(self, tmp_path):
+        filepath = tmp_path / "timestamps.json"
+        save_timestamp_file(str(filepath), {"a": "(T1)"})
+        update_timestamp_file(str(filepath), {"b": "(T2)"})
+
+        save_timestamp_file(str(filepath), {"c": "(T3)"})
+
+        assert not self._log(filepath).exists()
+        assert load_timestamp_file(str(filepath)) == {"c": "(T3)"}
+
+    def test_plaintext_records_are_checksummed_lines(self, tmp_path):
+        filepath = tmp_path / "memories.json"
+        write_chunks_with_hashes([("one", "h1")], str(filepath))
+
+        write_chunks_with_hashes([("two", "h2")], str(filepath))
+
+        lines = self._log(filepath).read_bytes().splitlines()
+        assert lines[0].startswith(b"WILMER-RECORDS 2 ")
+        checksum, payload = lines[1].split(b" ", 1)
+        assert int(checksum, 16) == zlib.crc32(payload)
+        assert json.loads(payload) == {"append": [{"text_block": "two", "hash": "h2"}]}
+
+    def test_encrypted_records_round_trip(self, tmp_path):
+        from cryptography.fernet import Fernet
+        key = Fernet.generate_key()
+        filepath = tmp_path / "memories.json"
+        write_chunks_with_hashes([("one", "h1")], str(filepath), encryption_key=key)
+
+        write_chunks_with_hashes([("secret two", "h2")], str(filepath), encryption_key=key)
+
+        assert b"secret two" not in self._log(filepath).read_bytes()
+        assert read_chunks_with_hashes(str(filepath), encryption_key=key) == [("one", "h1"), ("secret two", "h2")]
+
+    def test_torn_last_record_is_ignored_and_terminated(self, tmp_path):
+        filepath = tmp_path / "memories.json"
+        write_chunks_with_hashes([("one", "h1")], str(filepath))
+        write_chunks_with_hashes([("two", "h2")], str(filepath))
+        with open(self._log(filepath), "ab") as f:
+            f.write(b"0badf00d {\"append\": [{\"text_bl")
+
+        assert read_chunks_with_hashes(str(filepath)) == [("one", "h1"), ("two", "h2")]
+
+        write_chunks_with_hashes([("three", "h3")], str(filepath))
+
+        assert read_chunks_with_hashes(str(filepath)) == [("one", "h1"), ("two", "h2"), ("three", "h3")]
+
+    def test_corrupt_record_is_skipped(self, tmp_path):
+        filepath = tmp_path / "memories.json"
+        write_chunks_with_hashes([("one", "h1")], str(filepath))
+        write_chunks_with_hashes([("two", "h2")], str(filepath))
+        log = self._log(filepath)
+        log.write_bytes(log.read_bytes().replace(b'"two"', b'"tw0"'))
+
+        assert read_chunks_with_hashes(str(filepath)) == [("one", "h1")]
+
+    def test_log_for_an_earlier_file_version_is_ignored(self, tmp_path):
+        filepath = tmp_path / "memories.json"
+        write_chunks_with_hashes([("one", "h1")], str(filepath))
+        write_chunks_with_hashes([("two", "h2")], str(filepath))
+
+        # A hand edit replaces the JSON file; the records written against the old version must not replay.
+        filepath.write_text(json.dumps([{"text_block": "edited", "hash": "h9"}]))
+
+        assert read_chunks_with_hashes(str(filepath)) == [("edited", "h9")]
+        assert self._log(filepath).exists()
+
+        write_chunks_with_hashes([("three", "h3")], str(filepath))
+
+        assert read_chunks_with_hashes(str(filepath)) == [("edited", "h9"), ("three", "h3")]
+        # The unmatched log is kept aside for recovery, not truncated.
+        stale = list(tmp_path.glob("memories.json.records.stale-*"))
+        assert len(stale) == 1
+        assert b'"two"' in stale[0].read_bytes()
+
+    def test_copied_folder_keeps_its_pending_records(self, tmp_path):
+        source = tmp_path / "discussion"
+        source.mkdir()
+        write_chunks_with_hashes([("one", "h1")], str(source / "memories.json"))
+        write_chunks_with_hashes([("two", "h2")], str(source / "memories.json"))
+
+        backup = tmp_path / "discussion_backup"
+        shutil.copytree(source, backup)
+        copied = backup / "memories.json"
+
+        assert read_chunks_with_hashes(str(copied)) == [("one", "h1"), ("two", "h2")]
+        write_chunks_with_hashes([("three", "h3")], str(copied))
+        assert read_chunks_with_hashes(str(copied)) == [("one", "h1"), ("two", "h2"), ("three", "h3")]
+        assert not list(backup.glob("*.stale-*"))
+
+    def test_deleted_memories_do_not_come_back_when_the_file_is_recreated(self, tmp_path):
+        filepath = tmp_path / "memories.json"
+        assert ensure_json_file_exists(str(filepath)) == []
+        write_chunks_with_hashes([("deleted", "h1")], str(filepath))
+        assert self._log(filepath).exists()
+
+        filepath.unlink()
+
+        # The recreated "[]" fingerprints the same as the deleted one, so the old log must go.
+        assert ensure_json_file_exists(str(filepath)) == []
+        assert ensure_json_file_exists(str(filepath)) == []
+        assert not self._log(filepath).exists()
+        write_chunks_with_hashes([("new", "h2")], str(filepath))
+        assert read_chunks_with_hashes(str(filepath)) == [("new", "h2")]
+
+    def test_rewrite_over_an_unmatched_log_sets_it_aside(self, tmp_path):
+        filepath = tmp_path / "timestamps.json"
+        save_timestamp_file(str(filepath), {"a": "(T1)"})
+        update_timestamp_file(str(filepath), {"b": "(T2)"})
+        filepath.write_text(json.dumps({"edited": "(T9)"}))
+
+        assert compact_record_log(str(filepath)) is True
+
+        assert json.loads(filepath.read_text()) == {"edited": "(T9)"}
+        assert not self._log(filepath).exists()
+        assert len(list(tmp_path.glob("timestamps.json.records.stale-*"))) == 1
+
+    def test_log_is_compacted_once_it_outgrows_the_file(self, tmp_path, mocker):
+        mocker.patch.object(file_utils, "RECORD_LOG_MIN_COMPACT_BYTES", 0)
+        filepath = tmp_path / "memories.json"
+        write_chunks_with_hashes([("x" * 200, "h1")], str(filepath))
+
+        write_chunks_with_hashes([("small", "h2")], str(filepath))
+        assert self._log(filepath).exists()
+
+        write_chunks_with_hashes([("y" * 200, "h3")], str(filepath))
+
+        assert not self._log(filepath).exists()
+        assert [c["hash"] for c in json.loads(filepath.read_text())] == ["h1", "h2", "h3"]
+
+    def test_compact_record_log(self, tmp_path):
+        filepath = tmp_path / "timestamps.json"
+        save_timestamp_file(str(filepath), {"a": "(T1)"})
+        assert compact_record_log(str(filepath)) is False
+
+        update_timestamp_file(str(filepath), {"b": "(T2)"})
+
+        assert compact_record_log(str(filepath)) is True
+        assert not self._log(filepath).exists()
+        assert json.loads(filepath.read_text()) == {"a": "(T1)", "b": "(T2)"}
+
+    def test_compact_record_log_removes_orphaned_log(self, tmp_path):
+        filepath = tmp_path / "timestamps.json"
+        save_timestamp_file(str(filepath), {"a": "(T1)"})
+        update_timestamp_file(str(filepath), {"b": "(T2)"})
+        filepath.unlink()
+
+        assert compact_record_log(str(filepath)) is False
+        assert not self._log(filepath).exists()
@@ -0,0 +1,146 @@
+# Tests/utilities/test_keyword_index.py
+
+import random
+
+import pytest
+
+from Middleware.utilities import keyword_index as keyword_index_module
+from Middleware.utilities.keyword_index import KeywordIndex, KeywordIndexCache, keyword_index_cache
+from Middleware.utilities.search_utils import advanced_search_in_chunks, search_in_chunks
+
+CHUNKS = [
+    ["User: the quick brown fox", "Assistant: a lazy dog sleeps"],
+    ["User: tell me about the dog", "Assistant: the dog is brown and quick"],
+    ["Dog: I am the narrator here", "User: where did the fox go?"],
+    ["Nothing relevant", "at all"],
+]
+
+KEY = ("conversation", None, "disc-1")
+
+
+def _joined(chunks):
+    return ["\n".join(chunk) for chunk in chunks]
+
+
+class TestKeywordIndexCache:
+    """Tests for the cached per-discussion keyword indexes."""
+
+    def test_singleton_pattern(self):
+        assert KeywordIndexCache() is KeywordIndexCache()
+        assert keyword_index_cache is KeywordIndexCache()
+
+    @pytest.mark.parametrize("query", ["quick fox", "dog", "brown dog quick", "Dog narrator", "missing", "the the dog"])
+    @pytest.mark.parametrize("proximity_limit", [0, 1, 5])
+    def test_search_chunks_matches_the_unindexed_search(self, query, proximity_limit):
+        expected = advanced_search_in_chunks(_joined(CHUNKS), query, 2, proximity_limit)
+
+        best = keyword_index_cache.search_chunks(KEY, CHUNKS, query, 2, proximity_limit)
+
+        assert [_joined(CHUNKS)[i] for i in best] == expected
+
+    def test_search_chunks_matches_the_unindexed_search_on_random_text(self):
+        rng = random.Random(7)
+        words = ["alpha", "beta", "gamma", "delta", "Alpha", "user:", "beta:", "x"]
+        for _ in range(200):
+            chunks = [[" ".join(rng.choice(words) for _ in range(rng.randint(0, 8)))
+                       for _ in range(rng.randint(1, 3))] for _ in range(rng.randint(1, 12))]
+            query = " ".join(rng.choice(words).rstrip(":") for _ in range(rng.randint(1, 3)))
+            expected = advanced_search_in_chunks(_joined(chunks), query, 5, 3)
+
+            best = keyword_index_cache.search_chunks(KEY, chunks, query, 5, 3)
+
+            assert [_joined(chunks)[i] for i in best] == expected
+
+    @pytest.mark.parametrize("max_hits", [0, 1])
+    def test_match_documents_matches_the_unindexed_search(self, max_hits):
+        documents = ["User: the fox", "a dog", "User: nothing", "FOX and dog"]
+        expected = search_in_chunks(documents, "fox user", max_hits)
+
+        matches = keyword_index_cache.match_documents(("memories", None, "disc-1"), documents, "fox user", max_hits)
+
+        assert [documents[i] for i in matches] == expected
+
+    def test_only_new_documents_are_tokenized(self):
+        keyword_index_cache.search_chunks(KEY, CHUNKS, "dog")
+        rechunked = [CHUNKS[0] + CHUNKS[1], CHUNKS[2] + ["User: a new dog message"]]
+
+        keyword_index_cache.search_chunks(KEY, rechunked, "fox")
+
+        stats = keyword_index_cache.get_stats()
+        assert stats["misses"] == 9
+        assert stats["hits"] == 6
+        assert stats["indexes"] == 1
+
+    def test_searches_without_a_key_are_not_kept(self):
+        keyword_index_cache.search_chunks(None, CHUNKS, "dog")
+        keyword_index_cache.search_chunks(None, CHUNKS, "dog")
+
+        stats = keyword_index_cache.get_stats()
+        assert stats["misses"] == 16
+        assert stats["indexes"] == 0
+
+    def test_encrypted_requests_are_not_kept(self, mocker):
+        mocker.patch.object(keyword_index_module, "is_encryption_active", return_value=True)
+
+        matches = keyword_index_cache.search_chunks(KEY, CHUNKS, "dog")
+
+        assert matches == keyword_index_cache.search_chunks(None, CHUNKS, "dog")
+        assert keyword_index_cache.get_stats()["indexes"] == 0
+
+    def test_empty_chunks_or_query_return_nothing(self):
+        assert keyword_index_cache.search_chunks(KEY, [], "dog") == []
+        assert keyword_index_cache.search_chunks(KEY, CHUNKS, "") == []
+        assert keyword_index_cache.match_documents(KEY, ["dog"], "!!") == []
+
+    def test_unreferenced_documents_are_pruned(self, monkeypatch):
+        monkeypatch.setattr(keyword_index_module, "PRUNE_SLACK_DOCUMENTS", 0)
+        keyword_index_cache.match_documents(KEY, ["a", "b", "c"], "a")
+
+        keyword_index_cache.match_documents(KEY, ["d"], "a")
+
+        stats = keyword_index_cache.get_stats()
+        assert stats["pruned"] == 3
+        assert stats["documents"] == 1
+
+    def test_least_recently_searched_index_is_evicted(self, monkeypatch):
+        monkeypatch.setattr(keyword_index_module, "MAX_INDEXED_CHARS", 15)
+        keyword_index_cache.match_documents("first", ["aaaaaa"], "a")
+        keyword_index_cache.match_documents("second", ["bbbbbb"], "b")
+        keyword_index_cache.match_documents("first", ["aaaaaa"], "a")
+        keyword_index_cache.match_documents("third", ["cccccc"], "c")
+
+        keyword_index_cache.match_documents("first", ["aaaaaa"], "a")
+        keyword_index_cache.match_documents("second", ["bbbbbb"], "b")
+
+        stats = keyword_index_cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 4
+        assert stats["indexes"] == 2
+
+    def test_clear_resets_everything(self):
+        keyword_index_cache.search_chunks(KEY, CHUNKS, "dog")
+
+        keyword_index_cache.clear()
+
+        assert keyword_index_cache.get_stats() == {"hits": 0, "misses": 0, "pruned": 0,
+                                                   "indexes": 0, "documents": 0, "chars": 0}
+
+
+class TestKeywordIndex:
+    """Tests for a single positional index."""
+
+    def test_positions_are_offset_within_a_chunk(self):
+        index = KeywordIndex()
+        index.add_documents(["x two", "nine three", "two", "three"])
+
+        # Only the second chunk has "two" and "three" within one word of each other once
+        # each document's positions are offset by the documents before it.
+        assert index.search_chunks([["x two", "nine three"], ["two", "three"]], ["two", "three"],
+                                   proximity_limit=1) == [1, 0]
+
+    def test_speaker_label_does_not_make_a_chunk_relevant(self):
+        index = KeywordIndex()
+        index.add_documents(["Dog: hello", "a cat"])
+
+        assert index.search_chunks([["Dog: hello", "a cat"]], ["dog"]) == []
+        assert index.search_chunks([["Dog: hello", "a cat"]], ["dog", "cat"]) == [0]
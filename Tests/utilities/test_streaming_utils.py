@@ -2,6 +2,7 @@ import pytest
 
 # NOTE: Imports from Middleware.* assume the pytest.ini configuration (pythonpath = .)
 # is correctly applied in the environment where these tests are executed.
+from Middleware.utilities import streaming_utils
 from Middleware.utilities.streaming_utils import (
     StreamingThinkRemover,
     post_process_llm_output,
@@ -237,6 +238,62 @@ class TestStreamingThinkRemover:
         expected = "This text should be returned in full."
         assert process_stream_in_chunks(remover, text) == expected
 
+    # --- Incremental scanning ---
+
+    @pytest.mark.parametrize("config", [BASE_ENDPOINT_CONFIG, COMPLEX_TAG_CONFIG], ids=["short_tags", "long_tags"])
+    def test_closing_tag_search_keeps_only_tag_length_overlap(self, config):
+        """While suppressing, only len(endThinkTag) - 1 characters of earlier
+        text are carried into the next search, however long the block grows."""
+        remover = StreamingThinkRemover(config)
+        remover.process_delta(config["startThinkTag"])
+        for _ in range(2000):
+            assert remover.process_delta("reasoning ") == ""
+            assert len(remover._close_tag_tail) <= len(config["endThinkTag"]) - 1
+        assert remover._buffer == ""
+        assert remover.process_delta(config["endThinkTag"] + "Answer") == "Answer"
+        assert remover._suppressed == []
+
+    @pytest.mark.parametrize("split_at", range(1, 8))
+    def test_closing_tag_split_at_every_offset(self, split_at):
+        remover = StreamingThinkRemover(BASE_ENDPOINT_CONFIG)
+        assert remover.process_delta("<think>" + "r" * 500) == ""
+        assert remover.process_delta("</THINK>"[:split_at]) == ""
+        assert remover.process_delta("</THINK>"[split_at:] + "kept") == "kept"
+        assert remover.finalize() == ""
+
+    def test_long_unterminated_block_is_flushed_intact(self):
+        remover = StreamingThinkRemover(BASE_ENDPOINT_CONFIG)
+        deltas = ["<think>"] + [f"step {i} " for i in range(5000)]
+        output = "".join(remover.process_delta(delta) for delta in deltas) + remover.finalize()
+        assert output == "".join(deltas)
+
+    def test_unterminated_block_past_the_limit_keeps_only_its_tail(self, monkeypatch):
+        monkeypatch.setattr(streaming_utils, "MAX_UNTERMINATED_FLUSH_CHARS", 100)
+        remover = StreamingThinkRemover(BASE_ENDPOINT_CONFIG)
+        deltas = ["<think>"] + [f"step {i} " for i in range(500)]
+        for delta in deltas:
+            assert remover.process_delta(delta) == ""
+            assert remover._suppressed_chars <= 200 + len(delta)
+        assert remover.finalize() == "".join(deltas)[-100:]
+
+    def test_closing_only_mode_keeps_only_the_tail(self, monkeypatch):
+        monkeypatch.setattr(streaming_utils, "MAX_UNTERMINATED_FLUSH_CHARS", 10)
+        remover = StreamingThinkRemover({**BASE_ENDPOINT_CONFIG, "expectOnlyClosingThinkTag": True})
+        deltas = [f"{i:03d} " for i in range(100)]
+        for delta in deltas:
+            assert remover.process_delta(delta) == ""
+        assert remover.finalize() == "".join(deltas)[-10:]
+
+    def test_closing_only_mode_long_preamble_split_tag(self):
+        config = {**BASE_ENDPOINT_CONFIG, "expectOnlyClosingThinkTag": True}
+        remover = StreamingThinkRemover(config)
+        for _ in range(1000):
+            assert remover.process_delta("junk ") == ""
+        assert remover.process_delta("</thi") == ""
+        assert remover.process_delta("nk>Real") == "Real"
+        assert remover.process_delta(" answer") == " answer"
+        assert remover.finalize() == ""
+
 
 class TestRemoveThinkingFromText:
     """Tests for the stateless remove_thinking_from_text function."""
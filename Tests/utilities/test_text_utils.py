@@ -4,11 +4,14 @@ from copy import deepcopy
 
 import pytest
 
+from Middleware.utilities import text_utils
 from Middleware.utilities.text_utils import (
+    word_count_memo,
     rough_estimate_token_length,
     reduce_text_to_token_limit,
     split_into_tokenized_chunks,
     chunk_messages_by_token_size,
+    get_message_chunk_groups,
     messages_into_chunked_text_of_token_size,
     messages_to_text_block,
     get_message_chunks,
@@ -91,6 +94,46 @@ def test_rough_estimate_default_margin_distinguishable_from_no_margin():
     assert result_no_margin == 6    # int(6.75 * 1.00)
 
 
+def test_rough_estimate_memoizes_long_text_word_counts():
+    """Word counts of long texts are memoized; the estimate is unchanged."""
+    text = "word " * 100
+    expected = int(max(100 * 1.35, len(text) / 3.5) * 1.10)
+    assert rough_estimate_token_length(text) == expected
+    assert rough_estimate_token_length(text) == expected
+    stats = word_count_memo.get_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+
+def test_rough_estimate_does_not_memoize_short_text():
+    """Texts under MIN_MEMOIZED_TEXT_CHARS are split directly."""
+    rough_estimate_token_length("short text")
+    assert word_count_memo.get_stats()["entries"] == 0
+
+
+def test_word_count_memo_is_bounded(mocker):
+    """The least recently used counts are dropped past MAX_MEMOIZED_WORD_COUNTS."""
+    mocker.patch.object(text_utils, "MAX_MEMOIZED_WORD_COUNTS", 2)
+    for text in ["a b", "c d e", "f"]:
+        word_count_memo.count(text)
+    assert word_count_memo.get_stats()["entries"] == 2
+    assert word_count_memo.count("c d e") == 3
+    assert word_count_memo.get_stats()["hits"] == 1
+
+
+def test_word_count_memo_does_not_keep_text_alive():
+    """The memo is keyed by the text's hash and length, never the text itself."""
+    word_count_memo.count("private conversation text " * 20)
+    assert all(not isinstance(part, str) for key in word_count_memo._counts for part in key)
+
+
+@pytest.mark.parametrize("word", ["a", "word", "antidisestablishmentarianism", "x" * 40, "naïve", "日本語"])
+def test_single_word_estimate_matches_full_estimator(word):
+    """The per-word shortcut used by the chunking helpers gives the full estimator's answer."""
+    assert text_utils._estimate_single_word_tokens(len(word)) == rough_estimate_token_length(word)
+    assert text_utils._estimate_single_word_tokens(len(word) + 1) == rough_estimate_token_length(word + ' ')
+
+
 @pytest.mark.parametrize(
     "text, token_limit, expected_text",
     [
@@ -227,6 +270,16 @@ def test_get_message_chunks(mocker, lookback, expected_slice):
     assert called_with_messages == messages[expected_slice]
 
 
+def test_get_message_chunk_groups_render_to_get_message_chunks():
+    """
+    Tests that rendering each group yields exactly the text blocks of get_message_chunks.
+    """
+    messages = [{"role": "user", "content": c * 14} for c in "abcde"]
+    groups = get_message_chunk_groups(messages, lookbackStartTurn=0, chunk_size=10)
+    assert [messages_to_text_block(group) for group in groups] == get_message_chunks(messages, 0, 10)
+    assert [m for group in groups for m in group] == messages[:-1]
+
+
 def test_get_message_chunks_single_message_lookback_zero_returns_empty():
     """
     With lookbackStartTurn=0 and only one message there is nothing to chunk
@@ -14,6 +14,7 @@ import pytest
 # Import the functions to test
 from Middleware.utilities.vector_db_utils import (
     MAX_KEYWORDS_FOR_SEARCH,
+    PooledConnection,
     _get_db_path,
     _legacy_vector_db_path,
     _legacy_vector_db_path_cwd,
@@ -22,13 +23,17 @@ from Middleware.utilities.vector_db_utils import (
     add_memory_to_vector_db,
     add_vector_check_hash,
     get_all_embeddings,
+    get_ann_candidate_ids,
     get_db_connection,
+    get_embedding_signature,
+    get_embeddings_by_ids,
     get_memories_by_ids,
     get_memories_without_embeddings,
     get_vector_check_hash_history,
     initialize_vector_db,
     search_memories_by_keyword,
     setup_database_functions,
+    vector_db_connection_pool,
 )
 
 # A consistent discussion ID for testing
@@ -491,7 +496,7 @@ def test_get_db_connection_uri(memory_db_path):
     # We test if get_db_connection internally uses uri=True.
     conn = get_db_connection(TEST_DISCUSSION_ID)
     assert conn is not None
-    assert isinstance(conn, sqlite3.Connection)
+    assert isinstance(conn, PooledConnection)
 
     # Verify row factory and custom functions (proves setup ran)
     assert conn.row_factory == sqlite3.Row
@@ -1430,3 +1435,252 @@ def test_get_memories_by_ids_query_error(mocker):
     mock_logger.assert_called_once()
     assert "Failed to get memories by ids" in mock_logger.call_args[0][0]
     mock_conn.close.assert_called_once()
+
+
+# === Connection pool ===
+@pytest.fixture
+def file_db_path(tmp_path, mocker):
+    """Points _get_db_path at a real database file in a temp directory."""
+    db_path = str(tmp_path / "discussion_vector_memory.db")
+    mocker.patch("Middleware.utilities.vector_db_utils._get_db_path", return_value=db_path)
+    return db_path
+
+
+def test_pool_reuses_closed_connection(file_db_path):
+    first = get_db_connection(TEST_DISCUSSION_ID)
+    first.close()
+    second = get_db_connection(TEST_DISCUSSION_ID)
+
+    assert second.execute("SELECT recency_score('2024-01-01T00:00:00')").fetchone() is not None
+    stats = vector_db_connection_pool.get_stats()
+    assert stats["opened"] == 1 and stats["reused"] == 1
+    second.close()
+
+
+def test_closing_twice_keeps_the_parked_connection_usable(file_db_path):
+    first = get_db_connection(TEST_DISCUSSION_ID)
+    first.close()
+    first.close()
+    second = get_db_connection(TEST_DISCUSSION_ID)
+
+    assert vector_db_connection_pool.get_stats()["reused"] == 1
+    assert second.execute("SELECT 1").fetchone()[0] == 1
+    second.close()
+
+
+def test_stale_close_does_not_release_another_callers_lease(file_db_path):
+    first = get_db_connection(TEST_DISCUSSION_ID)
+    first.close()
+    second = get_db_connection(TEST_DISCUSSION_ID)
+    assert vector_db_connection_pool.get_stats()["reused"] == 1
+
+    # The first borrower closes again after its connection was lent to the second.
+    first.close()
+    third = get_db_connection(TEST_DISCUSSION_ID)
+
+    stats = vector_db_connection_pool.get_stats()
+    assert stats["opened"] == 2 and stats["idle"] == 0
+    assert second.execute("SELECT 1").fetchone()[0] == 1
+    with pytest.raises(sqlite3.ProgrammingError):
+        first.execute("SELECT 1")
+    second.close()
+    third.close()
+    assert vector_db_connection_pool.get_stats()["idle"] == 2
+
+
+def test_evicted_connection_closes_for_real(file_db_path):
+    conn = get_db_connection(TEST_DISCUSSION_ID)
+    conn.close()
+    vector_db_connection_pool.clear()
+
+    conn.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+
+def test_pool_leases_connections_exclusively(file_db_path):
+    first = get_db_connection(TEST_DISCUSSION_ID)
+    second = get_db_connection(TEST_DISCUSSION_ID)
+
+    assert first is not second
+    first.close()
+    second.close()
+    assert vector_db_connection_pool.get_stats()["idle"] == 2
+
+
+def test_pool_applies_wal_and_pragmas(file_db_path):
+    conn = get_db_connection(TEST_DISCUSSION_ID)
+
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    conn.close()
+
+
+def test_pool_rolls_back_uncommitted_work_on_release(file_db_path):
+    initialize_vector_db(TEST_DISCUSSION_ID)
+    conn = get_db_connection(TEST_DISCUSSION_ID)
+    conn.execute("INSERT INTO memories (discussion_id, memory_text, date_added) VALUES ('d', 'x', '2024-01-01')")
+    conn.close()
+
+    conn = get_db_connection(TEST_DISCUSSION_ID)
+    assert not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0] == 0
+    conn.close()
+
+
+def test_pool_discards_connection_when_file_is_replaced(file_db_path):
+    initialize_vector_db(TEST_DISCUSSION_ID)
+    first = get_db_connection(TEST_DISCUSSION_ID)
+    first.close()
+
+    os.remove(file_db_path)
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(file_db_path + suffix):
+            os.remove(file_db_path + suffix)
+    initialize_vector_db(TEST_DISCUSSION_ID)
+
+    assert vector_db_connection_pool.get_stats()["discarded"] == 1
+    second = get_db_connection(TEST_DISCUSSION_ID)
+    assert second is not first
+    assert second.execute("SELECT name FROM sqlite_master WHERE name = 'memories'").fetchone() is not None
+    second.close()
+
+
+def test_pool_evicts_least_recently_used_beyond_bound(tmp_path, mocker):
+    mocker.patch("Middleware.utilities.vector_db_utils.MAX_IDLE_CONNECTIONS", 2)
+    paths = [str(tmp_path / f"{i}.db") for i in range(3)]
+    get_path = mocker.patch("Middleware.utilities.vector_db_utils._get_db_path")
+
+    for path in paths:
+        get_path.return_value = path
+        get_db_connection(TEST_DISCUSSION_ID).close()
+
+    stats = vector_db_connection_pool.get_stats()
+    assert stats["idle"] == 2
+    assert stats["evicted"] == 1
+
+
+def test_pool_expires_idle_connections(file_db_path, mocker):
+    mocker.patch("Middleware.utilities.vector_db_utils.IDLE_CONNECTION_TTL_SECONDS", 0)
+    first = get_db_connection(TEST_DISCUSSION_ID)
+    first.close()
+
+    second = get_db_connection(TEST_DISCUSSION_ID)
+
+    assert second is not first
+    assert vector_db_connection_pool.get_stats()["evicted"] >= 1
+    second.close()
+
+
+def test_plain_memory_path_is_not_pooled(mocker):
+    mocker.patch("Middleware.utilities.vector_db_utils._get_db_path", return_value=":memory:")
+
+    conn = get_db_connection(TEST_DISCUSSION_ID)
+    conn.close()
+
+    assert vector_db_connection_pool.get_stats() == {
+        "opened": 0, "reused": 0, "discarded": 0, "evicted": 0, "idle": 0}
+
+
+# === Embedding signature ===
+def test_embedding_signature_changes_on_insert_and_replace(memory_db_path):
+    memory_id = add_memory_to_vector_db(TEST_DISCUSSION_ID, "text", json.dumps({}))
+    empty = get_embedding_signature(TEST_DISCUSSION_ID, "model-a")
+
+    add_embeddings_to_db(TEST_DISCUSSION_ID, [(memory_id, b"\x00" * 8)], "model-a")
+    inserted = get_embedding_signature(TEST_DISCUSSION_ID, "model-a")
+    add_embeddings_to_db(TEST_DISCUSSION_ID, [(memory_id, b"\x01" * 8)], "model-a")
+    replaced = get_embedding_signature(TEST_DISCUSSION_ID, "model-a")
+
+    assert empty == (0, 0, 0)
+    assert inserted[0] == 1 and replaced[0] == 1
+    assert len({empty, inserted, replaced}) == 3
+    assert get_embedding_signature(TEST_DISCUSSION_ID, "model-b") == (0, 0, 0)
+
+
+def test_embedding_signature_connection_error(mocker):
+    mocker.patch("Middleware.utilities.vector_db_utils.get_db_connection", return_value=None)
+
+    assert get_embedding_signature(TEST_DISCUSSION_ID, "model-a") is None
+
+
+def test_add_embeddings_folds_rows_into_cached_matrix(memory_db_path, mocker):
+    from Middleware.utilities.embedding_matrix_cache import embedding_matrix_cache
+    mocker.patch("Middleware.utilities.vector_db_utils.NUMPY_AVAILABLE", True)
+    mocker.patch.object(embedding_matrix_cache, "contains", return_value=True)
+    apply_write = mocker.patch.object(embedding_matrix_cache, "apply_write")
+    memory_id = add_memory_to_vector_db(TEST_DISCUSSION_ID, "text", json.dumps({}))
+    pairs = [(memory_id, b"\x00" * 8)]
+
+    add_embeddings_to_db(TEST_DISCUSSION_ID, pairs, "model-a")
+
+    key, before, after, written = apply_write.call_args[0]
+    assert key == (TEST_DISCUSSION_ID, None, "model-a")
+    assert before == (0, 0, 0)
+    assert after == get_embedding_signature(TEST_DISCUSSION_ID, "model-a")
+    assert written == pairs
+
+
+# === ANN index integration ===
+def _ivf_fixture_db(file_db_path):
+    """Creates a file DB with two embedded memories and a hand-written two-list IVF index."""
+    from Middleware.utilities import vector_index_utils
+    from Middleware.utilities.vector_math_utils import vector_to_blob
+    initialize_vector_db(TEST_DISCUSSION_ID)
+    first = add_memory_to_vector_db(TEST_DISCUSSION_ID, "east", json.dumps({}))
+    second = add_memory_to_vector_db(TEST_DISCUSSION_ID, "north", json.dumps({}))
+    add_embeddings_to_db(TEST_DISCUSSION_ID, [(first, vector_to_blob([1.0, 0.0])),
+                                              (second, vector_to_blob([0.0, 1.0]))], "model-a")
+    index_path = vector_index_utils.get_index_path(file_db_path)
+    conn = vector_index_utils._connect(index_path)
+    conn.execute("INSERT INTO ivf_meta VALUES ('model-a', 2, 2, 2, 't')")
+    conn.executemany("INSERT INTO ivf_centroids VALUES ('model-a', ?, ?)",
+                     [(0, vector_to_blob([1.0, 0.0])), (1, vector_to_blob([0.0, 1.0]))])
+    conn.executemany("INSERT INTO ivf_assignments VALUES ('model-a', ?, ?)", [(first, 0), (second, 1)])
+    conn.commit()
+    conn.close()
+    vector_index_utils.clear_centroid_cache()
+    return first, second
+
+
+def test_ann_candidates_come_from_nearest_list(file_db_path):
+    first, _ = _ivf_fixture_db(file_db_path)
+
+    assert get_ann_candidate_ids(TEST_DISCUSSION_ID, "model-a", [0.9, 0.1], probes=1) == [first]
+
+
+def test_ann_candidates_none_without_index(file_db_path):
+    initialize_vector_db(TEST_DISCUSSION_ID)
+
+    assert get_ann_candidate_ids(TEST_DISCUSSION_ID, "model-a", [1.0, 0.0]) is None
+
+
+def test_new_embeddings_are_added_to_existing_index(file_db_path):
+    from Middleware.utilities.vector_math_utils import vector_to_blob
+    _ivf_fixture_db(file_db_path)
+    third = add_memory_to_vector_db(TEST_DISCUSSION_ID, "north-ish", json.dumps({}))
+
+    add_embeddings_to_db(TEST_DISCUSSION_ID, [(third, vector_to_blob([0.1, 0.9]))], "model-a")
+
+    assert third in get_ann_candidate_ids(TEST_DISCUSSION_ID, "model-a", [0.0, 1.0], probes=1)
+
+
+def test_stale_index_is_not_used(file_db_path, mocker):
+    from Middleware.utilities.vector_math_utils import vector_to_blob
+    _ivf_fixture_db(file_db_path)
+    mocker.patch("Middleware.utilities.vector_db_utils._update_ann_index")
+    third = add_memory_to_vector_db(TEST_DISCUSSION_ID, "missed", json.dumps({}))
+    add_embeddings_to_db(TEST_DISCUSSION_ID, [(third, vector_to_blob([0.1, 0.9]))], "model-a")
+    mock_warning = mocker.patch("Middleware.utilities.vector_db_utils.logger.warning")
+
+    assert get_ann_candidate_ids(TEST_DISCUSSION_ID, "model-a", [0.0, 1.0]) is None
+    assert "covers 2 of 3" in mock_warning.call_args[0][0]
+
+
+def test_get_embeddings_by_ids_filters_by_model(memory_db_path):
+    memory_id = add_memory_to_vector_db(TEST_DISCUSSION_ID, "text", json.dumps({}))
+    add_embeddings_to_db(TEST_DISCUSSION_ID, [(memory_id, b"\x00" * 8)], "model-a")
+    add_embeddings_to_db(TEST_DISCUSSION_ID, [(memory_id, b"\x01" * 8)], "model-b")
+
+    assert get_embeddings_by_ids(TEST_DISCUSSION_ID, "model-a", [memory_id, 999]) == [(memory_id, b"\x00" * 8)]
+    assert get_embeddings_by_ids(TEST_DISCUSSION_ID, "model-a", []) == []
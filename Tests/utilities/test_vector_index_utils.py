@@ -0,0 +1,143 @@
+# Tests/utilities/test_vector_index_utils.py
+
+import pytest
+
+from Middleware.utilities import vector_index_utils
+from Middleware.utilities.vector_index_utils import (
+    add_to_ivf_index,
+    build_ivf_index,
+    default_list_count,
+    get_index_path,
+    get_ivf_index_info,
+    probe_ivf_index,
+)
+from Middleware.utilities.vector_math_utils import vector_to_blob
+
+MODEL = "emb-model"
+
+
+@pytest.fixture(autouse=True)
+def clear_centroids():
+    vector_index_utils.clear_centroid_cache()
+    yield
+    vector_index_utils.clear_centroid_cache()
+
+
+def _write_index(path, centroids, assignments, model=MODEL, built_at="t1"):
+    """Writes a hand-made index so probing can be tested without NumPy."""
+    conn = vector_index_utils._connect(str(path))
+    conn.execute("DELETE FROM ivf_meta WHERE model = ?", (model,))
+    conn.execute("DELETE FROM ivf_centroids WHERE model = ?", (model,))
+    conn.execute("INSERT INTO ivf_meta VALUES (?, ?, ?, ?, ?)",
+                 (model, len(centroids[0]), len(centroids), len(assignments), built_at))
+    conn.executemany("INSERT INTO ivf_centroids VALUES (?, ?, ?)",
+                     [(model, i, vector_to_blob(c)) for i, c in enumerate(centroids)])
+    conn.executemany("INSERT OR REPLACE INTO ivf_assignments VALUES (?, ?, ?)",
+                     [(model, memory_id, list_no) for memory_id, list_no in assignments.items()])
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+class TestIndexPaths:
+    """Tests for sidecar path resolution and sizing."""
+
+    def test_sidecar_sits_next_to_database(self, tmp_path):
+        db = tmp_path / "vector_memory.db"
+        assert get_index_path(str(db)) == str(tmp_path / "vector_memory.ann.db")
+
+    @pytest.mark.parametrize("db_path", ["", ":memory:", "file:memdb?mode=memory&cache=shared"])
+    def test_in_memory_databases_have_no_sidecar(self, db_path):
+        assert get_index_path(db_path) is None
+
+    @pytest.mark.parametrize("count,expected", [(1, 1), (4, 2), (100, 10), (100_000, 316)])
+    def test_default_list_count_is_about_sqrt(self, count, expected):
+        assert default_list_count(count) == expected
+
+
+class TestProbeAndInsert:
+    """Tests for the stdlib-only probe and incremental insert paths."""
+
+    def test_probe_returns_members_of_nearest_lists(self, tmp_path):
+        path = _write_index(tmp_path / "x.ann.db", [[1.0, 0.0], [0.0, 1.0], [-1.0, 0.0]],
+                            {1: 0, 2: 0, 3: 1, 4: 2})
+
+        assert sorted(probe_ivf_index(path, MODEL, [0.9, 0.1], probes=1)) == [1, 2]
+        assert sorted(probe_ivf_index(path, MODEL, [0.9, 0.1], probes=2)) == [1, 2, 3]
+        assert sorted(probe_ivf_index(path, MODEL, [0.9, 0.1], probes=99)) == [1, 2, 3, 4]
+
+    def test_probe_without_model_index_or_with_wrong_dimension_returns_none(self, tmp_path):
+        path = _write_index(tmp_path / "x.ann.db", [[1.0, 0.0]], {1: 0})
+
+        assert probe_ivf_index(path, "other-model", [1.0, 0.0]) is None
+        assert probe_ivf_index(path, MODEL, [1.0, 0.0, 0.0]) is None
+
+    def test_add_assigns_new_vectors_to_nearest_list(self, tmp_path):
+        path = _write_index(tmp_path / "x.ann.db", [[1.0, 0.0], [0.0, 1.0]], {1: 0})
+
+        added = add_to_ivf_index(path, MODEL, [(2, vector_to_blob([0.1, 0.9])),
+                                               (3, vector_to_blob([1.0, 0.0, 0.0]))])
+
+        assert added == 1
+        assert probe_ivf_index(path, MODEL, [0.0, 1.0], probes=1) == [2]
+        assert get_ivf_index_info(path, MODEL) == {"count": 2, "dim": 2, "nlist": 2, "trained_count": 1}
+
+    def test_add_without_model_index_is_a_no_op(self, tmp_path):
+        path = _write_index(tmp_path / "x.ann.db", [[1.0, 0.0]], {1: 0})
+
+        assert add_to_ivf_index(path, "other-model", [(2, vector_to_blob([1.0, 0.0]))]) == 0
+
+    def test_info_for_missing_file_is_none(self, tmp_path):
+        missing = tmp_path / "missing.ann.db"
+
+        assert get_ivf_index_info(str(missing), MODEL) is None
+        assert not missing.exists()
+
+    def test_rebuilt_centroids_replace_cached_ones(self, tmp_path):
+        path = _write_index(tmp_path / "x.ann.db", [[1.0, 0.0], [0.0, 1.0]], {1: 0, 2: 1})
+        assert probe_ivf_index(path, MODEL, [1.0, 0.0], probes=1) == [1]
+
+        _write_index(path, [[0.0, 1.0], [1.0, 0.0]], {1: 0, 2: 1}, built_at="t2")
+
+        assert probe_ivf_index(path, MODEL, [1.0, 0.0], probes=1) == [2]
+
+
+class TestBuild:
+    """Tests for training the index (NumPy only)."""
+
+    def test_build_requires_numpy(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(vector_index_utils, "NUMPY_AVAILABLE", False)
+
+        with pytest.raises(RuntimeError, match="NumPy"):
+            build_ivf_index(str(tmp_path / "x.ann.db"), MODEL, [(1, vector_to_blob([1.0, 0.0]))])
+
+    def test_build_clusters_and_probing_finds_neighbours(self, tmp_path):
+        pytest.importorskip("numpy")
+        # Two well-separated groups of vectors.
+        pairs = [(i, vector_to_blob([1.0, 0.01 * i, 0.0])) for i in range(1, 21)]
+        pairs += [(i, vector_to_blob([0.0, 0.01 * i, 1.0])) for i in range(21, 41)]
+        path = str(tmp_path / "x.ann.db")
+
+        assert build_ivf_index(path, MODEL, pairs, list_count=2) == 40
+
+        assert get_ivf_index_info(path, MODEL) == {"count": 40, "dim": 3, "nlist": 2, "trained_count": 40}
+        assert sorted(probe_ivf_index(path, MODEL, [1.0, 0.0, 0.0], probes=1)) == list(range(1, 21))
+        assert len(probe_ivf_index(path, MODEL, [1.0, 0.0, 0.0], probes=2)) == 40
+
+    def test_rebuild_replaces_previous_index(self, tmp_path):
+        pytest.importorskip("numpy")
+        path = str(tmp_path / "x.ann.db")
+        build_ivf_index(path, MODEL, [(1, vector_to_blob([1.0, 0.0])), (2, vector_to_blob([0.0, 1.0]))])
+
+        build_ivf_index(path, MODEL, [(3, vector_to_blob([1.0, 0.0]))])
+
+        assert probe_ivf_index(path, MODEL, [1.0, 0.0], probes=5) == [3]
+
+    def test_build_rejects_mixed_dimensions_and_empty_input(self, tmp_path):
+        pytest.importorskip("numpy")
+        path = str(tmp_path / "x.ann.db")
+
+        with pytest.raises(ValueError):
+            build_ivf_index(path, MODEL, [])
+        with pytest.raises(ValueError, match="same dimension"):
+            build_ivf_index(path, MODEL, [(1, vector_to_blob([1.0, 0.0])), (2, vector_to_blob([1.0]))])
@@ -97,7 +97,8 @@ class TestHandleMethod:
             "test-disc-789", "search for keywords", 10, api_key_hash=base_context.api_key_hash,
             bm25_weights=None, use_recency=False, include_dates=False,
             search_mode="keyword", semantic_query=None, embedding_endpoint_name=None,
-            use_entity_expansion=False, request_id=base_context.request_id
+            use_entity_expansion=False, vector_index="exact", vector_index_probes=None,
+            request_id=base_context.request_id
         )
         assert result == "Found memories."
 
@@ -120,7 +121,8 @@ class TestHandleMethod:
             "test-disc-789", "keywords", 30, api_key_hash=base_context.api_key_hash,
             bm25_weights=[3.0, 2.0, 2.0, 2.0, 0.5], use_recency=True, include_dates=True,
             search_mode="keyword", semantic_query=None, embedding_endpoint_name=None,
-            use_entity_expansion=False, request_id=base_context.request_id
+            use_entity_expansion=False, vector_index="exact", vector_index_probes=None,
+            request_id=base_context.request_id
         )
         assert result == "Found."
 
@@ -144,7 +146,8 @@ class TestHandleMethod:
             bm25_weights=None, use_recency=False, include_dates=False,
             search_mode="hybrid", semantic_query="resolved:{agent1Output}",
             embedding_endpoint_name="Embedding-Endpoint",
-            use_entity_expansion=False, request_id=base_context.request_id
+            use_entity_expansion=False, vector_index="exact", vector_index_probes=None,
+            request_id=base_context.request_id
         )
         assert result == "Found."
 
@@ -164,10 +167,31 @@ class TestHandleMethod:
             "test-disc-789", "kw", 5, api_key_hash=base_context.api_key_hash,
             bm25_weights=None, use_recency=False, include_dates=False,
             search_mode="keyword", semantic_query=None, embedding_endpoint_name=None,
-            use_entity_expansion=True, request_id=base_context.request_id
+            use_entity_expansion=True, vector_index="exact", vector_index_probes=None,
+            request_id=base_context.request_id
         )
         assert result == "Found."
 
+    def test_vector_memory_search_forwards_vector_index_options(self, memory_handler, mock_dependencies,
+                                                               base_context):
+        """Tests that vectorIndex and vectorIndexProbes reach the memory service."""
+        base_context.config = {
+            "type": "VectorMemorySearch",
+            "input": "kw",
+            "searchMode": "semantic",
+            "embeddingEndpointName": "Embedding-Endpoint",
+            "vectorIndex": "ivf",
+            "vectorIndexProbes": 16
+        }
+        mock_dependencies["workflow_variable_service"].apply_variables.return_value = "kw"
+        mock_dependencies["memory_service"].search_vector_memories.return_value = "Found."
+
+        memory_handler.handle(base_context)
+
+        kwargs = mock_dependencies["memory_service"].search_vector_memories.call_args.kwargs
+        assert kwargs["vector_index"] == "ivf"
+        assert kwargs["vector_index_probes"] == 16
+
     def test_vector_memory_search_no_discussion_id(self, memory_handler, base_context):
         """Tests 'VectorMemorySearch' node when discussion_id is None."""
         base_context.config = {"type": "VectorMemorySearch"}
@@ -191,7 +215,8 @@ class TestHandleMethod:
             "test-disc-789", "resolved keywords", 5, api_key_hash=None,
             bm25_weights=None, use_recency=False, include_dates=False,
             search_mode="keyword", semantic_query=None, embedding_endpoint_name=None,
-            use_entity_expansion=False, request_id=base_context.request_id
+            use_entity_expansion=False, vector_index="exact", vector_index_probes=None,
+            request_id=base_context.request_id
         )
         assert result == "results"
 
@@ -365,6 +390,20 @@ class TestHandleMethod:
         mock_rag.handle_discussion_id_flow.assert_called_once_with(base_context, False)
         assert result == "rag tool ran"
 
+    def test_quality_memory_in_background_is_queued(self, memory_handler, mock_dependencies, base_context, mocker):
+        """Tests that 'QualityMemory' with runInBackground queues the job instead of running the RAG tool."""
+        base_context.config = {"type": "QualityMemory", "runInBackground": True}
+        mocker.patch('Middleware.workflows.handlers.impl.memory_node_handler.get_memory_job_queue_settings',
+                     return_value=(2, 60, "/tmp/memory_jobs.db"))
+        mock_enqueue = mocker.patch(
+            'Middleware.workflows.handlers.impl.memory_node_handler.memory_job_service.enqueue_quality_memory')
+
+        result = memory_handler.handle(base_context)
+
+        mock_enqueue.assert_called_once_with(base_context, 2, 60, "/tmp/memory_jobs.db")
+        mock_dependencies["slow_but_quality_rag_service"].handle_discussion_id_flow.assert_not_called()
+        assert result is None
+
     def test_quality_memory_without_discussion_id(self, memory_handler, mock_dependencies, base_context, mocker):
         """Tests 'QualityMemory' node without a discussion_id, falling back to the stateless
         parser when a recentMemoryToolWorkflow IS configured (backward compatibility)."""
@@ -417,6 +417,24 @@ class TestHandleSaveCustomFile:
         mock_save_file.assert_called_once_with(filepath="/path/save.txt", content="note", mode="append")
         assert result == "File successfully saved to /path/save.txt"
 
+    @patch('Middleware.workflows.handlers.impl.specialized_node_handler.save_custom_file')
+    def test_passes_group_commit_for_append(self, mock_save_file, specialized_handler, base_context):
+        """groupCommit is forwarded for appends and ignored by every other mode."""
+        base_context.config = {"filepath": "/path/save.txt", "content": "note", "mode": "append",
+                               "groupCommit": True}
+
+        specialized_handler.handle_save_custom_file(base_context)
+
+        mock_save_file.assert_called_once_with(filepath="/path/save.txt", content="note", mode="append",
+                                               group_commit=True)
+
+        mock_save_file.reset_mock()
+        base_context.config = {"filepath": "/path/save.txt", "content": "note", "groupCommit": True}
+
+        specialized_handler.handle_save_custom_file(base_context)
+
+        mock_save_file.assert_called_once_with(filepath="/path/save.txt", content="note")
+
     def test_rejects_invalid_mode(self, specialized_handler, base_context):
         """Should reject a mode outside the supported set."""
         base_context.config = {"filepath": "/path/save.txt", "content": "note", "mode": "bogus"}
@@ -124,7 +124,7 @@ def test_invalid_headers_type_raises(web_fetch_handler):
 
 def test_get_default_method_and_timeout(web_fetch_handler, mocker):
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="hello world"),
     )
     context = _make_context({"type": "WebFetch", "url": "http://example.com"})
@@ -147,7 +147,7 @@ def test_get_default_method_and_timeout(web_fetch_handler, mocker):
 
 def test_post_with_headers_and_body(web_fetch_handler, mocker):
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="created", status_code=200),
     )
     context = _make_context({
@@ -186,7 +186,7 @@ def test_variable_substitution_runs_on_url_headers_body(web_fetch_handler, mocke
         lambda template, ctx: sub_map.get(template, template)
     )
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({
@@ -218,7 +218,7 @@ def test_output_format_json_serializes_parsed_response(web_fetch_handler, mocker
     would fail the exact-string assertion."""
     raw_text = '  {"x" :1}  '
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text=raw_text, json_body={"x": 1}),
     )
     context = _make_context({"type": "WebFetch", "url": "http://x", "outputFormat": "json"})
@@ -231,7 +231,7 @@ def test_output_format_json_serializes_parsed_response(web_fetch_handler, mocker
 
 def test_output_format_full_includes_status_headers_body(web_fetch_handler, mocker):
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(
             mocker,
             status_code=200,
@@ -251,7 +251,7 @@ def test_output_format_full_includes_status_headers_body(web_fetch_handler, mock
 
 def test_http_error_raises_by_default(web_fetch_handler, mocker):
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, status_code=500, text="boom"),
     )
     context = _make_context({"type": "WebFetch", "url": "http://x"})
@@ -262,7 +262,7 @@ def test_http_error_raises_by_default(web_fetch_handler, mocker):
 
 def test_http_error_returns_response_body_when_on_error_return_text(web_fetch_handler, mocker):
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, status_code=500, text="server fail"),
     )
     context = _make_context({"type": "WebFetch", "url": "http://x", "onError": "return"})
@@ -274,7 +274,7 @@ def test_http_error_returns_response_body_when_on_error_return_text(web_fetch_ha
 
 def test_http_error_returns_full_payload_when_on_error_return_full(web_fetch_handler, mocker):
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(
             mocker,
             status_code=404,
@@ -300,7 +300,7 @@ def test_http_error_returns_full_payload_when_on_error_return_full(web_fetch_han
 
 def test_connection_error_raises_by_default(web_fetch_handler, mocker):
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         side_effect=requests.exceptions.ConnectTimeout("connect timeout"),
     )
     context = _make_context({"type": "WebFetch", "url": "http://x"})
@@ -311,7 +311,7 @@ def test_connection_error_raises_by_default(web_fetch_handler, mocker):
 
 def test_connection_error_returns_message_when_on_error_return(web_fetch_handler, mocker):
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         side_effect=requests.exceptions.ConnectTimeout("connect timeout"),
     )
     context = _make_context({"type": "WebFetch", "url": "http://x", "onError": "return"})
@@ -322,7 +322,7 @@ def test_connection_error_returns_message_when_on_error_return(web_fetch_handler
 
 def test_proxy_socks5_forwarded_to_requests(web_fetch_handler, mocker):
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({
@@ -342,7 +342,7 @@ def test_proxy_socks5_forwarded_to_requests(web_fetch_handler, mocker):
 
 def test_proxy_http_scheme_also_works(web_fetch_handler, mocker):
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({
@@ -366,7 +366,7 @@ def test_proxy_supports_variable_substitution(web_fetch_handler, mocker):
         lambda template, ctx: sub_map.get(template, template)
     )
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({
@@ -396,7 +396,7 @@ def test_proxy_must_be_string(web_fetch_handler):
 
 def test_proxy_empty_string_is_treated_as_no_proxy(web_fetch_handler, mocker):
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({
@@ -430,7 +430,7 @@ def test_html_stripped_drops_scripts_styles_head_and_returns_visible_text(web_fe
         "</body></html>"
     )
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text=html),
     )
     context = _make_context({
@@ -460,7 +460,7 @@ def test_html_stripped_drops_scripts_styles_head_and_returns_visible_text(web_fe
 def test_html_stripped_handles_plain_text_response(web_fetch_handler, mocker):
     """Plain text passed through the stripper should survive (no tags to strip)."""
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="hello, world"),
     )
     context = _make_context({
@@ -477,7 +477,7 @@ def test_html_stripped_handles_broken_html_without_raising(web_fetch_handler, mo
     """Unclosed tags should not crash the parser; visible text should still come through."""
     html = "<html><body><p>Open paragraph<div>Nested<span>text"
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text=html),
     )
     context = _make_context({
@@ -496,7 +496,7 @@ def test_html_stripped_skips_unclosed_script_block(web_fetch_handler, mocker):
     """An unclosed <script> tag should still suppress its contents from the output."""
     html = "<html><body><p>before</p><script>leak_this()"
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text=html),
     )
     context = _make_context({
@@ -514,7 +514,7 @@ def test_html_stripped_on_error_return_uses_stripper(web_fetch_handler, mocker):
     """When onError=return and outputFormat=html-stripped, an HTML error body is stripped too."""
     error_html = "<html><body><h1>500 Internal Error</h1><p>Try again.</p></body></html>"
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, status_code=500, text=error_html),
     )
     context = _make_context({
@@ -533,7 +533,7 @@ def test_html_stripped_on_error_return_uses_stripper(web_fetch_handler, mocker):
 
 def test_streaming_response_returns_generator(web_fetch_handler, mocker):
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="hello"),
     )
     context = _make_context({"type": "WebFetch", "url": "http://x"}, stream=True)
@@ -549,7 +549,7 @@ def test_streaming_response_returns_generator(web_fetch_handler, mocker):
 def test_non_numeric_timeout_raises(web_fetch_handler, mocker):
     """A non-numeric timeout must raise the node's own clear ValueError, not a deep TypeError."""
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({"type": "WebFetch", "url": "http://x", "timeout": "soon"})
@@ -568,7 +568,7 @@ def test_non_positive_timeout_raises(web_fetch_handler):
 def test_boolean_timeout_raises(web_fetch_handler, mocker):
     """A boolean timeout is rejected even though bool is an int subclass."""
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
     )
     context = _make_context({"type": "WebFetch", "url": "http://x", "timeout": True})
 
@@ -580,7 +580,7 @@ def test_boolean_timeout_raises(web_fetch_handler, mocker):
 def test_numeric_string_timeout_is_coerced(web_fetch_handler, mocker):
     """A numeric string timeout is coerced to a number and forwarded to requests."""
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({"type": "WebFetch", "url": "http://x", "timeout": "15"})
@@ -595,7 +595,7 @@ def test_json_output_on_non_json_200_raises_by_default(web_fetch_handler, mocker
     resp = _mock_response(mocker, status_code=200, text="not json")
     resp.json.side_effect = json.JSONDecodeError("Expecting value", "not json", 0)
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=resp,
     )
     context = _make_context({"type": "WebFetch", "url": "http://x", "outputFormat": "json"})
@@ -607,7 +607,7 @@ def test_json_output_on_non_json_200_raises_by_default(web_fetch_handler, mocker
 def test_allow_redirects_can_be_disabled(web_fetch_handler, mocker):
     """allowRedirects=false is forwarded to requests so a 30x is not followed."""
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({"type": "WebFetch", "url": "http://x", "allowRedirects": False})
@@ -628,7 +628,7 @@ def test_response_exceeding_cap_raises_by_default(web_fetch_handler, mocker):
     resp = _mock_response(mocker, text="ok")
     resp.iter_content.return_value = [b"0123456789"]  # 10 bytes > cap of 5
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=resp,
     )
     context = _make_context({"type": "WebFetch", "url": "http://x", "maxResponseBytes": 5})
@@ -642,7 +642,7 @@ def test_response_exceeding_cap_returns_when_on_error_return(web_fetch_handler,
     resp = _mock_response(mocker, text="ok")
     resp.iter_content.return_value = [b"0123456789"]
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=resp,
     )
     context = _make_context({
@@ -659,7 +659,7 @@ def test_response_exceeding_cap_returns_when_on_error_return(web_fetch_handler,
 def test_cap_disabled_when_zero_does_not_stream(web_fetch_handler, mocker):
     """maxResponseBytes=0 disables the cap and the request is not streamed."""
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="big body"),
     )
     context = _make_context({"type": "WebFetch", "url": "http://x", "maxResponseBytes": 0})
@@ -679,7 +679,7 @@ def test_max_response_bytes_must_be_int(web_fetch_handler):
 def test_boolean_max_response_bytes_raises(web_fetch_handler, mocker):
     """A boolean cap is rejected even though bool is an int subclass."""
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
     )
     context = _make_context({"type": "WebFetch", "url": "http://x", "maxResponseBytes": True})
 
@@ -693,7 +693,7 @@ def test_body_within_cap_is_returned(web_fetch_handler, mocker):
     resp = _mock_response(mocker, text="hello world")
     resp.iter_content.return_value = [b"hello ", b"world"]
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=resp,
     )
     context = _make_context({"type": "WebFetch", "url": "http://x", "maxResponseBytes": 1024})
@@ -710,7 +710,7 @@ def test_body_within_cap_assembles_streamed_chunks(web_fetch_handler, mocker):
     """
     resp = _StubResponse([b"hel", b"lo ", b"world"], status_code=200)
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=resp,
     )
     context = _make_context({"type": "WebFetch", "url": "http://x", "maxResponseBytes": 1024})
@@ -733,7 +733,7 @@ def test_http_error_body_is_capped_on_return_path(web_fetch_handler, mocker):
     # 50 bytes of body, cap of 8.
     resp = _StubResponse([b"XXXXXXXXXX"] * 5, status_code=500)
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=resp,
     )
     context = _make_context({
@@ -758,7 +758,7 @@ def test_http_error_raise_path_closes_streamed_response(web_fetch_handler, mocke
     """
     resp = _StubResponse([b"X" * 100], status_code=500)
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=resp,
     )
     context = _make_context({"type": "WebFetch", "url": "http://x"})  # onError defaults to raise
@@ -773,7 +773,7 @@ def test_http_error_body_capped_on_return_path_full_format(web_fetch_handler, mo
     """The bounded error read also bounds the body embedded in the 'full' payload."""
     resp = _StubResponse([b"YYYYYYYYYY"] * 5, status_code=502, headers={"X-Err": "1"})
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=resp,
     )
     context = _make_context({
@@ -796,7 +796,7 @@ def test_capped_read_skips_empty_chunks(web_fetch_handler, mocker):
     cap or joined into the body."""
     resp = _StubResponse([b"", b"hello", b"", b" world"], status_code=200)
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=resp,
     )
     context = _make_context({"type": "WebFetch", "url": "http://x", "maxResponseBytes": 1024})
@@ -818,7 +818,7 @@ def test_capped_error_body_read_failure_keeps_partial(web_fetch_handler, mocker)
 
     resp = _FailingMidReadResponse([b"partial-err"], status_code=500)
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=resp,
     )
     context = _make_context({
@@ -840,7 +840,7 @@ def test_json_output_on_non_json_200_returns_body_when_on_error_return(web_fetch
     resp = _mock_response(mocker, status_code=200, text="not json")
     resp.json.side_effect = json.JSONDecodeError("Expecting value", "not json", 0)
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=resp,
     )
     context = _make_context({
@@ -861,7 +861,7 @@ def test_default_verify_is_true_when_unconfigured(web_fetch_handler, mocker):
     """Opt-in guarantee: with neither field set, requests is called with verify=True
     (the original always-on certifi behavior), unchanged."""
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({"type": "WebFetch", "url": "http://example.com"})
@@ -873,7 +873,7 @@ def test_default_verify_is_true_when_unconfigured(web_fetch_handler, mocker):
 
 def test_verify_false_disables_verification(web_fetch_handler, mocker):
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({"type": "WebFetch", "url": "https://internal", "verify": False})
@@ -889,7 +889,7 @@ def test_ca_bundle_forwarded_to_requests_as_path(web_fetch_handler, mocker):
         return_value=True,
     )
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({
@@ -914,7 +914,7 @@ def test_ca_bundle_supports_variable_substitution(web_fetch_handler, mocker):
         return_value=True,
     )
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({
@@ -936,7 +936,7 @@ def test_verify_false_takes_precedence_over_ca_bundle(web_fetch_handler, mocker)
         return_value=True,
     )
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({
@@ -954,7 +954,7 @@ def test_verify_false_takes_precedence_over_ca_bundle(web_fetch_handler, mocker)
 
 def test_ca_bundle_empty_string_falls_back_to_default_verify(web_fetch_handler, mocker):
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({"type": "WebFetch", "url": "https://x", "caBundle": ""})
@@ -1004,7 +1004,7 @@ def test_guard_inactive_forwards_redirect_handling_to_requests(web_fetch_handler
     """With neither guard field set the guard is inert: requests follows redirects itself
     (allow_redirects forwarded), preserving the original behavior."""
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({"type": "WebFetch", "url": "http://example.com"})
@@ -1016,7 +1016,7 @@ def test_guard_inactive_forwards_redirect_handling_to_requests(web_fetch_handler
 
 def test_block_private_addresses_rejects_loopback(web_fetch_handler, mocker):
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
     )
     context = _make_context({
         "type": "WebFetch",
@@ -1031,7 +1031,7 @@ def test_block_private_addresses_rejects_loopback(web_fetch_handler, mocker):
 
 def test_block_private_addresses_rejects_cloud_metadata(web_fetch_handler, mocker):
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
     )
     context = _make_context({
         "type": "WebFetch",
@@ -1048,7 +1048,7 @@ def test_block_private_addresses_returns_error_text_on_error_return(web_fetch_ha
     """With the default (text) output format and no response available, the return
     path yields the plain exception string, not a JSON envelope."""
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
     )
     context = _make_context({
         "type": "WebFetch",
@@ -1066,7 +1066,7 @@ def test_block_private_addresses_returns_envelope_on_error_return_full(web_fetch
     """With outputFormat=full, the blocked request comes back as the standard error
     envelope with null response fields (the request was never issued)."""
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
     )
     context = _make_context({
         "type": "WebFetch",
@@ -1087,7 +1087,7 @@ def test_block_private_addresses_returns_envelope_on_error_return_full(web_fetch
 
 def test_block_private_addresses_allows_public_ip(web_fetch_handler, mocker):
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({
@@ -1106,7 +1106,7 @@ def test_block_private_addresses_allows_public_ip(web_fetch_handler, mocker):
 
 def test_allowed_hosts_permits_listed_host(web_fetch_handler, mocker):
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({
@@ -1120,7 +1120,7 @@ def test_allowed_hosts_permits_listed_host(web_fetch_handler, mocker):
 
 def test_allowed_hosts_rejects_unlisted_host(web_fetch_handler, mocker):
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
     )
     context = _make_context({
         "type": "WebFetch",
@@ -1140,7 +1140,7 @@ def test_redirect_to_private_address_is_blocked(web_fetch_handler, mocker):
         mocker, status_code=302, headers={"location": "http://169.254.169.254/"}
     )
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=redirect,
     )
     context = _make_context({
@@ -1166,7 +1166,7 @@ def test_cross_host_redirect_strips_credentials(web_fetch_handler, mocker):
     )
     final = _mock_response(mocker, text="ok")
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         side_effect=[redirect, final],
     )
     context = _make_context({
@@ -1200,7 +1200,7 @@ def test_same_host_redirect_keeps_credentials(web_fetch_handler, mocker):
     )
     final = _mock_response(mocker, text="ok")
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         side_effect=[redirect, final],
     )
     context = _make_context({
@@ -1224,7 +1224,7 @@ def test_303_redirect_demotes_post_to_get_and_drops_body(web_fetch_handler, mock
     )
     final = _mock_response(mocker, text="ok")
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         side_effect=[redirect, final],
     )
     context = _make_context({
@@ -1260,7 +1260,7 @@ def test_redirect_chain_exceeding_max_raises_too_many_redirects(web_fetch_handle
         mocker, status_code=302, headers={"location": "http://8.8.8.8/loop"}
     )
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=redirect,
     )
     context = _make_context({
@@ -1281,7 +1281,7 @@ def test_redirect_without_location_is_returned_as_final(web_fetch_handler, mocke
         mocker, status_code=302, text="moved", headers={"X-No-Location": "1"}
     )
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=redirect,
     )
     context = _make_context({
@@ -1300,7 +1300,7 @@ def test_allowed_hosts_matching_is_case_insensitive(web_fetch_handler, mocker):
     """Doc contract: the request host must match an allowlist entry case-insensitively.
     Both a mixed-case URL host and a mixed-case allowlist entry must still match."""
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({
@@ -1316,7 +1316,7 @@ def test_allowed_hosts_host_match_ignores_port(web_fetch_handler, mocker):
     """The allowlist matches on the hostname; a nonstandard port on the URL does not
     defeat a listed host (the match is host-based, not authority-based)."""
     mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
     context = _make_context({
@@ -1337,7 +1337,7 @@ def test_allowed_hosts_entries_support_variable_substitution(web_fetch_handler,
         lambda template, ctx: sub_map.get(template, template)
     )
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=_mock_response(mocker, text="ok"),
     )
 
@@ -1363,7 +1363,7 @@ def test_combined_guards_reject_allowlisted_private_host(web_fetch_handler, mock
     """Doc contract: allowedHosts and blockPrivateAddresses are additive; an
     allowlisted host that is a private address must still be rejected."""
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
     )
     context = _make_context({
         "type": "WebFetch",
@@ -1384,7 +1384,7 @@ def test_redirect_to_unlisted_host_is_blocked_by_allowed_hosts(web_fetch_handler
         mocker, status_code=302, headers={"location": "http://evil.example.net/"}
     )
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         return_value=redirect,
     )
     context = _make_context({
@@ -1407,7 +1407,7 @@ def test_307_redirect_preserves_method_body_and_content_headers(web_fetch_handle
     )
     final = _mock_response(mocker, text="ok")
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         side_effect=[redirect, final],
     )
     context = _make_context({
@@ -1435,7 +1435,7 @@ def test_redirect_relative_location_resolves_against_current_url(web_fetch_handl
     )
     final = _mock_response(mocker, text="ok")
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
         side_effect=[redirect, final],
     )
     context = _make_context({
@@ -1483,7 +1483,7 @@ def test_empty_allowed_hosts_list_fails_closed(web_fetch_handler, mocker):
     """An explicitly configured empty allowlist must be rejected as a
     configuration error, not silently treated as "no allowlist" (fail-open)."""
     mock_request = mocker.patch(
-        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.request",
+        "Middleware.workflows.handlers.impl.web_fetch_handler.requests.Session.request",
     )
     context = _make_context({
         "type": "WebFetch",
@@ -0,0 +1,223 @@
+# Tests/workflows/handlers/impl/test_web_fetch_handler_cache.py
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from Middleware.services.http_session_pool_service import web_fetch_session_pool
+from Middleware.services.web_fetch_cache_service import html_text_memo, web_fetch_cache_service
+from Middleware.workflows.handlers.impl.web_fetch_handler import (
+    WebFetchHandler,
+    _AddressNotAllowedError,
+    _ResponseTooLargeError,
+)
+from Middleware.workflows.models.execution_context import ExecutionContext
+
+MODULE = "Middleware.workflows.handlers.impl.web_fetch_handler"
+
+_LAST_MODIFIED = "Wed, 21 Oct 2015 07:28:00 GMT"
+
+# path -> (extra response headers, body)
+_PAGES = {
+    "/fresh": ({"Cache-Control": "max-age=60"}, "fresh body"),
+    "/etag": ({"Cache-Control": "no-cache", "ETag": '"v1"'}, "etag body"),
+    "/last-modified": ({"Cache-Control": "max-age=0", "Last-Modified": _LAST_MODIFIED}, "dated body"),
+    "/no-store": ({"Cache-Control": "no-store"}, "private body"),
+    "/page.html": ({"Content-Type": "text/html"}, "<html><head><title>t</title></head><body><p>Docs</p></body></html>"),
+}
+
+
+class _RecordingHandler(BaseHTTPRequestHandler):
+    """Serves _PAGES, answers matching validators with 304, and records every request."""
+
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self):
+        self.server.requests.append((self.command, self.path, dict(self.headers), self.client_address[1]))
+        if self.command == "POST":
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        extra_headers, body = _PAGES[self.path]
+        validators = (("If-None-Match", "ETag"), ("If-Modified-Since", "Last-Modified"))
+        not_modified = any(self.headers.get(request_header) and self.headers[request_header] == extra_headers.get(stored)
+                           for request_header, stored in validators)
+        encoded = b"" if not_modified else body.encode("utf-8")
+        self.send_response(304 if not_modified else 200)
+        for name, value in {"Content-Type": "text/plain", **extra_headers}.items():
+            self.send_header(name, value)
+        if not not_modified:
+            self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _RecordingHandler)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    httpd.base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def cache_settings(mocker):
+    mocker.patch(f"{MODULE}.get_current_username", return_value="alice")
+    return mocker.patch(f"{MODULE}.get_web_fetch_cache_settings", return_value=(1024 * 1024, None))
+
+
+@pytest.fixture
+def handler(mocker):
+    variable_service = mocker.MagicMock()
+    variable_service.apply_variables.side_effect = lambda template, context: template
+    return WebFetchHandler(workflow_manager=mocker.MagicMock(), workflow_variable_service=variable_service)
+
+
+def _fetch(handler, url, **config):
+    context = ExecutionContext(request_id="req-1", workflow_id="wf-1", discussion_id=None,
+                               config={"type": "WebFetch", "url": url, **config}, messages=[], stream=False)
+    return handler.handle(context)
+
+
+def test_sequential_fetches_reuse_one_connection(handler, server):
+    _fetch(handler, server.base_url + "/fresh")
+    _fetch(handler, server.base_url + "/fresh")
+
+    assert len(server.requests) == 2
+    assert server.requests[0][3] == server.requests[1][3]
+    assert web_fetch_session_pool.get_stats()["reused"] == 1
+
+
+def test_fresh_response_is_served_without_a_request(handler, server, cache_settings):
+    first = _fetch(handler, server.base_url + "/fresh", cacheTtlSeconds=300)
+    second = _fetch(handler, server.base_url + "/fresh", cacheTtlSeconds=300)
+
+    assert first == second == "fresh body"
+    assert len(server.requests) == 1
+    assert web_fetch_cache_service.get_stats()["hits"] == 1
+
+
+def test_cache_is_opt_in_per_node(handler, server, cache_settings):
+    _fetch(handler, server.base_url + "/fresh")
+    _fetch(handler, server.base_url + "/fresh")
+
+    assert len(server.requests) == 2
+    cache_settings.assert_not_called()
+
+
+def test_user_setting_can_turn_the_cache_off(handler, server, cache_settings):
+    cache_settings.return_value = None
+
+    _fetch(handler, server.base_url + "/fresh", cacheTtlSeconds=300)
+    _fetch(handler, server.base_url + "/fresh", cacheTtlSeconds=300)
+
+    assert len(server.requests) == 2
+
+
+def test_stale_response_is_revalidated_with_its_etag(handler, server, cache_settings):
+    first = _fetch(handler, server.base_url + "/etag", cacheTtlSeconds=300)
+    second = _fetch(handler, server.base_url + "/etag", cacheTtlSeconds=300)
+
+    assert first == second == "etag body"
+    assert "If-None-Match" not in server.requests[0][2]
+    assert server.requests[1][2]["If-None-Match"] == '"v1"'
+    assert web_fetch_cache_service.get_stats()["revalidated"] == 1
+
+
+def test_stale_response_is_revalidated_with_its_last_modified_date(handler, server, cache_settings):
+    _fetch(handler, server.base_url + "/last-modified", cacheTtlSeconds=300)
+    second = _fetch(handler, server.base_url + "/last-modified", cacheTtlSeconds=300, outputFormat="full")
+
+    payload = json.loads(second)
+    assert payload["status_code"] == 200
+    assert payload["body"] == "dated body"
+    assert payload["headers"]["Last-Modified"] == _LAST_MODIFIED
+    assert server.requests[1][2]["If-Modified-Since"] == _LAST_MODIFIED
+
+
+def test_no_store_response_is_not_cached(handler, server, cache_settings):
+    _fetch(handler, server.base_url + "/no-store", cacheTtlSeconds=300)
+    _fetch(handler, server.base_url + "/no-store", cacheTtlSeconds=300)
+
+    assert len(server.requests) == 2
+    assert web_fetch_cache_service.get_stats()["entries"] == 0
+
+
+def test_post_is_not_cached(handler, server, cache_settings):
+    _fetch(handler, server.base_url + "/fresh", method="POST", body="{}", cacheTtlSeconds=300)
+    _fetch(handler, server.base_url + "/fresh", method="POST", body="{}", cacheTtlSeconds=300)
+
+    assert len(server.requests) == 2
+
+
+def test_request_with_its_own_validator_bypasses_the_cache(handler, server, cache_settings):
+    result = _fetch(handler, server.base_url + "/etag", cacheTtlSeconds=300, headers={"If-None-Match": '"v1"'})
+
+    assert result == ""
+    assert web_fetch_cache_service.get_stats()["misses"] == 0
+
+
+def test_fresh_response_still_goes_through_the_address_guard(handler, server, cache_settings):
+    _fetch(handler, server.base_url + "/fresh", cacheTtlSeconds=300)
+
+    with pytest.raises(_AddressNotAllowedError):
+        _fetch(handler, server.base_url + "/fresh", cacheTtlSeconds=300, blockPrivateAddresses=True)
+    result = _fetch(handler, server.base_url + "/fresh", cacheTtlSeconds=300, blockPrivateAddresses=True,
+                    onError="return")
+    assert "loopback" in result
+    assert len(server.requests) == 1
+
+
+def test_fresh_response_still_honors_the_node_size_cap(handler, server, cache_settings):
+    _fetch(handler, server.base_url + "/fresh", cacheTtlSeconds=300)
+
+    with pytest.raises(_ResponseTooLargeError):
+        _fetch(handler, server.base_url + "/fresh", cacheTtlSeconds=300, maxResponseBytes=4)
+    assert len(server.requests) == 1
+
+
+def test_revalidated_response_still_honors_the_node_size_cap(handler, server, cache_settings):
+    _fetch(handler, server.base_url + "/etag", cacheTtlSeconds=300)
+
+    result = _fetch(handler, server.base_url + "/etag", cacheTtlSeconds=300, maxResponseBytes=4, onError="return")
+
+    assert "maxResponseBytes" in result
+    assert len(server.requests) == 2
+
+
+def test_redirect_setting_is_part_of_the_key(handler, server, cache_settings):
+    _fetch(handler, server.base_url + "/fresh", cacheTtlSeconds=300)
+    _fetch(handler, server.base_url + "/fresh", cacheTtlSeconds=300, allowRedirects=False)
+
+    assert len(server.requests) == 2
+
+
+def test_stripped_html_is_memoized_by_body(handler, server):
+    first = _fetch(handler, server.base_url + "/page.html", outputFormat="html-stripped")
+    second = _fetch(handler, server.base_url + "/page.html", outputFormat="html-stripped")
+
+    assert first == second == "Docs"
+    assert html_text_memo.get_stats()["hits"] == 1
+
+
+def test_stripped_html_is_not_memoized_for_encrypted_requests(handler, server, mocker):
+    mocker.patch(f"{MODULE}.is_encryption_active", return_value=True)
+
+    assert _fetch(handler, server.base_url + "/page.html", outputFormat="html-stripped") == "Docs"
+    assert html_text_memo.get_stats()["entries"] == 0
+
+
+@pytest.mark.parametrize("value", [-1, "60", True])
+def test_invalid_cache_ttl_raises(handler, value):
+    with pytest.raises(ValueError, match="cacheTtlSeconds"):
+        _fetch(handler, "http://example.com", cacheTtlSeconds=value)
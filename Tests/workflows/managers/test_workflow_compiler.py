@@ -0,0 +1,157 @@
+# Tests/workflows/managers/test_workflow_compiler.py
+
+import json
+import os
+
+import pytest
+
+from Middleware.workflows.managers import workflow_compiler as compiler_module
+from Middleware.workflows.managers.workflow_compiler import (
+    WorkflowCompiler,
+    compile_workflow,
+    find_agent_output_references,
+    find_responder_index,
+    workflow_compiler,
+)
+
+
+def _write(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return str(path)
+
+
+def _bump_mtime(path):
+    """Forces a distinct mtime so the test does not depend on filesystem timestamp resolution."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture(autouse=True)
+def no_endpoint_lookups(mocker):
+    """Endpoint validation reads user config; keep it off the user's machine."""
+    return mocker.patch.object(compiler_module, "try_get_endpoint_config", return_value={})
+
+
+class TestCompileWorkflow:
+    """Tests for compile_workflow and its analysis helpers."""
+
+    def test_dict_and_legacy_list_formats_compile_alike(self):
+        nodes = [{"type": "Standard", "title": "First"}, {"type": "Standard", "agentName": "Second"}]
+
+        from_dict = compile_workflow("wf", {"persona": "x", "nodes": nodes})
+        from_list = compile_workflow("wf", nodes)
+
+        for plan in (from_dict, from_list):
+            assert plan.node_count == 2
+            assert plan.node_names == ("First", "Second")
+            assert plan.responder_index == 1
+
+    def test_unknown_node_type_is_recorded_as_standard_and_warned(self, caplog):
+        plan = compile_workflow("wf", [{"type": "NotARealType"}])
+
+        assert plan.node_types == ("Standard",)
+        assert "not a valid node type" in caplog.text
+
+    def test_validate_false_skips_warnings_and_endpoint_checks(self, caplog, no_endpoint_lookups):
+        compile_workflow("wf", [{"type": "NotARealType", "endpointName": "Missing"}], validate=False)
+
+        assert "not a valid node type" not in caplog.text
+        no_endpoint_lookups.assert_not_called()
+
+    def test_missing_literal_endpoint_is_warned(self, caplog, no_endpoint_lookups):
+        no_endpoint_lookups.return_value = None
+
+        compile_workflow("wf", [{"endpointName": "Missing"}, {"endpointName": "{agent1Input}"}])
+
+        assert "endpoint 'Missing' was not found" in caplog.text
+        no_endpoint_lookups.assert_called_once_with("Missing")
+
+    @pytest.mark.parametrize("nodes, expected", [
+        ([], None),
+        ([{}, {}, {}], 2),
+        ([{}, {"is_responder": True}, {"is_responder": True}], 1),
+        ([{"returnToUser": True}, {}], 0),
+        ([{"is_responder": False, "returnToUser": True}, {}], 1),
+    ], ids=["empty", "last_node", "first_opt_in_wins", "legacy_alias", "is_responder_takes_precedence"])
+    def test_find_responder_index(self, nodes, expected):
+        assert find_responder_index(nodes) == expected
+
+    def test_find_agent_output_references_covers_jinja_statements_and_lookups(self):
+        node = {
+            "prompt": "{agent1Output}",
+            "systemPrompt": "{% if agent2Output == 'QUESTION' %}x{% endif %}",
+            "args": ["{{ agent_outputs.agent3Output }}", "{{ agent_outputs['agent4'] }}", "{{ agent_outputs.agent5 }}"],
+            "title": "agent10 notes about {agent6Input}",
+        }
+
+        assert find_agent_output_references(node) == {
+            "agent1Output", "agent2Output", "agent3Output", "agent4Output", "agent5Output"}
+
+    def test_timestamped_node_detection(self):
+        assert compile_workflow("wf", [{}, {"addDiscussionIdTimestampsForLLM": True}]).has_timestamped_node
+        assert not compile_workflow("wf", [{}]).has_timestamped_node
+
+    def test_instantiate_returns_independent_mutable_copies(self, tmp_path):
+        path = _write(tmp_path / "wf.json", {"nodes": [{"prompt": "a"}]})
+        plan = workflow_compiler.get(path)
+
+        settings, nodes = plan.instantiate()
+        nodes[0]["prompt"] = "changed"
+        _, fresh_nodes = plan.instantiate()
+
+        assert settings["nodes"] is nodes
+        assert fresh_nodes[0]["prompt"] == "a"
+
+
+class TestWorkflowCompiler:
+    """Tests for the process-wide compiled workflow cache."""
+
+    def setup_method(self):
+        workflow_compiler.clear()
+
+    def teardown_method(self):
+        workflow_compiler.clear()
+
+    def test_singleton_pattern(self):
+        assert WorkflowCompiler() is WorkflowCompiler()
+        assert workflow_compiler is WorkflowCompiler()
+
+    def test_unchanged_file_is_compiled_once(self, tmp_path, mocker):
+        path = _write(tmp_path / "wf.json", [{"title": "Only"}])
+        spy = mocker.spy(compiler_module, "compile_workflow")
+
+        first = workflow_compiler.get(path)
+        second = workflow_compiler.get(path)
+
+        assert first is second
+        assert first.name == "wf"
+        assert spy.call_count == 1
+        assert workflow_compiler.get_stats() == {"hits": 1, "compiles": 1, "entries": 1}
+
+    def test_changed_file_is_recompiled(self, tmp_path):
+        path = _write(tmp_path / "wf.json", [{"title": "Old"}])
+        assert workflow_compiler.get(path).node_names == ("Old",)
+
+        _write(tmp_path / "wf.json", [{"title": "New"}, {"title": "Added"}])
+        _bump_mtime(path)
+
+        assert workflow_compiler.get(path).node_names == ("New", "Added")
+        assert workflow_compiler.get_stats()["compiles"] == 2
+
+    def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            workflow_compiler.get(str(tmp_path / "missing.json"))
+        assert workflow_compiler.get_stats()["entries"] == 0
+
+    def test_precompile_directory_compiles_json_files_and_skips_bad_ones(self, tmp_path, caplog):
+        (tmp_path / "user").mkdir()
+        good = _write(tmp_path / "user" / "good.json", [{}])
+        _write(tmp_path / "shared.json", {"nodes": []})
+        (tmp_path / "notes.txt").write_text("ignored", encoding="utf-8")
+        (tmp_path / "user" / "bad.json").write_text("{not json", encoding="utf-8")
+
+        assert workflow_compiler.precompile_directory(str(tmp_path)) == 2
+        assert "Could not precompile workflow" in caplog.text
+
+        workflow_compiler.get(good)
+        assert workflow_compiler.get_stats()["hits"] == 1
@@ -18,6 +18,15 @@ def _hermetic_chat_template_name(mocker):
         return_value='fake_template')
 
 
+@pytest.fixture(autouse=True)
+def _hermetic_locking_service(mocker, tmp_path):
+    """WorkflowProcessor opens the per-user lock database in its constructor; point it
+    at tmp_path so these tests never write a WilmerDb file under the real Public/."""
+    mocker.patch(
+        'Middleware.services.locking_service.config_utils.get_custom_dblite_filepath',
+        return_value=str(tmp_path))
+
+
 @pytest.fixture
 def setup_cancellation_service():
     """Clear cancellation service before each test."""
@@ -5,6 +5,7 @@ import pytest
 
 from Middleware.exceptions.early_termination_exception import EarlyTerminationException
 from Middleware.services.llm_service import LlmHandlerService
+from Middleware.services.metrics_service import metrics_service
 from Middleware.workflows.managers.workflow_variable_manager import WorkflowVariableManager
 from Middleware.workflows.models.execution_context import ExecutionContext, NodeExecutionInfo
 from Middleware.workflows.processors.workflows_processor import WorkflowProcessor
@@ -197,6 +198,31 @@ class TestWorkflowProcessorExecution:
         context2 = mock_node_handlers["StaticResponse"].handle.call_args[0][0]
         assert context2.stream is False  # The processor's stream flag is False
 
+    def test_execute_uses_supplied_workflow_plan(self, workflow_processor_factory, mock_node_handlers):
+        """A precompiled plan describing the configs decides the responder and
+        node names without being recompiled."""
+        from Middleware.workflows.managers.workflow_compiler import compile_workflow
+        config = [{"type": "Standard", "title": "N1", "returnToUser": True}, {"type": "Standard", "title": "N2"}]
+        mock_node_handlers["Standard"].handle.side_effect = ["Out1", "Out2"]
+        processor = workflow_processor_factory(configs=config)
+        plan = compile_workflow("TestWorkflow", config, validate=False)
+        processor.workflow_plan = plan
+
+        assert list(processor.execute()) == ["Out1"]
+        assert processor.workflow_plan is plan
+
+    def test_execute_recompiles_plan_that_does_not_match_configs(self, workflow_processor_factory,
+                                                                 mock_node_handlers):
+        """A plan whose node count differs from the configs is replaced, not trusted."""
+        from Middleware.workflows.managers.workflow_compiler import compile_workflow
+        config = [{"type": "Standard"}, {"type": "Standard"}]
+        mock_node_handlers["Standard"].handle.side_effect = ["Out1", "Out2"]
+        processor = workflow_processor_factory(configs=config)
+        processor.workflow_plan = compile_workflow("TestWorkflow", [{}], validate=False)
+
+        assert list(processor.execute()) == ["Out2"]
+        assert processor.workflow_plan.node_count == 2
+
     def test_execute_prompt_overrides(self, workflow_processor_factory, mock_node_handlers):
         """Verifies that prompt overrides are applied to the first node with a prompt field."""
         config = [
@@ -428,7 +454,8 @@ class TestEndpointAndPresetVariableSubstitution:
         mock_workflow_variable_service.apply_early_variables.assert_not_called()
         # The endpoint and preset should be used directly
         mock_llm_handler_service.load_model_from_config.assert_called_once_with(
-            "HardcodedEndpoint", "HardcodedPreset", False, 4096, 400, addGenerationPrompt=ANY
+            "HardcodedEndpoint", "HardcodedPreset", False, 4096, 400, addGenerationPrompt=ANY,
+            cache_responses=False, cache_api_key_hash=None
         )
 
     def test_hardcoded_endpoint_variable_preset(self, workflow_processor_factory, mock_node_handlers,
@@ -449,7 +476,8 @@ class TestEndpointAndPresetVariableSubstitution:
 
         # The hardcoded endpoint with resolved preset should be used
         mock_llm_handler_service.load_model_from_config.assert_called_once_with(
-            "HardcodedEndpoint", "DynamicPreset", False, 4096, 400, addGenerationPrompt=ANY
+            "HardcodedEndpoint", "DynamicPreset", False, 4096, 400, addGenerationPrompt=ANY,
+            cache_responses=False, cache_api_key_hash=None
         )
 
     def test_endpoint_with_agent_input_variable(self, workflow_processor_factory, mock_node_handlers,
@@ -476,7 +504,8 @@ class TestEndpointAndPresetVariableSubstitution:
 
         # The resolved endpoint should be used
         mock_llm_handler_service.load_model_from_config.assert_called_once_with(
-            "ResolvedEndpoint", "DefaultPreset", False, 4096, 400, addGenerationPrompt=ANY
+            "ResolvedEndpoint", "DefaultPreset", False, 4096, 400, addGenerationPrompt=ANY,
+            cache_responses=False, cache_api_key_hash=None
         )
 
     def test_endpoint_with_workflow_config_variable(self, workflow_processor_factory, mock_node_handlers,
@@ -501,7 +530,8 @@ class TestEndpointAndPresetVariableSubstitution:
 
         # The resolved endpoint should be used
         mock_llm_handler_service.load_model_from_config.assert_called_once_with(
-            "value_endpoint", "DefaultPreset", False, 4096, 400, addGenerationPrompt=ANY
+            "value_endpoint", "DefaultPreset", False, 4096, 400, addGenerationPrompt=ANY,
+            cache_responses=False, cache_api_key_hash=None
         )
 
     def test_hardcoded_preset_no_variables(self, workflow_processor_factory, mock_node_handlers,
@@ -526,7 +556,8 @@ class TestEndpointAndPresetVariableSubstitution:
 
         # The hardcoded preset should be used directly
         mock_llm_handler_service.load_model_from_config.assert_called_once_with(
-            "DynamicEndpoint", "HardcodedPreset", False, 4096, 400, addGenerationPrompt=ANY
+            "DynamicEndpoint", "HardcodedPreset", False, 4096, 400, addGenerationPrompt=ANY,
+            cache_responses=False, cache_api_key_hash=None
         )
 
     def test_preset_with_variables(self, workflow_processor_factory, mock_node_handlers,
@@ -548,7 +579,8 @@ class TestEndpointAndPresetVariableSubstitution:
 
         # The resolved preset should be used
         mock_llm_handler_service.load_model_from_config.assert_called_once_with(
-            "MyEndpoint", "Dynamic_preset", False, 4096, 400, addGenerationPrompt=ANY
+            "MyEndpoint", "Dynamic_preset", False, 4096, 400, addGenerationPrompt=ANY,
+            cache_responses=False, cache_api_key_hash=None
         )
 
     def test_both_endpoint_and_preset_with_variables(self, workflow_processor_factory, mock_node_handlers,
@@ -581,7 +613,8 @@ class TestEndpointAndPresetVariableSubstitution:
 
         # Both resolved values should be used
         mock_llm_handler_service.load_model_from_config.assert_called_once_with(
-            "DynamicEndpoint", "DynamicPreset", False, 4096, 400, addGenerationPrompt=ANY
+            "DynamicEndpoint", "DynamicPreset", False, 4096, 400, addGenerationPrompt=ANY,
+            cache_responses=False, cache_api_key_hash=None
         )
 
     def test_mixed_hardcoded_and_variable_presets(self, workflow_processor_factory, mock_node_handlers,
@@ -603,7 +636,8 @@ class TestEndpointAndPresetVariableSubstitution:
 
         # Resolved endpoint with static preset
         mock_llm_handler_service.load_model_from_config.assert_called_once_with(
-            "ResolvedEndpoint", "StaticPreset", False, 4096, 400, addGenerationPrompt=ANY
+            "ResolvedEndpoint", "StaticPreset", False, 4096, 400, addGenerationPrompt=ANY,
+            cache_responses=False, cache_api_key_hash=None
         )
 
     def test_jinja2_template_in_endpoint(self, workflow_processor_factory, mock_node_handlers,
@@ -625,7 +659,8 @@ class TestEndpointAndPresetVariableSubstitution:
         assert len(jinja_calls) >= 1
 
         mock_llm_handler_service.load_model_from_config.assert_called_once_with(
-            "FastEndpoint", "DefaultPreset", False, 4096, 400, addGenerationPrompt=ANY
+            "FastEndpoint", "DefaultPreset", False, 4096, 400, addGenerationPrompt=ANY,
+            cache_responses=False, cache_api_key_hash=None
         )
 
     def test_missing_endpoint_fallback(self, workflow_processor_factory, mock_node_handlers):
@@ -720,7 +755,8 @@ class TestEndpointAndPresetVariableSubstitution:
         # Should not trigger substitution
         mock_workflow_variable_service.apply_early_variables.assert_not_called()
         mock_llm_handler_service.load_model_from_config.assert_called_once_with(
-            "endpoint-with-dash_and_underscore.v1", "preset@2", False, 4096, 400, addGenerationPrompt=ANY
+            "endpoint-with-dash_and_underscore.v1", "preset@2", False, 4096, 400, addGenerationPrompt=ANY,
+            cache_responses=False, cache_api_key_hash=None
         )
 
     @patch('Middleware.workflows.processors.workflows_processor.StreamingResponseHandler')
@@ -929,6 +965,23 @@ class TestNodeExecutionLogging:
         assert [i.node_type for i in infos] == ["Standard", "Standard", "Tool"]
         assert [i.node_name for i in infos] == ["First Node", "Second Agent", "N/A"]
 
+    @patch('Middleware.workflows.processors.workflows_processor.VALID_NODE_TYPES', MOCK_VALID_TYPES)
+    def test_node_execution_time_is_recorded_as_a_metric(self, workflow_processor_factory, mock_node_handlers,
+                                                         mock_workflow_variable_service):
+        """Verifies that each node's execution time lands in the node histogram,
+        labelled by node type and workflow."""
+        config = [{"type": "Standard", "title": "A"}, {"type": "Standard", "title": "B"}, {"type": "Tool"}]
+        mock_node_handlers["Standard"].handle.return_value = "Response"
+        mock_node_handlers["Tool"].handle.return_value = "ToolResponse"
+
+        processor = workflow_processor_factory(configs=config, stream=False)
+        list(processor.execute())
+
+        text = metrics_service.render_prometheus()
+        workflow = processor.workflow_config_name
+        assert f'wilmer_node_execution_seconds_count{{node_type="Standard",workflow="{workflow}"}} 2' in text
+        assert f'wilmer_node_execution_seconds_count{{node_type="Tool",workflow="{workflow}"}} 1' in text
+
     @patch('Middleware.workflows.processors.workflows_processor.VALID_NODE_TYPES', MOCK_VALID_TYPES)
     def test_get_node_name_prefers_title(self, workflow_processor_factory, mock_node_handlers):
         """Verifies that _get_node_name prefers 'title' over 'agentName'."""
@@ -1072,7 +1125,8 @@ class TestMaxResponseSizeVariableSubstitution:
         # Should NOT call apply_early_variables for maxResponseSizeInTokens (it's an int, not a string with vars)
         # The value should be passed directly
         mock_llm_handler_service.load_model_from_config.assert_called_once_with(
-            "TestEndpoint", None, False, 4096, 8000, addGenerationPrompt=ANY
+            "TestEndpoint", None, False, 4096, 8000, addGenerationPrompt=ANY,
+            cache_responses=False, cache_api_key_hash=None
         )
 
     def test_string_variable_is_substituted_and_converted(self, workflow_processor_factory, mock_node_handlers,
@@ -1093,7 +1147,8 @@ class TestMaxResponseSizeVariableSubstitution:
 
         # The resolved and converted value should be used
         mock_llm_handler_service.load_model_from_config.assert_called_once_with(
-            "TestEndpoint", None, False, 4096, 5000, addGenerationPrompt=ANY
+            "TestEndpoint", None, False, 4096, 5000, addGenerationPrompt=ANY,
+            cache_responses=False, cache_api_key_hash=None
         )
 
     def test_invalid_string_falls_back_to_default(self, workflow_processor_factory, mock_node_handlers,
@@ -1109,7 +1164,8 @@ class TestMaxResponseSizeVariableSubstitution:
 
         # Should fall back to default 400
         mock_llm_handler_service.load_model_from_config.assert_called_once_with(
-            "TestEndpoint", None, False, 4096, 400, addGenerationPrompt=ANY
+            "TestEndpoint", None, False, 4096, 400, addGenerationPrompt=ANY,
+            cache_responses=False, cache_api_key_hash=None
         )
         # Should log a warning
         assert "'maxResponseSizeInTokens' resolved to non-integer value" in caplog.text
@@ -1124,7 +1180,8 @@ class TestMaxResponseSizeVariableSubstitution:
         list(processor.execute())
 
         mock_llm_handler_service.load_model_from_config.assert_called_once_with(
-            "TestEndpoint", None, False, 4096, 400, addGenerationPrompt=ANY
+            "TestEndpoint", None, False, 4096, 400, addGenerationPrompt=ANY,
+            cache_responses=False, cache_api_key_hash=None
         )
 
     def test_string_without_variables_is_converted(self, workflow_processor_factory, mock_node_handlers,
@@ -1139,7 +1196,8 @@ class TestMaxResponseSizeVariableSubstitution:
         # No variable substitution needed (no { or {{ in string)
         # But still converts string to int
         mock_llm_handler_service.load_model_from_config.assert_called_once_with(
-            "TestEndpoint", None, False, 4096, 3000, addGenerationPrompt=ANY
+            "TestEndpoint", None, False, 4096, 3000, addGenerationPrompt=ANY,
+            cache_responses=False, cache_api_key_hash=None
         )
 
     def test_combined_with_endpoint_and_preset_variables(self, workflow_processor_factory, mock_node_handlers,
@@ -1165,7 +1223,8 @@ class TestMaxResponseSizeVariableSubstitution:
 
         # All three should be resolved
         mock_llm_handler_service.load_model_from_config.assert_called_once_with(
-            "ResolvedEndpoint", "ResolvedPreset", False, 4096, 6000, addGenerationPrompt=ANY
+            "ResolvedEndpoint", "ResolvedPreset", False, 4096, 6000, addGenerationPrompt=ANY,
+            cache_responses=False, cache_api_key_hash=None
         )
 
 
@@ -1390,6 +1449,51 @@ class TestAddGenerationPromptDerivation:
         assert call.kwargs["addGenerationPrompt"] is expected
 
 
+class TestCacheResponses:
+    """Pins when a node's cacheResponses flag turns on the LLM response cache."""
+
+    @pytest.mark.parametrize("node_flags, stream, expected", [
+        ({"cacheResponses": True}, False, True),
+        # A streaming responder never uses the cache.
+        ({"cacheResponses": True}, True, False),
+        ({}, False, False),
+        ({"cacheResponses": False}, False, False),
+    ])
+    def test_cache_responses_passed_to_handler(self, workflow_processor_factory, mock_node_handlers,
+                                               mock_llm_handler_service, node_flags, stream, expected):
+        mock_node_handlers["Standard"].handle.return_value = "resp"
+        processor = workflow_processor_factory(
+            configs=[{"type": "Standard", "endpointName": "EP", **node_flags}], stream=stream)
+
+        list(processor.execute())
+
+        kwargs = mock_llm_handler_service.load_model_from_config.call_args.kwargs
+        assert kwargs["cache_responses"] is expected
+
+    def test_non_responder_caches_while_workflow_streams(self, workflow_processor_factory, mock_node_handlers,
+                                                        mock_llm_handler_service):
+        mock_node_handlers["Standard"].handle.return_value = "resp"
+        processor = workflow_processor_factory(
+            configs=[{"type": "Standard", "endpointName": "EP", "cacheResponses": True}, {"type": "Standard"}],
+            stream=True)
+
+        list(processor.execute())
+
+        assert mock_llm_handler_service.load_model_from_config.call_args.kwargs["cache_responses"] is True
+
+    def test_cache_is_scoped_to_the_request_api_key(self, workflow_processor_factory, mock_node_handlers,
+                                                   mock_llm_handler_service):
+        mock_node_handlers["Standard"].handle.return_value = "resp"
+        processor = workflow_processor_factory(
+            configs=[{"type": "Standard", "endpointName": "EP", "cacheResponses": True}], stream=False,
+            api_key="secret")
+
+        list(processor.execute())
+
+        kwargs = mock_llm_handler_service.load_model_from_config.call_args.kwargs
+        assert kwargs["cache_api_key_hash"] == processor.api_key_hash is not None
+
+
 class TestPostProcessLlmOutput:
     """Tests the post_process_llm_output call on non-streaming node results.
     Note the mock_processor_utils fixture identity-mocks the function; tests
@@ -1763,7 +1867,8 @@ class TestNumericConfigFieldResolution:
         list(processor.execute())
 
         mock_llm_handler_service.load_model_from_config.assert_called_once_with(
-            "EP", None, False, 4096, 5000, addGenerationPrompt=ANY
+            "EP", None, False, 4096, 5000, addGenerationPrompt=ANY,
+            cache_responses=False, cache_api_key_hash=None
         )
         context = mock_node_handlers["Standard"].handle.call_args[0][0]
         assert context.config["maxResponseSizeInTokens"] == 5000
@@ -1783,3 +1888,235 @@ class TestNumericConfigFieldResolution:
         assert "no default is available" in caplog.text
         context = mock_node_handlers["Standard"].handle.call_args[0][0]
         assert context.config["maxTurnsToPull"] == "abc"
+
+
+class TestParallelNodeExecution:
+    """Tests for the opt-in 'parallelNodeExecution' workflow mode."""
+
+    @staticmethod
+    def _parallel_processor(factory, configs, **kwargs):
+        processor = factory(configs=configs, **kwargs)
+        processor.workflow_file_config["parallelNodeExecution"] = True
+        return processor
+
+    def test_independent_pre_responder_nodes_run_concurrently(self, workflow_processor_factory,
+                                                             mock_node_handlers):
+        """Two nodes that do not reference each other overlap; sequential execution
+        would leave the barrier waiting and break it."""
+        import threading
+        barrier = threading.Barrier(2, timeout=5)
+
+        def handle(context):
+            if context.config.get("title") in ("A", "B"):
+                barrier.wait()
+            return f"out-{context.config.get('title')}"
+
+        mock_node_handlers["Standard"].handle.side_effect = handle
+        configs = [{"type": "Standard", "title": "A"}, {"type": "Standard", "title": "B"},
+                   {"type": "Standard", "title": "R"}]
+        processor = self._parallel_processor(workflow_processor_factory, configs)
+
+        assert list(processor.execute()) == ["out-R"]
+        responder_context = mock_node_handlers["Standard"].handle.call_args[0][0]
+        assert responder_context.agent_outputs["agent1Output"] == "out-A"
+        assert responder_context.agent_outputs["agent2Output"] == "out-B"
+
+    def test_dependent_node_waits_for_referenced_output(self, workflow_processor_factory, mock_node_handlers):
+        """A node referencing {agent1Output} starts only after node 1 finished."""
+        seen = {}
+
+        def handle(context):
+            title = context.config["title"]
+            seen[title] = dict(context.agent_outputs)
+            return f"out-{title}"
+
+        mock_node_handlers["Standard"].handle.side_effect = handle
+        configs = [{"type": "Standard", "title": "A"},
+                   {"type": "Standard", "title": "B", "prompt": "Use {agent1Output}"},
+                   {"type": "Standard", "title": "R"}]
+        processor = self._parallel_processor(workflow_processor_factory, configs)
+
+        list(processor.execute())
+
+        assert seen["B"]["agent1Output"] == "out-A"
+        assert seen["R"]["agent2Output"] == "out-B"
+
+    def test_sequential_by_default(self, workflow_processor_factory, mock_node_handlers):
+        """Without the workflow-level opt-in, every node runs on the calling thread."""
+        import threading
+        threads = []
+        mock_node_handlers["Standard"].handle.side_effect = \
+            lambda context: threads.append(threading.get_ident()) or "out"
+        processor = workflow_processor_factory(configs=[{"type": "Standard"}] * 3)
+
+        list(processor.execute())
+
+        assert threads == [threading.get_ident()] * 3
+
+    def test_execution_summary_stays_in_step_order(self, workflow_processor_factory, mock_node_handlers, mocker):
+        mock_node_handlers["Standard"].handle.return_value = "out"
+        log_summary = mocker.patch.object(WorkflowProcessor, "_log_node_execution_summary")
+        configs = [{"type": "Standard", "title": str(i)} for i in range(4)]
+        processor = self._parallel_processor(workflow_processor_factory, configs)
+
+        list(processor.execute())
+
+        infos = log_summary.call_args[0][0]
+        assert [info.node_index for info in infos] == [1, 2, 3, 4]
+
+    def test_failure_raises_lowest_step_error_and_skips_unstarted_nodes(self, workflow_processor_factory,
+                                                                       mock_node_handlers):
+        def handle(context):
+            title = context.config["title"]
+            if title in ("A", "B"):
+                raise RuntimeError(f"boom-{title}")
+            return "out"
+
+        mock_node_handlers["Standard"].handle.side_effect = handle
+        configs = [{"type": "Standard", "title": "A"}, {"type": "Standard", "title": "B"},
+                   {"type": "Standard", "title": "C", "prompt": "{agent1Output}"},
+                   {"type": "Standard", "title": "R"}]
+        processor = self._parallel_processor(workflow_processor_factory, configs)
+
+        with pytest.raises(RuntimeError, match="boom-A"):
+            list(processor.execute())
+        titles = [c[0][0].config["title"] for c in mock_node_handlers["Standard"].handle.call_args_list]
+        assert "C" not in titles and "R" not in titles
+
+    def test_cancellation_stops_scheduling(self, workflow_processor_factory, mock_node_handlers):
+        from Middleware.services.cancellation_service import cancellation_service
+
+        def handle(context):
+            cancellation_service.request_cancellation("req-123")
+            return "out"
+
+        mock_node_handlers["Standard"].handle.side_effect = handle
+        configs = [{"type": "Standard", "title": "A"},
+                   {"type": "Standard", "title": "B", "prompt": "{agent1Output}"},
+                   {"type": "Standard", "title": "R"}]
+        processor = self._parallel_processor(workflow_processor_factory, configs)
+
+        with pytest.raises(EarlyTerminationException):
+            list(processor.execute())
+        assert mock_node_handlers["Standard"].handle.call_count == 1
+        assert not cancellation_service.is_cancelled("req-123")
+
+    def test_request_context_is_carried_to_pool_threads(self, workflow_processor_factory, mock_node_handlers):
+        from Middleware.common import instance_global_variables
+        seen_users = []
+        mock_node_handlers["Standard"].handle.side_effect = \
+            lambda context: seen_users.append(instance_global_variables.get_request_user()) or "out"
+        processor = self._parallel_processor(workflow_processor_factory, [{"type": "Standard"}] * 3)
+        instance_global_variables.set_request_user("alice")
+        try:
+            list(processor.execute())
+        finally:
+            instance_global_variables.clear_request_user()
+
+        assert seen_users == ["alice"] * 3
+
+    def test_dependencies_honor_barriers_and_overrides(self, workflow_processor_factory):
+        from Middleware.workflows.managers.workflow_compiler import compile_workflow
+        configs = [{"type": "Standard"},
+                   {"type": "Standard", "prompt": "{agent1Output}"},
+                   {"type": "WorkflowLock"},
+                   {"type": "Standard"},
+                   {"type": "Standard"}]
+        processor = workflow_processor_factory(configs=configs)
+        plan = compile_workflow("wf", configs, validate=False)
+
+        dependencies = processor._build_node_dependencies(plan, 5, {3: frozenset({"agent2Output"})})
+
+        assert dependencies == [set(), {0}, {0, 1}, {1, 2}, {2}]
+
+    def test_dependencies_follow_jinja_references(self, workflow_processor_factory):
+        from Middleware.workflows.managers.workflow_compiler import compile_workflow
+        configs = [{"type": "Standard"},
+                   {"type": "Standard"},
+                   {"type": "Standard", "jinja2": True, "prompt": "{% if agent1Output %}{{ agent_outputs.agent2 }}{% endif %}"}]
+        processor = workflow_processor_factory(configs=configs)
+        plan = compile_workflow("wf", configs, validate=False)
+
+        assert processor._build_node_dependencies(plan, 3, {}) == [set(), set(), {0, 1}]
+
+    def test_stateful_node_types_are_barriers_unless_overridden(self, workflow_processor_factory):
+        from Middleware.workflows.managers.workflow_compiler import compile_workflow
+        configs = [{"type": "SaveCustomFile"},
+                   {"type": "GetCustomFile"},
+                   {"type": "Standard"},
+                   {"type": "QualityMemory", "parallelBarrier": False},
+                   {"type": "WebFetch", "parallelBarrier": True},
+                   {"type": "Standard"}]
+        processor = workflow_processor_factory(configs=configs)
+        plan = compile_workflow("wf", configs, validate=False)
+
+        dependencies = processor._build_node_dependencies(plan, 6, {})
+
+        assert dependencies == [set(), {0}, {0}, {0}, {0, 1, 2, 3}, {4}]
+
+    def test_image_processor_adding_user_message_is_seen_by_later_nodes(self, workflow_processor_factory,
+                                                                        mock_node_handlers, mocker):
+        """An ImageProcessor with addAsUserMessage inserts into the shared messages,
+        so a later node that does not reference its output still waits for it."""
+        import time
+        seen = {}
+
+        def handle_image(context):
+            time.sleep(0.05)
+            context.messages.insert(-1, {"role": "user", "content": "image description"})
+            return "described"
+
+        def handle(context):
+            seen[context.config["title"]] = [m["content"] for m in context.messages]
+            return "out"
+
+        mocker.patch('Middleware.workflows.processors.workflows_processor.VALID_NODE_TYPES',
+                     MOCK_VALID_TYPES + ["ImageProcessor"])
+        mock_node_handlers["ImageProcessor"] = Mock(name="ImageProcessorHandler")
+        mock_node_handlers["ImageProcessor"].handle.side_effect = handle_image
+        mock_node_handlers["Standard"].handle.side_effect = handle
+        configs = [{"type": "ImageProcessor", "addAsUserMessage": True},
+                   {"type": "Standard", "title": "lookup"},
+                   {"type": "Standard", "title": "R"}]
+        processor = self._parallel_processor(workflow_processor_factory, configs)
+
+        list(processor.execute())
+
+        assert seen["lookup"] == ["image description", "hello"]
+
+    def test_image_processor_is_barrier_only_when_adding_user_message(self, workflow_processor_factory):
+        configs = [{"type": "ImageProcessor", "addAsUserMessage": True},
+                   {"type": "ImageProcessor"},
+                   {"type": "ImageProcessor", "addAsUserMessage": True, "parallelBarrier": False}]
+        processor = workflow_processor_factory(configs=configs)
+
+        assert [processor._is_parallel_barrier(c["type"], c) for c in configs] == [True, False, False]
+
+    def test_read_only_lookups_run_alongside_each_other(self, workflow_processor_factory):
+        from Middleware.workflows.managers.workflow_compiler import compile_workflow
+        configs = [{"type": "VectorMemorySearch"},
+                   {"type": "GetCurrentMemoryFromFile"},
+                   {"type": "GetCurrentSummaryFromFile"},
+                   {"type": "MemoryKeywordSearchPerformerTool"},
+                   {"type": "GetCurrentStateDocument", "parallelBarrier": True},
+                   {"type": "ConversationalKeywordSearchPerformerTool"}]
+        processor = workflow_processor_factory(configs=configs)
+        plan = compile_workflow("wf", configs, validate=False)
+
+        dependencies = processor._build_node_dependencies(plan, 6, {})
+
+        assert dependencies == [set(), set(), set(), set(), {0, 1, 2, 3}, {4}]
+
+    @pytest.mark.parametrize("settings, expected", [
+        ({}, 0),
+        ({"parallelNodeExecution": "true"}, 0),
+        ({"parallelNodeExecution": True}, WorkflowProcessor._DEFAULT_MAX_PARALLEL_NODES),
+        ({"parallelNodeExecution": True, "maxParallelNodes": "2"}, 2),
+        ({"parallelNodeExecution": True, "maxParallelNodes": 0}, 1),
+        ({"parallelNodeExecution": True, "maxParallelNodes": "many"}, WorkflowProcessor._DEFAULT_MAX_PARALLEL_NODES),
+    ])
+    def test_parallel_worker_count(self, workflow_processor_factory, settings, expected):
+        processor = workflow_processor_factory(configs=[{}])
+        processor.workflow_file_config = settings
+
+        assert processor._get_parallel_worker_count() == expected
@@ -0,0 +1,276 @@
+# Tests/workflows/tools/test_mcp_client_tool_session_pool.py
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import anyio
+import pytest
+
+from Middleware.workflows.tools import mcp_client_tool
+from Middleware.workflows.tools.mcp_client_tool import MCPClient, MCPToolCallError, mcp_session_pool
+
+KEEP_ALIVE_CONFIG = {"transport": "stdio", "command": "fake", "keepAlive": True}
+
+
+class _Transports:
+    """Records how many transports were opened and how many have been closed again."""
+
+    def __init__(self):
+        self.opened = 0
+        self.closed = 0
+
+    def connect(self):
+        @asynccontextmanager
+        async def fake_connect_streams(server_config, server_name, timeout):
+            self.opened += 1
+            try:
+                yield MagicMock(name="read"), MagicMock(name="write")
+            finally:
+                self.closed += 1
+
+        return fake_connect_streams
+
+
+class _PoolSession:
+    """Stand-in for `mcp.ClientSession` with per-test behavior hooks on the class."""
+
+    call_behavior = None
+    ping_behavior = None
+    initialize_behavior = None
+    active_calls = 0
+    max_active_calls = 0
+    list_calls = 0
+
+    def __init__(self, read_stream, write_stream):
+        self.initialized = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def initialize(self):
+        if _PoolSession.initialize_behavior is not None:
+            await _PoolSession.initialize_behavior()
+        self.initialized = True
+
+    async def send_ping(self):
+        if _PoolSession.ping_behavior is not None:
+            await _PoolSession.ping_behavior()
+
+    async def list_tools(self):
+        _PoolSession.list_calls += 1
+        return SimpleNamespace(tools=[SimpleNamespace(name="ping", description="Ping", inputSchema=None)])
+
+    async def call_tool(self, name, arguments=None, read_timeout_seconds=None):
+        assert self.initialized, "call_tool called before initialize()"
+        _PoolSession.active_calls += 1
+        _PoolSession.max_active_calls = max(_PoolSession.max_active_calls, _PoolSession.active_calls)
+        try:
+            if _PoolSession.call_behavior is not None:
+                return await _PoolSession.call_behavior(name)
+            return SimpleNamespace(structuredContent=None, content=[SimpleNamespace(text=f"{name}:{id(self)}")],
+                                   isError=False)
+        finally:
+            _PoolSession.active_calls -= 1
+
+
+@pytest.fixture
+def transports(mocker):
+    import mcp
+
+    for hook in ("call_behavior", "ping_behavior", "initialize_behavior"):
+        setattr(_PoolSession, hook, None)
+    _PoolSession.active_calls = _PoolSession.max_active_calls = _PoolSession.list_calls = 0
+    recorder = _Transports()
+    mocker.patch.object(mcp_client_tool, "_connect_streams", recorder.connect())
+    mocker.patch.object(mcp, "ClientSession", _PoolSession)
+    return recorder
+
+
+def _use_config(mocker, config):
+    return mocker.patch(
+        "Middleware.workflows.tools.mcp_client_tool.load_mcp_server_config", return_value=dict(config)
+    )
+
+
+def test_keep_alive_server_reuses_one_session(mocker, transports):
+    _use_config(mocker, KEEP_ALIVE_CONFIG)
+    client = MCPClient()
+
+    first = client.call_tool("srv", "ping", {})
+    second = client.call_tool("srv", "ping", {})
+
+    assert first == second
+    assert transports.opened == 1
+    stats = mcp_session_pool.get_stats()
+    assert (stats["opened"], stats["reused"], stats["idle"]) == (1, 1, 1)
+
+
+def test_server_without_keep_alive_does_not_use_the_pool(mocker, transports):
+    _use_config(mocker, {"transport": "stdio", "command": "fake"})
+
+    MCPClient().call_tool("srv", "ping", {})
+    MCPClient().call_tool("srv", "ping", {})
+
+    assert transports.opened == 2
+    assert transports.closed == 2
+    assert mcp_session_pool.get_stats()["opened"] == 0
+
+
+def test_tool_error_keeps_the_session(mocker, transports):
+    _use_config(mocker, KEEP_ALIVE_CONFIG)
+
+    async def tool_error(name):
+        return SimpleNamespace(structuredContent=None, content=[SimpleNamespace(text="bad input")], isError=True)
+
+    _PoolSession.call_behavior = tool_error
+    with pytest.raises(MCPToolCallError, match="bad input"):
+        MCPClient().call_tool("srv", "ping", {})
+    _PoolSession.call_behavior = None
+    MCPClient().call_tool("srv", "ping", {})
+
+    assert transports.opened == 1
+    assert mcp_session_pool.get_stats()["discarded"] == 0
+
+
+def test_failed_call_discards_the_session(mocker, transports):
+    _use_config(mocker, KEEP_ALIVE_CONFIG)
+
+    async def protocol_failure(name):
+        raise RuntimeError("connection reset")
+
+    _PoolSession.call_behavior = protocol_failure
+    with pytest.raises(MCPToolCallError, match="connection reset"):
+        MCPClient().call_tool("srv", "ping", {})
+    _PoolSession.call_behavior = None
+    MCPClient().call_tool("srv", "ping", {})
+
+    assert transports.opened == 2
+    assert mcp_session_pool.get_stats()["discarded"] == 1
+
+
+def test_closed_session_is_retried_once_on_a_new_session(mocker, transports):
+    _use_config(mocker, KEEP_ALIVE_CONFIG)
+    MCPClient().call_tool("srv", "ping", {})
+    failures = iter([anyio.ClosedResourceError()])
+
+    async def closed_once(name):
+        error = next(failures, None)
+        if error is not None:
+            raise error
+        return SimpleNamespace(structuredContent=None, content=[SimpleNamespace(text="ok")], isError=False)
+
+    _PoolSession.call_behavior = closed_once
+
+    assert MCPClient().call_tool("srv", "ping", {}) == "ok"
+    assert transports.opened == 2
+
+
+def test_idle_session_failing_its_health_check_is_replaced(mocker, monkeypatch, transports):
+    _use_config(mocker, KEEP_ALIVE_CONFIG)
+    monkeypatch.setattr(mcp_client_tool, "HEALTH_CHECK_AFTER_SECONDS", 0)
+    MCPClient().call_tool("srv", "ping", {})
+
+    async def dead_server():
+        raise ConnectionError("server exited")
+
+    _PoolSession.ping_behavior = dead_server
+    MCPClient().call_tool("srv", "ping", {})
+
+    assert transports.opened == 2
+    assert mcp_session_pool.get_stats()["health_check_failures"] == 1
+
+
+def test_max_sessions_limits_concurrent_calls(mocker, transports):
+    _use_config(mocker, {**KEEP_ALIVE_CONFIG, "maxSessions": 2})
+
+    async def slow_call(name):
+        await asyncio.sleep(0.05)
+        return SimpleNamespace(structuredContent=None, content=[SimpleNamespace(text="ok")], isError=False)
+
+    _PoolSession.call_behavior = slow_call
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(lambda _: MCPClient().call_tool("srv", "ping", {}), range(6)))
+
+    assert results == ["ok"] * 6
+    assert _PoolSession.max_active_calls == 2
+    assert transports.opened == 2
+
+
+def test_handshake_timeout_closes_the_half_open_session(mocker, transports):
+    _use_config(mocker, KEEP_ALIVE_CONFIG)
+
+    async def never_initializes():
+        await asyncio.sleep(30)
+
+    _PoolSession.initialize_behavior = never_initializes
+    with pytest.raises(MCPToolCallError, match="timed out"):
+        MCPClient().call_tool("srv", "ping", {}, timeout=0.05)
+
+    deadline = time.monotonic() + 2
+    while transports.closed < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert transports.closed == 1
+    assert mcp_session_pool.get_stats()["idle"] == 0
+
+
+def test_list_tools_result_is_cached(mocker, transports):
+    _use_config(mocker, KEEP_ALIVE_CONFIG)
+
+    first = MCPClient().list_tools("srv")
+    second = MCPClient().list_tools("srv")
+
+    assert first == second
+    assert _PoolSession.list_calls == 1
+    stats = mcp_session_pool.get_stats()
+    assert (stats["tools_cache_hits"], stats["tools_cache_misses"]) == (1, 1)
+
+
+def test_list_tools_cache_can_be_disabled(mocker, transports):
+    _use_config(mocker, {**KEEP_ALIVE_CONFIG, "toolsCacheSeconds": 0})
+
+    MCPClient().list_tools("srv")
+    MCPClient().list_tools("srv")
+
+    assert _PoolSession.list_calls == 2
+
+
+def test_changed_config_retires_the_old_sessions(mocker, transports):
+    mock_load = _use_config(mocker, KEEP_ALIVE_CONFIG)
+    MCPClient().call_tool("srv", "ping", {})
+
+    mock_load.return_value = {**KEEP_ALIVE_CONFIG, "args": ["--verbose"]}
+    MCPClient().call_tool("srv", "ping", {})
+
+    assert transports.opened == 2
+    assert mcp_session_pool.get_stats()["idle"] == 1
+
+
+def test_idle_sweep_closes_expired_sessions(mocker, transports):
+    _use_config(mocker, {**KEEP_ALIVE_CONFIG, "idleTimeoutSeconds": 0})
+    MCPClient().call_tool("srv", "ping", {})
+
+    async def sweep():
+        return mcp_session_pool._close_expired()
+
+    assert mcp_session_pool.run(sweep()) == 1
+    assert mcp_session_pool.get_stats()["idle"] == 0
+    assert mcp_session_pool.get_stats()["idle_closed"] == 1
+
+
+@pytest.mark.parametrize("field, value", [
+    ("maxSessions", 0), ("maxSessions", 1.5), ("maxSessions", True),
+    ("idleTimeoutSeconds", -1), ("toolsCacheSeconds", "soon"),
+])
+def test_invalid_pool_settings_raise(mocker, transports, field, value):
+    _use_config(mocker, {**KEEP_ALIVE_CONFIG, field: value})
+
+    with pytest.raises(MCPToolCallError, match=field):
+        MCPClient().call_tool("srv", "ping", {})
+    assert transports.opened == 0
@@ -1,8 +1,10 @@
 import json
+import threading
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from Middleware.utilities.keyword_index import keyword_index_cache
 from Middleware.workflows.models.execution_context import ExecutionContext
 from Middleware.workflows.tools.slow_but_quality_rag_tool import SlowButQualityRAGTool
 
@@ -204,22 +206,25 @@ class TestSlowButQualityRAGTool:
             result = tool.perform_keyword_search("keywords", "InvalidTarget", mock_context)
             assert result == ""
 
-    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.advanced_search_in_chunks',
-           return_value=["found chunk"])
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.keyword_index_cache')
     @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.filter_keywords_by_speakers',
            side_effect=lambda _, k: k)
-    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.get_message_chunks', return_value=["chunk1", "chunk2"])
-    def test_perform_conversation_search(self, mock_get_chunks, mock_filter, mock_advanced_search, mock_context):
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.get_message_chunk_groups',
+           return_value=[[{"content": "chunk1"}], [{"content": "found"}, {"content": "chunk"}]])
+    def test_perform_conversation_search(self, mock_get_groups, mock_filter, mock_index, mock_context):
         """Tests searching within the current conversation messages."""
+        mock_index.search_chunks.return_value = [1]
         tool = SlowButQualityRAGTool()
         result = tool.perform_conversation_search("test keywords", mock_context)
 
-        mock_get_chunks.assert_called_once()
+        mock_get_groups.assert_called_once_with(mock_context.messages, 0, 400)
         mock_filter.assert_called_once()
-        mock_advanced_search.assert_called_once_with(["chunk1", "chunk2"], "test keywords", 10)
-        assert result == "found chunk"
+        mock_index.search_chunks.assert_called_once_with(
+            ("conversation", mock_context.api_key_hash, mock_context.discussion_id),
+            [["chunk1"], ["found", "chunk"]], "test keywords", 10)
+        assert result == "found\nchunk"
 
-    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.search_in_chunks', return_value=["found memory"])
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.keyword_index_cache')
     @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.filter_keywords_by_speakers',
            side_effect=lambda _, k: k)
     @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.extract_text_blocks_from_hashed_chunks',
@@ -227,9 +232,10 @@ class TestSlowButQualityRAGTool:
     @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.read_chunks_with_hashes')
     @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.get_discussion_memory_file_path')
     def test_perform_memory_file_keyword_search(
-            self, mock_get_path, mock_read_hashes, mock_extract, mock_filter, mock_search, mock_context
+            self, mock_get_path, mock_read_hashes, mock_extract, mock_filter, mock_index, mock_context
     ):
         """Tests searching within the memory file, checking slicing logic."""
+        mock_index.match_documents.return_value = [0]
         tool = SlowButQualityRAGTool()
         result = tool.perform_memory_file_keyword_search("test keywords", mock_context)
 
@@ -237,8 +243,25 @@ class TestSlowButQualityRAGTool:
         mock_extract.assert_called_once()
         mock_filter.assert_called_once()
 
-        mock_search.assert_called_once_with(["mem1"], "test keywords", 10)
-        assert result == "found memory"
+        mock_index.match_documents.assert_called_once_with(
+            ("memories", mock_context.api_key_hash, mock_context.discussion_id), ["mem1"], "test keywords", 10)
+        assert result == "mem1"
+
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.filter_keywords_by_speakers',
+           side_effect=lambda _, k: k)
+    def test_perform_conversation_search_reuses_the_index(self, mock_filter, mock_context):
+        """A follow-up search only tokenizes the messages added since the last one."""
+        mock_context.messages = [{"role": "user", "content": f"message {i} about dragons"} for i in range(4)]
+        tool = SlowButQualityRAGTool()
+
+        first = tool.perform_conversation_search("dragons", mock_context)
+        mock_context.messages = mock_context.messages + [
+            {"role": "assistant", "content": "more dragons"}, {"role": "user", "content": "latest"}]
+        second = tool.perform_conversation_search("dragons", mock_context)
+
+        assert "message 0 about dragons" in first
+        assert "more dragons" in second
+        assert keyword_index_cache.get_stats()["misses"] == 5
 
     @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.load_config')
     @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.vector_db_utils')
@@ -1330,15 +1353,14 @@ class TestProcessNewMemoryChunks:
         return context
 
     @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.update_chunks_with_hashes')
-    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.read_chunks_with_hashes',
-           return_value=[("existing summary", "existing_hash")])
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.read_chunks_with_hashes')
     @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.get_discussion_memory_file_path',
            return_value='/fake/memories.json')
     def test_appends_split_results_to_existing_chunks(
             self, mock_get_path, mock_read_hashes, mock_update_chunks, mock_context
     ):
         """The RAG output is split on --rag_break--, each summary is paired with its
-        chunk hash, and the file is overwritten with existing + new pairs."""
+        chunk hash, and only the new pairs are appended; the existing file is not read."""
         tool = SlowButQualityRAGTool()
         chunks = ["chunk one", "chunk two"]
         hash_chunks = [("chunk one", "h1"), ("chunk two", "h2")]
@@ -1353,9 +1375,10 @@ class TestProcessNewMemoryChunks:
             "sys", "prompt", "chunk one--ChunkBreak--chunk two", mock_context,
             workflow_config, "--rag_break--", 3
         )
+        mock_read_hashes.assert_not_called()
         mock_update_chunks.assert_called_once_with(
-            [("existing summary", "existing_hash"), ("s1", "h1"), ("s2", "h2")],
-            '/fake/memories.json', mode="overwrite", encryption_key=None
+            [("s1", "h1"), ("s2", "h2")],
+            '/fake/memories.json', mode="append", encryption_key=None
         )
 
     @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.update_chunks_with_hashes')
@@ -1381,7 +1404,7 @@ class TestProcessNewMemoryChunks:
 
         mock_update_chunks.assert_called_once_with(
             [("s1", "h1"), ("s2", "h2")],
-            '/fake/memories.json', mode="overwrite", encryption_key=None
+            '/fake/memories.json', mode="append", encryption_key=None
         )
         assert any("does not match" in r.getMessage() for r in caplog.records)
 
@@ -1623,17 +1646,17 @@ class TestKeywordSearchEdgeCases:
         context.llm_handler = mock_llm_handler
         return context
 
-    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.advanced_search_in_chunks',
-           return_value=["found A", "", "found B"])
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.keyword_index_cache')
     @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.filter_keywords_by_speakers',
            side_effect=lambda _, k: k)
-    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.get_message_chunks',
-           return_value=["chunk1", "chunk2"])
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.get_message_chunk_groups',
+           return_value=[[{"content": "found A"}], [{"content": ""}], [{"content": "found B"}]])
     def test_perform_conversation_search_joins_multiple_chunks(
-            self, mock_get_chunks, mock_filter, mock_advanced_search, mock_context
+            self, mock_get_groups, mock_filter, mock_index, mock_context
     ):
         """Multiple non-empty result chunks are joined with --ChunkBreak--; empty
         chunks are filtered out of the joined string."""
+        mock_index.search_chunks.return_value = [0, 1, 2]
         tool = SlowButQualityRAGTool()
         result = tool.perform_conversation_search("test keywords", mock_context)
         assert result == "found A--ChunkBreak--found B"
@@ -2506,6 +2529,104 @@ class TestStateDocumentIntegration:
         assert call_order == ['hash', 'update']
 
 
+class TestMemoryGenerationConcurrency:
+    """Tests for memoryGenerationConcurrency in generate_and_store_vector_memories."""
+
+    CONFIG = {'vectorMemoryEndpointName': 'test-endpoint', 'vectorMemoryPreset': 'test-preset',
+              'memoryGenerationConcurrency': 3}
+
+    @staticmethod
+    def _memory_json(chunk):
+        return json.dumps({"title": chunk, "summary": f"Summary of {chunk}", "entities": [], "key_phrases": []})
+
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.vector_db_utils')
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.LlmHandlerService')
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.get_endpoint_config')
+    def test_chunks_run_concurrently_and_commit_in_order(self, mock_get_endpoint, mock_llm_service,
+                                                         mock_vector_db, mock_context):
+        """The first chunk only finishes once the last one has started, which can only
+        happen concurrently; the hashes are still logged in chunk order."""
+        tool = SlowButQualityRAGTool()
+        hashed_chunks = [("c1", "h1"), ("c2", "h2"), ("c3", "h3")]
+        last_started = threading.Event()
+
+        def extract(chunk, *args):
+            if chunk == "c3":
+                last_started.set()
+            if chunk == "c1":
+                assert last_started.wait(timeout=5)
+            return self._memory_json(chunk)
+
+        with patch.object(SlowButQualityRAGTool, 'process_single_chunk', side_effect=extract):
+            result = tool.generate_and_store_vector_memories(hashed_chunks, self.CONFIG, mock_context)
+
+        assert result == 3
+        logged = [c[0][1] for c in mock_vector_db.add_vector_check_hash.call_args_list]
+        assert logged == ["h1", "h2", "h3"]
+        stored = [c[0][1] for c in mock_vector_db.add_memory_to_vector_db.call_args_list]
+        assert stored == ["Summary of c1", "Summary of c2", "Summary of c3"]
+        # One LLM handler per chunk: an LlmApiService serves one call at a time.
+        assert mock_llm_service.return_value.initialize_llm_handler.call_count == 3
+
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.vector_db_utils')
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.LlmHandlerService')
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.get_endpoint_config')
+    def test_request_user_is_visible_on_worker_threads(self, mock_get_endpoint, mock_llm_service,
+                                                       mock_vector_db, mock_context):
+        from Middleware.common import instance_global_variables
+        tool = SlowButQualityRAGTool()
+        seen_users = []
+
+        def extract(chunk, *args):
+            seen_users.append(instance_global_variables.get_request_user())
+            return self._memory_json(chunk)
+
+        instance_global_variables.set_request_user("alice")
+        try:
+            with patch.object(SlowButQualityRAGTool, 'process_single_chunk', side_effect=extract):
+                tool.generate_and_store_vector_memories([("c1", "h1"), ("c2", "h2")], self.CONFIG, mock_context)
+        finally:
+            instance_global_variables.clear_request_user()
+
+        assert seen_users == ["alice", "alice"]
+
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.vector_db_utils')
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.LlmHandlerService')
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.get_endpoint_config')
+    def test_failure_keeps_earlier_chunks_committed(self, mock_get_endpoint, mock_llm_service,
+                                                    mock_vector_db, mock_context):
+        tool = SlowButQualityRAGTool()
+
+        def extract(chunk, *args):
+            if chunk == "c2":
+                raise RuntimeError("backend down")
+            return self._memory_json(chunk)
+
+        with patch.object(SlowButQualityRAGTool, 'process_single_chunk', side_effect=extract):
+            with pytest.raises(RuntimeError, match="backend down"):
+                tool.generate_and_store_vector_memories([("c1", "h1"), ("c2", "h2"), ("c3", "h3")],
+                                                        self.CONFIG, mock_context)
+
+        mock_vector_db.add_vector_check_hash.assert_called_once_with(
+            mock_context.discussion_id, "h1", api_key_hash=mock_context.api_key_hash)
+
+    @pytest.mark.parametrize("value", [0, -2, "4", True, 1.5])
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.vector_db_utils')
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.LlmHandlerService')
+    @patch('Middleware.workflows.tools.slow_but_quality_rag_tool.get_endpoint_config')
+    def test_invalid_value_runs_sequentially(self, mock_get_endpoint, mock_llm_service, mock_vector_db,
+                                             value, mock_context):
+        tool = SlowButQualityRAGTool()
+        config = {**self.CONFIG, 'memoryGenerationConcurrency': value}
+
+        with patch.object(SlowButQualityRAGTool, 'process_single_chunk',
+                          side_effect=lambda chunk, *args: self._memory_json(chunk)):
+            result = tool.generate_and_store_vector_memories([("c1", "h1"), ("c2", "h2")], config, mock_context)
+
+        assert result == 2
+        mock_llm_service.return_value.initialize_llm_handler.assert_called_once()
+
+
 class TestEmbeddingWriteHook:
     """Unit tests for SlowButQualityRAGTool._store_embeddings_for_new_memories."""
 
@@ -0,0 +1,372 @@
+# e2e_benchmark.py
+#
+# End-to-end benchmark of a running Wilmer server against the stub LLM backend.
+#
+# For every combination of --server, --api-type and --workflow the harness:
+#   1. starts benchmarks/stub_llm_backend.py in-process with the given token rate
+#      and prefill delay, and times direct (non-Wilmer) calls to it;
+#   2. writes a throwaway Public/ directory whose only endpoint points at the stub
+#      and whose custom workflow is a copy of the replayed workflow file, with
+#      every node's endpointName and preset rewritten to that endpoint;
+#   3. boots Wilmer under run_waitress.py or run_eventlet.py in a subprocess;
+#   4. sends --requests streaming chat completions from --clients concurrent
+#      clients and samples the server's resident memory while they run.
+#
+# Reported per run: end-to-end latency (mean/p50/p99), time to first token,
+# streamed tokens per second, Wilmer's overhead per LLM node (the Wilmer latency
+# minus the direct backend latency of each node, spread over the nodes), and
+# the server's peak and final RSS (Linux only; null elsewhere).
+#
+# Replayed workflows are taken as-is apart from the endpoint rewrite. Nodes that
+# need services other than the LLM (memories, MCP, web fetches, sub-workflows in
+# other folders) run exactly as they would with those services absent.
+#
+# Examples (from the project root):
+#   python benchmarks/e2e_benchmark.py
+#   python benchmarks/e2e_benchmark.py --server waitress --server eventlet --api-type openai-chat \
+#       --api-type ollama-chat --clients 8 --requests 80 --token-rate 100 --prefill-ms 150 --json results.json
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+benchmarks_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, benchmarks_dir)
+
+from stub_llm_backend import start_stub_backend
+
+# api type name -> (ApiTypes config file, stub route, direct-call payload builder)
+API_TYPES = {
+    "openai-chat": ("Open-AI-API", "/v1/chat/completions", lambda msgs: {"messages": msgs}),
+    "openai-completions": ("OpenAI-Compatible-Completions", "/v1/completions", lambda msgs: {"prompt": "hi"}),
+    "ollama-chat": ("OllamaApiChat", "/api/chat", lambda msgs: {"messages": msgs}),
+    "ollama-generate": ("OllamaApiGenerate", "/api/generate", lambda msgs: {"prompt": "hi"}),
+    "claude": ("Claude", "/v1/messages", lambda msgs: {"messages": msgs, "max_tokens": 512}),
+}
+
+SERVERS = {"waitress": "run_waitress.py", "eventlet": "run_eventlet.py"}
+
+USER_NAME = "bench"
+ENDPOINT_NAME = "BenchEndpoint"
+
+CONVERSATION = [
+    {"role": "system", "content": "You are a helpful assistant."},
+    {"role": "user", "content": "Tell me about foxes."},
+    {"role": "assistant", "content": "Foxes are small omnivorous mammals found on every continent but Antarctica."},
+    {"role": "user", "content": "What do they eat, and how do they hunt?"},
+]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(values, scale=1.0, digits=2):
+    if not values:
+        return None
+    return {
+        "mean": round(statistics.mean(values) * scale, digits),
+        "p50": round(percentile(values, 50) * scale, digits),
+        "p99": round(percentile(values, 99) * scale, digits),
+    }
+
+
+def load_workflow(path):
+    """Loads a workflow file and points every LLM node at the benchmark endpoint."""
+    with open(path, encoding="utf-8") as f:
+        workflow = json.load(f)
+    nodes = workflow["nodes"] if isinstance(workflow, dict) else workflow
+    llm_nodes = 0
+    for node in nodes:
+        if "endpointName" in node:
+            node["endpointName"] = ENDPOINT_NAME
+            node["preset"] = ENDPOINT_NAME
+            llm_nodes += 1
+    return workflow, llm_nodes
+
+
+def build_public_directory(root, api_type, stub_port, workflow, wilmer_port):
+    """Writes a minimal Public/ tree for one benchmark run."""
+    configs = os.path.join(root, "Configs")
+    repo_configs = os.path.join(project_root, "Public", "Configs")
+    for folder in ("ApiTypes", "PromptTemplates"):
+        shutil.copytree(os.path.join(repo_configs, folder), os.path.join(configs, folder))
+
+    user_config = {
+        "port": wilmer_port,
+        "stream": True,
+        "customWorkflowOverride": True,
+        "customWorkflow": "Bench",
+        "endpointConfigsSubDirectory": USER_NAME,
+        "chatPromptTemplateName": "_chatonly",
+        "chatCompleteAddUserAssistant": True,
+        "chatCompletionAddMissingAssistantGenerator": True,
+        "useFileLogging": False,
+        "verboseLogging": False,
+    }
+    endpoint_config = {
+        "modelNameForDisplayOnly": "Stub",
+        "endpoint": f"http://127.0.0.1:{stub_port}",
+        "apiTypeConfigFileName": API_TYPES[api_type][0],
+        "apiKey": "stub",
+        "maxContextTokenSize": 32768,
+        "modelNameToSendToAPI": "stub",
+        "promptTemplate": "_chatonly",
+        "trimBeginningAndEndLineBreaks": True,
+        "dontIncludeModel": False,
+        "removeThinking": False,
+        "presetSamplers": {"temperature": 0.7},
+    }
+    files = {
+        os.path.join(configs, "Users", f"{USER_NAME}.json"): user_config,
+        os.path.join(configs, "Endpoints", USER_NAME, f"{ENDPOINT_NAME}.json"): endpoint_config,
+        os.path.join(configs, "Workflows", USER_NAME, "Bench.json"): workflow,
+    }
+    for path, content in files.items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(content, f, indent=2)
+
+
+def read_rss_mb(pid):
+    """Returns the resident set size of a process in MB, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        return None
+    return None
+
+
+class RssSampler:
+    """Samples a process's RSS on a background thread."""
+
+    def __init__(self, pid, interval=0.1):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = read_rss_mb(self.pid)
+            if rss is not None:
+                self.samples.append(rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def start_wilmer(server, public_dir, port, concurrency, log_path):
+    """Launches Wilmer and waits until it answers, returning the process."""
+    command = [sys.executable, os.path.join(project_root, SERVERS[server]), "--PublicDirectory", public_dir,
+               "--User", USER_NAME, "--port", str(port), "--concurrency", str(concurrency)]
+    log_file = open(log_path, "w", encoding="utf-8")
+    process = subprocess.Popen(command, cwd=project_root, stdout=log_file, stderr=subprocess.STDOUT)
+    process.log_file = log_file
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/v1/models", timeout=1).ok:
+                return process
+        except requests.RequestException:
+            time.sleep(0.2)
+    stop_wilmer(process)
+    with open(log_path, encoding="utf-8") as f:
+        tail = f.read()[-4000:]
+    raise RuntimeError(f"Wilmer ({server}) did not start:\n{tail}")
+
+
+def stop_wilmer(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    process.log_file.close()
+
+
+def time_direct_calls(stub_port, api_type, count=5):
+    """Times non-streaming calls straight to the stub, bypassing Wilmer."""
+    _, route, payload_builder = API_TYPES[api_type]
+    url = f"http://127.0.0.1:{stub_port}{route}"
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        requests.post(url, json={**payload_builder(CONVERSATION), "stream": False}, timeout=60).raise_for_status()
+        latencies.append(time.perf_counter() - started)
+    return statistics.median(latencies)
+
+
+def stream_one(url):
+    """Sends one streaming chat completion and times it."""
+    payload = {"model": USER_NAME, "messages": CONVERSATION, "stream": True}
+    started = time.perf_counter()
+    first_token = None
+    tokens = 0
+    with requests.post(url, json=payload, stream=True, timeout=600) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            try:
+                choices = json.loads(data).get("choices") or [{}]
+            except ValueError:
+                continue
+            if choices[0].get("delta", {}).get("content"):
+                tokens += 1
+                if first_token is None:
+                    first_token = time.perf_counter()
+    finished = time.perf_counter()
+    return {"latency": finished - started, "ttft": (first_token or finished) - started, "tokens": tokens,
+            "stream_seconds": finished - (first_token or finished)}
+
+
+def run_clients(url, clients, total_requests):
+    results, errors = [], []
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        futures = [executor.submit(stream_one, url) for _ in range(total_requests)]
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                errors.append(str(e))
+    return results, errors
+
+
+def run_benchmark(args, server, api_type, workflow_path):
+    workflow, llm_nodes = load_workflow(workflow_path)
+    stub = start_stub_backend(tokens=args.tokens, token_rate=args.token_rate, prefill_ms=args.prefill_ms)
+    stub_port = stub.server_address[1]
+    public_dir = tempfile.mkdtemp(prefix="wilmer-bench-")
+    try:
+        direct_latency = time_direct_calls(stub_port, api_type)
+        wilmer_port = free_port()
+        build_public_directory(public_dir, api_type, stub_port, workflow, wilmer_port)
+        process = start_wilmer(server, public_dir, wilmer_port, args.wilmer_concurrency or args.clients,
+                               os.path.join(public_dir, "wilmer.log"))
+        try:
+            url = f"http://127.0.0.1:{wilmer_port}/v1/chat/completions"
+            stream_one(url)  # warm-up: first-request imports and config loads are not measured
+            stub.stats["requests"] = 0
+            wall_started = time.perf_counter()
+            with RssSampler(process.pid) as sampler:
+                results, errors = run_clients(url, args.clients, args.requests)
+            wall = time.perf_counter() - wall_started
+        finally:
+            stop_wilmer(process)
+    finally:
+        stub.shutdown()
+        stub.server_close()
+        shutil.rmtree(public_dir, ignore_errors=True)
+
+    latencies = [r["latency"] for r in results]
+    per_request_rates = [r["tokens"] / r["stream_seconds"] for r in results if r["stream_seconds"] > 0]
+    overheads = [(latency - llm_nodes * direct_latency) / llm_nodes for latency in latencies] if llm_nodes else []
+    return {
+        "server": server,
+        "api_type": api_type,
+        "workflow": os.path.relpath(workflow_path, project_root),
+        "llm_nodes": llm_nodes,
+        "clients": args.clients,
+        "requests": len(results),
+        "errors": len(errors),
+        "error_samples": errors[:3],
+        "backend_calls": stub.stats["requests"],
+        "wall_seconds": round(wall, 3),
+        "requests_per_second": round(len(results) / wall, 3) if wall else None,
+        "direct_backend_latency_ms": round(direct_latency * 1000, 2),
+        "latency_ms": summarize(latencies, 1000),
+        "ttft_ms": summarize([r["ttft"] for r in results], 1000),
+        "tokens_per_second": summarize(per_request_rates, 1.0, 1),
+        "overhead_ms_per_node": summarize(overheads, 1000),
+        "rss_mb": {"peak": round(max(sampler.samples), 1), "end": round(sampler.samples[-1], 1)}
+        if sampler.samples else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Wilmer end to end against a stub LLM backend.")
+    parser.add_argument("--server", action="append", choices=sorted(SERVERS),
+                        help="WSGI server to boot Wilmer under; repeatable (default waitress).")
+    parser.add_argument("--api-type", action="append", choices=sorted(API_TYPES),
+                        help="Backend API shape the stub speaks; repeatable (default openai-chat).")
+    parser.add_argument("--workflow", action="append",
+                        help="Workflow file to replay; repeatable (default benchmarks/workflows/*.json).")
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent clients (default 4).")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per run (default 40).")
+    parser.add_argument("--wilmer-concurrency", type=int, default=None,
+                        help="Wilmer's --concurrency (default: the client count).")
+    parser.add_argument("--tokens", type=int, default=64, help="Tokens per backend response (default 64).")
+    parser.add_argument("--token-rate", type=float, default=0.0,
+                        help="Backend tokens per second; 0 = unthrottled (default).")
+    parser.add_argument("--prefill-ms", type=float, default=0.0, help="Backend delay before the first token.")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results to this file ('-' for stdout only).")
+    args = parser.parse_args()
+
+    workflows = args.workflow or sorted(glob.glob(os.path.join(benchmarks_dir, "workflows", "*.json")))
+    results = []
+    for server in args.server or ["waitress"]:
+        for api_type in args.api_type or ["openai-chat"]:
+            for workflow_path in workflows:
+                result = run_benchmark(args, server, api_type, os.path.abspath(workflow_path))
+                results.append(result)
+                latency, overhead = result["latency_ms"] or {}, result["overhead_ms_per_node"] or {}
+                print(f"{server:>8} {api_type:>18} {os.path.basename(workflow_path):>24}: "
+                      f"p50 {latency.get('p50')} ms, p99 {latency.get('p99')} ms, "
+                      f"overhead/node p50 {overhead.get('p50')} ms, "
+                      f"{result['requests_per_second']} req/s, {result['errors']} errors", file=sys.stderr)
+
+    report = {
+        "benchmark": "e2e",
+        "settings": {"clients": args.clients, "requests": args.requests, "tokens": args.tokens,
+                     "token_rate": args.token_rate, "prefill_ms": args.prefill_ms},
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.json and args.json != "-":
+        with open(args.json, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+# stub_llm_backend.py
+#
+# A fake LLM backend for benchmarking Wilmer without a real model.
+#
+# Serves the request and response shapes of the backends Wilmer talks to, both
+# streaming and non-streaming:
+#   POST /v1/chat/completions   OpenAI chat completions (SSE)
+#   POST /v1/completions        OpenAI legacy completions (SSE)
+#   POST /api/chat              Ollama chat (NDJSON)
+#   POST /api/generate          Ollama generate (NDJSON)
+#   POST /v1/messages           Claude messages (SSE with event names)
+#
+# Every response is --tokens tokens long. The backend waits --prefill-ms before
+# the first token, then emits tokens at --token-rate tokens per second (0 means
+# as fast as possible), so a benchmark can subtract a known backend cost from
+# what it measures through Wilmer.
+#
+# Examples (from the project root):
+#   python benchmarks/stub_llm_backend.py --port 5999
+#   python benchmarks/stub_llm_backend.py --port 5999 --tokens 256 --token-rate 50 --prefill-ms 200
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_WORDS = [" the", " quick", " brown", " fox", " jumps", " over", " a", " lazy", " dog", "."]
+
+
+def _token(i):
+    return _WORDS[i % len(_WORDS)]
+
+
+def _openai_chat_chunk(token, finish_reason=None):
+    delta = {"content": token} if token else {}
+    return {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "model": "stub",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+
+def _openai_completion_chunk(token, finish_reason=None):
+    return {"id": "cmpl-stub", "object": "text_completion", "model": "stub",
+            "choices": [{"index": 0, "text": token, "finish_reason": finish_reason}]}
+
+
+def _ollama_chat_chunk(token, done=False):
+    chunk = {"model": "stub", "message": {"role": "assistant", "content": token}, "done": done}
+    if done:
+        chunk["done_reason"] = "stop"
+    return chunk
+
+
+def _ollama_generate_chunk(token, done=False):
+    chunk = {"model": "stub", "response": token, "done": done}
+    if done:
+        chunk["done_reason"] = "stop"
+    return chunk
+
+
+class StubBackendHandler(BaseHTTPRequestHandler):
+    """Answers every supported route with --tokens tokens at the configured pace."""
+
+    # Silence the per-request access log; it would dominate the benchmark output.
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def settings(self):
+        return self.server.settings
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(body or b"{}")
+        except ValueError:
+            return {}
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _tokens(self):
+        """Yields the response tokens, sleeping for the prefill and between tokens."""
+        prefill = self.settings["prefill_ms"] / 1000.0
+        if prefill:
+            time.sleep(prefill)
+        interval = 1.0 / self.settings["token_rate"] if self.settings["token_rate"] else 0.0
+        for i in range(self.settings["tokens"]):
+            if i and interval:
+                time.sleep(interval)
+            yield _token(i)
+
+    def _full_text(self):
+        return "".join(self._tokens())
+
+    def _start_stream(self, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+    def _write(self, text):
+        self.wfile.write(text.encode("utf-8"))
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.startswith("/v1/models"):
+            self._send_json({"object": "list", "data": [{"id": "stub", "object": "model"}]})
+        elif self.path.startswith("/api/tags"):
+            self._send_json({"models": [{"name": "stub", "model": "stub"}]})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        payload = self._read_json()
+        stream = bool(payload.get("stream", False))
+        route = self.path.split("?", 1)[0]
+        with self.server.stats_lock:
+            self.server.stats["requests"] += 1
+        try:
+            if route == "/v1/chat/completions":
+                self._openai(stream, _openai_chat_chunk, lambda text: {
+                    "id": "chatcmpl-stub", "object": "chat.completion", "model": "stub",
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                                 "finish_reason": "stop"}]})
+            elif route == "/v1/completions":
+                self._openai(stream, _openai_completion_chunk, lambda text: {
+                    "id": "cmpl-stub", "object": "text_completion", "model": "stub",
+                    "choices": [{"index": 0, "text": text, "finish_reason": "stop"}]})
+            elif route == "/api/chat":
+                self._ollama(stream, _ollama_chat_chunk)
+            elif route == "/api/generate":
+                self._ollama(stream, _ollama_generate_chunk)
+            elif route == "/v1/messages":
+                self._claude(stream)
+            else:
+                self._send_json({"error": f"unsupported route {route}"}, status=404)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (cancellation or a benchmark timeout); nothing to report.
+            pass
+
+    def _openai(self, stream, make_chunk, make_response):
+        if not stream:
+            self._send_json(make_response(self._full_text()))
+            return
+        self._start_stream("text/event-stream")
+        for token in self._tokens():
+            self._write(f"data: {json.dumps(make_chunk(token))}\n\n")
+        self._write(f"data: {json.dumps(make_chunk('', 'stop'))}\n\n")
+        self._write("data: [DONE]\n\n")
+
+    def _ollama(self, stream, make_chunk):
+        if not stream:
+            self._send_json(make_chunk(self._full_text(), done=True))
+            return
+        self._start_stream("application/x-ndjson")
+        for token in self._tokens():
+            self._write(json.dumps(make_chunk(token)) + "\n")
+        self._write(json.dumps(make_chunk("", done=True)) + "\n")
+
+    def _claude(self, stream):
+        if not stream:
+            self._send_json({"id": "msg_stub", "type": "message", "role": "assistant", "model": "stub",
+                             "content": [{"type": "text", "text": self._full_text()}],
+                             "stop_reason": "end_turn"})
+            return
+        self._start_stream("text/event-stream")
+
+        def event(name, data):
+            self._write(f"event: {name}\ndata: {json.dumps({'type': name, **data})}\n\n")
+
+        event("message_start", {"message": {"id": "msg_stub", "type": "message", "role": "assistant",
+                                            "model": "stub", "content": []}})
+        event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+        for token in self._tokens():
+            event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": token}})
+        event("content_block_stop", {"index": 0})
+        event("message_delta", {"delta": {"stop_reason": "end_turn"}})
+        event("message_stop", {})
+
+
+def start_stub_backend(host="127.0.0.1", port=0, tokens=64, token_rate=0.0, prefill_ms=0.0):
+    """
+    Starts the stub backend on a daemon thread.
+
+    Returns:
+        ThreadingHTTPServer: The running server; its ``server_address`` holds the
+        bound port, ``stats`` counts requests, and ``shutdown()`` stops it.
+    """
+    server = ThreadingHTTPServer((host, port), StubBackendHandler)
+    server.daemon_threads = True
+    server.settings = {"tokens": tokens, "token_rate": token_rate, "prefill_ms": prefill_ms}
+    server.stats = {"requests": 0}
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, name="stub-llm-backend", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake LLM backend for benchmarking Wilmer.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5999)
+    parser.add_argument("--tokens", type=int, default=64, help="Tokens per response (default 64).")
+    parser.add_argument("--token-rate", type=float, default=0.0,
+                        help="Tokens per second after the first token; 0 = unthrottled (default).")
+    parser.add_argument("--prefill-ms", type=float, default=0.0, help="Delay before the first token (default 0).")
+    args = parser.parse_args()
+
+    server = start_stub_backend(args.host, args.port, args.tokens, args.token_rate, args.prefill_ms)
+    print(f"Stub LLM backend listening on http://{args.host}:{server.server_address[1]} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# think_remover_benchmark.py
+#
+# Micro-benchmark for StreamingThinkRemover on long reasoning streams.
+#
+# Feeds synthetic token-sized deltas (a think block of --tokens tokens followed
+# by a short answer) through the remover for each tag style and reports the
+# time per delta and the throughput. --baseline also times a remover that
+# re-searches its whole accumulated buffer on every delta, which is how the
+# remover worked before the closing-tag search became incremental, so the
+# difference is visible on the same machine.
+#
+# Examples (from the project root):
+#   python benchmarks/think_remover_benchmark.py
+#   python benchmarks/think_remover_benchmark.py --tokens 50000 --baseline --json
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+# Add the project root to sys.path so Middleware imports work
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from Middleware.utilities.streaming_utils import StreamingThinkRemover
+
+SCENARIOS = {
+    "standard": {
+        "removeThinking": True, "startThinkTag": "<think>", "endThinkTag": "</think>",
+    },
+    "long_tags": {
+        "removeThinking": True, "startThinkTag": "<|channel|>analysis<|message|>",
+        "endThinkTag": "<|start|>assistant<|channel|>final<|message|>",
+    },
+    "closing_only": {
+        "removeThinking": True, "startThinkTag": "<think>", "endThinkTag": "</think>",
+        "expectOnlyClosingThinkTag": True,
+    },
+}
+
+_WORDS = ["the", " user", " wants", " a", " careful", " answer", ",", " so", " let", " me", " think", ".\n"]
+
+
+def build_deltas(config, tokens):
+    """Returns the deltas of a stream with a think block of the given token count."""
+    deltas = [] if config.get("expectOnlyClosingThinkTag") else [config["startThinkTag"]]
+    deltas.extend(_WORDS[i % len(_WORDS)] for i in range(tokens))
+    deltas.append(config["endThinkTag"])
+    deltas.extend(["Here", " is", " the", " answer", "."])
+    return deltas
+
+
+class RescanningRemover:
+    """Baseline: buffers the whole think block and re-searches it on every delta."""
+
+    def __init__(self, config):
+        self.expect_only_closing = config.get("expectOnlyClosingThinkTag", False)
+        self.start_tag = config["startThinkTag"]
+        self.close_tag_re = re.compile(re.escape(config["endThinkTag"]), re.IGNORECASE)
+        self.buffer = ""
+        self.done = False
+
+    def process_delta(self, delta):
+        if self.done:
+            return delta
+        self.buffer += delta
+        if not self.expect_only_closing and self.buffer.startswith(self.start_tag):
+            self.buffer = self.buffer[len(self.start_tag):]
+            self.expect_only_closing = True
+        match = self.close_tag_re.search(self.buffer)
+        if not match:
+            return ""
+        self.done = True
+        return self.buffer[match.end():]
+
+    def finalize(self):
+        return "" if self.done else self.buffer
+
+
+def run(factory, config, deltas, repeats):
+    """Times the best of several runs of a remover over the deltas."""
+    best = None
+    output = ""
+    for _ in range(repeats):
+        remover = factory(config)
+        started = time.perf_counter()
+        output = "".join(remover.process_delta(delta) for delta in deltas) + remover.finalize()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark StreamingThinkRemover on long reasoning streams.")
+    parser.add_argument("--tokens", type=int, default=50000, help="Tokens in the think block (default 50000).")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per measurement; the best is kept.")
+    parser.add_argument("--baseline", action="store_true",
+                        help="Also time the whole-buffer rescanning baseline (slow for large --tokens).")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args()
+
+    results = []
+    for name, config in SCENARIOS.items():
+        deltas = build_deltas(config, args.tokens)
+        elapsed, output = run(StreamingThinkRemover, config, deltas, args.repeats)
+        if output != "Here is the answer.":
+            print(f"{name}: unexpected output {output[:80]!r}", file=sys.stderr)
+            return 1
+        result = {
+            "scenario": name,
+            "deltas": len(deltas),
+            "seconds": round(elapsed, 6),
+            "us_per_delta": round(elapsed / len(deltas) * 1e6, 3),
+            "deltas_per_second": round(len(deltas) / elapsed),
+        }
+        if args.baseline:
+            baseline_elapsed, _ = run(RescanningRemover, config, deltas, 1)
+            result["baseline_seconds"] = round(baseline_elapsed, 6)
+            result["speedup"] = round(baseline_elapsed / elapsed, 1)
+        results.append(result)
+
+    if args.json:
+        print(json.dumps({"benchmark": "think_remover", "tokens": args.tokens, "results": results}, indent=2))
+    else:
+        for result in results:
+            line = (f"{result['scenario']:>12}: {result['deltas']} deltas in {result['seconds']:.4f}s "
+                    f"({result['us_per_delta']:.2f} us/delta, {result['deltas_per_second']:,} deltas/s)")
+            if args.baseline:
+                line += f"; baseline {result['baseline_seconds']:.4f}s ({result['speedup']}x)"
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
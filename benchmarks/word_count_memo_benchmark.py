@@ -0,0 +1,106 @@
+# word_count_memo_benchmark.py
+#
+# Micro-benchmark for the WordCountMemo behind rough_estimate_token_length().
+#
+# Simulates what every request does to a long conversation: the client
+# re-sends the whole chat, the JSON body is parsed into fresh strings, and each
+# message's token length is estimated --estimates-per-message times (the
+# chunker, the context clamp, the compactor and the memory tools each estimate
+# it). Because the strings are fresh, every lookup pays for hash() once per
+# string; the memo is warm from the previous request, as it is in a running
+# server. The same requests are then timed with the word count taken by
+# str.split() directly. JSON parsing is timed on its own so it can be
+# subtracted from both.
+#
+# Examples (from the project root):
+#   python benchmarks/word_count_memo_benchmark.py
+#   python benchmarks/word_count_memo_benchmark.py --messages 500 --words 700 --json
+
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+
+# Add the project root to sys.path so Middleware imports work
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from Middleware.utilities.text_utils import word_count_memo
+
+
+def build_body(messages, words, seed=0):
+    """Returns the JSON body of a chat with the given number of messages and words per message."""
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))) for _ in range(5000)]
+    return json.dumps([" ".join(rng.choices(vocabulary, k=words)) for _ in range(messages)])
+
+
+def best_of(repeats, requests, fn):
+    """Returns the best per-request time, in milliseconds, over several runs of `requests` calls."""
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(requests):
+            fn()
+        elapsed = (time.perf_counter() - started) / requests * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WordCountMemo on re-parsed conversations.")
+    parser.add_argument("--messages", type=int, default=500, help="Messages in the conversation (default 500).")
+    parser.add_argument("--words", type=int, default=170,
+                        help="Words per message (default 170, about 1 KB of text).")
+    parser.add_argument("--estimates-per-message", type=int, default=1,
+                        help="Token estimates taken per message per request (default 1).")
+    parser.add_argument("--requests", type=int, default=30, help="Requests per run (default 30).")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per measurement; the best is kept.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args()
+
+    body = build_body(args.messages, args.words)
+    per_message = args.estimates_per_message
+
+    def parse_only():
+        json.loads(body)
+
+    def memoized():
+        for text in json.loads(body):
+            for _ in range(per_message):
+                word_count_memo.count(text)
+
+    def direct():
+        for text in json.loads(body):
+            for _ in range(per_message):
+                len(text.split())
+
+    memoized()  # warm the memo, as the previous request would have
+    parse_ms = best_of(args.repeats, args.requests, parse_only)
+    memo_ms = best_of(args.repeats, args.requests, memoized) - parse_ms
+    direct_ms = best_of(args.repeats, args.requests, direct) - parse_ms
+    result = {
+        "messages": args.messages,
+        "chars_per_message": len(json.loads(body)[0]),
+        "estimates_per_message": per_message,
+        "parse_ms": round(parse_ms, 3),
+        "memo_ms": round(memo_ms, 3),
+        "split_ms": round(direct_ms, 3),
+        "speedup": round(direct_ms / memo_ms, 1) if memo_ms > 0 else None,
+    }
+
+    if args.json:
+        print(json.dumps({"benchmark": "word_count_memo", "result": result}, indent=2))
+    else:
+        print(f"{result['messages']} messages of ~{result['chars_per_message']} chars, "
+              f"{per_message} estimate(s) each, JSON parse ({result['parse_ms']:.3f} ms) excluded:")
+        print(f"  memo:  {result['memo_ms']:.3f} ms/request")
+        print(f"  split: {result['split_ms']:.3f} ms/request ({result['speedup']}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,7 +12,7 @@ from Middleware.api.api_server import ApiServer
 from Middleware.common import instance_global_variables
 from Middleware.common.launch_arguments import parse_and_apply_launch_arguments
 from Middleware.common.server_startup import UserInjectionFilter, UserRoutingFileHandler, resolve_file_logging, \
-    resolve_port
+    resolve_port, precompile_workflows, recover_memory_jobs
 from Middleware.services.locking_service import LockingService
 from Middleware.utilities import config_utils
 
@@ -110,6 +110,10 @@ def initialize_app():
     else:
         logger.info("No concurrency limit")
 
+    recover_memory_jobs(users)
+
+    precompile_workflows()
+
     logger.info("Initializing API Server")
 
     # Instantiate the new ApiServer